@@ -0,0 +1,64 @@
+"""add escrow scan cursor and tx hash
+
+Revision ID: a2d5c8e1f3b7
+Revises: f4c9a2e7b1d8
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a2d5c8e1f3b7"
+down_revision = "f4c9a2e7b1d8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("deal_escrows", sa.Column("last_scanned_lt", sa.BigInteger(), nullable=True))
+    op.add_column("escrow_events", sa.Column("tx_hash", sa.String(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE escrow_events
+        SET tx_hash = payload ->> 'tx_hash'
+        WHERE event_type = 'tx_seen' AND (payload ->> 'tx_hash') IS NOT NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE deal_escrows
+        SET last_scanned_lt = seen.max_lt
+        FROM (
+            SELECT escrow_id, MAX((payload ->> 'lt')::bigint) AS max_lt
+            FROM escrow_events
+            WHERE event_type = 'tx_seen' AND (payload ->> 'lt') ~ '^[0-9]+$'
+            GROUP BY escrow_id
+        ) AS seen
+        WHERE deal_escrows.id = seen.escrow_id
+        """
+    )
+
+    # The plain column index replaces the payload expression index for hash dedup.
+    op.execute("DROP INDEX IF EXISTS ux_escrow_events_tx_seen_hash")
+    op.create_index(
+        "ux_escrow_events_escrow_id_tx_hash",
+        "escrow_events",
+        ["escrow_id", "tx_hash"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_escrow_events_escrow_id_tx_hash", table_name="escrow_events")
+    op.execute(
+        """
+        CREATE UNIQUE INDEX ux_escrow_events_tx_seen_hash
+        ON escrow_events (escrow_id, (payload ->> 'tx_hash'))
+        WHERE event_type = 'tx_seen' AND (payload ->> 'tx_hash') IS NOT NULL
+        """
+    )
+    op.drop_column("escrow_events", "tx_hash")
+    op.drop_column("deal_escrows", "last_scanned_lt")
@@ -0,0 +1,26 @@
+"""add deal next verification at
+
+Revision ID: a7d3f9c2e6b1
+Revises: f2a6d8c3b9e5
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7d3f9c2e6b1"
+down_revision = "f2a6d8c3b9e5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("deals", sa.Column("next_verification_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f("ix_deals_next_verification_at"), "deals", ["next_verification_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_deals_next_verification_at"), table_name="deals")
+    op.drop_column("deals", "next_verification_at")
@@ -0,0 +1,35 @@
+"""add escrow deposit mc block seqno
+
+Revision ID: b6e1f4a9c2d7
+Revises: a2d5c8e1f3b7
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b6e1f4a9c2d7"
+down_revision = "a2d5c8e1f3b7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("deal_escrows", sa.Column("deposit_mc_block_seqno", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE deal_escrows
+        SET deposit_mc_block_seqno = (escrow_events.payload ->> 'mc_block_seqno')::integer
+        FROM escrow_events
+        WHERE escrow_events.escrow_id = deal_escrows.id
+          AND escrow_events.event_type = 'tx_seen'
+          AND escrow_events.tx_hash = deal_escrows.deposit_tx_hash
+          AND (escrow_events.payload ->> 'mc_block_seqno') ~ '^[0-9]+$'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("deal_escrows", "deposit_mc_block_seqno")
@@ -0,0 +1,24 @@
+"""add ton payout lease until
+
+Revision ID: b8e4c1f7a2d3
+Revises: a7d3f9c2e6b1
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b8e4c1f7a2d3"
+down_revision = "a7d3f9c2e6b1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("ton_payouts", sa.Column("lease_until", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ton_payouts", "lease_until")
@@ -0,0 +1,66 @@
+"""create ton payouts and escrow sweeps
+
+Revision ID: c3f7a1d9e4b2
+Revises: b6e1f4a9c2d7
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3f7a1d9e4b2"
+down_revision = "b6e1f4a9c2d7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("deal_escrows", sa.Column("sweep_tx_hash", sa.String(), nullable=True))
+    op.add_column("deal_escrows", sa.Column("swept_at", sa.DateTime(timezone=True), nullable=True))
+
+    op.create_table(
+        "ton_payouts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("deal_id", sa.Integer(), nullable=False),
+        sa.Column("escrow_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("to_address", sa.String(), nullable=False),
+        sa.Column("amount_ton", sa.Numeric(18, 9), nullable=False),
+        sa.Column("reason", sa.String(), nullable=True),
+        sa.Column("state", sa.String(), server_default=sa.text("'pending'"), nullable=False),
+        sa.Column("tx_hash", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["deal_id"], ["deals.id"]),
+        sa.ForeignKeyConstraint(["escrow_id"], ["deal_escrows.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("escrow_id", "kind", name="ux_ton_payouts_escrow_id_kind"),
+    )
+    op.create_index(
+        "ix_ton_payouts_state_next_attempt_at",
+        "ton_payouts",
+        ["state", "next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ton_payouts_state_next_attempt_at", table_name="ton_payouts")
+    op.drop_table("ton_payouts")
+    op.drop_column("deal_escrows", "swept_at")
+    op.drop_column("deal_escrows", "sweep_tx_hash")
@@ -0,0 +1,27 @@
+"""add bot notification chat index
+
+Revision ID: c3f7a9d2e8b4
+Revises: b8e4c1f7a2d3
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "c3f7a9d2e8b4"
+down_revision = "b8e4c1f7a2d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_bot_notifications_chat_id_state_id",
+        "bot_notifications",
+        ["chat_id", "state", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bot_notifications_chat_id_state_id", table_name="bot_notifications")
@@ -0,0 +1,34 @@
+"""add ton payout submission fields
+
+Revision ID: d8b2e5f1a7c4
+Revises: c3f7a1d9e4b2
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d8b2e5f1a7c4"
+down_revision = "c3f7a1d9e4b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("ton_payouts", sa.Column("source_subwallet_id", sa.Integer(), nullable=True))
+    op.add_column("ton_payouts", sa.Column("source_address_raw", sa.String(), nullable=True))
+    op.add_column("ton_payouts", sa.Column("external_hash", sa.String(), nullable=True))
+    op.add_column("ton_payouts", sa.Column("seqno", sa.Integer(), nullable=True))
+    op.add_column("ton_payouts", sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("ton_payouts", sa.Column("submitted_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("ton_payouts", "submitted_at")
+    op.drop_column("ton_payouts", "expires_at")
+    op.drop_column("ton_payouts", "seqno")
+    op.drop_column("ton_payouts", "external_hash")
+    op.drop_column("ton_payouts", "source_address_raw")
+    op.drop_column("ton_payouts", "source_subwallet_id")
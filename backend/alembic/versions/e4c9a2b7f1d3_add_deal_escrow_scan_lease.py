@@ -0,0 +1,24 @@
+"""add deal escrow scan lease
+
+Revision ID: e4c9a2b7f1d3
+Revises: d8b2e5f1a7c4
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e4c9a2b7f1d3"
+down_revision = "d8b2e5f1a7c4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("deal_escrows", sa.Column("scan_lease_until", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("deal_escrows", "scan_lease_until")
@@ -0,0 +1,28 @@
+"""add deal escrow next scan at
+
+Revision ID: f2a6d8c3b9e5
+Revises: e4c9a2b7f1d3
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f2a6d8c3b9e5"
+down_revision = "e4c9a2b7f1d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("deal_escrows", sa.Column("next_scan_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("deal_escrows", sa.Column("scan_activity_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f("ix_deal_escrows_next_scan_at"), "deal_escrows", ["next_scan_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_deal_escrows_next_scan_at"), table_name="deal_escrows")
+    op.drop_column("deal_escrows", "scan_activity_at")
+    op.drop_column("deal_escrows", "next_scan_at")
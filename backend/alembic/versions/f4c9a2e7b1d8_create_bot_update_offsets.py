@@ -0,0 +1,35 @@
+"""create bot update offsets
+
+Revision ID: f4c9a2e7b1d8
+Revises: e3b8f1d6a2c5
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f4c9a2e7b1d8"
+down_revision = "e3b8f1d6a2c5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bot_update_offsets",
+        sa.Column("bot_key", sa.String(), nullable=False),
+        sa.Column("last_update_id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("bot_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bot_update_offsets")
@@ -34,8 +34,13 @@ from app.services.bot_notifications import (
     notify_campaign_offer_accepted,
     notify_campaign_offer_received,
 )
+from app.services.media_upload import (
+    InvalidMediaUpload,
+    MediaUploadTooLarge,
+    send_creative_upload,
+)
 from app.settings import Settings
-from shared.telegram.bot_api import BotApiService, TelegramApiError, TelegramConfigError
+from shared.telegram.bot_api import TelegramApiError, TelegramConfigError
 
 router = APIRouter(prefix="/campaigns", tags=["campaign-applications"])
 
@@ -308,6 +313,14 @@ def apply_to_campaign(
     )
     db.add(application)
     try:
+        db.flush()
+        notify_campaign_offer_received(
+            db=db,
+            settings=settings,
+            advertiser_id=campaign.advertiser_id,
+            campaign_id=campaign.id,
+            application_id=application.id,
+        )
         db.commit()
     except IntegrityError:
         db.rollback()
@@ -326,13 +339,6 @@ def apply_to_campaign(
         )
 
     db.refresh(application)
-    notify_campaign_offer_received(
-        db=db,
-        settings=settings,
-        advertiser_id=campaign.advertiser_id,
-        campaign_id=campaign.id,
-        application_id=application.id,
-    )
     return _application_summary(application)
 
 
@@ -482,30 +488,16 @@ def upload_campaign_application_creative_media(
             detail="Application is not submitted",
         )
 
-    content_type = file.content_type or ""
-    if content_type.startswith("image/"):
-        media_type = "image"
-    elif content_type.startswith("video/"):
-        media_type = "video"
-    else:
+    try:
+        result = send_creative_upload(upload=file, settings=settings, db=db)
+    except MediaUploadTooLarge as exc:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid creative_media_type",
-        )
-
-    content = file.file.read()
-    if not content:
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(exc)
+        ) from exc
+    except InvalidMediaUpload as exc:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Empty upload"
-        )
-
-    service = BotApiService(settings)
-    try:
-        result = service.upload_media(
-            media_type=media_type,
-            filename=file.filename or f"creative.{media_type}",
-            content=content,
-        )
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
     except (TelegramApiError, TelegramConfigError) as exc:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to upload media"
@@ -695,6 +687,7 @@ def accept_campaign_application(
             db.add(offer)
 
     try:
+        notify_campaign_offer_accepted(db=db, settings=settings, deal=deal)
         db.commit()
     except IntegrityError:
         db.rollback()
@@ -703,5 +696,4 @@ def accept_campaign_application(
         )
 
     db.refresh(deal)
-    notify_campaign_offer_accepted(db=db, settings=settings, deal=deal)
     return _deal_summary(deal)
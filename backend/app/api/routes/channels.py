@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.exc import IntegrityError
@@ -24,13 +25,20 @@ from app.schemas.listing import ChannelListingResponse, ListingDetail, ListingFo
 from app.services.channel_stats import build_channel_stats_response, read_latest_channel_snapshot
 from app.services.channel_verify import verify_channel
 from app.settings import Settings
-from shared.telegram import BotApiService, TelegramClientService
+from shared.telegram import AsyncBotApiService, TelegramClientService
+from shared.telegram.member_cache import RedisBotMemberCache
 
 router = APIRouter(prefix="/channels", tags=["channels"])
 
 _USERNAME_PATTERN = re.compile(r"^[a-z0-9_]{5,32}$")
 
 
+@lru_cache(maxsize=None)
+def _bot_member_cache(redis_url: str, ttl_seconds: int) -> RedisBotMemberCache:
+    # One cache, and so one Redis connection pool, per process rather than per request.
+    return RedisBotMemberCache.from_url(redis_url, ttl_seconds=ttl_seconds)
+
+
 def _normalize_username(raw_username: str) -> str:
     normalized = raw_username.strip()
     if normalized.startswith("@"):
@@ -245,7 +253,7 @@ async def verify_channel_endpoint(
     settings: Settings = Depends(get_settings_dep),
 ) -> ChannelSummary:
     telegram_client = TelegramClientService(settings)
-    bot_api = BotApiService(settings)
+    bot_api = AsyncBotApiService(settings)
     try:
         channel = await verify_channel(
             channel_id=channel_id,
@@ -253,6 +261,7 @@ async def verify_channel_endpoint(
             db=db,
             telegram_client=telegram_client,
             bot_api=bot_api,
+            member_cache=_bot_member_cache(settings.REDIS_URL, settings.BOT_PERMISSION_CACHE_TTL_SECONDS),
         )
     except ChannelNotFound as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
@@ -260,6 +269,8 @@ async def verify_channel_endpoint(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)) from exc
     except ChannelVerificationError as exc:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
+    finally:
+        await bot_api.aclose()
 
     return ChannelSummary(
         id=channel.id,
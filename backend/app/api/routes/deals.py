@@ -13,6 +13,7 @@ from fastapi import (
     UploadFile,
     status,
 )
+from fastapi.responses import FileResponse
 from sqlalchemy import func, or_
 from sqlmodel import Session, select
 
@@ -53,6 +54,12 @@ from app.services.deal_fsm import (
     apply_transition,
 )
 from app.services.bot_notifications import notify_deal_offer_accepted
+from app.services.media_cache import get_media_cache
+from app.services.media_upload import (
+    InvalidMediaUpload,
+    MediaUploadTooLarge,
+    send_creative_upload,
+)
 from app.services.ton.addressing import to_raw_address
 from app.services.ton.errors import TonConfigError
 from app.services.ton.tonconnect import build_tonconnect_transaction
@@ -296,32 +303,18 @@ def _build_proposal_snapshot(deal: Deal) -> dict[str, object]:
 
 
 def _upload_media_to_telegram(
-    *, file: UploadFile, settings: Settings
+    *, file: UploadFile, settings: Settings, db: Session
 ) -> DealCreativeUploadResponse:
-    content_type = file.content_type or ""
-    if content_type.startswith("image/"):
-        media_type = "image"
-    elif content_type.startswith("video/"):
-        media_type = "video"
-    else:
+    try:
+        result = send_creative_upload(upload=file, settings=settings, db=db)
+    except MediaUploadTooLarge as exc:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid creative_media_type",
-        )
-
-    content = file.file.read()
-    if not content:
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(exc)
+        ) from exc
+    except InvalidMediaUpload as exc:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Empty upload"
-        )
-
-    service = BotApiService(settings)
-    try:
-        result = service.upload_media(
-            media_type=media_type,
-            filename=file.filename or f"creative.{media_type}",
-            content=content,
-        )
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
     except (TelegramApiError, TelegramConfigError) as exc:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to upload media"
@@ -713,11 +706,11 @@ def accept_deal(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
         ) from exc
 
-    db.commit()
-    db.refresh(deal)
     notify_deal_offer_accepted(
         db=db, settings=settings, deal=deal, accepted_by_role=actor_role
     )
+    db.commit()
+    db.refresh(deal)
     return _deal_summary(deal)
 
 
@@ -904,7 +897,7 @@ def upload_creative_media(
             detail="Only channel owner may upload creative",
         )
 
-    return _upload_media_to_telegram(file=file, settings=settings)
+    return _upload_media_to_telegram(file=file, settings=settings, db=db)
 
 
 @router.post("/{deal_id}/proposal/upload", response_model=DealCreativeUploadResponse)
@@ -924,13 +917,14 @@ def upload_proposal_media(
         )
     _require_latest_proposal_counterparty(db, deal, current_user.id, action="edit")
 
-    return _upload_media_to_telegram(file=file, settings=settings)
+    return _upload_media_to_telegram(file=file, settings=settings, db=db)
 
 
 @router.get("/{deal_id}/proposal/media")
 def get_proposal_media(
     deal_id: int,
     media_ref: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     settings: Settings = Depends(get_settings_dep),
@@ -946,19 +940,34 @@ def get_proposal_media(
 
     service = BotApiService(settings)
     try:
-        content, content_type = service.download_file(file_id=normalized_media_ref)
+        media = get_media_cache(settings).get_or_fetch(
+            file_id=normalized_media_ref, bot_api=service
+        )
     except (TelegramApiError, TelegramConfigError) as exc:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to load media"
         ) from exc
 
-    return Response(
-        content=content,
-        media_type=content_type or "application/octet-stream",
-        headers={"Cache-Control": "private, max-age=60"},
+    # Telegram file_ids are immutable, so the content hash is a strong validator.
+    headers = {"Cache-Control": "private, max-age=3600", "ETag": media.etag}
+    if_none_match = _parse_if_none_match(request.headers.get("if-none-match"))
+    if "*" in if_none_match or media.etag in if_none_match:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # FileResponse streams the cached file in chunks and answers Range/If-Range itself.
+    return FileResponse(
+        media.path,
+        media_type=media.content_type,
+        headers=headers,
     )
 
 
+def _parse_if_none_match(value: str | None) -> set[str]:
+    if not value:
+        return set()
+    return {tag.strip().removeprefix("W/") for tag in value.split(",") if tag.strip()}
+
+
 @router.post("/{deal_id}/escrow/init", response_model=EscrowInitResponse)
 def init_escrow(
     deal_id: int,
@@ -986,16 +995,21 @@ def init_escrow(
             detail="TON_FEE_PERCENT is not configured",
         )
 
-    try:
-        deposit_details = resolve_deal_deposit_address(
-            deal_id=deal.id, settings=settings
-        )
-    except TonConfigError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
-        ) from exc
-
     escrow = _load_escrow(db, deal.id)
+    deposit_details = None
+    # Address derivation is only needed until the escrow row holds a complete address.
+    if escrow is None or not (
+        escrow.deposit_address and escrow.deposit_address_raw and escrow.escrow_network
+    ):
+        try:
+            deposit_details = resolve_deal_deposit_address(
+                deal_id=deal.id, settings=settings
+            )
+        except TonConfigError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+            ) from exc
+
     if escrow is None:
         escrow = DealEscrow(
             deal_id=deal.id,
@@ -1108,6 +1122,18 @@ def tonconnect_tx(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
         ) from exc
 
+    if escrow.state in (
+        EscrowState.AWAITING_DEPOSIT.value,
+        EscrowState.DEPOSIT_DETECTED.value,
+    ):
+        # A payment is about to be signed: the watcher claims the escrow on its next tick
+        # and keeps it on the fast scan interval.
+        now = datetime.now(timezone.utc)
+        escrow.scan_activity_at = now
+        escrow.next_scan_at = now
+        db.add(escrow)
+        db.commit()
+
     return TonConnectTxResponse(escrow_id=escrow.id, deal_id=deal.id, payload=payload)
 
 
@@ -30,8 +30,12 @@ from app.schemas.listing import (
     ListingUpdate,
 )
 from app.services.bot_notifications import notify_listing_offer_received
+from app.services.media_upload import (
+    InvalidMediaUpload,
+    MediaUploadTooLarge,
+    send_creative_upload,
+)
 from app.settings import Settings
-from shared.telegram.bot_api import BotApiService
 from shared.telegram.errors import TelegramApiError, TelegramConfigError
 
 router = APIRouter(prefix="/listings", tags=["listings"])
@@ -343,30 +347,16 @@ def upload_listing_creative_media(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Listing is inactive"
         )
 
-    content_type = file.content_type or ""
-    if content_type.startswith("image/"):
-        media_type = "image"
-    elif content_type.startswith("video/"):
-        media_type = "video"
-    else:
+    try:
+        result = send_creative_upload(upload=file, settings=settings, db=db)
+    except MediaUploadTooLarge as exc:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid creative_media_type",
-        )
-
-    content = file.file.read()
-    if not content:
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(exc)
+        ) from exc
+    except InvalidMediaUpload as exc:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Empty upload"
-        )
-
-    service = BotApiService(settings)
-    try:
-        result = service.upload_media(
-            media_type=media_type,
-            filename=file.filename or f"creative.{media_type}",
-            content=content,
-        )
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
     except (TelegramApiError, TelegramConfigError) as exc:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to upload media"
@@ -450,6 +440,7 @@ def create_deal_from_listing(
     )
     db.add(proposal_event)
     try:
+        notify_listing_offer_received(db=db, settings=settings, deal=deal)
         db.commit()
     except IntegrityError:
         db.rollback()
@@ -458,5 +449,4 @@ def create_deal_from_listing(
         )
 
     db.refresh(deal)
-    notify_listing_offer_received(db=db, settings=settings, deal=deal)
     return _deal_summary(deal)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Room for the multipart boundaries and part headers around the file itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+UPLOAD_PATH_SUFFIXES = ("/creative/upload", "/proposal/upload")
+
+
+class UploadSizeLimitMiddleware:
+    """Reject creative uploads over the largest media limit before their body is parsed.
+
+    A declared Content-Length over the limit is answered with 413 without reading the body;
+    a body without one is counted as it arrives and cut off once it passes the limit. The
+    routes still apply the stricter per-media-type limit once the type is known.
+    """
+
+    def __init__(self, app: ASGIApp, *, max_body_bytes: int) -> None:
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].endswith(UPLOAD_PATH_SUFFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Upload exceeds the {self.max_body_bytes} byte limit"
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None and content_length.isdigit():
+            if int(content_length) > self.max_body_bytes:
+                response = JSONResponse(
+                    {"detail": detail}, status_code=status.HTTP_413_CONTENT_TOO_LARGE
+                )
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=detail
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,15 +1,24 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.api.router import api_router
+from app.api.upload_limit import MULTIPART_OVERHEAD_BYTES, UploadSizeLimitMiddleware
 from app.logging import configure_logging
 from app.settings import get_settings
+from shared.metrics import metrics_registry
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
     configure_logging(settings)
     app = FastAPI(title=settings.APP_NAME)
+    # Added first so CORS wraps it and early 413 answers still carry CORS headers.
+    app.add_middleware(
+        UploadSizeLimitMiddleware,
+        max_body_bytes=max(settings.MEDIA_UPLOAD_MAX_IMAGE_BYTES, settings.MEDIA_UPLOAD_MAX_VIDEO_BYTES)
+        + MULTIPART_OVERHEAD_BYTES,
+    )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.CORS_ALLOW_ORIGINS,
@@ -18,6 +27,12 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     app.include_router(api_router)
+    if settings.METRICS_ENABLED:
+
+        @app.get("/metrics", include_in_schema=False)
+        def metrics() -> Response:
+            return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
     return app
 
 
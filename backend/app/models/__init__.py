@@ -1,5 +1,6 @@
 """Backend model re-exports."""
 
+from app.models.bot_notification import BotNotification, BotNotificationState
 from app.models.campaign_application import CampaignApplication
 from app.models.campaign_request import CampaignLifecycleState, CampaignRequest
 from app.models.channel import Channel
@@ -11,10 +12,14 @@ from app.models.deal_event import DealEvent
 from app.models.escrow_event import EscrowEvent
 from app.models.listing import Listing
 from app.models.listing_format import ListingFormat
+from app.models.media_asset import MediaAsset
+from app.models.ton_payout import TonPayout, TonPayoutKind, TonPayoutState
 from app.models.user import User
 from app.models.wallet_proof_challenge import WalletProofChallenge
 
 __all__ = [
+    "BotNotification",
+    "BotNotificationState",
     "CampaignApplication",
     "CampaignLifecycleState",
     "CampaignRequest",
@@ -29,6 +34,10 @@ __all__ = [
     "EscrowEvent",
     "Listing",
     "ListingFormat",
+    "MediaAsset",
+    "TonPayout",
+    "TonPayoutKind",
+    "TonPayoutState",
     "User",
     "WalletProofChallenge",
 ]
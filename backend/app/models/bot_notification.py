@@ -0,0 +1,3 @@
+from shared.db.models.bot_notification import BotNotification, BotNotificationState
+
+__all__ = ["BotNotification", "BotNotificationState"]
@@ -0,0 +1,3 @@
+from shared.db.models.media_asset import MediaAsset
+
+__all__ = ["MediaAsset"]
@@ -0,0 +1,3 @@
+from shared.db.models.ton_payout import TonPayout, TonPayoutKind, TonPayoutState
+
+__all__ = ["TonPayout", "TonPayoutKind", "TonPayoutState"]
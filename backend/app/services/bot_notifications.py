@@ -3,13 +3,13 @@ from __future__ import annotations
 import logging
 from decimal import Decimal
 
+from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel import Session, select
 
+from app.models.bot_notification import BotNotification
 from app.models.deal import Deal
 from app.models.user import User
 from app.settings import Settings
-from shared.telegram.bot_api import BotApiService
-from shared.telegram.errors import TelegramApiError, TelegramConfigError
 
 logger = logging.getLogger(__name__)
 
@@ -35,34 +35,42 @@ def _safe_send_to_users(
     message: str,
     event: str,
 ) -> None:
+    """Queue a message for each user in the bot notification outbox; delivery happens in the worker.
+
+    The rows join the caller's transaction and are committed, or rolled back, by the caller.
+    They are added under a savepoint, so a failed insert drops only the notifications.
+    """
     resolved_user_ids = _normalize_user_ids(user_ids)
     if not resolved_user_ids:
         return
 
+    # Flush the caller's own changes first so their errors are not mistaken for ours.
+    db.flush()
     try:
-        service = BotApiService(settings)
-    except (TelegramApiError, TelegramConfigError) as exc:
+        with db.begin_nested():
+            users = db.exec(select(User).where(User.id.in_(resolved_user_ids))).all()
+            users_by_id = {user.id: user for user in users}
+            for user_id in resolved_user_ids:
+                user = users_by_id.get(user_id)
+                if user is None or user.telegram_user_id is None:
+                    logger.warning(
+                        "Skipping bot notification for missing user",
+                        extra={"event": event, "user_id": user_id},
+                    )
+                    continue
+                db.add(
+                    BotNotification(
+                        user_id=user_id,
+                        chat_id=user.telegram_user_id,
+                        message=message,
+                        event=event,
+                    )
+                )
+    except SQLAlchemyError as exc:
         logger.error(
-            "Failed to initialize bot notification service",
+            "Failed to enqueue bot notification",
             extra={"event": event, "error": str(exc)},
         )
-        return
-
-    for user_id in resolved_user_ids:
-        user = db.exec(select(User).where(User.id == user_id)).first()
-        if user is None or user.telegram_user_id is None:
-            logger.warning(
-                "Skipping bot notification for missing user",
-                extra={"event": event, "user_id": user_id},
-            )
-            continue
-        try:
-            service.send_message(chat_id=user.telegram_user_id, text=message)
-        except Exception as exc:
-            logger.error(
-                "Failed to send bot notification",
-                extra={"event": event, "user_id": user_id, "error": str(exc)},
-            )
 
 
 def _deal_participants(deal: Deal) -> tuple[int | None, int | None]:
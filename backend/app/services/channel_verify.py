@@ -19,8 +19,9 @@ from app.models.channel_member import ChannelMember
 from app.models.channel_stats_snapshot import ChannelStatsSnapshot
 from app.models.user import User
 from app.telegram.permissions import check_bot_permissions
-from shared.telegram import BotApiService, TelegramClientService
+from shared.telegram import AsyncBotApiService, TelegramClientService
 from shared.telegram.errors import TelegramAuthorizationError
+from shared.telegram.member_cache import BotMemberCache
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +39,8 @@ async def verify_channel(
     user: User,
     db: Session,
     telegram_client: TelegramClientService,
-    bot_api: BotApiService,
+    bot_api: AsyncBotApiService,
+    member_cache: BotMemberCache | None = None,
 ) -> Channel:
     channel = db.exec(select(Channel).where(Channel.id == channel_id)).first()
     if channel is None:
@@ -64,7 +66,7 @@ async def verify_channel(
     if channel_ref is None:
         raise ChannelVerificationError("Channel is missing Telegram identifiers", channel_id=channel_id)
 
-    permission_result = await check_bot_permissions(bot_api, channel_ref)
+    permission_result = await check_bot_permissions(bot_api, channel_ref, member_cache=member_cache)
     if not permission_result.ok:
         _log_phase(
             channel_id=channel_id,
@@ -144,6 +144,7 @@ def publish_deal_post(
     deal.posted_content_hash = content_hash
     deal.posted_at = datetime.now(timezone.utc)
     deal.verification_window_hours = _derive_verification_window_hours(deal, settings)
+    deal.next_verification_at = deal.posted_at
 
     return {
         "message_id": message_id,
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from app.settings import Settings
+from shared.telegram.bot_api import BotApiService
+
+logger = logging.getLogger(__name__)
+
+# Bot API download links stay valid for at least an hour after getFile.
+FILE_PATH_TTL_SECONDS = 50 * 60
+# Resolved getFile paths kept in memory, least recently used dropped first.
+MAX_FILE_PATHS = 4096
+
+
+@dataclass(frozen=True)
+class CachedMedia:
+    path: Path
+    size: int
+    content_type: str
+    etag: str
+
+
+class _KeyLock:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class _HashingWriter:
+    def __init__(self, handle) -> None:
+        self._handle = handle
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk: bytes) -> int:
+        self.digest.update(chunk)
+        self.size += len(chunk)
+        return self._handle.write(chunk)
+
+
+class TelegramMediaCache:
+    """On-disk LRU of Telegram files keyed by file_id, bounded by total size and entry age.
+
+    Each entry is a `<key>.bin` payload plus a `<key>.json` sidecar; the payload's mtime is
+    bumped on every hit and eviction drops the least recently used entries first. Both files
+    are replaced atomically, the sidecar first, and the sidecar records the payload's inode,
+    so a reader racing a rewrite sees a miss rather than a mismatched pair.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        max_bytes: int,
+        ttl_seconds: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._root = Path(root)
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._file_paths: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._guard = threading.Lock()
+        self._key_locks: dict[str, _KeyLock] = {}
+
+    def get_or_fetch(self, *, file_id: str, bot_api: BotApiService) -> CachedMedia:
+        key = hashlib.sha256(file_id.encode("utf-8")).hexdigest()
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        with self._locked(key):
+            # Another request may have finished the same download while we waited.
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+            cached = self._download(key=key, file_id=file_id, bot_api=bot_api)
+
+        self._evict(keep=key)
+        return cached
+
+    @contextmanager
+    def _locked(self, key: str) -> Iterator[None]:
+        # Locks only live while someone holds or waits for them, so the map stays small.
+        with self._guard:
+            entry = self._key_locks.get(key)
+            if entry is None:
+                entry = self._key_locks[key] = _KeyLock()
+            entry.users += 1
+        try:
+            with entry.lock:
+                yield
+        finally:
+            with self._guard:
+                entry.users -= 1
+                if not entry.users:
+                    del self._key_locks[key]
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self._root / f"{key}.bin", self._root / f"{key}.json"
+
+    def _lookup(self, key: str) -> CachedMedia | None:
+        payload_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            stat_result = payload_path.stat()
+        except (OSError, ValueError):
+            return None
+
+        size = stat_result.st_size
+        if size != meta.get("size") or stat_result.st_ino != meta.get("inode"):
+            # Mid-rewrite or left over from a crash; the next download replaces both files.
+            return None
+        if self._clock() - float(meta.get("stored_at", 0)) > self._ttl_seconds:
+            self._remove(key)
+            return None
+
+        now = self._clock()
+        try:
+            os.utime(payload_path, (now, now))
+        except OSError:
+            return None
+        return CachedMedia(
+            path=payload_path,
+            size=size,
+            content_type=meta.get("content_type") or "application/octet-stream",
+            etag=f'"{meta["sha256"]}"',
+        )
+
+    def _resolve_file_path(self, *, file_id: str, bot_api: BotApiService) -> str:
+        now = self._clock()
+        with self._guard:
+            cached = self._file_paths.get(file_id)
+            if cached is not None and cached[0] > now:
+                self._file_paths.move_to_end(file_id)
+                return cached[1]
+            self._file_paths.pop(file_id, None)
+        file_path = bot_api.get_file_path(file_id=file_id)
+        with self._guard:
+            self._file_paths[file_id] = (now + FILE_PATH_TTL_SECONDS, file_path)
+            while len(self._file_paths) > MAX_FILE_PATHS:
+                self._file_paths.popitem(last=False)
+        return file_path
+
+    def _forget_file_path(self, file_id: str) -> None:
+        with self._guard:
+            self._file_paths.pop(file_id, None)
+
+    def _download(self, *, key: str, file_id: str, bot_api: BotApiService) -> CachedMedia:
+        self._root.mkdir(parents=True, exist_ok=True)
+        file_path = self._resolve_file_path(file_id=file_id, bot_api=bot_api)
+        payload_path, meta_path = self._paths(key)
+
+        handle = tempfile.NamedTemporaryFile(dir=self._root, suffix=".part", delete=False)
+        meta_handle = None
+        try:
+            with handle:
+                writer = _HashingWriter(handle)
+                content_type = bot_api.stream_file_to(file_path=file_path, destination=writer)
+            stored_at = self._clock()
+            meta = {
+                "file_id": file_id,
+                "content_type": content_type,
+                "size": writer.size,
+                "sha256": writer.digest.hexdigest(),
+                "stored_at": stored_at,
+                # os.replace keeps the inode, so readers can tell which payload this sidecar describes.
+                "inode": os.stat(handle.name).st_ino,
+            }
+            meta_handle = tempfile.NamedTemporaryFile(
+                "w", dir=self._root, suffix=".part", delete=False
+            )
+            with meta_handle:
+                json.dump(meta, meta_handle)
+            os.replace(meta_handle.name, meta_path)
+            os.replace(handle.name, payload_path)
+            os.utime(payload_path, (stored_at, stored_at))
+        except BaseException:
+            # A stale file_path fails the download; forget it so the next request re-resolves.
+            self._forget_file_path(file_id)
+            Path(handle.name).unlink(missing_ok=True)
+            if meta_handle is not None:
+                Path(meta_handle.name).unlink(missing_ok=True)
+            raise
+
+        return CachedMedia(
+            path=payload_path,
+            size=writer.size,
+            content_type=content_type or "application/octet-stream",
+            etag=f'"{meta["sha256"]}"',
+        )
+
+    def _remove(self, key: str) -> None:
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
+
+    def _evict(self, *, keep: str) -> None:
+        entries: list[tuple[float, int, str]] = []
+        try:
+            candidates = list(self._root.glob("*.bin"))
+        except OSError:
+            return
+        for payload_path in candidates:
+            try:
+                stat_result = payload_path.stat()
+            except OSError:
+                continue
+            entries.append((stat_result.st_mtime, stat_result.st_size, payload_path.stem))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            if key == keep:
+                continue
+            self._remove(key)
+            total -= size
+            logger.info("Evicted cached media", extra={"cache_key": key, "size": size})
+
+
+_CACHES: dict[tuple[str, int, int], TelegramMediaCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_media_cache(settings: Settings) -> TelegramMediaCache:
+    key = (settings.MEDIA_CACHE_DIR, settings.MEDIA_CACHE_MAX_BYTES, settings.MEDIA_CACHE_TTL_SECONDS)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = TelegramMediaCache(
+                settings.MEDIA_CACHE_DIR,
+                max_bytes=settings.MEDIA_CACHE_MAX_BYTES,
+                ttl_seconds=settings.MEDIA_CACHE_TTL_SECONDS,
+            )
+            _CACHES[key] = cache
+        return cache
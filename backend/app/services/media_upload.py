@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from typing import BinaryIO
+
+from fastapi import UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models.media_asset import MediaAsset
+from app.settings import Settings
+from shared.telegram.bot_api import BotApiService
+
+logger = logging.getLogger(__name__)
+
+SNIFF_BYTES = 64
+HASH_CHUNK_BYTES = 64 * 1024
+
+# Brands inside an ISO BMFF `ftyp` box that carry still images rather than video.
+_IMAGE_FTYP_BRANDS = {b"heic", b"heix", b"avif", b"mif1", b"msf1"}
+
+
+class InvalidMediaUpload(ValueError):
+    pass
+
+
+class MediaUploadTooLarge(InvalidMediaUpload):
+    def __init__(self, *, media_type: str, limit: int) -> None:
+        super().__init__(f"Upload exceeds the {limit} byte limit for {media_type}")
+        self.media_type = media_type
+        self.limit = limit
+
+
+def sniff_media_type(head: bytes) -> str | None:
+    """Classify the leading bytes of an upload as "image" or "video" by magic number."""
+    if head.startswith(b"\xff\xd8\xff") or head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image"
+    if head[:6] in {b"GIF87a", b"GIF89a"}:
+        return "image"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image"
+    if head[4:8] == b"ftyp":
+        return "image" if head[8:12] in _IMAGE_FTYP_BRANDS else "video"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "video"
+    return None
+
+
+def _declared_media_type(content_type: str | None) -> str | None:
+    content_type = content_type or ""
+    if content_type.startswith("image/"):
+        return "image"
+    if content_type.startswith("video/"):
+        return "video"
+    return None
+
+
+def _upload_size(upload: UploadFile) -> int:
+    if upload.size is not None:
+        return upload.size
+    stream = upload.file
+    position = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+def _size_limit(media_type: str, settings: Settings) -> int:
+    if media_type == "image":
+        return settings.MEDIA_UPLOAD_MAX_IMAGE_BYTES
+    return settings.MEDIA_UPLOAD_MAX_VIDEO_BYTES
+
+
+def resolve_upload_media_type(upload: UploadFile, settings: Settings) -> tuple[str, BinaryIO]:
+    """Validate an upload from its first chunk and size, without reading the body.
+
+    Returns the media type and the rewound file object, ready to be streamed to Telegram.
+    """
+    stream = upload.file
+    stream.seek(0)
+    head = stream.read(SNIFF_BYTES)
+    stream.seek(0)
+
+    declared = _declared_media_type(upload.content_type)
+    sniffed = sniff_media_type(head)
+    if declared is not None and sniffed is not None and declared != sniffed:
+        raise InvalidMediaUpload("Invalid creative_media_type")
+    media_type = sniffed or declared
+    if media_type is None:
+        raise InvalidMediaUpload("Invalid creative_media_type")
+    if not head:
+        raise InvalidMediaUpload("Empty upload")
+
+    limit = _size_limit(media_type, settings)
+    if _upload_size(upload) > limit:
+        raise MediaUploadTooLarge(media_type=media_type, limit=limit)
+    return media_type, stream
+
+
+def _hash_stream(stream: BinaryIO, *, media_type: str, limit: int) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := stream.read(HASH_CHUNK_BYTES):
+        size += len(chunk)
+        if size > limit:
+            raise MediaUploadTooLarge(media_type=media_type, limit=limit)
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest(), size
+
+
+def send_creative_upload(*, upload: UploadFile, settings: Settings, db: Session) -> dict:
+    """Return the Telegram file_id for an upload, sending it only if its content is new.
+
+    The body is hashed in one chunked pass; a known (sha256, media_type) pair short-circuits
+    the upload, otherwise httpx streams the spooled file to the media channel.
+    """
+    media_type, stream = resolve_upload_media_type(upload, settings)
+    sha256, size = _hash_stream(stream, media_type=media_type, limit=_size_limit(media_type, settings))
+
+    asset = db.exec(
+        select(MediaAsset)
+        .where(MediaAsset.sha256 == sha256)
+        .where(MediaAsset.media_type == media_type)
+    ).first()
+    if asset is not None:
+        return {"file_id": asset.file_id, "media_type": media_type}
+
+    result = BotApiService(settings).upload_media(
+        media_type=media_type,
+        filename=upload.filename or f"creative.{media_type}",
+        content=stream,
+    )
+
+    db.add(
+        MediaAsset(
+            sha256=sha256,
+            media_type=media_type,
+            file_id=result["file_id"],
+            size_bytes=size,
+        )
+    )
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent upload of the same content registered it first; either file_id works.
+        db.rollback()
+        logger.info("Media asset already registered", extra={"sha256": sha256})
+    return result
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Protocol
+
+import redis
+
+
+class TokenBucketLimiter(Protocol):
+    def try_acquire(self, key: str, *, rate: float, capacity: float) -> float:
+        """Take one token from `key`; return 0.0 on success or the seconds until a token is available."""
+        ...
+
+
+def _refill(
+    *,
+    tokens: float,
+    updated_at: float,
+    now: float,
+    rate: float,
+    capacity: float,
+) -> tuple[float, float]:
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= 1.0:
+        return tokens - 1.0, 0.0
+    return tokens, (1.0 - tokens) / rate
+
+
+class InMemoryTokenBucket:
+    """Process-local token buckets; suitable for tests and single-process tools."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str, *, rate: float, capacity: float) -> float:
+        with self._lock:
+            now = self._clock()
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens, wait = _refill(
+                tokens=tokens,
+                updated_at=updated_at,
+                now=now,
+                rate=rate,
+                capacity=capacity,
+            )
+            self._buckets[key] = (tokens, now)
+            return wait
+
+
+# Refill and take atomically so every worker process shares one budget per key.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket:
+    def __init__(self, client: redis.Redis, *, prefix: str = "ratelimit:") -> None:
+        self._client = client
+        self._prefix = prefix
+        self._script = client.register_script(_TOKEN_BUCKET_LUA)
+
+    @classmethod
+    def from_url(cls, url: str, *, prefix: str = "ratelimit:") -> "RedisTokenBucket":
+        return cls(redis.Redis.from_url(url), prefix=prefix)
+
+    def try_acquire(self, key: str, *, rate: float, capacity: float) -> float:
+        result = self._script(keys=[f"{self._prefix}{key}"], args=[rate, capacity, time.time()])
+        if isinstance(result, bytes):
+            result = result.decode("ascii")
+        return float(result)
@@ -6,12 +6,14 @@ import json
 from datetime import datetime, timezone
 from typing import Any
 
+from shared.metrics import observe_outbound
 from shared.telegram.telethon_client import TelegramClientService
 
 
 async def fetch_message(client, *, channel, message_id: int):
     try:
-        result = await client.get_messages(channel, ids=message_id)
+        with observe_outbound("telegram_mtproto", "get_messages"):
+            result = await client.get_messages(channel, ids=message_id)
     except Exception:
         return None
 
@@ -27,8 +29,9 @@ async def fetch_story(client, *, channel, story_id: int):
         return None
 
     try:
-        entity = await client.get_input_entity(channel)
-        response = await client(functions.stories.GetStoriesByIDRequest(peer=entity, id=[story_id]))
+        with observe_outbound("telegram_mtproto", "stories.getStoriesByID"):
+            entity = await client.get_input_entity(channel)
+            response = await client(functions.stories.GetStoriesByIDRequest(peer=entity, id=[story_id]))
     except Exception:
         return None
 
@@ -118,6 +121,20 @@ def compute_story_hash(story) -> str:
     return hashlib.sha256(raw).hexdigest()
 
 
+async def fetch_message_hash(client, *, channel, message_id: int) -> str | None:
+    message = await fetch_message(client, channel=channel, message_id=message_id)
+    if message is None:
+        return None
+    return compute_message_hash(message)
+
+
+async def fetch_story_hash(client, *, channel, story_id: int) -> str | None:
+    story = await fetch_story(client, channel=channel, story_id=story_id)
+    if story is None:
+        return None
+    return compute_story_hash(story)
+
+
 def _is_feed_post(message) -> bool:
     if message is None:
         return False
@@ -142,20 +159,21 @@ async def has_additional_posts(
         return False
 
     try:
-        async for message in client.iter_messages(channel, offset_date=end_window, limit=500):
-            if message is None:
-                continue
-            message_date = _ensure_aware_utc(getattr(message, "date", None))
-            if message_date is None:
-                continue
-            if message_date < start_window:
-                break
-            if message_date > end_window:
-                continue
-            if int(getattr(message, "id", 0) or 0) == exclude_message_id:
-                continue
-            if _is_feed_post(message):
-                return True
+        with observe_outbound("telegram_mtproto", "iter_messages"):
+            async for message in client.iter_messages(channel, offset_date=end_window, limit=500):
+                if message is None:
+                    continue
+                message_date = _ensure_aware_utc(getattr(message, "date", None))
+                if message_date is None:
+                    continue
+                if message_date < start_window:
+                    break
+                if message_date > end_window:
+                    continue
+                if int(getattr(message, "id", 0) or 0) == exclude_message_id:
+                    continue
+                if _is_feed_post(message):
+                    return True
     except Exception:
         return False
 
@@ -181,8 +199,9 @@ async def has_additional_stories(
         return False
 
     try:
-        entity = await client.get_input_entity(channel)
-        response = await client(functions.stories.GetPeerStoriesRequest(peer=entity))
+        with observe_outbound("telegram_mtproto", "stories.getPeerStories"):
+            entity = await client.get_input_entity(channel)
+            response = await client(functions.stories.GetPeerStoriesRequest(peer=entity))
     except Exception:
         return False
 
@@ -215,11 +234,9 @@ def fetch_message_hash_sync(
     async def _run() -> str | None:
         await service.connect()
         client = service.client()
-        message = await fetch_message(client, channel=channel, message_id=message_id)
+        content_hash = await fetch_message_hash(client, channel=channel, message_id=message_id)
         await service.disconnect()
-        if message is None:
-            return None
-        return compute_message_hash(message)
+        return content_hash
 
     try:
         return asyncio.run(_run())
@@ -242,11 +259,9 @@ def fetch_story_hash_sync(
     async def _run() -> str | None:
         await service.connect()
         client = service.client()
-        story = await fetch_story(client, channel=channel, story_id=story_id)
+        content_hash = await fetch_story_hash(client, channel=channel, story_id=story_id)
         await service.disconnect()
-        if story is None:
-            return None
-        return compute_story_hash(story)
+        return content_hash
 
     try:
         return asyncio.run(_run())
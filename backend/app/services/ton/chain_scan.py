@@ -1,51 +1,57 @@
 from __future__ import annotations
 
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Protocol
+from typing import Iterator, Mapping, Protocol
 
 import httpx
 
 from app.services.ton.addressing import to_raw_address, try_to_raw_address
 from app.services.ton.errors import TonConfigError
-from app.services.ton.toncenter_url import normalize_toncenter_v3_base_url
+from app.services.ton.toncenter_client import get_toncenter_client
 from app.services.ton.utils import nano_to_ton
 from app.settings import Settings
 
+logger = logging.getLogger(__name__)
+
+# TonCenter v3 caps /transactions pages at 256 rows.
+BATCH_PAGE_LIMIT = 256
+
 
 class TonChainAdapter(Protocol):
-    def find_incoming_tx(
+    def iter_incoming_txs(
         self, address: str, min_amount: Decimal, since_lt: str | None
-    ) -> dict | None: ...
+    ) -> Iterator[dict]: ...
 
     def get_confirmations(self, tx_hash: str) -> int: ...
 
+    def get_masterchain_seqno(self) -> int | None: ...
 
-@dataclass
-class TonCenterAdapter:
-    settings: Settings
 
-    def _base_url(self) -> str:
-        if not self.settings.TONCENTER_API:
-            raise TonConfigError("TONCENTER_API is not configured")
-        return normalize_toncenter_v3_base_url(self.settings.TONCENTER_API)
+def _parse_lt(value: str | int | None) -> int | None:
+    if value is None or not str(value).isdigit():
+        return None
+    return int(value)
 
-    def _headers(self) -> dict[str, str]:
-        if not self.settings.TONCENTER_KEY:
-            return {}
-        return {"X-API-Key": self.settings.TONCENTER_KEY}
 
-    def _params(self, params: dict[str, str | int]) -> dict[str, str | int]:
-        if self.settings.TONCENTER_KEY:
-            params = dict(params)
-            params.setdefault("api_key", self.settings.TONCENTER_KEY)
-        return params
+def confirmations_between(tx_mc_seqno: int, last_mc_seqno: int) -> int:
+    return max(0, int(last_mc_seqno) - int(tx_mc_seqno) + 1)
+
+
+def _sort_lt(tx: dict) -> int:
+    return int(tx["lt"])
+
+
+@dataclass
+class TonCenterAdapter:
+    settings: Settings
 
-    def _get(self, path: str, *, params: dict[str, str | int] | None = None) -> dict:
+    def _get(self, path: str, *, params: dict[str, str | int | list[str]] | None = None) -> dict:
         if not self.settings.TON_ENABLED:
             raise TonConfigError("TON integration is disabled")
-        url = f"{self._base_url()}{path}"
-        response = httpx.get(url, params=self._params(params or {}), headers=self._headers())
+        response = get_toncenter_client(self.settings).get(path, params=params or {})
         if response.status_code != 200:
             raise TonConfigError(f"TonCenter error {response.status_code}: {response.text}")
         return response.json()
@@ -82,54 +88,180 @@ class TonCenterAdapter:
             "mc_block_seqno": mc_block_seqno,
         }
 
-    def find_incoming_tx(self, address: str, min_amount: Decimal, since_lt: str | None) -> dict | None:
+    def _incoming_entry(self, tx: dict, min_amount: Decimal) -> dict | None:
+        in_msg = tx.get("in_msg") or {}
+        destination = in_msg.get("destination") or in_msg.get("dest")
+        destination_raw = try_to_raw_address(str(destination) if destination is not None else None)
+        if destination_raw is None:
+            return None
+
+        value = in_msg.get("value")
+        if value is None:
+            return None
+
+        amount_ton = nano_to_ton(value)
+        if amount_ton < min_amount:
+            return None
+
+        fields = self._extract_tx_fields(tx)
+        if fields.get("lt") is None:
+            return None
+
+        tx_entry = dict(fields)
+        tx_entry["amount_ton"] = amount_ton
+        tx_entry["destination_raw"] = destination_raw
+        tx_entry["raw"] = tx
+        return tx_entry
+
+    def iter_incoming_txs(
+        self, address: str, min_amount: Decimal, since_lt: str | None
+    ) -> Iterator[dict]:
+        """Yield every incoming transaction newer than ``since_lt``, oldest first.
+
+        Pages forward with ``start_lt`` cursors, so each transaction is fetched once no
+        matter how many arrived since the last scan.
+        """
         try:
             target_raw = to_raw_address(address)
         except Exception as exc:
             raise TonConfigError("Invalid TON account address for chain scan") from exc
 
-        payload = self._get(
-            "/transactions",
-            params={"account": address, "limit": 50, "sort": "desc"},
-        )
-        transactions = self._extract_transactions(payload)
-        candidates: list[dict] = []
-        since_lt_value = int(since_lt) if since_lt is not None and str(since_lt).isdigit() else None
-
-        for tx in transactions:
-            in_msg = tx.get("in_msg") or {}
-            destination = in_msg.get("destination") or in_msg.get("dest")
-            destination_raw = try_to_raw_address(str(destination) if destination is not None else None)
-            if destination_raw != target_raw:
-                continue
-
-            value = in_msg.get("value")
-            if value is None:
-                continue
-
-            amount_ton = nano_to_ton(value)
-            if amount_ton < min_amount:
-                continue
-
-            fields = self._extract_tx_fields(tx)
-            lt = fields.get("lt")
-            if lt is None:
-                continue
-            lt_value = int(lt)
-            if since_lt_value is not None and lt_value <= since_lt_value:
-                continue
-
-            tx_entry = dict(fields)
-            tx_entry["amount_ton"] = amount_ton
-            tx_entry["destination_raw"] = destination_raw
-            tx_entry["raw"] = tx
-            candidates.append(tx_entry)
-
-        if not candidates:
-            return None
+        cursor = _parse_lt(since_lt)
+        while True:
+            params: dict[str, str | int | list[str]] = {
+                "account": address,
+                "limit": BATCH_PAGE_LIMIT,
+                "sort": "asc",
+            }
+            if cursor is not None:
+                params["start_lt"] = cursor + 1
+            transactions = self._extract_transactions(self._get("/transactions", params=params))
+
+            page_max_lt = cursor
+            for tx in transactions:
+                lt = _parse_lt(self._extract_tx_fields(tx).get("lt"))
+                if lt is None or (cursor is not None and lt <= cursor):
+                    continue
+                page_max_lt = lt if page_max_lt is None else max(page_max_lt, lt)
+                tx_entry = self._incoming_entry(tx, min_amount)
+                if tx_entry is not None and tx_entry["destination_raw"] == target_raw:
+                    yield tx_entry
+
+            if len(transactions) < BATCH_PAGE_LIMIT or page_max_lt == cursor:
+                return
+            cursor = page_max_lt
+
+    def find_incoming_tx(self, address: str, min_amount: Decimal, since_lt: str | None) -> dict | None:
+        return next(self.iter_incoming_txs(address, min_amount, since_lt), None)
+
+    def find_incoming_txs_batch(
+        self,
+        since_lts: Mapping[str, str | None],
+        min_amount: Decimal = Decimal("0"),
+    ) -> dict[str, list[dict]]:
+        """Fetch new incoming transactions for many accounts at once.
+
+        Accounts are queried ``TON_SCAN_BATCH_SIZE`` at a time through the multi-account
+        ``/transactions`` filter, with up to ``TON_SCAN_CONCURRENCY`` batches in flight.
+        The result maps every address of a successful batch to its transactions newer than
+        its ``since_lt``, oldest first; addresses of a failed batch are left out so the
+        caller can fall back to scanning them one by one.
+        """
+        targets: dict[str, str] = {}
+        for address in since_lts:
+            try:
+                targets[address] = to_raw_address(address)
+            except Exception as exc:
+                raise TonConfigError("Invalid TON account address for chain scan") from exc
+
+        addresses = list(targets)
+        batch_size = max(1, self.settings.TON_SCAN_BATCH_SIZE)
+        batches = [addresses[i : i + batch_size] for i in range(0, len(addresses), batch_size)]
+        if not batches:
+            return {}
+
+        def scan(batch: list[str]) -> dict[str, list[dict]] | None:
+            try:
+                return self._scan_batch(
+                    {address: targets[address] for address in batch},
+                    {address: _parse_lt(since_lts[address]) for address in batch},
+                    min_amount,
+                )
+            except (TonConfigError, httpx.HTTPError) as exc:
+                logger.error(
+                    "TonCenter batch scan failed",
+                    extra={"accounts": len(batch), "error": str(exc)},
+                )
+                return None
 
-        candidates.sort(key=lambda item: int(item.get("lt")))
-        return candidates[0]
+        workers = max(1, min(self.settings.TON_SCAN_CONCURRENCY, len(batches)))
+        grouped: dict[str, list[dict]] = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(scan, batches):
+                if result is not None:
+                    grouped.update(result)
+        return grouped
+
+    def _scan_batch(
+        self,
+        targets: Mapping[str, str],
+        since_lts: Mapping[str, int | None],
+        min_amount: Decimal,
+    ) -> dict[str, list[dict]]:
+        by_raw = {raw: address for address, raw in targets.items()}
+        grouped: dict[str, list[dict]] = {address: [] for address in targets}
+        params: dict[str, str | int | list[str]] = {
+            "account": list(targets),
+            "limit": BATCH_PAGE_LIMIT,
+            "sort": "asc",
+        }
+        # Every account in the batch only needs transactions after the oldest cursor.
+        known_lts = list(since_lts.values())
+        if known_lts and None not in known_lts:
+            params["start_lt"] = min(known_lts) + 1
+
+        offset = 0
+        while True:
+            params["offset"] = offset
+            transactions = self._extract_transactions(self._get("/transactions", params=params))
+            for tx in transactions:
+                tx_entry = self._incoming_entry(tx, min_amount)
+                if tx_entry is None:
+                    continue
+                address = by_raw.get(tx_entry["destination_raw"])
+                if address is None:
+                    continue
+                since_lt_value = since_lts[address]
+                if since_lt_value is not None and int(tx_entry["lt"]) <= since_lt_value:
+                    continue
+                grouped[address].append(tx_entry)
+            if len(transactions) < BATCH_PAGE_LIMIT:
+                break
+            offset += len(transactions)
+
+        for entries in grouped.values():
+            entries.sort(key=_sort_lt)
+        return grouped
+
+    def iter_block_incoming_txs(self, mc_seqno: int) -> Iterator[dict]:
+        """Yield incoming transfers of every shard block committed in one masterchain block."""
+        offset = 0
+        while True:
+            transactions = self._extract_transactions(
+                self._get(
+                    "/transactionsByMasterchainBlock",
+                    params={"seqno": mc_seqno, "limit": BATCH_PAGE_LIMIT, "offset": offset},
+                )
+            )
+            for tx in transactions:
+                tx_entry = self._incoming_entry(tx, Decimal("0"))
+                if tx_entry is not None:
+                    if tx_entry["mc_block_seqno"] is None:
+                        tx_entry["mc_block_seqno"] = mc_seqno
+                    yield tx_entry
+            if len(transactions) < BATCH_PAGE_LIMIT:
+                return
+            offset += len(transactions)
 
     def get_confirmations(self, tx_hash: str) -> int:
         payload = self._get(
@@ -145,13 +277,17 @@ class TonCenterAdapter:
         if tx_seqno is None:
             return 0
 
+        last_seqno = self.get_masterchain_seqno()
+        if last_seqno is None:
+            return 0
+
+        return confirmations_between(tx_seqno, last_seqno)
+
+    def get_masterchain_seqno(self) -> int | None:
         master_info = self._get("/masterchainInfo")
         last_seqno = None
         if isinstance(master_info.get("last"), dict):
             last_seqno = master_info["last"].get("seqno")
         if last_seqno is None:
             last_seqno = master_info.get("last_seqno")
-        if last_seqno is None:
-            return 0
-
-        return max(0, int(last_seqno) - int(tx_seqno) + 1)
+        return None if last_seqno is None else int(last_seqno)
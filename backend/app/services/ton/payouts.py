@@ -4,14 +4,13 @@ from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal, ROUND_DOWN
 
-from sqlmodel import Session
+from sqlmodel import Session, select
 
 from app.models.deal import Deal, DealState
 from app.models.deal_escrow import DealEscrow
+from app.models.ton_payout import TonPayout, TonPayoutKind
 from app.models.user import User
 from app.services.deal_fsm import DealAction, DealActorRole, apply_transition
-from app.services.ton.errors import TonConfigError
-from app.services.ton.transfers import TonTransferError, send_ton_transfer
 from app.settings import Settings
 
 _ZERO = Decimal("0")
@@ -25,6 +24,8 @@ class PayoutError(RuntimeError):
 class PayoutResult:
     tx_hash: str
     amount_ton: Decimal
+    # True when a payout intent was recorded for the payout worker to submit and confirm.
+    queued: bool = False
 
 
 def _quantize_amount(amount: Decimal) -> Decimal:
@@ -54,6 +55,37 @@ def _require_wallet(user: User) -> str:
     return user.ton_wallet_address
 
 
+def _payout_intent(db: Session, *, escrow: DealEscrow, kind: TonPayoutKind) -> TonPayout | None:
+    return db.exec(
+        select(TonPayout)
+        .where(TonPayout.escrow_id == escrow.id)
+        .where(TonPayout.kind == kind.value)
+    ).first()
+
+
+def _enqueue_payout(
+    db: Session,
+    *,
+    deal: Deal,
+    escrow: DealEscrow,
+    kind: TonPayoutKind,
+    to_address: str,
+    amount: Decimal,
+    reason: str | None = None,
+) -> TonPayout:
+    payout = TonPayout(
+        deal_id=deal.id,
+        escrow_id=escrow.id,
+        kind=kind.value,
+        to_address=to_address,
+        amount_ton=amount,
+        reason=reason,
+    )
+    db.add(payout)
+    db.flush()
+    return payout
+
+
 def release_funds(
     *,
     db: Session,
@@ -61,11 +93,10 @@ def release_funds(
     escrow: DealEscrow,
     owner: User,
     settings: Settings,
-    transfer_fn=send_ton_transfer,
 ) -> PayoutResult:
     if deal.state != DealState.VERIFIED.value:
         raise PayoutError("Deal is not verified")
-    if escrow.release_tx_hash:
+    if escrow.release_tx_hash or _payout_intent(db, escrow=escrow, kind=TonPayoutKind.RELEASE):
         raise PayoutError("Release already processed")
 
     wallet = _require_wallet(owner)
@@ -89,31 +120,20 @@ def release_funds(
         )
         return PayoutResult(tx_hash="", amount_ton=escrow.released_amount_ton)
 
-    try:
-        tx_hash = transfer_fn(
-            settings=settings,
-            to_address=wallet,
-            amount_ton=amount,
-            source_subwallet_id=escrow.subwallet_id,
-        )
-    except (TonTransferError, TonConfigError) as exc:
-        raise PayoutError(str(exc)) from exc
-
-    escrow.release_tx_hash = tx_hash
+    payout = _enqueue_payout(
+        db, deal=deal, escrow=escrow, kind=TonPayoutKind.RELEASE, to_address=wallet, amount=amount
+    )
     escrow.released_amount_ton = amount
-    escrow.released_at = datetime.now(timezone.utc)
     db.add(escrow)
-
     apply_transition(
         db,
         deal=deal,
         action=DealAction.release.value,
         actor_id=None,
         actor_role=DealActorRole.system.value,
-        payload={"escrow_id": escrow.id, "release_tx_hash": tx_hash},
+        payload={"escrow_id": escrow.id, "release_tx_hash": None, "payout_id": payout.id},
     )
-
-    return PayoutResult(tx_hash=tx_hash, amount_ton=amount)
+    return PayoutResult(tx_hash="", amount_ton=amount, queued=True)
 
 
 def refund_funds(
@@ -123,11 +143,11 @@ def refund_funds(
     escrow: DealEscrow,
     advertiser: User,
     settings: Settings,
-    transfer_fn=send_ton_transfer,
+    reason: str | None = None,
 ) -> PayoutResult:
     if deal.state != DealState.REFUNDED.value:
         raise PayoutError("Deal is not marked for refund")
-    if escrow.refund_tx_hash:
+    if escrow.refund_tx_hash or _payout_intent(db, escrow=escrow, kind=TonPayoutKind.REFUND):
         raise PayoutError("Refund already processed")
 
     wallet = _require_wallet(advertiser)
@@ -139,22 +159,18 @@ def refund_funds(
         db.add(escrow)
         return PayoutResult(tx_hash="", amount_ton=escrow.refunded_amount_ton)
 
-    try:
-        tx_hash = transfer_fn(
-            settings=settings,
-            to_address=wallet,
-            amount_ton=amount,
-            source_subwallet_id=escrow.subwallet_id,
-        )
-    except (TonTransferError, TonConfigError) as exc:
-        raise PayoutError(str(exc)) from exc
-
-    escrow.refund_tx_hash = tx_hash
+    _enqueue_payout(
+        db,
+        deal=deal,
+        escrow=escrow,
+        kind=TonPayoutKind.REFUND,
+        to_address=wallet,
+        amount=amount,
+        reason=reason,
+    )
     escrow.refunded_amount_ton = amount
-    escrow.refunded_at = datetime.now(timezone.utc)
     db.add(escrow)
-
-    return PayoutResult(tx_hash=tx_hash, amount_ton=amount)
+    return PayoutResult(tx_hash="", amount_ton=amount, queued=True)
 
 
 def ensure_release(
@@ -164,17 +180,17 @@ def ensure_release(
     escrow: DealEscrow,
     owner: User,
     settings: Settings,
-    transfer_fn=send_ton_transfer,
 ) -> PayoutResult | None:
     if escrow.release_tx_hash or escrow.released_at is not None:
         return None
+    if _payout_intent(db, escrow=escrow, kind=TonPayoutKind.RELEASE) is not None:
+        return None
     return release_funds(
         db=db,
         deal=deal,
         escrow=escrow,
         owner=owner,
         settings=settings,
-        transfer_fn=transfer_fn,
     )
 
 
@@ -185,15 +201,17 @@ def ensure_refund(
     escrow: DealEscrow,
     advertiser: User,
     settings: Settings,
-    transfer_fn=send_ton_transfer,
+    reason: str | None = None,
 ) -> PayoutResult | None:
     if escrow.refund_tx_hash or escrow.refunded_at is not None:
         return None
+    if _payout_intent(db, escrow=escrow, kind=TonPayoutKind.REFUND) is not None:
+        return None
     return refund_funds(
         db=db,
         deal=deal,
         escrow=escrow,
         advertiser=advertiser,
         settings=settings,
-        transfer_fn=transfer_fn,
+        reason=reason,
     )
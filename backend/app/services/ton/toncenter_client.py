@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Sequence
+
+import httpx
+from tonutils.client import ToncenterV3Client
+from tonutils.exceptions import HTTPClientResponseError, RateLimitExceeded, UnauthorizedError
+
+from app.services.rate_limit import InMemoryTokenBucket, RedisTokenBucket, TokenBucketLimiter
+from app.services.ton.errors import TonConfigError
+from app.services.ton.toncenter_url import normalize_toncenter_tonutils_base_url, normalize_toncenter_v3_base_url
+from app.settings import Settings
+from shared.metrics import observe_outbound
+
+logger = logging.getLogger(__name__)
+
+_MAX_BACKOFF_SECONDS = 30.0
+
+_CLIENTS: dict[tuple, "TonCenterClient"] = {}
+_TONUTILS_CLIENTS: dict[tuple, "PooledToncenterV3Client"] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _bucket_key(api_key: str | None) -> str:
+    # Buckets are shared through Redis, so never put the key itself in the bucket name.
+    if not api_key:
+        return "toncenter:anonymous"
+    return f"toncenter:{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class _FailOpenLimiter:
+    """Falls back to a process-local budget while Redis is unreachable."""
+
+    def __init__(self, primary: TokenBucketLimiter) -> None:
+        self._primary = primary
+        self._fallback = InMemoryTokenBucket()
+
+    def try_acquire(self, key: str, *, rate: float, capacity: float) -> float:
+        try:
+            return self._primary.try_acquire(key, rate=rate, capacity=capacity)
+        except Exception as exc:
+            logger.warning("TonCenter rate limiter unavailable", extra={"error": str(exc)})
+            return self._fallback.try_acquire(key, rate=rate, capacity=capacity)
+
+
+class TonCenterClient:
+    """Pooled TonCenter v3 HTTP client shared by every TON module of a process.
+
+    Each API key gets an ``rps`` token bucket (shared across processes when the limiter is
+    Redis-backed). Requests rotate over the keys that have budget left; a 429 cools the
+    offending key down for its ``Retry-After`` (or an exponential backoff) and the request
+    is retried on the next available key.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        api_keys: Sequence[str | None] = (),
+        rps: float,
+        limiter: TokenBucketLimiter,
+        max_retries: int = 3,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        transport: httpx.BaseTransport | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self._api_keys: list[str | None] = [key for key in api_keys if key] or [None]
+        self._rps = rps
+        self._limiter = limiter
+        self._max_retries = max_retries
+        self._clock = clock
+        self._sleep = sleep
+        self._cooldown_until: dict[int, float] = {}
+        self._next_key = 0
+        self._lock = threading.Lock()
+        self._http = httpx.Client(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            transport=transport,
+        )
+
+    def close(self) -> None:
+        self._http.close()
+
+    def _acquire_key(self) -> int:
+        while True:
+            with self._lock:
+                start = self._next_key
+                self._next_key = (self._next_key + 1) % len(self._api_keys)
+                cooldown_until = dict(self._cooldown_until)
+            now = self._clock()
+            waits: list[float] = []
+            for offset in range(len(self._api_keys)):
+                index = (start + offset) % len(self._api_keys)
+                cooldown = cooldown_until.get(index, 0.0) - now
+                if cooldown > 0:
+                    waits.append(cooldown)
+                    continue
+                wait = self._limiter.try_acquire(
+                    _bucket_key(self._api_keys[index]),
+                    rate=self._rps,
+                    capacity=self._rps,
+                )
+                if wait <= 0:
+                    return index
+                waits.append(wait)
+            self._sleep(min(waits))
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Any = None,
+        json_body: Any = None,
+    ) -> httpx.Response:
+        """Send one request within the shared budget; returns the last response, even a 429."""
+        for attempt in range(self._max_retries + 1):
+            index = self._acquire_key()
+            api_key = self._api_keys[index]
+            headers = {"X-API-Key": api_key} if api_key else {}
+            with observe_outbound("toncenter", path.strip("/")) as call:
+                response = self._http.request(method, path, params=params, json=json_body, headers=headers)
+                call.record_status(response.status_code)
+            if response.status_code != 429:
+                return response
+
+            delay = _retry_after_seconds(response)
+            if delay is None:
+                delay = min(0.5 * 2**attempt, _MAX_BACKOFF_SECONDS)
+            with self._lock:
+                self._cooldown_until[index] = self._clock() + delay
+            logger.warning(
+                "TonCenter rate limited",
+                extra={"path": path, "attempt": attempt + 1, "retry_after": delay},
+            )
+        return response
+
+    def get(self, path: str, *, params: Any = None) -> httpx.Response:
+        return self.request("GET", path, params=params)
+
+
+class PooledToncenterV3Client(ToncenterV3Client):
+    """tonutils client whose requests go through the shared ``TonCenterClient``.
+
+    The shared client is synchronous (its budget waits sleep), so each request runs in a worker
+    thread and never blocks the event loop driving tonutils.
+    """
+
+    def __init__(self, http: TonCenterClient, *, is_testnet: bool, base_url: str) -> None:
+        # rps=None turns off tonutils' own per-instance limiter; the shared budget applies instead.
+        super().__init__(is_testnet=is_testnet, base_url=base_url, rps=None, max_retries=0)
+        self._http = http
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        body: dict[str, Any] | None = None,
+    ) -> Any:
+        url = f"{self.base_url}{path}"
+        response = await asyncio.to_thread(self._http.request, method, path, params=params, json_body=body)
+        try:
+            content = response.json()
+        except json.JSONDecodeError:
+            content = response.text
+        if isinstance(content, dict) and "ok" in content:
+            content = (
+                content.get("result")
+                if content.get("ok")
+                else {"error": content.get("result"), "code": content.get("code", 0)}
+            )
+
+        if response.status_code == 429:
+            raise RateLimitExceeded(url, 1)
+        if response.status_code == 401:
+            raise UnauthorizedError(url)
+        if not response.is_success:
+            raise HTTPClientResponseError(url, response.status_code, str(content))
+        return content
+
+
+def _toncenter_api_keys(settings: Settings) -> tuple[str, ...]:
+    keys = [settings.TONCENTER_KEY, *settings.TONCENTER_EXTRA_KEYS]
+    return tuple(dict.fromkeys(key for key in keys if key))
+
+
+def get_toncenter_client(settings: Settings) -> TonCenterClient:
+    """Return the process-wide TonCenter client for these settings."""
+    if not settings.TONCENTER_API:
+        raise TonConfigError("TONCENTER_API is not configured")
+    base_url = normalize_toncenter_v3_base_url(settings.TONCENTER_API)
+    cache_key = (base_url, _toncenter_api_keys(settings), settings.TONCENTER_RPS, settings.REDIS_URL)
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(cache_key)
+        if client is None:
+            client = TonCenterClient(
+                base_url=base_url,
+                api_keys=_toncenter_api_keys(settings),
+                rps=settings.TONCENTER_RPS,
+                limiter=_FailOpenLimiter(RedisTokenBucket.from_url(settings.REDIS_URL)),
+                max_retries=settings.TONCENTER_MAX_RETRIES,
+            )
+            _CLIENTS[cache_key] = client
+    return client
+
+
+def get_tonutils_client(settings: Settings) -> PooledToncenterV3Client:
+    """Return a process-wide tonutils client backed by ``get_toncenter_client``."""
+    http = get_toncenter_client(settings)
+    network = (settings.TON_NETWORK or "").lower()
+    cache_key = (id(http), network)
+
+    with _CLIENTS_LOCK:
+        client = _TONUTILS_CLIENTS.get(cache_key)
+        if client is None:
+            client = PooledToncenterV3Client(
+                http,
+                is_testnet=network == "testnet",
+                base_url=normalize_toncenter_tonutils_base_url(settings.TONCENTER_API),
+            )
+            _TONUTILS_CLIENTS[cache_key] = client
+    return client
@@ -4,22 +4,46 @@ import asyncio
 import base64
 import inspect
 import time
+from collections import Counter
+from dataclasses import dataclass
 from decimal import Decimal
+from typing import Sequence
 
-import httpx
 from tonutils.client import ToncenterV3Client
 from tonutils.wallet import WalletV5R1
+from tonutils.wallet.messages import TransferMessage
 
+from app.services.ton.addressing import try_to_raw_address
 from app.services.ton.errors import TonConfigError
-from app.services.ton.toncenter_url import normalize_toncenter_tonutils_base_url, normalize_toncenter_v3_base_url
+from app.services.ton.toncenter_client import get_toncenter_client, get_tonutils_client
 from app.services.ton.utils import ton_to_nano
 from app.settings import Settings
 
 
+# WalletV5R1 accepts at most 255 actions per external message.
+MAX_BATCH_MESSAGES = 255
+
+
 class TonTransferError(RuntimeError):
     pass
 
 
+@dataclass(frozen=True)
+class SubmittedTransfer:
+    external_hash: str
+    source_address_raw: str
+    seqno: int
+    # Unix time after which the message can no longer execute; ``None`` when it never expires.
+    valid_until: int | None
+
+
+@dataclass(frozen=True)
+class BatchTransferResult:
+    tx_hash: str
+    # Indexes of the requested messages that left the wallet as outgoing chain messages.
+    delivered: frozenset[int]
+
+
 def _require_mnemonic(settings: Settings) -> str:
     if not settings.TON_ENABLED:
         raise TonConfigError("TON integration is disabled")
@@ -29,18 +53,7 @@ def _require_mnemonic(settings: Settings) -> str:
 
 
 def _toncenter_client(settings: Settings) -> ToncenterV3Client:
-    if not settings.TONCENTER_API:
-        raise TonConfigError("TONCENTER_API is not configured")
-    base_url = normalize_toncenter_tonutils_base_url(settings.TONCENTER_API)
-
-    network = (settings.TON_NETWORK or "").lower()
-    return ToncenterV3Client(
-        api_key=settings.TONCENTER_KEY,
-        is_testnet=network == "testnet",
-        base_url=base_url,
-        rps=1,
-        max_retries=1,
-    )
+    return get_tonutils_client(settings)
 
 
 def _invoke_transfer(
@@ -139,20 +152,6 @@ def _hash_base64_to_hex(value: str) -> str | None:
     return raw.hex()
 
 
-def _toncenter_v3_headers(settings: Settings) -> dict[str, str]:
-    if not settings.TONCENTER_KEY:
-        return {}
-    return {"X-API-Key": settings.TONCENTER_KEY}
-
-
-def _toncenter_v3_params(settings: Settings, params: dict[str, str | int]) -> dict[str, str | int]:
-    if not settings.TONCENTER_KEY:
-        return params
-    with_key = dict(params)
-    with_key.setdefault("api_key", settings.TONCENTER_KEY)
-    return with_key
-
-
 def _locate_source_tx_by_external_hash(
     *,
     settings: Settings,
@@ -161,23 +160,21 @@ def _locate_source_tx_by_external_hash(
     attempts: int = 6,
     poll_interval_seconds: float = 1.0,
 ) -> dict | None:
+    """Find the wallet transaction that ran our external message, however old it is.
+
+    The message hash is looked up directly rather than searched for among the wallet's recent
+    transactions, which a settlement wallet receiving many sweeps pushes out of any fixed window.
+    """
     if not settings.TONCENTER_API:
         return None
 
     target_hash = _hash_hex_to_base64(external_hash) or external_hash
-    url = f"{normalize_toncenter_v3_base_url(settings.TONCENTER_API)}/transactions"
-    params = _toncenter_v3_params(
-        settings,
-        {"account": source_address_raw, "limit": 20, "sort": "desc"},
-    )
+    source_raw = try_to_raw_address(source_address_raw)
+    client = get_toncenter_client(settings)
+    params = {"msg_hash": target_hash, "direction": "in", "limit": 10}
 
     for attempt in range(attempts):
-        response = httpx.get(
-            url,
-            params=params,
-            headers=_toncenter_v3_headers(settings),
-            timeout=10,
-        )
+        response = client.get("/transactionsByMessage", params=params)
         if response.status_code != 200:
             break
         payload = response.json()
@@ -187,30 +184,19 @@ def _locate_source_tx_by_external_hash(
                 in_msg = tx.get("in_msg") if isinstance(tx, dict) else None
                 if not isinstance(in_msg, dict):
                     continue
-                if in_msg.get("hash_norm") == target_hash:
+                if target_hash not in (in_msg.get("hash_norm"), in_msg.get("hash")):
+                    continue
+                if try_to_raw_address(str(tx.get("account") or "")) == source_raw:
                     return tx
         if attempt + 1 < attempts:
             time.sleep(poll_interval_seconds)
     return None
 
 
-def _validate_onchain_transfer_execution(
-    *,
-    settings: Settings,
-    source_address_raw: str,
-    external_hash: str,
-) -> str:
-    tx = _locate_source_tx_by_external_hash(
-        settings=settings,
-        source_address_raw=source_address_raw,
-        external_hash=external_hash,
-    )
-    if tx is None:
-        return external_hash
-
+def _check_transfer_executed(tx: dict) -> None:
     description = tx.get("description") if isinstance(tx, dict) else None
     if not isinstance(description, dict):
-        return external_hash
+        return
     action = description.get("action") if isinstance(description.get("action"), dict) else {}
     aborted = bool(description.get("aborted"))
     msgs_created_raw = action.get("msgs_created", 0)
@@ -230,12 +216,58 @@ def _validate_onchain_transfer_execution(
             f"(aborted={aborted}, msgs_created={msgs_created}, skipped_actions={skipped_actions})"
         )
 
+
+def _source_tx_hash(tx: dict, external_hash: str) -> str:
     tx_hash_raw = tx.get("hash")
     if isinstance(tx_hash_raw, str):
         return _hash_base64_to_hex(tx_hash_raw) or tx_hash_raw
     return external_hash
 
 
+def _validate_onchain_transfer_execution(
+    *,
+    settings: Settings,
+    source_address_raw: str,
+    external_hash: str,
+) -> str:
+    tx = _locate_source_tx_by_external_hash(
+        settings=settings,
+        source_address_raw=source_address_raw,
+        external_hash=external_hash,
+    )
+    if tx is None:
+        return external_hash
+
+    _check_transfer_executed(tx)
+    return _source_tx_hash(tx, external_hash)
+
+
+def _delivered_message_indexes(tx: dict, messages: Sequence[tuple[str, Decimal]]) -> frozenset[int]:
+    out_msgs = tx.get("out_msgs") if isinstance(tx, dict) else None
+    if not isinstance(out_msgs, list):
+        # Without the outgoing list there is nothing to disprove; trust the executed action.
+        return frozenset(range(len(messages)))
+
+    sent: Counter[tuple[str | None, int]] = Counter()
+    for out_msg in out_msgs:
+        if not isinstance(out_msg, dict):
+            continue
+        destination = try_to_raw_address(str(out_msg.get("destination") or ""))
+        try:
+            value = int(out_msg.get("value"))
+        except (TypeError, ValueError):
+            continue
+        sent[(destination, value)] += 1
+
+    delivered: set[int] = set()
+    for index, (to_address, amount_ton) in enumerate(messages):
+        key = (try_to_raw_address(to_address), ton_to_nano(amount_ton))
+        if sent[key] > 0:
+            sent[key] -= 1
+            delivered.add(index)
+    return frozenset(delivered)
+
+
 def send_ton_transfer(
     *,
     settings: Settings,
@@ -277,3 +309,90 @@ def send_ton_transfer(
         )
 
     raise TonTransferError("No compatible transfer method found on WalletV5R1")
+
+
+def _wallet_seqno(client: ToncenterV3Client, wallet) -> int:
+    if _seqno_override_for_wallet(client, wallet) == 0:
+        return 0
+    try:
+        return int(_run_async(WalletV5R1.get_seqno(client, wallet.address)))
+    except Exception as exc:  # pragma: no cover - provider/network/runtime failures
+        raise TonTransferError(f"Could not read wallet seqno: {exc}") from exc
+
+
+def submit_ton_transfer(
+    *,
+    settings: Settings,
+    messages: Sequence[tuple[str, Decimal]],
+    source_subwallet_id: int = 0,
+    seqno: int | None = None,
+) -> SubmittedTransfer:
+    """Sign and broadcast (address, amount) transfers as one WalletV5R1 message and return at once.
+
+    Passing the ``seqno`` of an earlier attempt re-signs the same wallet action, so at most one
+    of the attempts can ever execute. Messages use the wallet's default ignore-errors send mode;
+    ``confirm_ton_transfer`` reports which of them actually left.
+    """
+    if not messages:
+        raise TonTransferError("Transfer needs at least one message")
+    if len(messages) > MAX_BATCH_MESSAGES:
+        raise TonTransferError(f"Transfer is limited to {MAX_BATCH_MESSAGES} messages")
+    mnemonic = _require_mnemonic(settings)
+    if source_subwallet_id < 0:
+        raise TonTransferError("source_subwallet_id must be non-negative")
+    client = _toncenter_client(settings)
+
+    wallet, _, _, _ = WalletV5R1.from_mnemonic(client, mnemonic, source_subwallet_id)
+    if seqno is None:
+        seqno = _wallet_seqno(client, wallet)
+    # A seqno 0 message deploys the wallet and never expires; later ones expire at valid_until.
+    valid_until = None if seqno == 0 else int(time.time()) + settings.TON_PAYOUT_MESSAGE_TTL_SECONDS
+    transfer_messages = [
+        TransferMessage(destination=to_address, amount=amount_ton, bounce=False)
+        for to_address, amount_ton in messages
+    ]
+    kwargs = {"seqno": seqno} if valid_until is None else {"seqno": seqno, "valid_until": valid_until}
+    try:
+        result = _run_async(wallet.batch_transfer_messages(transfer_messages, **kwargs))
+    except Exception as exc:  # pragma: no cover - provider/network/runtime failures
+        raise TonTransferError(
+            f"TON transfer failed for subwallet {source_subwallet_id}: {exc}"
+        ) from exc
+
+    return SubmittedTransfer(
+        external_hash=_extract_tx_hash(result),
+        source_address_raw=wallet.address.to_str(is_user_friendly=False),
+        seqno=seqno,
+        valid_until=valid_until,
+    )
+
+
+def confirm_ton_transfer(
+    *,
+    settings: Settings,
+    source_address_raw: str,
+    external_hash: str,
+    messages: Sequence[tuple[str, Decimal]],
+) -> BatchTransferResult | None:
+    """Look up a submitted transfer once; ``None`` means it has not been indexed yet."""
+    tx = _locate_source_tx_by_external_hash(
+        settings=settings,
+        source_address_raw=source_address_raw,
+        external_hash=external_hash,
+        attempts=1,
+    )
+    if tx is None:
+        return None
+
+    _check_transfer_executed(tx)
+    return BatchTransferResult(
+        tx_hash=_source_tx_hash(tx, external_hash),
+        delivered=_delivered_message_indexes(tx, messages),
+    )
+
+
+def current_wallet_seqno(*, settings: Settings, source_subwallet_id: int) -> int:
+    mnemonic = _require_mnemonic(settings)
+    client = _toncenter_client(settings)
+    wallet, _, _, _ = WalletV5R1.from_mnemonic(client, mnemonic, source_subwallet_id)
+    return _wallet_seqno(client, wallet)
@@ -2,17 +2,23 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import hashlib
+import threading
 
 from tonutils.client import ToncenterV3Client
 from tonutils.wallet import WalletV5R1
 
 from app.services.ton.addressing import to_raw_address
 from app.services.ton.errors import TonConfigError
-from app.services.ton.toncenter_url import normalize_toncenter_tonutils_base_url
+from app.services.ton.toncenter_client import get_tonutils_client
 from app.settings import Settings
 
 _SUBWALLET_MODULUS = 2**31
 
+# Mnemonic-to-keypair derivation (PBKDF2) is the slow part of address generation, so the
+# hot-wallet keypair is derived once per process, keyed by a digest of the mnemonic.
+_KEYPAIR_CACHE: dict[str, tuple[bytes, bytes]] = {}
+_CACHE_LOCK = threading.RLock()
+
 
 @dataclass(frozen=True)
 class DealDepositAddress:
@@ -36,41 +42,56 @@ def _require_mnemonic(settings: Settings) -> str:
 
 
 def _toncenter_client(settings: Settings) -> ToncenterV3Client:
-    if not settings.TONCENTER_API:
-        raise TonConfigError("TONCENTER_API is not configured")
-
-    base_url = normalize_toncenter_tonutils_base_url(settings.TONCENTER_API)
-
-    network = (settings.TON_NETWORK or "").lower()
-    return ToncenterV3Client(
-        api_key=settings.TONCENTER_KEY,
-        is_testnet=network == "testnet",
-        base_url=base_url,
-        rps=1,
-        max_retries=1,
-    )
+    return get_tonutils_client(settings)
 
 
-def resolve_deal_deposit_address(*, deal_id: int, settings: Settings) -> DealDepositAddress:
+def hot_wallet_keypair(settings: Settings) -> tuple[bytes, bytes]:
+    """Return the hot wallet's (public_key, private_key), deriving it once per process."""
     mnemonic = _require_mnemonic(settings)
-    subwallet_id = subwallet_id_from_deal_id(deal_id)
+    cache_key = hashlib.sha256(mnemonic.encode("utf-8")).hexdigest()
+    keypair = _KEYPAIR_CACHE.get(cache_key)
+    if keypair is not None:
+        return keypair
+
+    with _CACHE_LOCK:
+        keypair = _KEYPAIR_CACHE.get(cache_key)
+        if keypair is None:
+            _, public_key, private_key, _ = WalletV5R1.from_mnemonic(
+                _toncenter_client(settings), mnemonic
+            )
+            keypair = (public_key, private_key)
+            _KEYPAIR_CACHE[cache_key] = keypair
+    return keypair
+
+
+def hot_subwallet_address(settings: Settings, subwallet_id: int) -> tuple[str, str]:
+    """Return the (friendly, raw) address of a hot-wallet subwallet from the cached keypair."""
+    public_key, private_key = hot_wallet_keypair(settings)
     client = _toncenter_client(settings)
 
-    wallet, _, _, _ = WalletV5R1.from_mnemonic(client, mnemonic, subwallet_id)
-    network = (settings.TON_NETWORK or "mainnet").lower()
-    is_testnet = network == "testnet"
+    wallet = WalletV5R1(client, public_key, private_key, wallet_id=subwallet_id)
+    is_testnet = (settings.TON_NETWORK or "mainnet").lower() == "testnet"
     friendly = wallet.address.to_str(
         is_user_friendly=True,
         is_url_safe=True,
         is_bounceable=False,
         is_test_only=is_testnet,
     )
-    raw = to_raw_address(friendly)
+    return friendly, to_raw_address(friendly)
+
+
+def settlement_wallet_address(settings: Settings) -> str:
+    return hot_subwallet_address(settings, settings.TON_SETTLEMENT_SUBWALLET_ID)[0]
+
+
+def resolve_deal_deposit_address(*, deal_id: int, settings: Settings) -> DealDepositAddress:
+    subwallet_id = subwallet_id_from_deal_id(deal_id)
+    friendly, raw = hot_subwallet_address(settings, subwallet_id)
     return DealDepositAddress(
         friendly=friendly,
         raw=raw,
         subwallet_id=subwallet_id,
-        network=network,
+        network=(settings.TON_NETWORK or "mainnet").lower(),
     )
 
 
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 import inspect
 from typing import Iterable
 
+from shared.telegram.member_cache import BotMemberCache
+
 REQUIRED_BOT_RIGHTS = {
     "can_post_messages",
     "can_edit_messages",
@@ -44,12 +47,23 @@ class PermissionCheckResult:
     raw_member: dict | None = None
 
 
-async def check_bot_permissions(bot_api, channel) -> PermissionCheckResult:
-    """Check bot admin permissions in a channel via Bot API getMe/getChatMember."""
+# getMe never changes for a given token, so its id is resolved once per process.
+_BOT_ID_BY_TOKEN: dict[str, int] = {}
+
+
+async def check_bot_permissions(
+    bot_api,
+    channel,
+    member_cache: BotMemberCache | None = None,
+) -> PermissionCheckResult:
+    """Check bot admin permissions in a channel via Bot API getMe/getChatMember.
+
+    When member_cache is given, a found getChatMember payload is reused until its TTL expires
+    or the bot's my_chat_member update for the chat invalidates it. Its calls run in a worker thread.
+    """
     required_order = sorted(REQUIRED_BOT_RIGHTS)
     try:
-        me = bot_api.get_me()
-        bot_id = int(me["id"])
+        bot_id = await _resolve_bot_id(bot_api)
     except Exception:
         return PermissionCheckResult(
             ok=False,
@@ -60,15 +74,13 @@ async def check_bot_permissions(bot_api, channel) -> PermissionCheckResult:
             raw_member=None,
         )
 
-    member: dict | None = None
     refs = _build_bot_chat_refs(channel)
-    for chat_ref in refs:
-        try:
-            member = bot_api.get_chat_member(chat_id=chat_ref, user_id=bot_id)
-            break
-        except Exception:
-            continue
-
+    # Cache backends may block on I/O (Redis), so they are called off the event loop.
+    member = await asyncio.to_thread(member_cache.get, refs[0]) if member_cache is not None and refs else None
+    if member is None:
+        member = await _fetch_bot_member(bot_api, refs, bot_id)
+        if member is not None and member_cache is not None:
+            await asyncio.to_thread(member_cache.set, refs[0], member)
     if member is None:
         return PermissionCheckResult(
             ok=False,
@@ -108,6 +120,38 @@ async def check_bot_permissions(bot_api, channel) -> PermissionCheckResult:
     )
 
 
+async def _resolve_bot_id(bot_api) -> int:
+    token = getattr(getattr(bot_api, "_settings", None), "TELEGRAM_BOT_TOKEN", None)
+    if token and token in _BOT_ID_BY_TOKEN:
+        return _BOT_ID_BY_TOKEN[token]
+    me = await _maybe_await(bot_api.get_me())
+    bot_id = int(me["id"])
+    if token:
+        _BOT_ID_BY_TOKEN[token] = bot_id
+    return bot_id
+
+
+async def _fetch_bot_member(bot_api, refs: list[int | str], bot_id: int) -> dict | None:
+    """Return the member payload for the first chat ref that resolves, in preference order."""
+    if not inspect.iscoroutinefunction(bot_api.get_chat_member):
+        for chat_ref in refs:
+            try:
+                return bot_api.get_chat_member(chat_id=chat_ref, user_id=bot_id)
+            except Exception:
+                continue
+        return None
+
+    # Async clients probe every candidate ref at once instead of paying one round trip per miss.
+    results = await asyncio.gather(
+        *(bot_api.get_chat_member(chat_id=chat_ref, user_id=bot_id) for chat_ref in refs),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, dict):
+            return result
+    return None
+
+
 async def check_user_permissions(
     client,
     channel,
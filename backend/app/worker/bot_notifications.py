@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import exists
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+
+from app.models.bot_notification import BotNotification, BotNotificationState
+from app.services.rate_limit import RedisTokenBucket, TokenBucketLimiter
+from app.settings import get_settings
+from app.worker.celery_app import celery_app
+from shared.db.session import SessionLocal
+from shared.telegram.bot_api import BotApiService
+from shared.telegram.errors import TelegramRateLimitError
+
+logger = logging.getLogger(__name__)
+
+_GLOBAL_BUCKET_KEY = "bot:global"
+_MAX_BACKOFF_SECONDS = 300
+
+
+def _retry_backoff_seconds(attempts: int) -> int:
+    return min(2**attempts, _MAX_BACKOFF_SECONDS)
+
+
+def _queued_before(*conditions):
+    """An earlier PENDING notification of the same chat that matches ``conditions``."""
+    earlier = aliased(BotNotification)
+    return (
+        exists()
+        .where(earlier.chat_id == BotNotification.chat_id)
+        .where(earlier.state == BotNotificationState.PENDING.value)
+        .where(earlier.id < BotNotification.id)
+        .where(*conditions)
+    )
+
+
+def _deliver_pending_notifications(
+    *,
+    db: Session,
+    settings,
+    bot_api: BotApiService,
+    limiter: TokenBucketLimiter,
+    now: datetime | None = None,
+) -> int:
+    """Send due notifications, each chat's strictly in queue order, committing after every send.
+
+    A chat whose earlier message waits for a retry is left alone until that message goes out
+    or fails for good. Each row is locked and rechecked just before its send, so overlapping
+    runs skip it, and committed right after, so a crash re-sends at most that one message.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    candidate_ids = db.exec(
+        select(BotNotification.id)
+        .where(BotNotification.state == BotNotificationState.PENDING.value)
+        .where(BotNotification.next_attempt_at <= now)
+        .where(~_queued_before(BotNotification.next_attempt_at > now))
+        .order_by(BotNotification.id)
+        .limit(settings.BOT_NOTIFY_BATCH_SIZE)
+    ).all()
+    db.commit()
+
+    sent = 0
+    # Chats that hit a limit or failure this run are skipped so their queue stays in order.
+    held_chats: set[int] = set()
+    for notification_id in candidate_ids:
+        notification = db.exec(
+            select(BotNotification)
+            .where(BotNotification.id == notification_id)
+            .where(BotNotification.state == BotNotificationState.PENDING.value)
+            .where(BotNotification.next_attempt_at <= now)
+            # Whatever its state, anything still queued ahead of it goes first.
+            .where(~_queued_before())
+            .with_for_update(skip_locked=True)
+        ).first()
+        if notification is None or notification.chat_id in held_chats:
+            db.rollback()
+            continue
+
+        # The global budget is checked first so a chat token is never taken and then unused.
+        global_wait = limiter.try_acquire(
+            _GLOBAL_BUCKET_KEY,
+            rate=settings.BOT_NOTIFY_GLOBAL_RATE,
+            capacity=settings.BOT_NOTIFY_GLOBAL_RATE,
+        )
+        if global_wait > 0:
+            db.rollback()
+            break
+
+        chat_wait = limiter.try_acquire(
+            f"bot:chat:{notification.chat_id}",
+            rate=settings.BOT_NOTIFY_PER_CHAT_RATE,
+            capacity=1,
+        )
+        if chat_wait > 0:
+            held_chats.add(notification.chat_id)
+            db.rollback()
+            continue
+
+        try:
+            bot_api.send_message(chat_id=notification.chat_id, text=notification.message)
+        except TelegramRateLimitError as exc:
+            held_chats.add(notification.chat_id)
+            notification.attempts += 1
+            notification.last_error = str(exc)
+            notification.next_attempt_at = now + timedelta(seconds=exc.retry_after)
+        except Exception as exc:
+            held_chats.add(notification.chat_id)
+            notification.attempts += 1
+            notification.last_error = str(exc)
+            if notification.attempts >= settings.BOT_NOTIFY_MAX_ATTEMPTS:
+                notification.state = BotNotificationState.FAILED.value
+                logger.error(
+                    "Bot notification delivery failed",
+                    extra={
+                        "notification_id": notification.id,
+                        "event": notification.event,
+                        "error": str(exc),
+                    },
+                )
+            else:
+                notification.next_attempt_at = now + timedelta(
+                    seconds=_retry_backoff_seconds(notification.attempts)
+                )
+        else:
+            notification.state = BotNotificationState.SENT.value
+            notification.sent_at = datetime.now(timezone.utc)
+            sent += 1
+        db.add(notification)
+        db.commit()
+
+    return sent
+
+
+@celery_app.task(name="app.worker.bot_notifications.deliver_bot_notifications")
+def deliver_bot_notifications() -> int:
+    settings = get_settings()
+    if not settings.TELEGRAM_ENABLED or not settings.TELEGRAM_BOT_TOKEN:
+        return 0
+
+    with SessionLocal() as db:
+        return _deliver_pending_notifications(
+            db=db,
+            settings=settings,
+            bot_api=BotApiService(settings),
+            limiter=RedisTokenBucket.from_url(settings.REDIS_URL),
+        )
@@ -2,30 +2,62 @@ import os
 
 from celery import Celery
 
+# Connects the task signal hooks in every process that loads the app, beat included.
+from app.worker import metrics as _metrics  # noqa: F401
+
+
+# The Redis broker redelivers a task not acked within this window, and an ETA task is only
+# acked once it runs, so ETA tasks are never queued further ahead than this (see deal_posting).
+BROKER_VISIBILITY_TIMEOUT_SECONDS = 2 * 60 * 60
+DEAL_POSTING_POLL_SECONDS = 300.0
+
 
 def _redis_url() -> str:
     return os.getenv("REDIS_URL", "redis://redis:6379/0")
 
 
 celery_app = Celery("ads_worker", broker=_redis_url(), backend=_redis_url())
+celery_app.conf.broker_transport_options = {"visibility_timeout": BROKER_VISIBILITY_TIMEOUT_SECONDS}
 celery_app.autodiscover_tasks(["app.worker"])
 celery_app.conf.imports = (
     "app.worker.ton_watch",
     "app.worker.deal_posting",
     "app.worker.deal_verification",
+    "app.worker.bot_notifications",
+    "app.worker.ton_payouts",
 )
 celery_app.conf.timezone = "UTC"
 celery_app.conf.beat_schedule = {
     "ton-escrow-watch": {
         "task": "app.worker.ton_watch.scan_escrows",
-        "schedule": 60.0,
+        # Cheap when idle: each run only claims escrows whose next_scan_at has passed.
+        "schedule": 5.0,
     },
     "deal-posting": {
         "task": "app.worker.deal_posting.post_due_deals",
-        "schedule": 60.0,
+        # Safety net: deals are posted on time by ETA tasks, queued when they are funded or,
+        # for later starts, by this task once the start comes within the ETA horizon.
+        "schedule": DEAL_POSTING_POLL_SECONDS,
     },
     "deal-verification": {
         "task": "app.worker.deal_verification.verify_posted_deals",
-        "schedule": 300.0,
+        # Each run only checks deals whose next_verification_at has passed.
+        "schedule": 60.0,
+    },
+    "bot-notifications": {
+        "task": "app.worker.bot_notifications.deliver_bot_notifications",
+        "schedule": 2.0,
+    },
+    "ton-escrow-sweep": {
+        "task": "app.worker.ton_payouts.sweep_funded_escrows",
+        "schedule": 60.0,
+    },
+    "ton-payout-submit": {
+        "task": "app.worker.ton_payouts.submit_pending_payouts",
+        "schedule": 10.0,
+    },
+    "ton-payout-confirm": {
+        "task": "app.worker.ton_payouts.confirm_submitted_payouts",
+        "schedule": 10.0,
     },
 }
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Callable
 
 from sqlmodel import Session, select
 
@@ -16,7 +17,8 @@ from app.services.deal_fsm import (
 )
 from app.services.deal_posting import DealPostingError, publish_deal_post
 from app.settings import get_settings
-from app.worker.celery_app import celery_app
+from app.worker.celery_app import BROKER_VISIBILITY_TIMEOUT_SECONDS, DEAL_POSTING_POLL_SECONDS, celery_app
+from app.worker.metrics import DEAL_POSTING_LATENESS_SECONDS, record_items
 from shared.db.session import SessionLocal
 from shared.telegram.bot_api import BotApiService
 from shared.telegram.errors import TelegramApiError, TelegramConfigError
@@ -24,6 +26,114 @@ from shared.telegram.errors import TelegramApiError, TelegramConfigError
 logger = logging.getLogger(__name__)
 
 
+_POSTABLE_STATES = (DealState.FUNDED.value, DealState.SCHEDULED.value)
+# Well inside the broker visibility timeout, so a queued ETA task runs before it could be redelivered.
+ETA_HORIZON = timedelta(seconds=BROKER_VISIBILITY_TIMEOUT_SECONDS / 2)
+# Each poller run queues the starts up to two runs ahead, so one missed run loses nothing.
+_UPCOMING_WINDOW = timedelta(seconds=2 * DEAL_POSTING_POLL_SECONDS)
+
+
+def _ensure_aware_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _record_posting_lateness(deal: Deal, *, trigger: str) -> None:
+    if deal.posted_at is None or deal.scheduled_at is None:
+        return
+    lateness = (_ensure_aware_utc(deal.posted_at) - _ensure_aware_utc(deal.scheduled_at)).total_seconds()
+    DEAL_POSTING_LATENESS_SECONDS.labels(trigger=trigger).observe(max(0.0, lateness))
+    logger.info(
+        "Deal posted",
+        extra={"deal_id": deal.id, "trigger": trigger, "lateness_seconds": round(lateness, 3)},
+    )
+
+
+def _post_deal(
+    *,
+    db: Session,
+    settings,
+    deal_id: int,
+    now: datetime | None = None,
+    bot_api: BotApiService | None = None,
+    trigger: str = "poller",
+) -> bool:
+    """Post one deal if it is due; returns False when there was nothing to do or posting failed.
+
+    The row lock makes the ETA task and the poller wait for each other on the same deal, and
+    the state check turns whichever comes second into a no-op.
+    """
+    now = now or datetime.now(timezone.utc)
+    deal = db.exec(select(Deal).where(Deal.id == deal_id).with_for_update()).first()
+    if (
+        deal is None
+        or deal.state not in _POSTABLE_STATES
+        or deal.scheduled_at is None
+        or _ensure_aware_utc(deal.scheduled_at) > now
+    ):
+        db.rollback()
+        return False
+
+    channel = db.exec(select(Channel).where(Channel.id == deal.channel_id)).first()
+    if channel is None:
+        db.rollback()
+        logger.error("Channel not found for deal", extra={"deal_id": deal.id})
+        return False
+
+    bot_api = bot_api or BotApiService(settings)
+    notify_posted = False
+    try:
+        if deal.state == DealState.FUNDED.value:
+            apply_transition(
+                db,
+                deal=deal,
+                action=DealAction.schedule.value,
+                actor_id=None,
+                actor_role=DealActorRole.system.value,
+                payload={
+                    "scheduled_at": (
+                        deal.scheduled_at.isoformat() if deal.scheduled_at else None
+                    )
+                },
+            )
+
+        if deal.state == DealState.SCHEDULED.value and not deal.posted_message_id:
+            publish_deal_post(
+                deal=deal, channel=channel, settings=settings, bot_api=bot_api
+            )
+            apply_transition(
+                db,
+                deal=deal,
+                action=DealAction.post.value,
+                actor_id=None,
+                actor_role=DealActorRole.system.value,
+                payload={"message_id": deal.posted_message_id},
+            )
+            notify_posted = True
+            notify_deal_posted(db=db, settings=settings, deal=deal)
+
+        db.add(deal)
+    except (
+        DealPostingError,
+        DealTransitionError,
+        TelegramApiError,
+        TelegramConfigError,
+    ) as exc:
+        db.rollback()
+        logger.error(
+            "Deal posting failed", extra={"deal_id": deal_id, "error": str(exc)}
+        )
+        record_items("deal_posting", failed=1)
+        return False
+
+    db.commit()
+    record_items("deal_posting", processed=1)
+    if notify_posted:
+        _record_posting_lateness(deal, trigger=trigger)
+    return True
+
+
 def _post_due_deals(
     *,
     db: Session,
@@ -31,74 +141,70 @@ def _post_due_deals(
     now: datetime | None = None,
     bot_api: BotApiService | None = None,
 ) -> int:
+    """Post every deal whose time has passed; catches deals whose ETA task never ran."""
     now = now or datetime.now(timezone.utc)
     bot_api = bot_api or BotApiService(settings)
 
-    deals = db.exec(
-        select(Deal)
+    deal_ids = db.exec(
+        select(Deal.id)
         .where(Deal.scheduled_at.is_not(None))
         .where(Deal.scheduled_at <= now)
-        .where(Deal.state.in_([DealState.FUNDED.value, DealState.SCHEDULED.value]))
+        .where(Deal.state.in_(_POSTABLE_STATES))
+        .order_by(Deal.scheduled_at, Deal.id)
     ).all()
 
     processed = 0
-    for deal in deals:
-        channel = db.exec(select(Channel).where(Channel.id == deal.channel_id)).first()
-        if channel is None:
-            logger.error("Channel not found for deal", extra={"deal_id": deal.id})
-            continue
-
-        notify_posted = False
-        try:
-            if deal.state == DealState.FUNDED.value:
-                apply_transition(
-                    db,
-                    deal=deal,
-                    action=DealAction.schedule.value,
-                    actor_id=None,
-                    actor_role=DealActorRole.system.value,
-                    payload={
-                        "scheduled_at": (
-                            deal.scheduled_at.isoformat() if deal.scheduled_at else None
-                        )
-                    },
-                )
-
-            if deal.state == DealState.SCHEDULED.value and not deal.posted_message_id:
-                publish_deal_post(
-                    deal=deal, channel=channel, settings=settings, bot_api=bot_api
-                )
-                apply_transition(
-                    db,
-                    deal=deal,
-                    action=DealAction.post.value,
-                    actor_id=None,
-                    actor_role=DealActorRole.system.value,
-                    payload={"message_id": deal.posted_message_id},
-                )
-                notify_posted = True
-
-            db.add(deal)
+    for deal_id in deal_ids:
+        if _post_deal(db=db, settings=settings, deal_id=deal_id, now=now, bot_api=bot_api):
             processed += 1
-        except (
-            DealPostingError,
-            DealTransitionError,
-            TelegramApiError,
-            TelegramConfigError,
-        ) as exc:
-            db.rollback()
-            logger.error(
-                "Deal posting failed", extra={"deal_id": deal.id, "error": str(exc)}
-            )
-            continue
-        else:
-            db.commit()
-            if notify_posted:
-                notify_deal_posted(db=db, settings=settings, deal=deal)
-
     return processed
 
 
+@celery_app.task(name="app.worker.deal_posting.post_deal")
+def post_deal(deal_id: int) -> bool:
+    settings = get_settings()
+    if not settings.TELEGRAM_ENABLED:
+        return False
+
+    with SessionLocal() as db:
+        return _post_deal(db=db, settings=settings, deal_id=deal_id, trigger="eta")
+
+
+def schedule_deal_post(deal_id: int, scheduled_at: datetime | None, *, now: datetime | None = None) -> None:
+    """Queue ``post_deal`` to run at the deal's start time, if it is within ``ETA_HORIZON``.
+
+    Later starts are queued by ``post_due_deals`` once they come within range. Redelivered or
+    duplicate tasks are harmless, and ``post_due_deals`` still posts any deal whose task was lost.
+    """
+    if scheduled_at is None:
+        return
+    now = now or datetime.now(timezone.utc)
+    eta = _ensure_aware_utc(scheduled_at)
+    if eta > now + ETA_HORIZON:
+        return
+    post_deal.apply_async(args=[deal_id], eta=eta)
+
+
+def _queue_upcoming_posts(
+    *,
+    db: Session,
+    now: datetime | None = None,
+    schedule_fn: Callable[..., None] = schedule_deal_post,
+) -> int:
+    """Queue ETA tasks for deals starting before the next poller runs, so they post on time."""
+    now = now or datetime.now(timezone.utc)
+    upcoming = db.exec(
+        select(Deal.id, Deal.scheduled_at)
+        .where(Deal.scheduled_at > now)
+        .where(Deal.scheduled_at <= now + _UPCOMING_WINDOW)
+        .where(Deal.state.in_(_POSTABLE_STATES))
+        .order_by(Deal.scheduled_at, Deal.id)
+    ).all()
+    for deal_id, scheduled_at in upcoming:
+        schedule_fn(deal_id, scheduled_at, now=now)
+    return len(upcoming)
+
+
 @celery_app.task(name="app.worker.deal_posting.post_due_deals")
 def post_due_deals() -> int:
     settings = get_settings()
@@ -106,4 +212,6 @@ def post_due_deals() -> int:
         return 0
 
     with SessionLocal() as db:
-        return _post_due_deals(db=db, settings=settings)
+        posted = _post_due_deals(db=db, settings=settings)
+        _queue_upcoming_posts(db=db)
+        return posted
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 
 from app.domain.escrow_fsm import EscrowState
@@ -18,16 +24,21 @@ from app.services.deal_fsm import (
     apply_transition,
 )
 from app.services.telegram.message_inspect import (
-    fetch_message_hash_sync,
-    fetch_story_hash_sync,
-    has_additional_posts_sync,
-    has_additional_stories_sync,
+    fetch_message_hash,
+    fetch_story_hash,
+    has_additional_posts,
+    has_additional_stories,
 )
 from app.services.ton.payouts import PayoutError, ensure_refund, ensure_release
-from app.services.ton.transfers import TonTransferError, send_ton_transfer
 from app.settings import get_settings
 from app.worker.celery_app import celery_app
+from app.worker.metrics import (
+    VERIFICATION_CHANNEL_SECONDS,
+    VERIFICATION_CYCLE_SECONDS,
+    record_items,
+)
 from shared.db.session import SessionLocal
+from shared.telegram.telethon_client import TelegramClientService
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +60,29 @@ def _ensure_aware_utc(value: datetime) -> datetime:
     return value.astimezone(timezone.utc)
 
 
-def _resolve_placement_type(deal: Deal) -> str:
+@dataclass(frozen=True)
+class _PostedDeal:
+    """The columns of a POSTED deal and its channel and escrow that the checks read."""
+
+    id: int
+    advertiser_id: int
+    channel_owner_id: int
+    posted_message_id: str | None
+    posted_content_hash: str | None
+    posted_at: datetime | None
+    placement_type: str | None
+    ad_type: str | None
+    retention_hours: int | None
+    verification_window_hours: int | None
+    exclusive_hours: int | None
+    channel_pk: int | None
+    telegram_channel_id: int | None
+    channel_username: str | None
+    escrow_pk: int | None
+    escrow_state: str | None
+
+
+def _resolve_placement_type(deal: Deal | _PostedDeal) -> str:
     placement_type = (deal.placement_type or "").strip().lower()
     if placement_type in {"post", "story"}:
         return placement_type
@@ -60,7 +93,7 @@ def _resolve_placement_type(deal: Deal) -> str:
     return "post"
 
 
-def _retention_deadline(deal: Deal, *, default_hours: int) -> datetime | None:
+def _retention_deadline(deal: Deal | _PostedDeal, *, default_hours: int) -> datetime | None:
     if deal.posted_at is None:
         return None
     posted_at = _ensure_aware_utc(deal.posted_at)
@@ -71,7 +104,7 @@ def _retention_deadline(deal: Deal, *, default_hours: int) -> datetime | None:
     return posted_at + timedelta(hours=retention_hours)
 
 
-def _exclusivity_deadline(deal: Deal) -> datetime | None:
+def _exclusivity_deadline(deal: Deal | _PostedDeal) -> datetime | None:
     if deal.posted_at is None:
         return None
     posted_at = _ensure_aware_utc(deal.posted_at)
@@ -79,7 +112,7 @@ def _exclusivity_deadline(deal: Deal) -> datetime | None:
     return posted_at + timedelta(hours=exclusive_hours)
 
 
-def _verification_deadline(deal: Deal, *, default_hours: int) -> datetime | None:
+def _verification_deadline(deal: Deal | _PostedDeal, *, default_hours: int) -> datetime | None:
     retention = _retention_deadline(deal, default_hours=default_hours)
     exclusivity = _exclusivity_deadline(deal)
     if retention is None:
@@ -89,215 +122,517 @@ def _verification_deadline(deal: Deal, *, default_hours: int) -> datetime | None
     return max(retention, exclusivity)
 
 
-def _verify_posted_deals(
+# The last content check runs this long before retention ends; the run at the deadline itself
+# only settles, since the post may be removed from then on.
+_FINAL_CHECK_LEAD = timedelta(minutes=2)
+
+
+def _next_verification_at(target: Deal | _PostedDeal, *, now: datetime, settings) -> datetime:
+    """When to check a deal that did not settle now.
+
+    Checks follow the deal's deadlines rather than a fixed cadence: when the exclusivity window
+    closes (the breach check covers the whole window), just before retention ends and at the
+    verification deadline, where the deal settles. Between them only a spot check runs every
+    ``VERIFICATION_SPOT_CHECK_INTERVAL_SECONDS``, so a post edited and restored in between goes
+    unnoticed; deletions and exclusivity breaches are still caught at the deadlines. A deal
+    past its deadline that did not settle is retried after ``VERIFICATION_RETRY_INTERVAL_SECONDS``.
+    """
+    default_hours = settings.VERIFICATION_WINDOW_DEFAULT_HOURS
+    verification_deadline = _verification_deadline(target, default_hours=default_hours)
+    if verification_deadline is None or now >= verification_deadline:
+        return now + timedelta(seconds=max(settings.VERIFICATION_RETRY_INTERVAL_SECONDS, 1))
+    retention_deadline = _retention_deadline(target, default_hours=default_hours)
+    milestones = [
+        now + timedelta(seconds=max(settings.VERIFICATION_SPOT_CHECK_INTERVAL_SECONDS, 1)),
+        verification_deadline,
+        _exclusivity_deadline(target),
+        None if retention_deadline is None else retention_deadline - _FINAL_CHECK_LEAD,
+    ]
+    return min(milestone for milestone in milestones if milestone is not None and milestone > now)
+
+
+def _load_due_posted_deals(db: Session, *, now: datetime, limit: int) -> list[_PostedDeal]:
+    rows = db.exec(
+        select(
+            Deal.id,
+            Deal.advertiser_id,
+            Deal.channel_owner_id,
+            Deal.posted_message_id,
+            Deal.posted_content_hash,
+            Deal.posted_at,
+            Deal.placement_type,
+            Deal.ad_type,
+            Deal.retention_hours,
+            Deal.verification_window_hours,
+            Deal.exclusive_hours,
+            Channel.id,
+            Channel.telegram_channel_id,
+            Channel.username,
+            DealEscrow.id,
+            DealEscrow.state,
+        )
+        .select_from(Deal)
+        .outerjoin(Channel, Channel.id == Deal.channel_id)
+        .outerjoin(DealEscrow, DealEscrow.deal_id == Deal.id)
+        .where(Deal.state == DealState.POSTED.value)
+        .where(Deal.posted_message_id.is_not(None))
+        .where(Deal.posted_message_id != "")
+        .where(Deal.posted_at.is_not(None))
+        .where(or_(Deal.next_verification_at.is_(None), Deal.next_verification_at <= now))
+        .order_by(Deal.next_verification_at.asc().nulls_first(), Deal.id)
+        .limit(limit)
+    ).all()
+    return [_PostedDeal(*row) for row in rows]
+
+
+async def _check_posted_deal(
+    target: _PostedDeal,
     *,
-    db: Session,
+    client,
     settings,
-    now: datetime | None = None,
-    fetch_hash_fn=fetch_message_hash_sync,
-    fetch_story_hash_fn=fetch_story_hash_sync,
-    has_post_breach_fn=has_additional_posts_sync,
-    has_story_breach_fn=has_additional_stories_sync,
-    transfer_fn=send_ton_transfer,
-) -> int:
-    now = now or datetime.now(timezone.utc)
-    now = _ensure_aware_utc(now)
+    now: datetime,
+    fetch_hash_fn,
+    fetch_story_hash_fn,
+    has_post_breach_fn,
+    has_story_breach_fn,
+) -> tuple[bool, str | None]:
+    """Return whether the deal settles now and, if so, the tamper reason that refunds it."""
+    verification_deadline = _verification_deadline(
+        target,
+        default_hours=settings.VERIFICATION_WINDOW_DEFAULT_HOURS,
+    )
+    retention_deadline = _retention_deadline(
+        target,
+        default_hours=settings.VERIFICATION_WINDOW_DEFAULT_HOURS,
+    )
+    exclusivity_deadline = _exclusivity_deadline(target)
+    if (
+        verification_deadline is None
+        or retention_deadline is None
+        or exclusivity_deadline is None
+    ):
+        return False, None
+
+    if target.channel_pk is None:
+        logger.error(
+            "Channel not found for verification", extra={"deal_id": target.id}
+        )
+        return False, None
+    if target.escrow_pk is None:
+        logger.error(
+            "Escrow not found for verification", extra={"deal_id": target.id}
+        )
+        return False, None
+    if target.escrow_state != EscrowState.FUNDED.value:
+        logger.error(
+            "Escrow not funded", extra={"deal_id": target.id, "state": target.escrow_state}
+        )
+        return False, None
 
-    deals = db.exec(select(Deal).where(Deal.state == DealState.POSTED.value)).all()
-    processed = 0
+    chat_id = target.telegram_channel_id or target.channel_username
+    if not chat_id:
+        logger.error(
+            "Channel missing telegram identifier", extra={"deal_id": target.id}
+        )
+        return False, None
 
-    for deal in deals:
-        if not deal.posted_message_id or deal.posted_at is None:
-            continue
+    placement_type = _resolve_placement_type(target)
+    posted_message_id = int(target.posted_message_id)
 
-        verification_deadline = _verification_deadline(
-            deal,
-            default_hours=settings.VERIFICATION_WINDOW_DEFAULT_HOURS,
-        )
-        retention_deadline = _retention_deadline(
-            deal,
-            default_hours=settings.VERIFICATION_WINDOW_DEFAULT_HOURS,
-        )
-        exclusivity_deadline = _exclusivity_deadline(deal)
-        if (
-            verification_deadline is None
-            or retention_deadline is None
-            or exclusivity_deadline is None
-        ):
-            continue
-
-        channel = db.exec(select(Channel).where(Channel.id == deal.channel_id)).first()
-        if channel is None:
+    tamper_reason: str | None = None
+    if now <= retention_deadline:
+        try:
+            if placement_type == "story":
+                current_hash = await fetch_story_hash_fn(
+                    client,
+                    channel=chat_id,
+                    story_id=posted_message_id,
+                )
+            else:
+                current_hash = await fetch_hash_fn(
+                    client,
+                    channel=chat_id,
+                    message_id=posted_message_id,
+                )
+        except Exception as exc:
             logger.error(
-                "Channel not found for verification", extra={"deal_id": deal.id}
+                "Verification fetch failed",
+                extra={"deal_id": target.id, "error": str(exc)},
             )
-            continue
+            return False, None
 
-        escrow = db.exec(
-            select(DealEscrow).where(DealEscrow.deal_id == deal.id)
-        ).first()
-        if escrow is None:
-            logger.error(
-                "Escrow not found for verification", extra={"deal_id": deal.id}
-            )
-            continue
-        if escrow.state != EscrowState.FUNDED.value:
+        if current_hash is None:
+            tamper_reason = "missing_content"
+        elif target.posted_content_hash and current_hash != target.posted_content_hash:
+            tamper_reason = "content_changed"
+
+    # Checks are sparse, so the whole window is searched each time, even once it has closed.
+    has_exclusivity = max(int(target.exclusive_hours or 0), 0) > 0
+    if tamper_reason is None and has_exclusivity:
+        posted_at = _ensure_aware_utc(target.posted_at)
+        try:
+            if placement_type == "story":
+                breached = await has_story_breach_fn(
+                    client,
+                    channel=chat_id,
+                    start_at=posted_at,
+                    end_at=min(now, exclusivity_deadline),
+                    exclude_story_id=posted_message_id,
+                )
+            else:
+                breached = await has_post_breach_fn(
+                    client,
+                    channel=chat_id,
+                    start_at=posted_at,
+                    end_at=min(now, exclusivity_deadline),
+                    exclude_message_id=posted_message_id,
+                )
+        except Exception as exc:
             logger.error(
-                "Escrow not funded", extra={"deal_id": deal.id, "state": escrow.state}
+                "Exclusivity check failed",
+                extra={"deal_id": target.id, "error": str(exc)},
             )
-            continue
+            return False, None
 
-        chat_id = channel.telegram_channel_id or channel.username
-        if not chat_id:
-            logger.error(
-                "Channel missing telegram identifier", extra={"deal_id": deal.id}
+        if breached:
+            tamper_reason = "exclusivity_breach"
+
+    if tamper_reason is None and now < verification_deadline:
+        return False, None
+    return True, tamper_reason
+
+
+_CheckFn = Callable[..., Awaitable[tuple[bool, str | None]]]
+
+
+def _record_channel_latency(channel_pk: int | None, *, deals: int, seconds: float) -> None:
+    VERIFICATION_CHANNEL_SECONDS.observe(seconds)
+    logger.info(
+        "Channel verification checked",
+        extra={"channel_id": channel_pk, "deals": deals, "latency_seconds": round(seconds, 3)},
+    )
+
+
+def _record_verification_cycle(*, deals: int, channels: int, settled: int, seconds: float) -> None:
+    VERIFICATION_CYCLE_SECONDS.observe(seconds)
+    logger.info(
+        "Verification cycle finished",
+        extra={
+            "deals": deals,
+            "channels": channels,
+            "settled": settled,
+            "duration_seconds": round(seconds, 3),
+        },
+    )
+
+
+async def _check_posted_deals(
+    targets: list[_PostedDeal],
+    *,
+    check: _CheckFn,
+    client,
+    concurrency: int,
+) -> dict[int, tuple[bool, str | None]]:
+    """Run the Telegram checks of every target, channel by channel.
+
+    Channels are checked concurrently, at most ``concurrency`` at a time, while the deals of
+    one channel run one after another so a channel never sees parallel requests from us.
+    """
+    groups: dict[int | None, list[_PostedDeal]] = {}
+    for target in targets:
+        groups.setdefault(target.channel_pk, []).append(target)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def check_one(target: _PostedDeal) -> tuple[bool, str | None]:
+        # A bad row fails its own deal, which is rescheduled, not the whole cycle.
+        try:
+            return await check(target, client=client)
+        except Exception as exc:
+            logger.exception(
+                "Verification check failed",
+                extra={"deal_id": target.id, "error": str(exc)},
             )
-            continue
+            return False, None
 
-        placement_type = _resolve_placement_type(deal)
-        posted_message_id = int(deal.posted_message_id)
+    async def check_channel(channel_pk: int | None, group: list[_PostedDeal]):
+        async with semaphore:
+            started = time.monotonic()
+            outcomes = [(target.id, await check_one(target)) for target in group]
+            _record_channel_latency(channel_pk, deals=len(group), seconds=time.monotonic() - started)
+            return outcomes
 
-        tamper_reason: str | None = None
-        if now <= retention_deadline:
-            try:
-                if placement_type == "story":
-                    current_hash = fetch_story_hash_fn(
-                        settings=settings,
-                        channel=chat_id,
-                        story_id=posted_message_id,
-                    )
-                else:
-                    current_hash = fetch_hash_fn(
-                        settings=settings,
-                        channel=chat_id,
-                        message_id=posted_message_id,
-                    )
-            except Exception as exc:
-                logger.error(
-                    "Verification fetch failed",
-                    extra={"deal_id": deal.id, "error": str(exc)},
-                )
-                continue
+    results = await asyncio.gather(*(check_channel(pk, group) for pk, group in groups.items()))
+    return {deal_id: outcome for outcomes in results for deal_id, outcome in outcomes}
 
-            if current_hash is None:
-                tamper_reason = "missing_content"
-            elif deal.posted_content_hash and current_hash != deal.posted_content_hash:
-                tamper_reason = "content_changed"
 
-        exclusivity_active = (
-            now <= exclusivity_deadline and max(int(deal.exclusive_hours or 0), 0) > 0
+async def _check_with_telegram(
+    targets: list[_PostedDeal],
+    *,
+    settings,
+    check: _CheckFn,
+) -> dict[int, tuple[bool, str | None]]:
+    """Share one Telethon connection across the whole cycle."""
+    service = TelegramClientService(settings)
+    await service.connect()
+    try:
+        return await _check_posted_deals(
+            targets,
+            check=check,
+            client=service.client(),
+            concurrency=settings.VERIFICATION_CHANNEL_CONCURRENCY,
         )
-        if tamper_reason is None and exclusivity_active:
-            posted_at = _ensure_aware_utc(deal.posted_at)
-            try:
-                if placement_type == "story":
-                    breached = has_story_breach_fn(
-                        settings=settings,
-                        channel=chat_id,
-                        start_at=posted_at,
-                        end_at=min(now, exclusivity_deadline),
-                        exclude_story_id=posted_message_id,
-                    )
-                else:
-                    breached = has_post_breach_fn(
-                        settings=settings,
-                        channel=chat_id,
-                        start_at=posted_at,
-                        end_at=min(now, exclusivity_deadline),
-                        exclude_message_id=posted_message_id,
-                    )
-            except Exception as exc:
-                logger.error(
-                    "Exclusivity check failed",
-                    extra={"deal_id": deal.id, "error": str(exc)},
-                )
-                continue
+    finally:
+        await service.disconnect()
+
+
+def _settle_deal(
+    db: Session,
+    *,
+    deal: Deal,
+    escrow: DealEscrow,
+    advertiser: User | None,
+    owner: User | None,
+    tamper_reason: str | None,
+    settings,
+    now: datetime,
+) -> None:
+    if tamper_reason is not None:
+        apply_transition(
+            db,
+            deal=deal,
+            action=DealAction.refund.value,
+            actor_id=None,
+            actor_role=DealActorRole.system.value,
+            payload={"reason": tamper_reason},
+        )
+        if advertiser is None:
+            raise PayoutError("Advertiser not found")
+        ensure_refund(
+            db=db,
+            deal=deal,
+            escrow=escrow,
+            advertiser=advertiser,
+            settings=settings,
+            reason=tamper_reason,
+        )
+    else:
+        deal.verified_at = now
+        apply_transition(
+            db,
+            deal=deal,
+            action=DealAction.verify.value,
+            actor_id=None,
+            actor_role=DealActorRole.system.value,
+            payload={"verified_at": now.isoformat()},
+        )
+        if owner is None:
+            raise PayoutError("Channel owner not found")
+        ensure_release(
+            db=db,
+            deal=deal,
+            escrow=escrow,
+            owner=owner,
+            settings=settings,
+        )
+    db.add(deal)
+    db.add(escrow)
+    # Queued payouts are announced by the payout worker once confirmed on chain.
+    if tamper_reason is None and escrow.released_at is not None:
+        notify_deal_released(
+            db=db,
+            settings=settings,
+            deal=deal,
+            released_amount_ton=escrow.released_amount_ton,
+            tx_hash=escrow.release_tx_hash,
+        )
+    elif tamper_reason is not None and escrow.refunded_at is not None:
+        notify_deal_refunded(
+            db=db,
+            settings=settings,
+            deal=deal,
+            refunded_amount_ton=escrow.refunded_amount_ton,
+            tx_hash=escrow.refund_tx_hash,
+            reason=tamper_reason,
+        )
+    db.commit()
+
+
+def _verify_posted_deals(
+    *,
+    db: Session,
+    settings,
+    now: datetime | None = None,
+    client=None,
+    fetch_hash_fn=fetch_message_hash,
+    fetch_story_hash_fn=fetch_story_hash,
+    has_post_breach_fn=has_additional_posts,
+    has_story_breach_fn=has_additional_stories,
+) -> int:
+    """Check the POSTED deals that are due and settle the ones whose windows closed or that were
+    tampered with.
+
+    The checks read one joined query of the needed columns, oldest due first and at most
+    ``VERIFICATION_BATCH_SIZE`` deals, and run on one Telegram connection (``client`` when
+    given), ``VERIFICATION_CHANNEL_CONCURRENCY`` channels at a time. Deals that do not settle
+    get their next check time in one bulk update; only deals that settle load full rows, in one
+    query per table, and their transitions and payouts are applied afterwards, one by one.
+    """
+    started = time.monotonic()
+    now = now or datetime.now(timezone.utc)
+    now = _ensure_aware_utc(now)
 
-            if breached:
-                tamper_reason = "exclusivity_breach"
+    targets = _load_due_posted_deals(db, now=now, limit=settings.VERIFICATION_BATCH_SIZE)
+    if not targets:
+        return 0
+    # End the read transaction so the connection is not held idle while Telegram answers.
+    db.rollback()
+
+    async def check(target: _PostedDeal, *, client) -> tuple[bool, str | None]:
+        return await _check_posted_deal(
+            target,
+            client=client,
+            settings=settings,
+            now=now,
+            fetch_hash_fn=fetch_hash_fn,
+            fetch_story_hash_fn=fetch_story_hash_fn,
+            has_post_breach_fn=has_post_breach_fn,
+            has_story_breach_fn=has_story_breach_fn,
+        )
 
-        if tamper_reason is None and now < verification_deadline:
-            continue
+    if client is None:
+        outcomes = asyncio.run(_check_with_telegram(targets, settings=settings, check=check))
+    else:
+        outcomes = asyncio.run(
+            _check_posted_deals(
+                targets,
+                check=check,
+                client=client,
+                concurrency=settings.VERIFICATION_CHANNEL_CONCURRENCY,
+            )
+        )
 
-        refund_reason: str | None = None
-        did_release = False
-        try:
-            if tamper_reason is not None:
-                refund_reason = tamper_reason
-                apply_transition(
+    settling: list[tuple[_PostedDeal, str | None]] = []
+    rescheduled: list[dict] = []
+    for target in targets:
+        settles, tamper_reason = outcomes[target.id]
+        if settles:
+            settling.append((target, tamper_reason))
+        else:
+            rescheduled.append(
+                {
+                    "id": target.id,
+                    "next_verification_at": _next_verification_at(target, now=now, settings=settings),
+                }
+            )
+    if rescheduled:
+        db.execute(update(Deal), rescheduled)
+        db.commit()
+    processed = _settle_deals(db, settling, settings=settings, now=now) if settling else 0
+
+    _record_verification_cycle(
+        deals=len(targets),
+        channels=len({target.channel_pk for target in targets}),
+        settled=processed,
+        seconds=time.monotonic() - started,
+    )
+    return processed
+
+
+def _claim_settling_deals(
+    db: Session,
+    deal_ids: list[int],
+    *,
+    now: datetime,
+    lease_until: datetime,
+) -> set[int]:
+    """Move the next check of the deals still POSTED and due past ``lease_until``; returns their ids.
+
+    A deal that another run already claimed or settled no longer matches and is left out. If
+    this run dies before settling, the deal is checked again once the lease passes.
+    """
+    claimed = db.execute(
+        update(Deal)
+        .where(Deal.id.in_(deal_ids))
+        .where(Deal.state == DealState.POSTED.value)
+        .where(or_(Deal.next_verification_at.is_(None), Deal.next_verification_at <= now))
+        .values(next_verification_at=lease_until)
+        .returning(Deal.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    return set(claimed)
+
+
+def _settle_deals(
+    db: Session,
+    settling: list[tuple[_PostedDeal, str | None]],
+    *,
+    settings,
+    now: datetime,
+) -> int:
+    """Apply the transitions and payouts of the deals whose checks settled them.
+
+    The deals are claimed first, so of two overlapping runs that checked the same deal only one
+    settles it.
+    """
+    claimed = _claim_settling_deals(
+        db,
+        [target.id for target, _ in settling],
+        now=now,
+        lease_until=now + timedelta(seconds=settings.VERIFICATION_RETRY_INTERVAL_SECONDS),
+    )
+    settling = [(target, tamper_reason) for target, tamper_reason in settling if target.id in claimed]
+    if not settling:
+        return 0
+
+    deal_ids = [target.id for target, _ in settling]
+    deals = {deal.id: deal for deal in db.exec(select(Deal).where(Deal.id.in_(deal_ids))).all()}
+    escrows = {
+        escrow.deal_id: escrow
+        for escrow in db.exec(select(DealEscrow).where(DealEscrow.deal_id.in_(deal_ids))).all()
+    }
+    user_ids = {
+        target.advertiser_id if tamper_reason is not None else target.channel_owner_id
+        for target, tamper_reason in settling
+    }
+    users = {user.id: user for user in db.exec(select(User).where(User.id.in_(user_ids))).all()}
+
+    processed = 0
+    # Rows loaded above stay usable across the per-deal commits instead of reloading one by one.
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        for target, tamper_reason in settling:
+            deal = deals[target.id]
+            escrow = escrows[target.id]
+            try:
+                _settle_deal(
                     db,
                     deal=deal,
-                    action=DealAction.refund.value,
-                    actor_id=None,
-                    actor_role=DealActorRole.system.value,
-                    payload={"reason": tamper_reason},
-                )
-                advertiser = db.exec(
-                    select(User).where(User.id == deal.advertiser_id)
-                ).first()
-                if advertiser is None:
-                    raise PayoutError("Advertiser not found")
-                ensure_refund(
-                    db=db,
-                    deal=deal,
                     escrow=escrow,
-                    advertiser=advertiser,
+                    advertiser=users.get(target.advertiser_id),
+                    owner=users.get(target.channel_owner_id),
+                    tamper_reason=tamper_reason,
                     settings=settings,
-                    transfer_fn=transfer_fn,
+                    now=now,
                 )
-            else:
-                deal.verified_at = now
-                apply_transition(
-                    db,
-                    deal=deal,
-                    action=DealAction.verify.value,
-                    actor_id=None,
-                    actor_role=DealActorRole.system.value,
-                    payload={"verified_at": now.isoformat()},
-                )
-                owner = db.exec(
-                    select(User).where(User.id == deal.channel_owner_id)
-                ).first()
-                if owner is None:
-                    raise PayoutError("Channel owner not found")
-                ensure_release(
-                    db=db,
-                    deal=deal,
-                    escrow=escrow,
-                    owner=owner,
-                    settings=settings,
-                    transfer_fn=transfer_fn,
+            except (DealTransitionError, PayoutError, IntegrityError) as exc:
+                db.rollback()
+                logger.error(
+                    "Verification processing failed",
+                    extra={"deal_id": target.id, "error": str(exc)},
                 )
-                did_release = True
+                record_items("deal_verification", failed=1)
+                # Retry after the retry interval rather than at the head of every batch.
+                deal.next_verification_at = _next_verification_at(target, now=now, settings=settings)
+                db.add(deal)
+                db.commit()
+                continue
 
-            db.add(deal)
-            db.add(escrow)
-            db.commit()
             processed += 1
-            if did_release:
-                notify_deal_released(
-                    db=db,
-                    settings=settings,
-                    deal=deal,
-                    released_amount_ton=escrow.released_amount_ton,
-                    tx_hash=escrow.release_tx_hash,
-                )
-            elif refund_reason is not None:
-                notify_deal_refunded(
-                    db=db,
-                    settings=settings,
-                    deal=deal,
-                    refunded_amount_ton=escrow.refunded_amount_ton,
-                    tx_hash=escrow.refund_tx_hash,
-                    reason=refund_reason,
-                )
-        except (DealTransitionError, PayoutError, TonTransferError) as exc:
-            db.rollback()
-            logger.error(
-                "Verification processing failed",
-                extra={"deal_id": deal.id, "error": str(exc)},
-            )
-            continue
+            record_items("deal_verification", processed=1)
+    finally:
+        db.expire_on_commit = expire_on_commit
 
     return processed
 
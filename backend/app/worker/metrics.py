@@ -0,0 +1,173 @@
+"""Celery task metrics and the worker's Prometheus exporter.
+
+Signal hooks time every task, measure how long it waited in the queue and count failures;
+the workers add what each run handled through ``record_items``. Set ``METRICS_WORKER_PORT``
+to serve the metrics from the worker, together with ``PROMETHEUS_MULTIPROC_DIR`` for the
+prefork pool so the samples of every child process are collected.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_shutdown,
+)
+from prometheus_client import Counter, Histogram, multiprocess, start_http_server
+from sqlalchemy import event
+
+from app.settings import get_settings
+from shared.db.session import engine
+from shared.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+_DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+TASK_DURATION_SECONDS = Histogram(
+    "celery_task_duration_seconds",
+    "Run time of Celery tasks.",
+    ["task", "state"],
+    buckets=_DURATION_BUCKETS,
+)
+TASK_QUEUE_LAG_SECONDS = Histogram(
+    "celery_task_queue_lag_seconds",
+    "Time from publish, or from the ETA, until a worker started the task.",
+    ["task"],
+    buckets=_DURATION_BUCKETS,
+)
+TASK_FAILURES = Counter(
+    "celery_task_failures_total",
+    "Celery tasks that raised.",
+    ["task"],
+)
+WORKER_ITEMS = Counter(
+    "worker_items_total",
+    "Items handled by worker runs, by outcome.",
+    ["worker", "outcome"],
+)
+DEAL_POSTING_LATENESS_SECONDS = Histogram(
+    "deal_posting_lateness_seconds",
+    "Delay between a deal's scheduled start and its post.",
+    ["trigger"],
+    buckets=(0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+VERIFICATION_CHANNEL_SECONDS = Histogram(
+    "deal_verification_channel_duration_seconds",
+    "Time spent checking the due deals of one channel.",
+    buckets=_DURATION_BUCKETS,
+)
+VERIFICATION_CYCLE_SECONDS = Histogram(
+    "deal_verification_cycle_duration_seconds",
+    "Duration of one verification run with due deals.",
+    buckets=_DURATION_BUCKETS,
+)
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_duration_seconds",
+    "Duration of database statements run by the workers.",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+_PUBLISHED_AT_HEADER = "published_at"
+_task_started: dict[str, float] = {}
+
+
+def record_items(worker: str, *, processed: int = 0, failed: int = 0) -> None:
+    if processed:
+        WORKER_ITEMS.labels(worker=worker, outcome="processed").inc(processed)
+    if failed:
+        WORKER_ITEMS.labels(worker=worker, outcome="failed").inc(failed)
+
+
+def _eta_timestamp(eta: object) -> float | None:
+    if isinstance(eta, str):
+        try:
+            eta = datetime.fromisoformat(eta)
+        except ValueError:
+            return None
+    if not isinstance(eta, datetime):
+        return None
+    if eta.tzinfo is None:
+        eta = eta.replace(tzinfo=timezone.utc)
+    return eta.timestamp()
+
+
+@before_task_publish.connect
+def _stamp_published_at(headers: dict | None = None, **kwargs) -> None:
+    if headers is not None:
+        headers.setdefault(_PUBLISHED_AT_HEADER, time.time())
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id: str | None = None, task=None, **kwargs) -> None:
+    if task_id is None or task is None:
+        return
+    _task_started[task_id] = time.perf_counter()
+
+    published_at = getattr(task.request, _PUBLISHED_AT_HEADER, None)
+    ready_at = max(
+        (value for value in (published_at, _eta_timestamp(task.request.eta)) if value is not None),
+        default=None,
+    )
+    if ready_at is not None:
+        TASK_QUEUE_LAG_SECONDS.labels(task=task.name).observe(max(0.0, time.time() - float(ready_at)))
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id: str | None = None, task=None, state: str | None = None, **kwargs) -> None:
+    started = _task_started.pop(task_id, None) if task_id is not None else None
+    if started is None or task is None:
+        return
+    TASK_DURATION_SECONDS.labels(task=task.name, state=state or "UNKNOWN").observe(
+        time.perf_counter() - started
+    )
+
+
+@task_failure.connect
+def _on_task_failure(sender=None, **kwargs) -> None:
+    if sender is not None:
+        TASK_FAILURES.labels(task=sender.name).inc()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("metrics_started")
+    if not started:
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+    DB_STATEMENT_SECONDS.labels(operation=operation).observe(time.perf_counter() - started.pop())
+
+
+def instrument_engine(bind) -> None:
+    if not event.contains(bind, "before_cursor_execute", _before_cursor_execute):
+        event.listen(bind, "before_cursor_execute", _before_cursor_execute)
+        event.listen(bind, "after_cursor_execute", _after_cursor_execute)
+
+
+@worker_init.connect
+def _on_worker_init(**kwargs) -> None:
+    # Forked pool processes inherit the listeners.
+    instrument_engine(engine)
+
+    port = get_settings().METRICS_WORKER_PORT
+    if port:
+        start_http_server(port, registry=metrics_registry())
+        logger.info("Worker metrics exporter started", extra={"port": port})
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(pid: int | None = None, **kwargs) -> None:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,518 @@
+from __future__ import annotations
+
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import httpx
+from sqlalchemy import and_, exists, func, or_
+from sqlmodel import Session, select
+
+from app.domain.escrow_fsm import EscrowState
+from app.models.deal import Deal
+from app.models.deal_escrow import DealEscrow
+from app.models.ton_payout import TonPayout, TonPayoutKind, TonPayoutState
+from app.services.bot_notifications import notify_deal_refunded, notify_deal_released
+from app.services.ton.errors import TonConfigError
+from app.services.ton.transfers import (
+    MAX_BATCH_MESSAGES,
+    TonTransferError,
+    confirm_ton_transfer,
+    current_wallet_seqno,
+    submit_ton_transfer,
+)
+from app.services.ton.wallets import settlement_wallet_address
+from app.settings import get_settings
+from app.worker.celery_app import celery_app
+from shared.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_MAX_BACKOFF_SECONDS = 600
+# Key of the PostgreSQL advisory lock that serializes payout claims across worker runs.
+_PAYOUT_CLAIM_LOCK_ID = 0x70617974
+_ACTIVE_PAYOUT_STATES = (TonPayoutState.PENDING.value, TonPayoutState.SUBMITTED.value)
+# Failed chain lookups say nothing about a submitted transfer; it stays submitted and is checked again.
+_LOOKUP_ERRORS = (httpx.HTTPError, json.JSONDecodeError)
+
+
+def _ensure_aware_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _retry_backoff_seconds(attempts: int) -> int:
+    return min(30 * 2 ** (attempts - 1), _MAX_BACKOFF_SECONDS)
+
+
+def _sweep_funded_escrows(
+    *,
+    db: Session,
+    settings,
+    limit: int = 50,
+) -> int:
+    """Queue moves of funded escrow balances into the settlement wallet so payouts can be batched.
+
+    Sweeps leave through the payout queue like releases and refunds; an escrow only counts as
+    swept, and its payouts only leave the settlement wallet, once the sweep is confirmed on chain.
+    """
+    settlement_address = settlement_wallet_address(settings)
+    escrows = db.exec(
+        select(DealEscrow)
+        .where(DealEscrow.state == EscrowState.FUNDED.value)
+        .where(DealEscrow.swept_at.is_(None))
+        .where(DealEscrow.release_tx_hash.is_(None))
+        .where(DealEscrow.refund_tx_hash.is_(None))
+        .where(DealEscrow.subwallet_id != settings.TON_SETTLEMENT_SUBWALLET_ID)
+        # A queued payout already owns the subwallet's next seqno.
+        .where(~exists().where(TonPayout.escrow_id == DealEscrow.id))
+        .order_by(DealEscrow.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    queued = 0
+    for escrow in escrows:
+        # The escrow keeps the network fee so its own sweep transfer can pay for gas.
+        amount = (escrow.received_amount_ton or Decimal("0")) - settings.TON_REFUND_NETWORK_FEE
+        if amount <= 0:
+            continue
+        db.add(
+            TonPayout(
+                deal_id=escrow.deal_id,
+                escrow_id=escrow.id,
+                kind=TonPayoutKind.SWEEP.value,
+                to_address=settlement_address,
+                amount_ton=amount,
+            )
+        )
+        queued += 1
+
+    # One commit, so the row locks keep overlapping runs off these escrows until the rows exist.
+    db.commit()
+    return queued
+
+
+def _fail_permanently(payout: TonPayout, *, error: str) -> None:
+    payout.state = TonPayoutState.FAILED.value
+    payout.last_error = error
+    logger.error(
+        "TON payout failed",
+        extra={"payout_id": payout.id, "deal_id": payout.deal_id, "error": error},
+    )
+
+
+def _record_failure(
+    payout: TonPayout,
+    *,
+    error: str,
+    settings,
+    now: datetime,
+    seqno_consumed: bool = False,
+) -> None:
+    """Put a payout back in the queue.
+
+    The recorded seqno is kept unless a transaction already consumed it, so a retry re-signs
+    the same wallet action and cannot execute alongside an earlier attempt.
+    """
+    payout.attempts += 1
+    if seqno_consumed:
+        payout.seqno = None
+        payout.source_subwallet_id = None
+    if payout.attempts >= settings.TON_PAYOUT_MAX_ATTEMPTS:
+        _fail_permanently(payout, error=error)
+        return
+    payout.state = TonPayoutState.PENDING.value
+    payout.last_error = error
+    payout.next_attempt_at = now + timedelta(seconds=_retry_backoff_seconds(payout.attempts))
+
+
+def _mark_sent(payout: TonPayout, *, escrow: DealEscrow, tx_hash: str, now: datetime) -> None:
+    payout.state = TonPayoutState.SENT.value
+    payout.tx_hash = tx_hash
+    payout.sent_at = now
+    if payout.kind == TonPayoutKind.SWEEP.value:
+        escrow.sweep_tx_hash = tx_hash
+        escrow.swept_at = now
+    elif payout.kind == TonPayoutKind.RELEASE.value:
+        escrow.release_tx_hash = tx_hash
+        escrow.released_amount_ton = payout.amount_ton
+        escrow.released_at = now
+    else:
+        escrow.refund_tx_hash = tx_hash
+        escrow.refunded_amount_ton = payout.amount_ton
+        escrow.refunded_at = now
+
+
+def _notify_sent(db: Session, *, settings, payouts: list[TonPayout]) -> None:
+    for payout in payouts:
+        deal = db.get(Deal, payout.deal_id)
+        if deal is None:
+            continue
+        if payout.kind == TonPayoutKind.SWEEP.value:
+            continue
+        if payout.kind == TonPayoutKind.RELEASE.value:
+            notify_deal_released(
+                db=db,
+                settings=settings,
+                deal=deal,
+                released_amount_ton=payout.amount_ton,
+                tx_hash=payout.tx_hash,
+            )
+        else:
+            notify_deal_refunded(
+                db=db,
+                settings=settings,
+                deal=deal,
+                refunded_amount_ton=payout.amount_ton,
+                tx_hash=payout.tx_hash,
+                reason=payout.reason,
+            )
+
+
+def _payout_source(payout: TonPayout, *, escrow: DealEscrow, settings) -> int:
+    if payout.source_subwallet_id is not None:
+        return payout.source_subwallet_id
+    if payout.kind != TonPayoutKind.SWEEP.value and escrow.swept_at is not None:
+        return settings.TON_SETTLEMENT_SUBWALLET_ID
+    return escrow.subwallet_id
+
+
+def _lock_payout_claims(db: Session) -> None:
+    """Serialize payout claims until the claiming transaction ends.
+
+    Claims check which wallets other runs are using, so two of them must not interleave.
+    SQLite already serializes writers.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_advisory_xact_lock(_PAYOUT_CLAIM_LOCK_ID)))
+
+
+def _lease_free(now: datetime):
+    return or_(TonPayout.lease_until.is_(None), TonPayout.lease_until < now)
+
+
+def _claim_pending_payouts(
+    db: Session,
+    *,
+    settings,
+    now: datetime,
+    lease_until: datetime,
+    batch_size: int,
+) -> dict[int, list[TonPayout]]:
+    """Lease one group of due payouts for each source wallet that is free, keyed by wallet.
+
+    A wallet is busy while a transfer from it awaits confirmation or another run holds a lease
+    on payouts leaving it. The lease is committed with the chosen wallet, so later claims see it.
+    """
+    _lock_payout_claims(db)
+    payouts = db.exec(
+        select(TonPayout)
+        .where(TonPayout.state == TonPayoutState.PENDING.value)
+        .where(TonPayout.next_attempt_at <= now)
+        .where(_lease_free(now))
+        .order_by(TonPayout.id)
+        .limit(batch_size * 4)
+        .with_for_update()
+    ).all()
+    if not payouts:
+        db.commit()
+        return {}
+
+    escrow_ids = {payout.escrow_id for payout in payouts}
+    escrows = {
+        escrow.id: escrow
+        for escrow in db.exec(select(DealEscrow).where(DealEscrow.id.in_(escrow_ids))).all()
+    }
+    # Funds of these escrows are on their way to the settlement wallet.
+    sweeping = set(
+        db.exec(
+            select(TonPayout.escrow_id)
+            .where(TonPayout.escrow_id.in_(escrow_ids))
+            .where(TonPayout.kind == TonPayoutKind.SWEEP.value)
+            .where(TonPayout.state.in_(_ACTIVE_PAYOUT_STATES))
+        ).all()
+    )
+    busy = set(
+        db.exec(
+            select(TonPayout.source_subwallet_id).where(
+                or_(
+                    TonPayout.state == TonPayoutState.SUBMITTED.value,
+                    and_(
+                        TonPayout.state == TonPayoutState.PENDING.value,
+                        TonPayout.lease_until >= now,
+                    ),
+                )
+            )
+        ).all()
+    )
+
+    groups: dict[int, dict[int | None, list[TonPayout]]] = defaultdict(lambda: defaultdict(list))
+    for payout in payouts:
+        escrow = escrows.get(payout.escrow_id)
+        if escrow is None:
+            continue
+        if payout.kind != TonPayoutKind.SWEEP.value and payout.escrow_id in sweeping:
+            continue
+        source = _payout_source(payout, escrow=escrow, settings=settings)
+        if source not in busy:
+            groups[source][payout.seqno].append(payout)
+
+    claimed: dict[int, list[TonPayout]] = {}
+    for source, by_seqno in groups.items():
+        # Retries holding a seqno go first: nothing else can leave the wallet before them.
+        seqno = min(by_seqno, key=lambda value: (value is None, value or 0))
+        group = by_seqno[seqno][:batch_size]
+        for payout in group:
+            payout.source_subwallet_id = source
+            payout.lease_until = lease_until
+            db.add(payout)
+        claimed[source] = group
+    db.commit()
+    return claimed
+
+
+def _release_payout_leases(db: Session, group: list[TonPayout]) -> None:
+    for payout in group:
+        payout.lease_until = None
+        db.add(payout)
+    db.commit()
+
+
+def _submit_pending_payouts(
+    *,
+    db: Session,
+    settings,
+    submit_fn=submit_ton_transfer,
+    seqno_fn=current_wallet_seqno,
+    now: datetime | None = None,
+) -> int:
+    """Submit queued releases, refunds and sweeps without waiting for them to land.
+
+    Payouts of swept escrows leave the settlement wallet as one multi-message transfer of up
+    to ``TON_PAYOUT_BATCH_SIZE`` messages; the others leave their escrow subwallet. Each wallet
+    has at most one transfer in flight, and the seqno is stored before broadcasting so a retry
+    after an ambiguous failure reuses it.
+    """
+    now = now or datetime.now(timezone.utc)
+    batch_size = max(1, min(settings.TON_PAYOUT_BATCH_SIZE, MAX_BATCH_MESSAGES))
+    claimed = _claim_pending_payouts(
+        db,
+        settings=settings,
+        now=now,
+        lease_until=now + timedelta(seconds=settings.TON_PAYOUT_LEASE_SECONDS),
+        batch_size=batch_size,
+    )
+
+    submitted = 0
+    for source, group in claimed.items():
+        seqno = group[0].seqno
+        try:
+            current_seqno = seqno_fn(settings=settings, source_subwallet_id=source)
+            if seqno is not None and current_seqno != seqno:
+                for payout in group:
+                    _fail_permanently(
+                        payout,
+                        error=(
+                            f"Wallet seqno moved from {seqno} to {current_seqno} without a "
+                            "confirmed transfer; reconcile manually"
+                        ),
+                    )
+                _release_payout_leases(db, group)
+                continue
+            for payout in group:
+                payout.seqno = current_seqno
+                db.add(payout)
+            db.commit()
+
+            result = submit_fn(
+                settings=settings,
+                messages=[(payout.to_address, payout.amount_ton) for payout in group],
+                source_subwallet_id=source,
+                seqno=current_seqno,
+            )
+        except (TonTransferError, TonConfigError) as exc:
+            for payout in group:
+                _record_failure(payout, error=str(exc), settings=settings, now=now)
+        else:
+            expires_at = (
+                datetime.fromtimestamp(result.valid_until, tz=timezone.utc)
+                if result.valid_until is not None
+                else None
+            )
+            for payout in group:
+                payout.state = TonPayoutState.SUBMITTED.value
+                payout.source_address_raw = result.source_address_raw
+                payout.external_hash = result.external_hash
+                payout.expires_at = expires_at
+                payout.submitted_at = now
+            submitted += len(group)
+        _release_payout_leases(db, group)
+
+    return submitted
+
+
+def _handle_unconfirmed(
+    group: list[TonPayout],
+    *,
+    settings,
+    seqno_fn,
+    now: datetime,
+) -> None:
+    first = group[0]
+    submitted_at = _ensure_aware_utc(first.submitted_at or now)
+    timed_out = now - submitted_at > timedelta(seconds=settings.TON_PAYOUT_CONFIRM_TIMEOUT_SECONDS)
+    expired = first.expires_at is not None and now > _ensure_aware_utc(first.expires_at)
+    if not expired and not timed_out:
+        return
+
+    try:
+        current_seqno = seqno_fn(settings=settings, source_subwallet_id=first.source_subwallet_id)
+    except (TonTransferError, TonConfigError, *_LOOKUP_ERRORS) as exc:
+        logger.error(
+            "TON payout seqno check failed",
+            extra={"external_hash": first.external_hash, "error": str(exc)},
+        )
+        return
+    if current_seqno == first.seqno:
+        # Nothing executed with our seqno, so resubmitting it cannot pay twice.
+        for payout in group:
+            _record_failure(
+                payout,
+                error=f"Transfer {first.external_hash} expired unconfirmed",
+                settings=settings,
+                now=now,
+            )
+    elif timed_out:
+        for payout in group:
+            _fail_permanently(
+                payout,
+                error=(
+                    f"Wallet seqno advanced but transfer {first.external_hash} was not found; "
+                    "reconcile manually"
+                ),
+            )
+
+
+def _confirm_submitted_payouts(
+    *,
+    db: Session,
+    settings,
+    confirm_fn=confirm_ton_transfer,
+    seqno_fn=current_wallet_seqno,
+    now: datetime | None = None,
+) -> int:
+    """Confirm submitted payouts on chain, record their tx hash and announce them.
+
+    Each transfer's outcome is committed together with its notifications, so a later failure
+    cannot leave a payout sent but unannounced.
+    """
+    now = now or datetime.now(timezone.utc)
+
+    _lock_payout_claims(db)
+    payouts = db.exec(
+        select(TonPayout)
+        .where(TonPayout.state == TonPayoutState.SUBMITTED.value)
+        .where(_lease_free(now))
+        .order_by(TonPayout.id)
+        .with_for_update()
+    ).all()
+    # Leased as a whole, so every transfer is confirmed by one run with all of its messages.
+    lease_until = now + timedelta(seconds=settings.TON_PAYOUT_LEASE_SECONDS)
+    for payout in payouts:
+        payout.lease_until = lease_until
+        db.add(payout)
+    db.commit()
+
+    groups: dict[str, list[TonPayout]] = defaultdict(list)
+    for payout in payouts:
+        groups[payout.external_hash or ""].append(payout)
+
+    sent: list[TonPayout] = []
+    for external_hash, group in groups.items():
+        first = group[0]
+        messages = [(payout.to_address, payout.amount_ton) for payout in group]
+        try:
+            result = confirm_fn(
+                settings=settings,
+                source_address_raw=first.source_address_raw,
+                external_hash=external_hash,
+                messages=messages,
+            )
+        except TonTransferError as exc:
+            # The wallet ran the transaction but sent nothing; its seqno is spent.
+            for payout in group:
+                _record_failure(
+                    payout, error=str(exc), settings=settings, now=now, seqno_consumed=True
+                )
+        except TonConfigError as exc:
+            logger.error(
+                "TON payout confirmation misconfigured",
+                extra={"external_hash": external_hash, "error": str(exc)},
+            )
+        except _LOOKUP_ERRORS as exc:
+            logger.warning(
+                "TON payout confirmation lookup failed",
+                extra={"external_hash": external_hash, "error": str(exc)},
+            )
+        else:
+            if result is None:
+                _handle_unconfirmed(group, settings=settings, seqno_fn=seqno_fn, now=now)
+            else:
+                delivered: list[TonPayout] = []
+                for index, payout in enumerate(group):
+                    if index in result.delivered:
+                        escrow = db.get(DealEscrow, payout.escrow_id)
+                        _mark_sent(payout, escrow=escrow, tx_hash=result.tx_hash, now=now)
+                        db.add(escrow)
+                        delivered.append(payout)
+                    else:
+                        _record_failure(
+                            payout,
+                            error=f"Message was skipped by transfer {result.tx_hash}",
+                            settings=settings,
+                            now=now,
+                            seqno_consumed=True,
+                        )
+                _notify_sent(db, settings=settings, payouts=delivered)
+                sent.extend(delivered)
+        _release_payout_leases(db, group)
+
+    return len(sent)
+
+
+@celery_app.task(name="app.worker.ton_payouts.sweep_funded_escrows")
+def sweep_funded_escrows() -> int:
+    settings = get_settings()
+    if not settings.TON_ENABLED or settings.TON_PAYOUT_MODE != "batched":
+        return 0
+
+    with SessionLocal() as db:
+        try:
+            return _sweep_funded_escrows(db=db, settings=settings)
+        except TonConfigError as exc:
+            logger.error("Escrow sweep misconfigured", extra={"error": str(exc)})
+            return 0
+
+
+@celery_app.task(name="app.worker.ton_payouts.submit_pending_payouts")
+def submit_pending_payouts() -> int:
+    settings = get_settings()
+    if not settings.TON_ENABLED:
+        return 0
+
+    with SessionLocal() as db:
+        return _submit_pending_payouts(db=db, settings=settings)
+
+
+@celery_app.task(name="app.worker.ton_payouts.confirm_submitted_payouts")
+def confirm_submitted_payouts() -> int:
+    settings = get_settings()
+    if not settings.TON_ENABLED:
+        return 0
+
+    with SessionLocal() as db:
+        return _confirm_submitted_payouts(db=db, settings=settings)
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Protocol
+
+import httpx
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from app.models.deal_escrow import DealEscrow
+from app.services.ton.addressing import try_to_raw_address
+from app.services.ton.chain_scan import TonCenterAdapter
+from app.services.ton.errors import TonConfigError
+from app.settings import get_settings
+from app.worker.deal_posting import schedule_deal_post
+from app.worker.ton_watch import WATCHED_ESCROW_STATES, scan_escrow
+from shared.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Transient TonCenter and database failures; the stream logs them and keeps consuming.
+_CHAIN_ERRORS = (TonConfigError, httpx.HTTPError)
+_PROCESS_ERRORS = (*_CHAIN_ERRORS, SQLAlchemyError)
+
+
+class TransactionStream(Protocol):
+    """An endless feed of incoming transfers, each carrying at least ``destination_raw``."""
+
+    def __iter__(self) -> Iterator[dict]: ...
+
+    def stop(self) -> None: ...
+
+
+class MasterchainBlockStream:
+    """Follows the masterchain block by block and yields the incoming transfers of each block."""
+
+    def __init__(
+        self,
+        adapter: TonCenterAdapter,
+        *,
+        poll_seconds: float,
+        start_seqno: int | None = None,
+    ) -> None:
+        self._adapter = adapter
+        self._poll_seconds = poll_seconds
+        self._next_seqno = start_seqno
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def __iter__(self) -> Iterator[dict]:
+        while not self._stopped.is_set():
+            try:
+                head = self._adapter.get_masterchain_seqno()
+            except _CHAIN_ERRORS as exc:
+                logger.error("Masterchain head lookup failed", extra={"error": str(exc)})
+                head = None
+
+            if head is not None and self._next_seqno is None:
+                self._next_seqno = head
+            while head is not None and self._next_seqno <= head and not self._stopped.is_set():
+                try:
+                    yield from self._adapter.iter_block_incoming_txs(self._next_seqno)
+                except _CHAIN_ERRORS as exc:
+                    logger.error(
+                        "Masterchain block scan failed",
+                        extra={"mc_seqno": self._next_seqno, "error": str(exc)},
+                    )
+                    break
+                self._next_seqno += 1
+
+            self._stopped.wait(self._poll_seconds)
+
+
+class InMemoryTransactionStream:
+    """Offline stream fed by ``push``; used by tests and local runs without TonCenter."""
+
+    def __init__(self, txs: Iterable[dict] = ()) -> None:
+        self._txs: list[dict] = list(txs)
+        self._condition = threading.Condition()
+        self._stopped = False
+
+    def push(self, tx: dict) -> None:
+        with self._condition:
+            self._txs.append(tx)
+            self._condition.notify_all()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def __iter__(self) -> Iterator[dict]:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._txs or self._stopped)
+                if not self._txs:
+                    return
+                tx = self._txs.pop(0)
+            yield tx
+
+
+class WatchedAddresses:
+    """In-memory map of watched deposit addresses to escrow ids.
+
+    The map is rebuilt whenever a cheap fingerprint of the watched escrows changes,
+    checked at most once per ``refresh_seconds``.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        refresh_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._session_factory = session_factory
+        self._refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._checked_at: float | None = None
+        self._fingerprint: tuple | None = None
+        self._escrow_ids: dict[str, int] = {}
+
+    def lookup(self, destination_raw: str | None) -> int | None:
+        if destination_raw is None:
+            return None
+        self.refresh()
+        return self._escrow_ids.get(destination_raw)
+
+    def refresh(self, *, force: bool = False) -> None:
+        now = self._clock()
+        if (
+            not force
+            and self._checked_at is not None
+            and now - self._checked_at < self._refresh_seconds
+        ):
+            return
+        self._checked_at = now
+
+        with self._session_factory() as db:
+            watched = DealEscrow.state.in_(WATCHED_ESCROW_STATES)
+            fingerprint = tuple(
+                db.exec(
+                    select(
+                        func.count(DealEscrow.id),
+                        func.max(DealEscrow.id),
+                        func.max(DealEscrow.updated_at),
+                    ).where(watched)
+                ).one()
+            )
+            if not force and fingerprint == self._fingerprint:
+                return
+            rows = db.exec(
+                select(DealEscrow.id, DealEscrow.deposit_address_raw, DealEscrow.deposit_address).where(
+                    watched
+                )
+            ).all()
+
+        escrow_ids: dict[str, int] = {}
+        for escrow_id, address_raw, address in rows:
+            raw = address_raw or try_to_raw_address(address)
+            if raw:
+                escrow_ids[raw] = escrow_id
+        self._escrow_ids = escrow_ids
+        self._fingerprint = fingerprint
+
+    def __len__(self) -> int:
+        return len(self._escrow_ids)
+
+
+def consume_deposit_stream(
+    stream: TransactionStream,
+    *,
+    watched: WatchedAddresses,
+    process: Callable[[int], object],
+) -> int:
+    """Trigger escrow processing for each streamed transfer to a watched address.
+
+    A failed lookup or escrow scan is logged and skipped; the watcher's periodic scan picks
+    the escrow up again.
+    """
+    triggered = 0
+    for tx in stream:
+        escrow_id = None
+        try:
+            escrow_id = watched.lookup(tx.get("destination_raw"))
+            if escrow_id is None:
+                continue
+            logger.info(
+                "Deposit seen on stream",
+                extra={"escrow_id": escrow_id, "tx_hash": tx.get("hash")},
+            )
+            process(escrow_id)
+        except _PROCESS_ERRORS as exc:
+            logger.error(
+                "Streamed deposit processing failed",
+                extra={"escrow_id": escrow_id, "tx_hash": tx.get("hash"), "error": str(exc)},
+            )
+            continue
+        triggered += 1
+    return triggered
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    adapter = TonCenterAdapter(settings)
+    stream = MasterchainBlockStream(adapter, poll_seconds=settings.TON_STREAM_POLL_SECONDS)
+    watched = WatchedAddresses(SessionLocal, refresh_seconds=settings.TON_STREAM_WATCH_REFRESH_SECONDS)
+
+    consume_deposit_stream(
+        stream,
+        watched=watched,
+        process=lambda escrow_id: scan_escrow(
+            escrow_id,
+            adapter=adapter,
+            settings=settings,
+            on_funded=schedule_deal_post,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
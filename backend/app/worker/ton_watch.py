@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from typing import Callable, Iterable
 
+import httpx
+from sqlalchemy import or_
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 
@@ -25,15 +29,37 @@ from app.services.deal_fsm import (
     apply_transition,
 )
 from app.services.ton.addressing import to_raw_address
-from app.services.ton.chain_scan import TonCenterAdapter, TonChainAdapter
+from app.services.ton.chain_scan import (
+    TonCenterAdapter,
+    TonChainAdapter,
+    confirmations_between,
+)
 from app.services.ton.errors import TonConfigError
 from app.services.ton.payouts import PayoutError, ensure_refund
 from app.settings import get_settings
 from app.worker.celery_app import celery_app
+from app.worker.deal_posting import schedule_deal_post
+from app.worker.metrics import record_items
 from shared.db.session import SessionLocal
 
 logger = logging.getLogger(__name__)
 
+WATCHED_ESCROW_STATES = (
+    EscrowState.AWAITING_DEPOSIT.value,
+    EscrowState.DEPOSIT_DETECTED.value,
+)
+
+_ESCROW_WATCH_ERRORS = (
+    IntegrityError,
+    TonConfigError,
+    # TonCenter transport failures are transient: the escrow is released and rescanned.
+    httpx.HTTPError,
+    EscrowTransitionError,
+    DealTransitionError,
+    PayoutError,
+    ValueError,
+)
+
 
 def _ensure_aware_utc(value: datetime) -> datetime:
     if value.tzinfo is None:
@@ -77,60 +103,34 @@ def _effective_start_at(db: Session, deal: Deal) -> datetime | None:
     return _latest_negotiated_start_at(db, deal.id)
 
 
-def _known_tx_keys(db: Session, escrow_id: int) -> set[str]:
-    events = db.exec(
-        select(EscrowEvent)
-        .where(EscrowEvent.escrow_id == escrow_id)
-        .where(EscrowEvent.event_type == "tx_seen")
-    ).all()
-    keys: set[str] = set()
-    for event in events:
-        payload = event.payload or {}
-        if not isinstance(payload, dict):
-            continue
-        tx_hash = payload.get("tx_hash")
-        if tx_hash:
-            keys.add(f"h:{tx_hash}")
-        lt = payload.get("lt")
-        if lt is not None:
-            try:
-                keys.add(f"l:{int(lt)}")
-            except (TypeError, ValueError):
-                continue
-    return keys
-
-
-def _tx_dedup_keys(tx: dict) -> set[str]:
-    keys: set[str] = set()
-    tx_hash = tx.get("hash")
-    if tx_hash:
-        keys.add(f"h:{tx_hash}")
-    lt = tx.get("lt")
-    if lt is not None:
-        try:
-            keys.add(f"l:{int(lt)}")
-        except (TypeError, ValueError):
-            pass
-    return keys
+def _record_tx_seen(db: Session, *, escrow: DealEscrow, tx_hash: str, payload: dict) -> bool:
+    """Insert a tx_seen event unless this escrow already recorded the transaction.
 
+    Deduplication is left to the unique (escrow_id, tx_hash) index, so the check costs
+    one statement regardless of how much history the escrow has.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Unsupported database dialect for tx dedup: {dialect}")
 
-def _last_seen_lt(db: Session, escrow_id: int) -> str | None:
-    events = db.exec(
-        select(EscrowEvent)
-        .where(EscrowEvent.escrow_id == escrow_id)
-        .where(EscrowEvent.event_type == "tx_seen")
-    ).all()
-    lts: list[int] = []
-    for event in events:
-        payload = event.payload or {}
-        if isinstance(payload, dict) and payload.get("lt") is not None:
-            try:
-                lts.append(int(payload["lt"]))
-            except (TypeError, ValueError):
-                continue
-    if not lts:
-        return None
-    return str(max(lts))
+    statement = (
+        insert(EscrowEvent.__table__)
+        .values(
+            escrow_id=escrow.id,
+            actor_user_id=None,
+            from_state=None,
+            to_state=escrow.state,
+            event_type="tx_seen",
+            payload=payload,
+            tx_hash=tx_hash,
+        )
+        .on_conflict_do_nothing()
+    )
+    return db.execute(statement).rowcount == 1
 
 
 def _timeout_close(
@@ -184,6 +184,7 @@ def _timeout_close(
             escrow=escrow,
             advertiser=advertiser,
             settings=settings,
+            reason="funding_timeout",
         )
     else:
         escrow.refunded_amount_ton = Decimal("0.000000000")
@@ -193,6 +194,18 @@ def _timeout_close(
     return True
 
 
+def _masterchain_height_once(adapter: TonChainAdapter) -> Callable[[], int | None]:
+    """Return a getter that asks for the masterchain height at most once per scan cycle."""
+    cached: list[int | None] = []
+
+    def height() -> int | None:
+        if not cached:
+            cached.append(adapter.get_masterchain_seqno())
+        return cached[0]
+
+    return height
+
+
 def _required_worker_settings(settings) -> list[str]:
     missing: list[str] = []
     if not settings.TONCENTER_API:
@@ -208,14 +221,19 @@ def _process_escrow(
     escrow: DealEscrow,
     adapter: TonChainAdapter,
     settings,
-) -> None:
+    incoming_txs: Iterable[dict] | None = None,
+    masterchain_height: Callable[[], int | None] | None = None,
+) -> Deal | None:
+    """Advance one escrow from chain state; returns the deal when this call funded it.
+
+    ``incoming_txs`` carries transactions already fetched by a batched scan; when it is
+    None the adapter is asked for this escrow's address directly. ``masterchain_height``
+    shares one masterchain lookup across a scan cycle.
+    """
     if escrow.expected_amount_ton is None:
         return
 
-    if escrow.state not in {
-        EscrowState.AWAITING_DEPOSIT.value,
-        EscrowState.DEPOSIT_DETECTED.value,
-    }:
+    if escrow.state not in WATCHED_ESCROW_STATES:
         return
 
     deal = db.exec(select(Deal).where(Deal.id == escrow.deal_id)).first()
@@ -230,59 +248,49 @@ def _process_escrow(
     if not watch_address:
         return
 
-    known_keys = _known_tx_keys(db, escrow.id)
-    since_lt = _last_seen_lt(db, escrow.id)
     new_txs: list[dict] = []
     updated = False
 
-    while True:
-        tx = adapter.find_incoming_tx(
-            watch_address,
-            Decimal("0"),
-            since_lt,
-        )
-        if tx is None:
-            break
-
-        tx_keys = _tx_dedup_keys(tx)
-        since_lt = str(tx.get("lt")) if tx.get("lt") is not None else since_lt
-        if tx_keys and tx_keys.isdisjoint(known_keys):
-            new_txs.append(tx)
-            known_keys.update(tx_keys)
+    if incoming_txs is None:
+        since_lt = None if escrow.last_scanned_lt is None else str(escrow.last_scanned_lt)
+        incoming_txs = adapter.iter_incoming_txs(watch_address, Decimal("0"), since_lt)
 
-        if since_lt is None:
-            break
+    for tx in incoming_txs:
+        lt = tx.get("lt")
+        if lt is not None and (escrow.last_scanned_lt is None or int(lt) > escrow.last_scanned_lt):
+            escrow.last_scanned_lt = int(lt)
+            db.add(escrow)
 
-    for tx in new_txs:
         tx_hash = str(tx.get("hash")) if tx.get("hash") is not None else None
         amount_ton = tx.get("amount_ton")
-        if amount_ton is None:
+        if tx_hash is None or amount_ton is None:
+            continue
+
+        inserted = _record_tx_seen(
+            db,
+            escrow=escrow,
+            tx_hash=tx_hash,
+            payload={
+                "tx_hash": tx_hash,
+                "amount_ton": str(amount_ton),
+                "lt": lt,
+                "utime": tx.get("utime"),
+                "mc_block_seqno": tx.get("mc_block_seqno"),
+            },
+        )
+        if not inserted:
             continue
 
         escrow.received_amount_ton = (
             escrow.received_amount_ton or Decimal("0")
         ) + Decimal(amount_ton)
-        if tx_hash:
-            escrow.deposit_tx_hash = tx_hash
+        escrow.deposit_tx_hash = tx_hash
+        mc_block_seqno = tx.get("mc_block_seqno")
+        escrow.deposit_mc_block_seqno = None if mc_block_seqno is None else int(mc_block_seqno)
+        escrow.scan_activity_at = datetime.now(timezone.utc)
+        new_txs.append(tx)
         updated = True
 
-        db.add(
-            EscrowEvent(
-                escrow_id=escrow.id,
-                actor_user_id=None,
-                from_state=None,
-                to_state=escrow.state,
-                event_type="tx_seen",
-                payload={
-                    "tx_hash": tx_hash,
-                    "amount_ton": str(amount_ton),
-                    "lt": tx.get("lt"),
-                    "utime": tx.get("utime"),
-                    "mc_block_seqno": tx.get("mc_block_seqno"),
-                },
-            )
-        )
-
     if new_txs and escrow.state == EscrowState.AWAITING_DEPOSIT.value:
         apply_escrow_transition(
             db,
@@ -294,7 +302,15 @@ def _process_escrow(
         )
 
     if escrow.deposit_tx_hash:
-        confirmations = adapter.get_confirmations(escrow.deposit_tx_hash)
+        if escrow.deposit_mc_block_seqno is not None:
+            height = (masterchain_height or _masterchain_height_once(adapter))()
+            confirmations = (
+                escrow.deposit_confirmations
+                if height is None
+                else confirmations_between(escrow.deposit_mc_block_seqno, height)
+            )
+        else:
+            confirmations = adapter.get_confirmations(escrow.deposit_tx_hash)
         if confirmations != escrow.deposit_confirmations:
             escrow.deposit_confirmations = confirmations
             updated = True
@@ -330,11 +346,17 @@ def _process_escrow(
                 payload={"escrow_id": escrow.id},
             )
             notify_deal_funded(db=db, settings=settings, deal=deal)
+            return deal
         return
 
     if deal.state == DealState.CREATIVE_APPROVED.value:
         timed_out = _timeout_close(db=db, escrow=escrow, deal=deal, settings=settings)
-        if timed_out and deal.state == DealState.REFUNDED.value:
+        # Queued refunds are announced by the payout worker once confirmed on chain.
+        if (
+            timed_out
+            and deal.state == DealState.REFUNDED.value
+            and escrow.refunded_at is not None
+        ):
             notify_deal_refunded(
                 db=db,
                 settings=settings,
@@ -345,6 +367,272 @@ def _process_escrow(
             )
 
 
+def _prefetch_incoming_txs(
+    *,
+    escrows: list[DealEscrow],
+    adapter: TonCenterAdapter,
+) -> dict[int, list[dict]]:
+    """Fetch new deposits for all watched escrows with batched multi-account requests.
+
+    Escrows missing from the result are scanned individually by ``_process_escrow``.
+    """
+    since_lts: dict[str, str | None] = {}
+    escrow_ids_by_address: dict[str, list[int]] = {}
+    for escrow in escrows:
+        if escrow.expected_amount_ton is None:
+            continue
+        watch_address = escrow.deposit_address_raw or escrow.deposit_address
+        if not watch_address:
+            continue
+        since_lts[watch_address] = (
+            None if escrow.last_scanned_lt is None else str(escrow.last_scanned_lt)
+        )
+        escrow_ids_by_address.setdefault(watch_address, []).append(escrow.id)
+
+    if not since_lts:
+        return {}
+    try:
+        grouped = adapter.find_incoming_txs_batch(since_lts)
+    except (TonConfigError, httpx.HTTPError) as exc:
+        logger.error("Batched escrow scan failed", extra={"error": str(exc)})
+        return {}
+
+    prefetched: dict[int, list[dict]] = {}
+    for address, txs in grouped.items():
+        for escrow_id in escrow_ids_by_address.get(address, ()):
+            prefetched[escrow_id] = txs
+    return prefetched
+
+
+def scan_escrow(
+    escrow_id: int,
+    *,
+    adapter: TonChainAdapter,
+    settings,
+    session_factory: Callable[[], Session] = SessionLocal,
+    on_funded: Callable[[int, datetime | None], None] | None = None,
+) -> bool:
+    """Process a single escrow right away; returns False when it failed and was rolled back.
+
+    ``on_funded`` gets the id and start time of a deal this call funded, once committed.
+    """
+    with session_factory() as db:
+        # Waits for a watcher run that is processing the same escrow instead of racing it.
+        escrow = db.exec(
+            select(DealEscrow).where(DealEscrow.id == escrow_id).with_for_update()
+        ).first()
+        if escrow is None:
+            return False
+        try:
+            funded = _process_escrow(db=db, escrow=escrow, adapter=adapter, settings=settings)
+        except _ESCROW_WATCH_ERRORS as exc:
+            logger.error(
+                "Escrow watch failed",
+                extra={"escrow_id": escrow_id, "error": str(exc)},
+            )
+            db.rollback()
+            return False
+        funded_deal = None if funded is None else (funded.id, funded.scheduled_at)
+        escrow.next_scan_at = _next_scan_at(escrow, now=datetime.now(timezone.utc), settings=settings)
+        db.add(escrow)
+        db.commit()
+    if funded_deal is not None and on_funded is not None:
+        on_funded(*funded_deal)
+    return True
+
+
+def _next_scan_at(escrow: DealEscrow, *, now: datetime, settings) -> datetime | None:
+    """Scan every few seconds around activity, backing off toward the ceiling while idle.
+
+    The interval is half the time since the last activity, so an idle escrow's scans
+    spread out geometrically; a deposit awaiting confirmations stays on the fast interval.
+    """
+    if escrow.state not in WATCHED_ESCROW_STATES:
+        return None
+    floor = settings.TON_SCAN_MIN_INTERVAL_SECONDS
+    if escrow.state == EscrowState.DEPOSIT_DETECTED.value:
+        return now + timedelta(seconds=floor)
+    active_at = escrow.scan_activity_at or escrow.created_at or now
+    idle_seconds = max(0.0, (now - _ensure_aware_utc(active_at)).total_seconds())
+    interval = min(settings.TON_SCAN_MAX_INTERVAL_SECONDS, max(floor, idle_seconds / 2))
+    return now + timedelta(seconds=interval)
+
+
+def _claim_due_escrows(
+    db: Session,
+    *,
+    run_started_at: datetime,
+    lease_until: datetime,
+    limit: int,
+) -> list[DealEscrow]:
+    """Lease up to ``limit`` due watched escrows that no run holds and this run has not scanned.
+
+    ``FOR UPDATE SKIP LOCKED`` lets concurrent runs claim disjoint batches without waiting
+    on each other; once the claim commits, the lease keeps other runs away.
+    """
+    escrows = db.exec(
+        select(DealEscrow)
+        .where(DealEscrow.state.in_(WATCHED_ESCROW_STATES))
+        .where(
+            or_(
+                DealEscrow.next_scan_at.is_(None),
+                DealEscrow.next_scan_at <= run_started_at,
+            )
+        )
+        .where(
+            or_(
+                DealEscrow.scan_lease_until.is_(None),
+                DealEscrow.scan_lease_until < run_started_at,
+            )
+        )
+        .order_by(DealEscrow.next_scan_at.asc().nulls_first(), DealEscrow.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    for escrow in escrows:
+        escrow.scan_lease_until = lease_until
+        db.add(escrow)
+    return list(escrows)
+
+
+def _release_lease(
+    db: Session,
+    escrow: DealEscrow,
+    *,
+    released_at: datetime,
+    now: datetime,
+    settings,
+) -> None:
+    # Releasing to the run start keeps the escrow out of this run's later claims.
+    escrow.scan_lease_until = released_at
+    escrow.next_scan_at = _next_scan_at(escrow, now=now, settings=settings)
+    db.add(escrow)
+    db.commit()
+
+
+def _scan_claimed_escrow(
+    escrow_id: int,
+    *,
+    lease_until: datetime,
+    released_at: datetime,
+    adapter: TonChainAdapter,
+    settings,
+    session_factory: Callable[[], Session],
+    incoming_txs: Iterable[dict] | None,
+    masterchain_height: Callable[[], int | None],
+    clock: Callable[[], datetime],
+    on_funded: Callable[[int, datetime | None], None] | None = None,
+) -> bool:
+    with session_factory() as db:
+        escrow = db.exec(
+            select(DealEscrow).where(DealEscrow.id == escrow_id).with_for_update()
+        ).first()
+        if (
+            escrow is None
+            or escrow.scan_lease_until is None
+            or _ensure_aware_utc(escrow.scan_lease_until) != lease_until
+        ):
+            # The lease ran out mid-run and another run has taken the escrow over.
+            return False
+        try:
+            funded = _process_escrow(
+                db=db,
+                escrow=escrow,
+                adapter=adapter,
+                settings=settings,
+                incoming_txs=incoming_txs,
+                masterchain_height=masterchain_height,
+            )
+        except _ESCROW_WATCH_ERRORS as exc:
+            logger.error(
+                "Escrow watch failed",
+                extra={"escrow_id": escrow_id, "error": str(exc)},
+            )
+            db.rollback()
+            _release_lease(
+                db,
+                db.get(DealEscrow, escrow_id),
+                released_at=released_at,
+                now=clock(),
+                settings=settings,
+            )
+            return False
+        funded_deal = None if funded is None else (funded.id, funded.scheduled_at)
+        _release_lease(db, escrow, released_at=released_at, now=clock(), settings=settings)
+    if funded_deal is not None and on_funded is not None:
+        on_funded(*funded_deal)
+    return True
+
+
+def _scan_due_escrows(
+    *,
+    adapter: TonCenterAdapter,
+    settings,
+    session_factory: Callable[[], Session] = SessionLocal,
+    clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    spawn_helper: Callable[[], None] | None = None,
+    on_funded: Callable[[int, datetime | None], None] | None = None,
+) -> int:
+    """Claim and process due escrows batch by batch until this run finds none left.
+
+    Each claimed escrow is processed in its own session, ``TON_SCAN_PROCESS_CONCURRENCY`` at
+    a time. A full batch means more escrows are waiting, so ``spawn_helper`` is called once to
+    start another run that claims alongside this one on an idle worker. ``on_funded`` is
+    passed on to each escrow scan.
+    """
+    run_started_at = clock()
+    batch_size = max(1, settings.TON_SCAN_CLAIM_BATCH_SIZE)
+    processed = 0
+    spawned = False
+
+    while True:
+        lease_until = clock() + timedelta(seconds=settings.TON_SCAN_LEASE_SECONDS)
+        with session_factory() as db:
+            escrows = _claim_due_escrows(
+                db,
+                run_started_at=run_started_at,
+                lease_until=lease_until,
+                limit=batch_size,
+            )
+            # Keep the loaded rows usable after commit without reloading them one by one.
+            db.flush()
+            db.expunge_all()
+            db.commit()
+        if not escrows:
+            return processed
+
+        if spawn_helper is not None and not spawned and len(escrows) == batch_size:
+            spawn_helper()
+            spawned = True
+
+        prefetched = _prefetch_incoming_txs(escrows=escrows, adapter=adapter)
+        masterchain_height = _masterchain_height_once(adapter)
+
+        def scan(escrow_id: int) -> bool:
+            return _scan_claimed_escrow(
+                escrow_id,
+                lease_until=lease_until,
+                released_at=run_started_at,
+                adapter=adapter,
+                settings=settings,
+                session_factory=session_factory,
+                incoming_txs=prefetched.get(escrow_id),
+                masterchain_height=masterchain_height,
+                clock=clock,
+                on_funded=on_funded,
+            )
+
+        escrow_ids = [escrow.id for escrow in escrows]
+        workers = max(1, min(settings.TON_SCAN_PROCESS_CONCURRENCY, len(escrow_ids)))
+        if workers == 1:
+            results = [scan(escrow_id) for escrow_id in escrow_ids]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(scan, escrow_ids))
+        processed += sum(results)
+        record_items("ton_watch", processed=sum(results), failed=len(results) - sum(results))
+
+
 @celery_app.task(name="app.worker.ton_watch.scan_escrows")
 def scan_escrows() -> int:
     settings = get_settings()
@@ -359,42 +647,9 @@ def scan_escrows() -> int:
         )
         return 0
 
-    adapter = TonCenterAdapter(settings)
-    processed = 0
-
-    with SessionLocal() as db:
-        escrows = db.exec(
-            select(DealEscrow).where(
-                DealEscrow.state.in_(
-                    [
-                        EscrowState.AWAITING_DEPOSIT.value,
-                        EscrowState.DEPOSIT_DETECTED.value,
-                    ]
-                )
-            )
-        ).all()
-
-        for escrow in escrows:
-            try:
-                _process_escrow(
-                    db=db, escrow=escrow, adapter=adapter, settings=settings
-                )
-            except (
-                IntegrityError,
-                TonConfigError,
-                EscrowTransitionError,
-                DealTransitionError,
-                PayoutError,
-                ValueError,
-            ) as exc:
-                logger.error(
-                    "Escrow watch failed",
-                    extra={"escrow_id": escrow.id, "error": str(exc)},
-                )
-                db.rollback()
-                continue
-            else:
-                db.commit()
-                processed += 1
-
-    return processed
+    return _scan_due_escrows(
+        adapter=TonCenterAdapter(settings),
+        settings=settings,
+        spawn_helper=scan_escrows.delay,
+        on_funded=schedule_deal_post,
+    )
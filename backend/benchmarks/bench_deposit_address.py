@@ -0,0 +1,63 @@
+"""Per-call cost of deriving a deal deposit address.
+
+Compares a full mnemonic derivation per call (the previous behaviour) with the cached
+hot-wallet keypair used by ``resolve_deal_deposit_address``. Runs offline.
+
+    cd backend && python -m benchmarks.bench_deposit_address
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from tonutils.wallet import WalletV5R1
+
+from app.services.ton import wallets
+from app.services.ton.wallets import resolve_deal_deposit_address, subwallet_id_from_deal_id
+from app.settings import Settings
+
+# Throwaway mnemonic; the benchmark never touches the network.
+_MNEMONIC = " ".join(["abandon"] * 23 + ["art"])
+
+
+def _per_call_derivation(settings: Settings, deal_id: int) -> str:
+    client = wallets._toncenter_client(settings)
+    wallet, _, _, _ = WalletV5R1.from_mnemonic(client, _MNEMONIC, subwallet_id_from_deal_id(deal_id))
+    return wallet.address.to_str(is_user_friendly=False)
+
+
+def _cached_derivation(settings: Settings, deal_id: int) -> str:
+    return resolve_deal_deposit_address(deal_id=deal_id, settings=settings).raw
+
+
+def _time_per_call(func, settings: Settings, iterations: int) -> float:
+    started = time.perf_counter()
+    for deal_id in range(1, iterations + 1):
+        func(settings, deal_id)
+    return (time.perf_counter() - started) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    settings = Settings(
+        _env_file=None,
+        TON_ENABLED=True,
+        TON_NETWORK="testnet",
+        TON_HOT_WALLET_MNEMONIC=_MNEMONIC,
+        TONCENTER_API="https://testnet.toncenter.com/api/v3/jsonRPC",
+    )
+    before = _time_per_call(_per_call_derivation, settings, args.iterations)
+    _cached_derivation(settings, 0)
+    after = _time_per_call(_cached_derivation, settings, args.iterations)
+
+    print(f"per-call derivation: {before * 1000:.3f} ms/call")
+    print(f"cached keypair:      {after * 1000:.3f} ms/call")
+    print(f"speedup:             {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Local stand-ins for TonCenter and the Telegram Bot API, used by load tests."""
@@ -0,0 +1,194 @@
+"""In-memory Telegram Bot API stand-in.
+
+Serves ``sendMessage``, ``sendPhoto``, ``sendVideo``, ``getChatMember``, ``getFile``,
+``getUpdates`` and file downloads, plus no-op answers for the housekeeping methods the bot
+calls on start-up. Sends are throttled per chat on top of the global per-token limit, and
+throttled or failing calls answer in Telegram's error envelope so the real retry paths run.
+
+Control routes under ``/_fake`` queue updates for ``getUpdates`` and report request stats.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.services.rate_limit import InMemoryTokenBucket
+from benchmarks.fakes.faults import FaultProfile, FaultStats, install_faults
+
+_SEND_METHODS = {"sendMessage": "text", "sendPhoto": "photo", "sendVideo": "video"}
+_NOOP_METHODS = {"setWebhook", "deleteWebhook", "answerCallbackQuery", "deleteMessage"}
+# Long polls return early in a load test; nobody wants a 30 s wait per empty poll.
+_MAX_POLL_SECONDS = 5.0
+
+
+def _ok(result: object) -> JSONResponse:
+    return JSONResponse({"ok": True, "result": result})
+
+
+def _telegram_error(status_code: int, description: str, *, retry_after: float | None = None) -> JSONResponse:
+    body: dict[str, object] = {"ok": False, "error_code": status_code, "description": description}
+    if retry_after is not None:
+        body["parameters"] = {"retry_after": max(1, round(retry_after))}
+    return JSONResponse(body, status_code=status_code)
+
+
+def _retry_after_response(wait: float) -> JSONResponse:
+    seconds = max(1, round(wait))
+    return _telegram_error(429, f"Too Many Requests: retry after {seconds}", retry_after=seconds)
+
+
+@dataclass
+class FakeBotState:
+    # Sends allowed per second into one chat (Telegram allows about one).
+    chat_rps: float | None = 1.0
+    member_status: str = "administrator"
+    file_size: int = 64 * 1024
+    sent: Counter[str] = field(default_factory=Counter)
+    updates: list[dict] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self._message_ids: dict[str, itertools.count] = {}
+        self._update_ids = itertools.count(1)
+        self._chat_limiter = InMemoryTokenBucket(clock=time.monotonic)
+        self._updates_ready = asyncio.Event()
+
+    def chat_wait(self, chat_id: str) -> float:
+        if not self.chat_rps:
+            return 0.0
+        return self._chat_limiter.try_acquire(f"chat:{chat_id}", rate=self.chat_rps, capacity=self.chat_rps)
+
+    def next_message_id(self, chat_id: str) -> int:
+        return next(self._message_ids.setdefault(chat_id, itertools.count(1)))
+
+    def push_update(self, update: dict) -> dict:
+        update = {**update, "update_id": next(self._update_ids)}
+        self.updates.append(update)
+        self._updates_ready.set()
+        return update
+
+    async def poll_updates(self, *, offset: int | None, timeout: float) -> list[dict]:
+        if offset is not None:
+            # Like Telegram, asking for an offset confirms every earlier update.
+            self.updates = [update for update in self.updates if update["update_id"] >= offset]
+        if not self.updates and timeout > 0:
+            self._updates_ready.clear()
+            try:
+                await asyncio.wait_for(self._updates_ready.wait(), timeout=min(timeout, _MAX_POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+        return list(self.updates)
+
+
+async def _call_params(request: Request) -> dict:
+    params: dict[str, object] = dict(request.query_params)
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        params.update(await request.json())
+    elif content_type.startswith(("multipart/form-data", "application/x-www-form-urlencoded")):
+        form = await request.form()
+        for key, value in form.items():
+            params[key] = value if isinstance(value, str) else f"upload:{getattr(value, 'filename', key)}"
+    return params
+
+
+def _media_result(kind: str, chat_id: str) -> object:
+    file_id = f"fake-{kind}-{chat_id}-{time.monotonic_ns()}"
+    if kind == "photo":
+        return [{"file_id": file_id, "file_unique_id": file_id, "width": 1280, "height": 720}]
+    return {"file_id": file_id, "file_unique_id": file_id, "duration": 10}
+
+
+def create_app(state: FakeBotState, profile: FaultProfile | None = None) -> FastAPI:
+    app = FastAPI(title="Fake Telegram Bot API")
+    stats = FaultStats()
+
+    install_faults(
+        app,
+        profile or FaultProfile(),
+        client_key=lambda request: request.url.path.split("/", 2)[1],
+        rate_limited_response=_retry_after_response,
+        error_response=lambda: _telegram_error(502, "Bad Gateway"),
+        stats=stats,
+    )
+
+    @app.api_route("/bot{token}/{method}", methods=["GET", "POST"])
+    async def call(token: str, method: str, request: Request):
+        params = await _call_params(request)
+
+        if method in _SEND_METHODS:
+            chat_id = str(params.get("chat_id", ""))
+            if not chat_id:
+                return _telegram_error(400, "Bad Request: chat_id is empty")
+            wait = state.chat_wait(chat_id)
+            if wait > 0:
+                stats.rate_limited += 1
+                return _retry_after_response(wait)
+            state.sent[method] += 1
+            kind = _SEND_METHODS[method]
+            message: dict[str, object] = {
+                "message_id": state.next_message_id(chat_id),
+                "date": int(time.time()),
+                "chat": {"id": int(chat_id) if chat_id.lstrip("-").isdigit() else chat_id},
+            }
+            if kind == "text":
+                message["text"] = params.get("text", "")
+            else:
+                message[kind] = _media_result(kind, chat_id)
+                if params.get("caption") is not None:
+                    message["caption"] = params["caption"]
+            return _ok(message)
+
+        if method == "getChatMember":
+            return _ok(
+                {
+                    "status": state.member_status,
+                    "user": {"id": int(params.get("user_id", 0)), "is_bot": False, "first_name": "Fake"},
+                    "can_post_messages": True,
+                    "can_edit_messages": True,
+                    "can_delete_messages": True,
+                    "can_post_stories": True,
+                }
+            )
+        if method == "getFile":
+            file_id = str(params.get("file_id", ""))
+            return _ok(
+                {
+                    "file_id": file_id,
+                    "file_unique_id": file_id,
+                    "file_size": state.file_size,
+                    "file_path": f"files/{file_id}",
+                }
+            )
+        if method == "getUpdates":
+            offset = params.get("offset")
+            updates = await state.poll_updates(
+                offset=int(offset) if offset is not None else None,
+                timeout=float(params.get("timeout", 0)),
+            )
+            return _ok(updates)
+        if method == "getMe":
+            return _ok({"id": 1, "is_bot": True, "first_name": "Fake", "username": "fake_bot"})
+        if method in _NOOP_METHODS:
+            return _ok(True)
+        return _telegram_error(404, "Not Found: method not found")
+
+    @app.get("/file/bot{token}/{file_path:path}")
+    async def download(token: str, file_path: str) -> Response:
+        return Response(b"\0" * state.file_size, media_type="application/octet-stream")
+
+    @app.post("/_fake/updates")
+    async def push_update(update: dict) -> dict:
+        return state.push_update(update)
+
+    @app.get("/_fake/stats")
+    async def fake_stats() -> dict:
+        return {**stats.as_dict(), "sent": dict(state.sent), "pending_updates": len(state.updates)}
+
+    return app
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+
+from app.services.rate_limit import InMemoryTokenBucket
+
+# Requests under this prefix drive the fake itself and never see injected faults.
+CONTROL_PREFIX = "/_fake"
+
+
+@dataclass
+class FaultProfile:
+    """How a fake server misbehaves: added latency, random failures and a per-client rate limit."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    # Requests per second allowed per client key; ``None`` disables the limit.
+    rps: float | None = None
+    seed: int | None = None
+
+
+@dataclass
+class FaultStats:
+    requests: Counter[str] = field(default_factory=Counter)
+    rate_limited: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": sum(self.requests.values()),
+            "rate_limited": self.rate_limited,
+            "errors": self.errors,
+            "by_path": dict(self.requests),
+        }
+
+
+def install_faults(
+    app: FastAPI,
+    profile: FaultProfile,
+    *,
+    client_key: Callable[[Request], str],
+    rate_limited_response: Callable[[float], Response],
+    error_response: Callable[[], Response],
+    stats: FaultStats,
+    limiter: InMemoryTokenBucket | None = None,
+) -> None:
+    """Add latency, error injection and rate limiting in front of every non-control route."""
+    rng = random.Random(profile.seed)
+    limiter = limiter or InMemoryTokenBucket(clock=time.monotonic)
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        path = request.url.path
+        if path.startswith(CONTROL_PREFIX):
+            return await call_next(request)
+
+        stats.requests[path] += 1
+        delay_ms = profile.latency_ms + rng.uniform(0.0, profile.jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+        if profile.rps:
+            wait = limiter.try_acquire(client_key(request), rate=profile.rps, capacity=profile.rps)
+            if wait > 0:
+                stats.rate_limited += 1
+                return rate_limited_response(wait)
+
+        if profile.error_rate and rng.random() < profile.error_rate:
+            stats.errors += 1
+            return error_response()
+
+        return await call_next(request)
@@ -0,0 +1,405 @@
+"""In-memory TonCenter v3 stand-in.
+
+Serves the endpoints the escrow watcher, sweeps and payouts call (``/transactions``,
+``/transactionsByMasterchainBlock``, ``/transactionsByMessage``, ``/masterchainInfo``,
+``/account``, ``/runGetMethod`` and ``/message``) over a toy ledger. Masterchain blocks
+advance on a timer and a transaction only becomes visible once its block is reached.
+``/message`` understands WalletV5R1 external messages: it checks seqno and expiry, executes
+the send actions against wallet balances and records the wallet and destination transactions
+the confirm step looks for.
+
+Control routes under ``/_fake`` seed deposits and balances and report request stats.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import random
+import time
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Callable
+
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pytoniq_core import Cell, MessageAny
+from tonutils.utils import normalize_hash
+
+from app.services.ton.addressing import to_raw_address
+from benchmarks.fakes.faults import FaultProfile, FaultStats, install_faults
+
+API_PREFIX = "/api/v3"
+MAX_PAGE_LIMIT = 1000
+
+# WalletV5R1 send mode flags.
+_MODE_IGNORE_ERRORS = 2
+_MODE_CARRY_BALANCE = 128
+
+
+class MessageRejected(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class WalletAction:
+    destination_raw: str
+    value_nano: int
+    mode: int
+
+
+@dataclass(frozen=True)
+class WalletExternalMessage:
+    wallet_raw: str
+    seqno: int
+    valid_until: int
+    actions: list[WalletAction]
+    hash_norm: str
+
+
+def _display_raw(address: str) -> str:
+    # TonCenter reports raw addresses with an upper-case hash part.
+    workchain, _, address_hash = to_raw_address(address).partition(":")
+    return f"{workchain}:{address_hash.upper()}"
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def parse_wallet_message(boc: str) -> WalletExternalMessage:
+    """Decode a signed WalletV5R1 external message; the signature itself is not checked."""
+    try:
+        message = MessageAny.deserialize(Cell.one_from_boc(boc).begin_parse())
+        body = message.body.begin_parse()
+        body.load_uint(32)  # opcode
+        body.load_uint(32)  # wallet_id
+        valid_until = body.load_uint(32)
+        seqno = body.load_uint(32)
+        actions: list[WalletAction] = []
+        if body.load_bit():
+            node = body.load_ref()
+            while node.refs:
+                action = node.begin_parse()
+                previous = action.load_ref()
+                action.load_uint(32)  # action_send_msg opcode
+                mode = action.load_uint(8)
+                out_msg = MessageAny.deserialize(action.load_ref().begin_parse())
+                actions.append(
+                    WalletAction(
+                        destination_raw=out_msg.info.dest.to_str(is_user_friendly=False),
+                        value_nano=int(out_msg.info.value.grams),
+                        mode=mode,
+                    )
+                )
+                node = previous
+        wallet_raw = message.info.dest.to_str(is_user_friendly=False)
+    except Exception as exc:
+        raise MessageRejected(f"cannot parse external message: {exc}") from exc
+
+    # The action list is built newest-first; report actions in the order they were added.
+    actions.reverse()
+    return WalletExternalMessage(
+        wallet_raw=to_raw_address(wallet_raw),
+        seqno=seqno,
+        valid_until=valid_until,
+        actions=actions,
+        hash_norm=_b64(normalize_hash(message)),
+    )
+
+
+@dataclass
+class FakeLedger:
+    """Accounts, wallet seqnos and transactions of the fake chain."""
+
+    block_seconds: float = 1.0
+    # Balance an account starts with the first time it sends; lets payouts run unfunded.
+    default_balance_nano: int = 0
+    # Share of accepted external messages that never execute, as if lost before a block.
+    drop_message_rate: float = 0.0
+    clock: Callable[[], float] = time.time
+    seed: int | None = None
+    balances: dict[str, int] = field(default_factory=dict)
+    seqnos: dict[str, int] = field(default_factory=dict)
+    transactions: list[dict] = field(default_factory=list)
+    by_account: dict[str, list[dict]] = field(default_factory=dict)
+    messages_accepted: int = 0
+    messages_dropped: int = 0
+
+    def __post_init__(self) -> None:
+        self._started = self.clock()
+        self._lt = count(start=1_000_000, step=1000)
+        self._rng = random.Random(self.seed)
+
+    def masterchain_seqno(self) -> int:
+        return 1 + int((self.clock() - self._started) / self.block_seconds)
+
+    def _visible(self, tx: dict) -> bool:
+        return tx["mc_block_seqno"] <= self.masterchain_seqno()
+
+    def _record(self, account_raw: str, *, in_msg: dict, out_msgs: list[dict], description: dict) -> dict:
+        lt = next(self._lt)
+        now = int(self.clock())
+        tx = {
+            "account": _display_raw(account_raw),
+            "hash": _b64(hashlib.sha256(f"{account_raw}:{lt}".encode()).digest()),
+            "lt": str(lt),
+            "now": now,
+            "utime": now,
+            # Lands in the next block, so a fresh transaction is not visible straight away.
+            "mc_block_seqno": self.masterchain_seqno() + 1,
+            "in_msg": in_msg,
+            "out_msgs": out_msgs,
+            "description": description,
+        }
+        self.transactions.append(tx)
+        self.by_account.setdefault(account_raw, []).append(tx)
+        return tx
+
+    def credit(self, address: str, amount_nano: int, *, source: str | None = None) -> dict:
+        account_raw = to_raw_address(address)
+        self.balances[account_raw] = self.balances.get(account_raw, 0) + amount_nano
+        return self._record(
+            account_raw,
+            in_msg={
+                "source": _display_raw(source) if source else None,
+                "destination": _display_raw(account_raw),
+                "value": str(amount_nano),
+            },
+            out_msgs=[],
+            description={"aborted": False, "action": {"msgs_created": 0, "skipped_actions": 0}},
+        )
+
+    def apply_external(self, message: WalletExternalMessage) -> dict | None:
+        wallet = message.wallet_raw
+        expected_seqno = self.seqnos.get(wallet, 0)
+        if message.seqno != expected_seqno:
+            raise MessageRejected(f"seqno mismatch: got {message.seqno}, wallet is at {expected_seqno}")
+        if message.seqno != 0 and message.valid_until < self.clock():
+            raise MessageRejected("message expired")
+
+        self.messages_accepted += 1
+        if self.drop_message_rate and self._rng.random() < self.drop_message_rate:
+            self.messages_dropped += 1
+            return None
+
+        self.seqnos[wallet] = expected_seqno + 1
+        balance = self.balances.setdefault(wallet, self.default_balance_nano)
+        sent: list[tuple[str, int]] = []
+        skipped = 0
+        for action in message.actions:
+            value = balance if action.mode & _MODE_CARRY_BALANCE else action.value_nano
+            if value > balance:
+                if action.mode & _MODE_IGNORE_ERRORS:
+                    skipped += 1
+                    continue
+                sent = []
+                skipped = len(message.actions)
+                balance = self.balances[wallet]
+                break
+            balance -= value
+            sent.append((action.destination_raw, value))
+        self.balances[wallet] = balance
+
+        tx = self._record(
+            wallet,
+            in_msg={
+                "source": None,
+                "destination": _display_raw(wallet),
+                "value": None,
+                "hash_norm": message.hash_norm,
+            },
+            out_msgs=[
+                {"source": _display_raw(wallet), "destination": _display_raw(dest), "value": str(value)}
+                for dest, value in sent
+            ],
+            description={
+                "aborted": bool(message.actions) and not sent,
+                "action": {"msgs_created": len(sent), "skipped_actions": skipped},
+            },
+        )
+        for destination, value in sent:
+            self.credit(destination, value, source=wallet)
+        return tx
+
+    def query_transactions(
+        self,
+        *,
+        accounts: list[str] | None,
+        tx_hash: str | None,
+        start_lt: int | None,
+        end_lt: int | None,
+        limit: int,
+        offset: int,
+        sort: str,
+    ) -> list[dict]:
+        if accounts:
+            candidates = [
+                tx for account in accounts for tx in self.by_account.get(to_raw_address(account), [])
+            ]
+        else:
+            candidates = list(self.transactions)
+        if tx_hash:
+            hash_b64 = tx_hash
+            try:
+                hash_b64 = _b64(bytes.fromhex(tx_hash))
+            except ValueError:
+                pass
+            candidates = [tx for tx in candidates if tx["hash"] == hash_b64]
+
+        selected = [
+            tx
+            for tx in candidates
+            if self._visible(tx)
+            and (start_lt is None or int(tx["lt"]) >= start_lt)
+            and (end_lt is None or int(tx["lt"]) <= end_lt)
+        ]
+        selected.sort(key=lambda tx: int(tx["lt"]), reverse=sort != "asc")
+        return selected[offset : offset + limit]
+
+    def message_transactions(self, msg_hash: str, *, limit: int, offset: int) -> list[dict]:
+        """Visible transactions whose inbound message has this hash (hex or base64)."""
+        hash_b64 = msg_hash
+        try:
+            hash_b64 = _b64(bytes.fromhex(msg_hash))
+        except ValueError:
+            pass
+        selected = [
+            tx
+            for tx in self.transactions
+            if self._visible(tx) and hash_b64 in (tx["in_msg"].get("hash_norm"), tx["in_msg"].get("hash"))
+        ]
+        return selected[offset : offset + limit]
+
+    def block_transactions(self, seqno: int, *, limit: int, offset: int) -> list[dict]:
+        if seqno > self.masterchain_seqno():
+            return []
+        selected = [tx for tx in self.transactions if tx["mc_block_seqno"] == seqno]
+        return selected[offset : offset + limit]
+
+    def stats(self) -> dict:
+        return {
+            "masterchain_seqno": self.masterchain_seqno(),
+            "transactions": len(self.transactions),
+            "messages_accepted": self.messages_accepted,
+            "messages_dropped": self.messages_dropped,
+        }
+
+
+class _CreditRequest(BaseModel):
+    address: str
+    amount_nano: int
+    source: str | None = None
+
+
+def _error(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse({"error": message, "code": status_code}, status_code=status_code)
+
+
+def create_app(ledger: FakeLedger, profile: FaultProfile | None = None) -> FastAPI:
+    app = FastAPI(title="Fake TonCenter")
+    stats = FaultStats()
+
+    install_faults(
+        app,
+        profile or FaultProfile(),
+        client_key=lambda request: request.headers.get("X-API-Key") or "anonymous",
+        rate_limited_response=lambda wait: JSONResponse(
+            {"error": "Ratelimit exceed", "code": 429},
+            status_code=429,
+            headers={"Retry-After": f"{wait:.3f}"},
+        ),
+        error_response=lambda: _error(500, "injected failure"),
+        stats=stats,
+    )
+
+    @app.get(f"{API_PREFIX}/masterchainInfo")
+    async def masterchain_info() -> dict:
+        seqno = ledger.masterchain_seqno()
+        return {"first": {"seqno": 1}, "last": {"workchain": -1, "seqno": seqno}}
+
+    @app.get(f"{API_PREFIX}/transactions")
+    async def transactions(
+        account: list[str] | None = Query(default=None),
+        hash: str | None = None,
+        start_lt: int | None = None,
+        end_lt: int | None = None,
+        limit: int = Query(default=10, ge=1, le=MAX_PAGE_LIMIT),
+        offset: int = Query(default=0, ge=0),
+        sort: str = "desc",
+    ) -> dict:
+        return {
+            "transactions": ledger.query_transactions(
+                accounts=account,
+                tx_hash=hash,
+                start_lt=start_lt,
+                end_lt=end_lt,
+                limit=limit,
+                offset=offset,
+                sort=sort,
+            ),
+            "address_book": {},
+        }
+
+    @app.get(f"{API_PREFIX}/transactionsByMasterchainBlock")
+    async def transactions_by_block(
+        seqno: int,
+        limit: int = Query(default=10, ge=1, le=MAX_PAGE_LIMIT),
+        offset: int = Query(default=0, ge=0),
+    ) -> dict:
+        return {"transactions": ledger.block_transactions(seqno, limit=limit, offset=offset)}
+
+    @app.get(f"{API_PREFIX}/transactionsByMessage")
+    async def transactions_by_message(
+        msg_hash: str,
+        direction: str = "in",
+        limit: int = Query(default=10, ge=1, le=MAX_PAGE_LIMIT),
+        offset: int = Query(default=0, ge=0),
+    ) -> dict:
+        # Only inbound lookups are served; the confirm step asks for the wallet's external-in.
+        if direction != "in":
+            return {"transactions": []}
+        return {"transactions": ledger.message_transactions(msg_hash, limit=limit, offset=offset)}
+
+    @app.get(f"{API_PREFIX}/account")
+    async def account(address: str) -> dict:
+        account_raw = to_raw_address(address)
+        history = ledger.by_account.get(account_raw, [])
+        return {
+            "balance": str(ledger.balances.get(account_raw, 0)),
+            "status": "active" if ledger.seqnos.get(account_raw) else "uninit",
+            "code": None,
+            "data": None,
+            "last_transaction_lt": history[-1]["lt"] if history else None,
+            "last_transaction_hash": history[-1]["hash"] if history else None,
+        }
+
+    @app.post(f"{API_PREFIX}/runGetMethod")
+    async def run_get_method(request: Request) -> dict:
+        body = await request.json()
+        value = 0
+        if body.get("method") == "seqno":
+            value = ledger.seqnos.get(to_raw_address(body["address"]), 0)
+        return {"gas_used": 0, "exit_code": 0, "stack": [{"type": "num", "value": hex(value)}]}
+
+    @app.post(f"{API_PREFIX}/message")
+    async def send_message(request: Request):
+        body = await request.json()
+        try:
+            message = parse_wallet_message(body["boc"])
+            ledger.apply_external(message)
+        except (KeyError, MessageRejected) as exc:
+            return _error(500, f"cannot apply external message to current state: {exc}")
+        return {"message_hash": message.hash_norm, "message_hash_norm": message.hash_norm}
+
+    @app.post("/_fake/credit")
+    async def credit(payload: _CreditRequest) -> dict:
+        """Simulate an incoming transfer, e.g. an advertiser paying a deposit address."""
+        return ledger.credit(payload.address, payload.amount_nano, source=payload.source)
+
+    @app.get("/_fake/stats")
+    async def fake_stats() -> dict:
+        return {**stats.as_dict(), **ledger.stats()}
+
+    return app
@@ -0,0 +1,459 @@
+"""Load-test the TON and Telegram workers against local TonCenter and Bot API stand-ins.
+
+Start the fakes, then run the real Celery worker and beat pointed at them:
+
+    cd backend && python -m benchmarks.load_test serve --latency-ms 80 --error-rate 0.02
+    TONCENTER_API=http://127.0.0.1:8081/api/v3 TELEGRAM_BOT_API_URL=http://127.0.0.1:8082 \
+        celery -A app.worker.celery_app worker -B
+
+``drive`` runs one scenario per worker and reports its timings, together with the request,
+throttling and error counts the fakes saw:
+
+* ``deposits`` seeds escrows awaiting a deposit, pays every deposit address through the fake
+  chain and times how quickly the escrow watcher marks them funded;
+* ``posting`` seeds funded deals starting over the next ``--post-spread-seconds``, queues their
+  ETA tasks the way the escrow watcher does and measures how late each post lands;
+* ``payouts`` queues one release per funded escrow and times submission and confirmation;
+* ``notifications`` fills the bot notification outbox across ``--notification-chats`` chats and
+  measures how fast the sender drains it.
+
+It writes to ``DATABASE_URL`` and queues tasks on the Celery broker, so point it at a scratch
+database and use the same broker and ``TON_HOT_WALLET_MNEMONIC`` as the workers:
+
+    cd backend && python -m benchmarks.load_test drive --deals 500 --deposits-per-second 50
+    cd backend && python -m benchmarks.load_test drive --scenarios notifications --notifications 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Callable, Sequence
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import httpx
+import uvicorn
+from sqlmodel import Session, select
+
+from app.domain.escrow_fsm import EscrowState
+from app.models.bot_notification import BotNotification, BotNotificationState
+from app.models.channel import Channel
+from app.models.deal import Deal, DealSourceType, DealState
+from app.models.deal_escrow import DealEscrow
+from app.models.listing import Listing
+from app.models.listing_format import ListingFormat
+from app.models.ton_payout import TonPayout, TonPayoutKind, TonPayoutState
+from app.models.user import User
+from app.services.ton.utils import ton_to_nano
+from app.services.ton.wallets import resolve_deal_deposit_address
+from app.settings import get_settings
+from app.worker.deal_posting import schedule_deal_post
+from benchmarks.fakes import bot_api, toncenter
+from benchmarks.fakes.faults import FaultProfile
+from shared.db.session import SessionLocal
+
+# Stand-ins for the advertiser's and the channel owner's wallets.
+_PAYER_ADDRESS = "0:" + "ab" * 32
+_OWNER_ADDRESS = "0:" + "cd" * 32
+SCENARIOS = ("deposits", "posting", "payouts", "notifications")
+
+
+def _profile(args: argparse.Namespace, rps: float | None) -> FaultProfile:
+    return FaultProfile(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rps=rps,
+        seed=args.seed,
+    )
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    ledger = toncenter.FakeLedger(
+        block_seconds=args.block_seconds,
+        default_balance_nano=ton_to_nano(Decimal(str(args.default_balance_ton))),
+        drop_message_rate=args.drop_message_rate,
+        seed=args.seed,
+    )
+    bot_state = bot_api.FakeBotState(chat_rps=args.chat_rps or None)
+    servers = [
+        uvicorn.Server(
+            uvicorn.Config(
+                toncenter.create_app(ledger, _profile(args, args.toncenter_rps or None)),
+                host=args.host,
+                port=args.toncenter_port,
+                log_level="warning",
+            )
+        ),
+        uvicorn.Server(
+            uvicorn.Config(
+                bot_api.create_app(bot_state, _profile(args, args.bot_rps or None)),
+                host=args.host,
+                port=args.bot_api_port,
+                log_level="warning",
+            )
+        ),
+    ]
+    print(f"TONCENTER_API=http://{args.host}:{args.toncenter_port}/api/v3")
+    print(f"TELEGRAM_BOT_API_URL=http://{args.host}:{args.bot_api_port}")
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def _seed_deals(
+    db: Session,
+    *,
+    deals: int,
+    price_ton: Decimal,
+    run_id: int,
+    first_index: int,
+    deal_state: DealState,
+    escrow_state: EscrowState,
+    scheduled_at: Callable[[int], datetime | None] = lambda index: None,
+) -> list[tuple[Deal, DealEscrow]]:
+    """Add deals with their channel, listing and escrow; ``first_index`` keeps names unique per run."""
+    settings = get_settings()
+    funded = escrow_state == EscrowState.FUNDED
+    seeded: list[tuple[Deal, DealEscrow]] = []
+    for index in range(first_index, first_index + deals):
+        suffix = f"{run_id}_{index}"
+        advertiser = User(telegram_user_id=run_id * 1_000_000 + 2 * index, username=f"lt_adv_{suffix}")
+        owner = User(telegram_user_id=run_id * 1_000_000 + 2 * index + 1, username=f"lt_owner_{suffix}")
+        channel = Channel(username=f"lt_channel_{suffix}", telegram_channel_id=-(10**12) - index)
+        db.add_all([advertiser, owner, channel])
+        db.flush()
+
+        listing = Listing(channel_id=channel.id, owner_id=owner.id, is_active=True)
+        db.add(listing)
+        db.flush()
+        listing_format = ListingFormat(
+            listing_id=listing.id,
+            placement_type="post",
+            exclusive_hours=1,
+            retention_hours=24,
+            price=price_ton,
+        )
+        db.add(listing_format)
+        db.flush()
+
+        deal = Deal(
+            source_type=DealSourceType.LISTING.value,
+            advertiser_id=advertiser.id,
+            channel_id=channel.id,
+            channel_owner_id=owner.id,
+            listing_id=listing.id,
+            listing_format_id=listing_format.id,
+            price_ton=price_ton,
+            ad_type=listing_format.placement_type,
+            placement_type=listing_format.placement_type,
+            exclusive_hours=listing_format.exclusive_hours,
+            retention_hours=listing_format.retention_hours,
+            creative_text="Load test",
+            creative_media_type="image",
+            creative_media_ref="load-test",
+            scheduled_at=scheduled_at(index - first_index),
+            state=deal_state.value,
+        )
+        db.add(deal)
+        db.flush()
+
+        deposit = resolve_deal_deposit_address(deal_id=deal.id, settings=settings)
+        escrow = DealEscrow(
+            deal_id=deal.id,
+            state=escrow_state.value,
+            deposit_address=deposit.friendly,
+            deposit_address_raw=deposit.raw,
+            subwallet_id=deposit.subwallet_id,
+            escrow_network=deposit.network,
+            expected_amount_ton=price_ton,
+            received_amount_ton=price_ton if funded else Decimal("0"),
+            fee_percent=settings.TON_FEE_PERCENT or Decimal("0"),
+        )
+        db.add(escrow)
+        db.flush()
+        seeded.append((deal, escrow))
+    return seeded
+
+
+def _percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def _report(label: str, values: Sequence[float]) -> None:
+    if values:
+        values = list(values)
+        print(
+            f"{label}: p50 {statistics.median(values):.1f} s, "
+            f"p95 {_percentile(values, 0.95):.1f} s, max {max(values):.1f} s"
+        )
+
+
+def _wait_for(
+    ids: Sequence[int],
+    done: Callable[[Session, list[int]], Sequence[int]],
+    *,
+    args: argparse.Namespace,
+) -> dict[int, float]:
+    """Poll until ``done`` reports every id or the timeout passes; returns when each was first seen."""
+    seen: dict[int, float] = {}
+    deadline = time.monotonic() + args.timeout
+    while len(seen) < len(ids) and time.monotonic() < deadline:
+        with SessionLocal() as db:
+            finished = done(db, [item for item in ids if item not in seen])
+        now = time.monotonic()
+        for item in finished:
+            seen.setdefault(item, now)
+        time.sleep(args.poll_seconds)
+    return seen
+
+
+def _seconds(later: datetime | None, earlier: datetime | None) -> float | None:
+    if later is None or earlier is None:
+        return None
+    if later.tzinfo is None:
+        later = later.replace(tzinfo=timezone.utc)
+    if earlier.tzinfo is None:
+        earlier = earlier.replace(tzinfo=timezone.utc)
+    return (later - earlier).total_seconds()
+
+
+def _drive_deposits(args: argparse.Namespace, *, run_id: int, first_index: int) -> None:
+    price_ton = Decimal(args.price_ton)
+    with SessionLocal() as db:
+        seeded = _seed_deals(
+            db,
+            deals=args.deals,
+            price_ton=price_ton,
+            run_id=run_id,
+            first_index=first_index,
+            deal_state=DealState.CREATIVE_APPROVED,
+            escrow_state=EscrowState.AWAITING_DEPOSIT,
+        )
+        db.commit()
+        addresses = [(escrow.id, escrow.deposit_address_raw) for _, escrow in seeded]
+    print(f"deposits: seeded {len(addresses)} escrows awaiting deposit")
+
+    paid_at: dict[int, float] = {}
+    interval = 1.0 / args.deposits_per_second
+    with httpx.Client(base_url=args.toncenter_url, timeout=10.0) as fake:
+        for escrow_id, address in addresses:
+            fake.post(
+                "/_fake/credit",
+                json={"address": address, "amount_nano": ton_to_nano(price_ton), "source": _PAYER_ADDRESS},
+            ).raise_for_status()
+            paid_at[escrow_id] = time.monotonic()
+            time.sleep(interval)
+
+    funded_at = _wait_for(
+        list(paid_at),
+        lambda db, ids: db.exec(
+            select(DealEscrow.id).where(
+                DealEscrow.id.in_(ids),
+                DealEscrow.state == EscrowState.FUNDED.value,
+            )
+        ).all(),
+        args=args,
+    )
+    print(f"deposits: funded {len(funded_at)}/{len(paid_at)} escrows")
+    _report("deposit -> funded", [funded_at[item] - paid_at[item] for item in funded_at])
+
+
+def _drive_posting(args: argparse.Namespace, *, run_id: int, first_index: int) -> None:
+    # Starts are spread evenly from a few seconds out, so every post has an ETA to hit.
+    start = datetime.now(timezone.utc) + timedelta(seconds=5)
+    step = args.post_spread_seconds / max(1, args.deals)
+    with SessionLocal() as db:
+        seeded = _seed_deals(
+            db,
+            deals=args.deals,
+            price_ton=Decimal(args.price_ton),
+            run_id=run_id,
+            first_index=first_index,
+            deal_state=DealState.FUNDED,
+            escrow_state=EscrowState.FUNDED,
+            scheduled_at=lambda index: start + timedelta(seconds=index * step),
+        )
+        db.commit()
+        starts = {deal.id: deal.scheduled_at for deal, _ in seeded}
+    for deal_id, scheduled_at in starts.items():
+        schedule_deal_post(deal_id, scheduled_at)
+    print(f"posting: seeded {len(starts)} funded deals over {args.post_spread_seconds:.0f} s")
+
+    posted = _wait_for(
+        list(starts),
+        lambda db, ids: db.exec(select(Deal.id).where(Deal.id.in_(ids), Deal.posted_at.is_not(None))).all(),
+        args=args,
+    )
+    with SessionLocal() as db:
+        lateness = [
+            _seconds(deal.posted_at, deal.scheduled_at)
+            for deal in db.exec(select(Deal).where(Deal.id.in_(list(posted)))).all()
+        ]
+    print(f"posting: posted {len(posted)}/{len(starts)} deals")
+    _report("scheduled -> posted", [value for value in lateness if value is not None])
+
+
+def _drive_payouts(args: argparse.Namespace, *, run_id: int, first_index: int) -> None:
+    price_ton = Decimal(args.price_ton)
+    with SessionLocal() as db:
+        seeded = _seed_deals(
+            db,
+            deals=args.deals,
+            price_ton=price_ton,
+            run_id=run_id,
+            first_index=first_index,
+            deal_state=DealState.RELEASED,
+            escrow_state=EscrowState.FUNDED,
+        )
+        payouts = [
+            TonPayout(
+                deal_id=deal.id,
+                escrow_id=escrow.id,
+                kind=TonPayoutKind.RELEASE.value,
+                to_address=_OWNER_ADDRESS,
+                amount_ton=price_ton,
+            )
+            for deal, escrow in seeded
+        ]
+        db.add_all(payouts)
+        db.commit()
+        queued_at = datetime.now(timezone.utc)
+        payout_ids = [payout.id for payout in payouts]
+    print(f"payouts: queued {len(payout_ids)} releases")
+
+    settled = _wait_for(
+        payout_ids,
+        lambda db, ids: db.exec(
+            select(TonPayout.id).where(
+                TonPayout.id.in_(ids),
+                TonPayout.state.in_([TonPayoutState.SENT.value, TonPayoutState.FAILED.value]),
+            )
+        ).all(),
+        args=args,
+    )
+    with SessionLocal() as db:
+        rows = db.exec(select(TonPayout).where(TonPayout.id.in_(payout_ids))).all()
+    sent = [row for row in rows if row.state == TonPayoutState.SENT.value]
+    failed = sum(1 for row in rows if row.state == TonPayoutState.FAILED.value)
+    print(
+        f"payouts: {len(sent)}/{len(payout_ids)} sent, {failed} failed, "
+        f"{len(payout_ids) - len(settled)} still in flight"
+    )
+    _report(
+        "queued -> submitted",
+        [_seconds(row.submitted_at, queued_at) for row in sent if row.submitted_at],
+    )
+    _report(
+        "submitted -> confirmed",
+        [_seconds(row.sent_at, row.submitted_at) for row in sent if row.sent_at and row.submitted_at],
+    )
+
+
+def _drive_notifications(args: argparse.Namespace, *, run_id: int, first_index: int) -> None:
+    chats = max(1, args.notification_chats)
+    with SessionLocal() as db:
+        notifications = [
+            BotNotification(
+                chat_id=run_id * 1_000_000 + first_index + index % chats,
+                message=f"Load test notification {index}",
+                event="load_test",
+            )
+            for index in range(args.notifications)
+        ]
+        db.add_all(notifications)
+        db.commit()
+        started = time.monotonic()
+        notification_ids = [notification.id for notification in notifications]
+    print(f"notifications: queued {len(notification_ids)} across {chats} chats")
+
+    delivered = _wait_for(
+        notification_ids,
+        lambda db, ids: db.exec(
+            select(BotNotification.id).where(
+                BotNotification.id.in_(ids),
+                BotNotification.state == BotNotificationState.SENT.value,
+            )
+        ).all(),
+        args=args,
+    )
+    elapsed = (max(delivered.values()) - started) if delivered else 0.0
+    rate = len(delivered) / elapsed if elapsed > 0 else 0.0
+    print(f"notifications: sent {len(delivered)}/{len(notification_ids)} in {elapsed:.1f} s ({rate:.1f}/s)")
+    _report("queued -> sent", [seen - started for seen in delivered.values()])
+
+
+_DRIVERS = {
+    "deposits": _drive_deposits,
+    "posting": _drive_posting,
+    "payouts": _drive_payouts,
+    "notifications": _drive_notifications,
+}
+
+
+def _drive(args: argparse.Namespace) -> None:
+    run_id = int(time.time()) % 100_000
+    for number, scenario in enumerate(args.scenarios):
+        # Each scenario names its users, channels and chats from its own index range.
+        _DRIVERS[scenario](args, run_id=run_id, first_index=number * 100_000)
+
+    toncenter_stats = httpx.get(f"{args.toncenter_url}/_fake/stats", timeout=10.0).json()
+    bot_stats = httpx.get(f"{args.bot_api_url}/_fake/stats", timeout=10.0).json()
+    for name, stats in (("toncenter", toncenter_stats), ("bot api", bot_stats)):
+        print(
+            f"{name}: {stats['requests']} requests, {stats['rate_limited']} rate limited, "
+            f"{stats['errors']} injected errors"
+        )
+
+
+def _scenario_list(value: str) -> list[str]:
+    scenarios = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = sorted(set(scenarios) - set(SCENARIOS))
+    if unknown or not scenarios:
+        raise argparse.ArgumentTypeError(f"choose from {', '.join(SCENARIOS)}")
+    return scenarios
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the fake TonCenter and Bot API servers")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--toncenter-port", type=int, default=8081)
+    serve.add_argument("--bot-api-port", type=int, default=8082)
+    serve.add_argument("--latency-ms", type=float, default=0.0)
+    serve.add_argument("--jitter-ms", type=float, default=0.0)
+    serve.add_argument("--error-rate", type=float, default=0.0)
+    serve.add_argument("--toncenter-rps", type=float, default=10.0, help="per API key; 0 disables")
+    serve.add_argument("--bot-rps", type=float, default=30.0, help="per bot token; 0 disables")
+    serve.add_argument("--chat-rps", type=float, default=1.0, help="sends per chat; 0 disables")
+    serve.add_argument("--block-seconds", type=float, default=1.0)
+    serve.add_argument("--drop-message-rate", type=float, default=0.0)
+    serve.add_argument("--default-balance-ton", type=float, default=1_000_000.0)
+    serve.add_argument("--seed", type=int, default=None)
+
+    drive = commands.add_parser("drive", help="seed work for the workers and time how they handle it")
+    drive.add_argument("--scenarios", type=_scenario_list, default=list(SCENARIOS), help="comma-separated")
+    drive.add_argument("--deals", type=int, default=100, help="per deposit, posting and payout scenario")
+    drive.add_argument("--price-ton", default="1.5")
+    drive.add_argument("--deposits-per-second", type=float, default=20.0)
+    drive.add_argument("--post-spread-seconds", type=float, default=60.0)
+    drive.add_argument("--notifications", type=int, default=1000)
+    drive.add_argument("--notification-chats", type=int, default=100)
+    drive.add_argument("--timeout", type=float, default=300.0)
+    drive.add_argument("--poll-seconds", type=float, default=1.0)
+    drive.add_argument("--toncenter-url", default="http://127.0.0.1:8081")
+    drive.add_argument("--bot-api-url", default="http://127.0.0.1:8082")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        asyncio.run(_serve(args))
+    else:
+        _drive(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
+import asyncio
+import json
+
+import httpx
 import pytest
 
 from app.settings import Settings
-from shared.telegram.bot_api import BotApiService
-from shared.telegram.errors import TelegramApiError, TelegramConfigError
+from shared.telegram.bot_api import AsyncBotApiService, BotApiService
+from shared.telegram.errors import TelegramApiError, TelegramConfigError, TelegramRateLimitError
 import shared.telegram.bot_api as bot_api
 
 
@@ -209,3 +213,57 @@ def test_post_story_requires_business_connection_id(monkeypatch) -> None:
 
     with pytest.raises(TelegramConfigError):
         service.post_story(media_type="image", media="file-id")
+
+
+def test_async_get_chat_member_success() -> None:
+    captured: dict[str, object] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured["url"] = str(request.url)
+        captured["json"] = json.loads(request.content)
+        return httpx.Response(200, json={"ok": True, "result": {"status": "administrator"}})
+
+    settings = Settings(_env_file=None, TELEGRAM_ENABLED=True, TELEGRAM_BOT_TOKEN="token")
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = AsyncBotApiService(settings, client=client)
+
+    async def run() -> dict:
+        try:
+            return await service.get_chat_member(chat_id="@chan", user_id=999)
+        finally:
+            await client.aclose()
+
+    result = asyncio.run(run())
+    assert result["status"] == "administrator"
+    assert captured["url"] == "https://api.telegram.org/bottoken/getChatMember"
+    assert captured["json"] == {"chat_id": "@chan", "user_id": 999}
+
+
+def test_async_bot_api_error_raises() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(400, text="bad request")
+
+    settings = Settings(_env_file=None, TELEGRAM_ENABLED=True, TELEGRAM_BOT_TOKEN="token")
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service = AsyncBotApiService(settings, client=client)
+
+    with pytest.raises(TelegramApiError):
+        asyncio.run(service.get_me())
+
+
+def test_send_message_rate_limited_exposes_retry_after(monkeypatch) -> None:
+    def fake_post(url: str, json: dict) -> DummyResponse:
+        return DummyResponse(
+            429,
+            {"ok": False, "parameters": {"retry_after": 12}},
+            text="Too Many Requests",
+        )
+
+    monkeypatch.setattr(bot_api.httpx, "post", fake_post)
+
+    settings = Settings(_env_file=None, TELEGRAM_ENABLED=True, TELEGRAM_BOT_TOKEN="token")
+    service = BotApiService(settings)
+
+    with pytest.raises(TelegramRateLimitError) as excinfo:
+        service.send_message(chat_id=1, text="hello")
+    assert excinfo.value.retry_after == 12
@@ -1,4 +1,6 @@
 import asyncio
+import threading
+from types import SimpleNamespace
 
 import pytest
 
@@ -9,6 +11,7 @@ from app.telegram.permissions import (
     check_bot_permissions,
     check_user_permissions,
 )
+from shared.telegram.member_cache import InMemoryBotMemberCache
 
 
 class DummyBotApi:
@@ -226,3 +229,126 @@ def test_ensure_permissions_raises() -> None:
     assert excinfo.value.context == "posting"
     assert excinfo.value.missing_permissions == ["post_messages"]
     assert "posting" in str(excinfo.value)
+
+
+class DummyAsyncBotApi:
+    def __init__(self, *, members: dict) -> None:
+        self.members = members
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_me(self) -> dict:
+        return {"id": 999}
+
+    async def get_chat_member(self, *, chat_id, user_id: int) -> dict:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        member = self.members.get(chat_id)
+        if member is None:
+            raise RuntimeError("chat not found")
+        return member
+
+
+def test_check_bot_permissions_async_probes_refs_concurrently() -> None:
+    bot_api = DummyAsyncBotApi(
+        members={
+            -100123: {"status": "member"},
+            123: {"status": "administrator", "can_post_messages": True},
+        }
+    )
+
+    result = asyncio.run(check_bot_permissions(bot_api, 123))
+
+    assert bot_api.max_in_flight == 2
+    # The -100 prefixed ref is preferred when both refs resolve.
+    assert result.raw_member == {"status": "member"}
+
+
+def test_check_bot_permissions_async_falls_back_to_next_ref() -> None:
+    bot_api = DummyAsyncBotApi(members={"channel": {"status": "administrator"}})
+
+    result = asyncio.run(check_bot_permissions(bot_api, "channel"))
+
+    assert result.is_admin is True
+    assert result.raw_member == {"status": "administrator"}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_check_bot_permissions_reuses_cached_member_until_ttl() -> None:
+    clock = FakeClock()
+    cache = InMemoryBotMemberCache(ttl_seconds=60, clock=clock)
+    bot_api = DummyBotApi(member={"status": "administrator", "can_post_messages": True})
+
+    asyncio.run(check_bot_permissions(bot_api, "Channel", member_cache=cache))
+    asyncio.run(check_bot_permissions(bot_api, "@channel", member_cache=cache))
+    member_calls = [call for call in bot_api.calls if call[0] == "get_chat_member"]
+    assert len(member_calls) == 1
+
+    clock.now = 61
+    asyncio.run(check_bot_permissions(bot_api, "channel", member_cache=cache))
+    member_calls = [call for call in bot_api.calls if call[0] == "get_chat_member"]
+    assert len(member_calls) == 2
+
+
+def test_check_bot_permissions_refetches_after_invalidation() -> None:
+    cache = InMemoryBotMemberCache(ttl_seconds=60)
+    bot_api = DummyBotApi(member={"status": "administrator"})
+
+    asyncio.run(check_bot_permissions(bot_api, 123, member_cache=cache))
+    bot_api.member = {"status": "left"}
+    cache.invalidate(-100123)
+
+    result = asyncio.run(check_bot_permissions(bot_api, 123, member_cache=cache))
+
+    assert result.is_admin is False
+    assert result.raw_member == {"status": "left"}
+
+
+def test_check_bot_permissions_caches_get_me_per_token() -> None:
+    class TokenBotApi(DummyBotApi):
+        def __init__(self, **kwargs) -> None:
+            super().__init__(**kwargs)
+            self._settings = SimpleNamespace(TELEGRAM_BOT_TOKEN="cached-token")
+
+    bot_api = TokenBotApi(member={"status": "administrator"})
+
+    asyncio.run(check_bot_permissions(bot_api, 123))
+    asyncio.run(check_bot_permissions(bot_api, 456))
+
+    assert [call for call in bot_api.calls if call[0] == "get_me"] == [("get_me",)]
+
+
+def test_check_bot_permissions_uses_member_cache_off_the_event_loop() -> None:
+    class ThreadRecordingCache(InMemoryBotMemberCache):
+        def __init__(self) -> None:
+            super().__init__(ttl_seconds=60)
+            self.threads: list[int] = []
+
+        def get(self, chat_ref):
+            self.threads.append(threading.get_ident())
+            return super().get(chat_ref)
+
+        def set(self, chat_ref, member) -> None:
+            self.threads.append(threading.get_ident())
+            super().set(chat_ref, member)
+
+    cache = ThreadRecordingCache()
+    bot_api = DummyBotApi(member={"status": "administrator"})
+
+    async def check() -> int:
+        await check_bot_permissions(bot_api, 123, member_cache=cache)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(check())
+
+    assert len(cache.threads) == 2
+    assert loop_thread not in cache.threads
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, select
+
+from app.models.bot_notification import BotNotification, BotNotificationState
+from app.models.user import User
+from app.services.bot_notifications import _safe_send_to_users
+from app.services.rate_limit import InMemoryTokenBucket
+from app.settings import Settings
+from app.worker.bot_notifications import _deliver_pending_notifications
+from shared.db.base import SQLModel
+from shared.telegram.errors import TelegramApiError, TelegramRateLimitError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def __call__(self) -> float:
+        return self.value
+
+
+class FakeBotApi:
+    def __init__(self, errors: list[Exception] | None = None) -> None:
+        self.sent: list[dict] = []
+        self.errors = list(errors or [])
+
+    def send_message(self, **kwargs):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(kwargs)
+        return {"ok": True}
+
+
+@pytest.fixture
+def session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    # pysqlite only supports savepoints once it stops managing transactions itself.
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        yield db
+
+
+def _settings(**overrides) -> Settings:
+    return Settings(_env_file=None, TELEGRAM_BOT_TOKEN="token", **overrides)
+
+
+def _seed_users(db: Session) -> tuple[User, User]:
+    first = User(telegram_user_id=111, username="first")
+    second = User(telegram_user_id=222, username="second")
+    db.add(first)
+    db.add(second)
+    db.commit()
+    db.refresh(first)
+    db.refresh(second)
+    return first, second
+
+
+def _enqueue(db: Session, user_ids: list[int | None], message: str) -> None:
+    _safe_send_to_users(
+        db=db,
+        settings=_settings(),
+        user_ids=user_ids,
+        message=message,
+        event="test",
+    )
+    db.commit()
+
+
+def test_notify_only_enqueues(session: Session) -> None:
+    first, second = _seed_users(session)
+
+    _enqueue(session, [first.id, second.id, first.id, None, 999], "hello")
+
+    rows = session.exec(select(BotNotification).order_by(BotNotification.id)).all()
+    assert [row.chat_id for row in rows] == [111, 222]
+    assert all(row.state == BotNotificationState.PENDING.value for row in rows)
+
+
+def test_failed_enqueue_keeps_caller_changes(session: Session) -> None:
+    first, _ = _seed_users(session)
+    BotNotification.__table__.drop(session.connection())
+
+    first.username = "renamed"
+    session.add(first)
+    _safe_send_to_users(
+        db=session,
+        settings=_settings(),
+        user_ids=[first.id],
+        message="hello",
+        event="test",
+    )
+    session.commit()
+
+    session.expire_all()
+    assert session.get(User, first.id).username == "renamed"
+
+
+def test_enqueue_leaves_commit_to_caller(session: Session) -> None:
+    first, _ = _seed_users(session)
+
+    _safe_send_to_users(
+        db=session,
+        settings=_settings(),
+        user_ids=[first.id],
+        message="hello",
+        event="test",
+    )
+    session.rollback()
+
+    assert session.exec(select(BotNotification)).all() == []
+
+
+def test_deliver_respects_per_chat_rate(session: Session) -> None:
+    first, second = _seed_users(session)
+    _enqueue(session, [first.id], "one")
+    _enqueue(session, [first.id], "two")
+    _enqueue(session, [second.id], "three")
+
+    clock = FakeClock()
+    limiter = InMemoryTokenBucket(clock=clock)
+    bot_api = FakeBotApi()
+    settings = _settings()
+    now = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+    sent = _deliver_pending_notifications(
+        db=session, settings=settings, bot_api=bot_api, limiter=limiter, now=now
+    )
+    assert sent == 2
+    assert [item["text"] for item in bot_api.sent] == ["one", "three"]
+
+    clock.value = 1.0
+    sent = _deliver_pending_notifications(
+        db=session, settings=settings, bot_api=bot_api, limiter=limiter, now=now
+    )
+    assert sent == 1
+    assert bot_api.sent[-1]["text"] == "two"
+
+
+def test_deliver_honors_retry_after(session: Session) -> None:
+    first, _ = _seed_users(session)
+    _enqueue(session, [first.id], "hello")
+
+    bot_api = FakeBotApi(errors=[TelegramRateLimitError("429", retry_after=7)])
+    now = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+    sent = _deliver_pending_notifications(
+        db=session,
+        settings=_settings(),
+        bot_api=bot_api,
+        limiter=InMemoryTokenBucket(clock=FakeClock()),
+        now=now,
+    )
+
+    assert sent == 0
+    row = session.exec(select(BotNotification)).one()
+    assert row.state == BotNotificationState.PENDING.value
+    assert row.attempts == 1
+    next_attempt_at = row.next_attempt_at.replace(tzinfo=timezone.utc)
+    assert next_attempt_at == now + timedelta(seconds=7)
+
+
+def test_deliver_marks_failed_after_max_attempts(session: Session) -> None:
+    first, _ = _seed_users(session)
+    _enqueue(session, [first.id], "hello")
+
+    clock = FakeClock()
+    limiter = InMemoryTokenBucket(clock=clock)
+    bot_api = FakeBotApi(errors=[TelegramApiError("boom"), TelegramApiError("boom")])
+    settings = _settings(BOT_NOTIFY_MAX_ATTEMPTS=2)
+    now = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+    _deliver_pending_notifications(
+        db=session, settings=settings, bot_api=bot_api, limiter=limiter, now=now
+    )
+    clock.value = 10.0
+    _deliver_pending_notifications(
+        db=session,
+        settings=settings,
+        bot_api=bot_api,
+        limiter=limiter,
+        now=now + timedelta(minutes=5),
+    )
+
+    row = session.exec(select(BotNotification)).one()
+    assert row.state == BotNotificationState.FAILED.value
+    assert row.attempts == 2
+    assert bot_api.sent == []
+
+
+def test_deliver_keeps_chat_order_while_an_earlier_message_waits_to_retry(session: Session) -> None:
+    first, _ = _seed_users(session)
+    _enqueue(session, [first.id], "one")
+    _enqueue(session, [first.id], "two")
+
+    clock = FakeClock()
+    limiter = InMemoryTokenBucket(clock=clock)
+    bot_api = FakeBotApi(errors=[TelegramApiError("boom")])
+    settings = _settings()
+    now = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+    assert _deliver_pending_notifications(
+        db=session, settings=settings, bot_api=bot_api, limiter=limiter, now=now
+    ) == 0
+    # "one" backs off for 2 seconds; "two" is due but must not overtake it.
+    clock.value = 1.0
+    assert _deliver_pending_notifications(
+        db=session, settings=settings, bot_api=bot_api, limiter=limiter, now=now + timedelta(seconds=1)
+    ) == 0
+    clock.value = 5.0
+    _deliver_pending_notifications(
+        db=session, settings=settings, bot_api=bot_api, limiter=limiter, now=now + timedelta(seconds=5)
+    )
+    clock.value = 10.0
+    _deliver_pending_notifications(
+        db=session, settings=settings, bot_api=bot_api, limiter=limiter, now=now + timedelta(seconds=10)
+    )
+
+    assert [item["text"] for item in bot_api.sent] == ["one", "two"]
+
+
+def test_deliver_keeps_the_chat_token_when_the_global_budget_is_spent(session: Session) -> None:
+    first, second = _seed_users(session)
+    _enqueue(session, [first.id], "one")
+    _enqueue(session, [second.id], "two")
+
+    clock = FakeClock()
+    limiter = InMemoryTokenBucket(clock=clock)
+    bot_api = FakeBotApi()
+    settings = _settings(BOT_NOTIFY_GLOBAL_RATE=1, BOT_NOTIFY_PER_CHAT_RATE=0.1)
+    now = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+    assert _deliver_pending_notifications(
+        db=session, settings=settings, bot_api=bot_api, limiter=limiter, now=now
+    ) == 1
+    clock.value = 1.0
+    assert _deliver_pending_notifications(
+        db=session, settings=settings, bot_api=bot_api, limiter=limiter, now=now
+    ) == 1
+
+    assert [item["text"] for item in bot_api.sent] == ["one", "two"]
+
+
+def test_deliver_commits_each_message_as_it_is_sent(session: Session) -> None:
+    first, second = _seed_users(session)
+    _enqueue(session, [first.id], "one")
+    _enqueue(session, [second.id], "two")
+
+    class CrashingBotApi(FakeBotApi):
+        def send_message(self, **kwargs):
+            if self.sent:
+                raise SystemExit("worker killed")
+            return super().send_message(**kwargs)
+
+    with pytest.raises(SystemExit):
+        _deliver_pending_notifications(
+            db=session,
+            settings=_settings(),
+            bot_api=CrashingBotApi(),
+            limiter=InMemoryTokenBucket(clock=FakeClock()),
+            now=datetime.now(timezone.utc) + timedelta(seconds=1),
+        )
+    session.rollback()
+
+    states = [row.state for row in session.exec(select(BotNotification).order_by(BotNotification.id))]
+    assert states == [BotNotificationState.SENT.value, BotNotificationState.PENDING.value]
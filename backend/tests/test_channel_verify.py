@@ -274,7 +274,7 @@ def _patch_telegram(
 
 
 def test_verify_channel_permission_denied(client: TestClient, db_engine, monkeypatch) -> None:
-    async def fake_check_bot_permissions(_bot_api, _channel):
+    async def fake_check_bot_permissions(_bot_api, _channel, member_cache=None):
         return PermissionCheckResult(
             ok=False,
             is_admin=False,
@@ -320,7 +320,7 @@ def test_verify_channel_permission_denied(client: TestClient, db_engine, monkeyp
 
 
 def test_verify_channel_success_creates_snapshot(client: TestClient, db_engine, monkeypatch) -> None:
-    async def fake_check_bot_permissions(_bot_api, _channel):
+    async def fake_check_bot_permissions(_bot_api, _channel, member_cache=None):
         return PermissionCheckResult(
             ok=True,
             is_admin=True,
@@ -389,7 +389,7 @@ def test_verify_channel_success_creates_snapshot(client: TestClient, db_engine,
 def test_verify_channel_resolves_stats_graph_async_before_persist(
     client: TestClient, db_engine, monkeypatch
 ) -> None:
-    async def fake_check_bot_permissions(_bot_api, _channel):
+    async def fake_check_bot_permissions(_bot_api, _channel, member_cache=None):
         return PermissionCheckResult(
             ok=True,
             is_admin=True,
@@ -455,7 +455,7 @@ def test_verify_channel_resolves_stats_graph_async_before_persist(
 def test_verify_channel_derives_premium_ratio_from_boosts_status(
     client: TestClient, db_engine, monkeypatch
 ) -> None:
-    async def fake_check_bot_permissions(_bot_api, _channel):
+    async def fake_check_bot_permissions(_bot_api, _channel, member_cache=None):
         return PermissionCheckResult(
             ok=True,
             is_admin=True,
@@ -521,7 +521,7 @@ def test_verify_channel_derives_premium_ratio_from_boosts_status(
 
 
 def test_verify_channel_boosts_failure_is_non_blocking(client: TestClient, db_engine, monkeypatch) -> None:
-    async def fake_check_bot_permissions(_bot_api, _channel):
+    async def fake_check_bot_permissions(_bot_api, _channel, member_cache=None):
         return PermissionCheckResult(
             ok=True,
             is_admin=True,
@@ -580,7 +580,7 @@ def test_verify_channel_boosts_failure_is_non_blocking(client: TestClient, db_en
 
 
 def test_verify_channel_serializes_bytes_in_raw_stats(client: TestClient, db_engine, monkeypatch) -> None:
-    async def fake_check_bot_permissions(_bot_api, _channel):
+    async def fake_check_bot_permissions(_bot_api, _channel, member_cache=None):
         return PermissionCheckResult(
             ok=True,
             is_admin=True,
@@ -656,7 +656,7 @@ def test_verify_channel_serializes_bytes_in_raw_stats(client: TestClient, db_eng
 
 
 def test_verify_channel_requires_membership(client: TestClient, db_engine, monkeypatch) -> None:
-    async def fake_check_bot_permissions(_bot_api, _channel):
+    async def fake_check_bot_permissions(_bot_api, _channel, member_cache=None):
         return PermissionCheckResult(
             ok=True,
             is_admin=True,
@@ -720,7 +720,7 @@ def test_verify_channel_telegram_failure_returns_502(client: TestClient, monkeyp
 def test_verify_channel_unauthorized_telethon_session_returns_502(
     client: TestClient, monkeypatch
 ) -> None:
-    async def fake_check_bot_permissions(_bot_api, _channel):
+    async def fake_check_bot_permissions(_bot_api, _channel, member_cache=None):
         return PermissionCheckResult(
             ok=True,
             is_admin=True,
@@ -761,7 +761,7 @@ def test_verify_channel_unauthorized_telethon_session_returns_502(
 def test_verify_channel_connect_failure_has_no_partial_persistence(
     client: TestClient, db_engine, monkeypatch
 ) -> None:
-    async def fake_check_bot_permissions(_bot_api, _channel):
+    async def fake_check_bot_permissions(_bot_api, _channel, member_cache=None):
         return PermissionCheckResult(
             ok=True,
             is_admin=True,
@@ -14,7 +14,14 @@ from app.models.listing_format import ListingFormat
 from app.models.user import User
 from app.services.deal_fsm import DealTransitionError
 from app.settings import Settings
-from app.worker.deal_posting import _post_due_deals
+from app.worker.deal_posting import (
+    ETA_HORIZON,
+    _post_deal,
+    _post_due_deals,
+    _queue_upcoming_posts,
+    post_deal,
+    schedule_deal_post,
+)
 from shared.db.base import SQLModel
 import app.services.deal_posting as deal_posting
 
@@ -350,3 +357,90 @@ def test_post_due_deals_prefixes_username_channel_ref(monkeypatch) -> None:
         assert bot_api.calls[0]["chat_id"] == "@ludex_channel"
 
     SQLModel.metadata.drop_all(engine)
+
+
+def test_post_deal_waits_for_start_and_posts_once(monkeypatch) -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    scheduled_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+    settings = Settings(_env_file=None)
+    monkeypatch.setattr(
+        deal_posting, "fetch_message_hash_sync", lambda **kwargs: "hash"
+    )
+    monkeypatch.setattr("app.worker.deal_posting.notify_deal_posted", lambda **kwargs: None)
+
+    with Session(engine) as session:
+        deal = _seed_deal(
+            session,
+            scheduled_at=scheduled_at,
+            placement_type="post",
+            media_type="image",
+            retention_hours=24,
+        )
+        bot_api = FakeBotApi()
+
+        def _post(now: datetime, trigger: str) -> bool:
+            return _post_deal(
+                db=session,
+                settings=settings,
+                deal_id=deal.id,
+                now=now,
+                bot_api=bot_api,
+                trigger=trigger,
+            )
+
+        # An early delivery does nothing.
+        assert _post(scheduled_at - timedelta(seconds=1), "eta") is False
+        assert _post(scheduled_at, "eta") is True
+        # The poller, or a redelivered task, arriving second finds the deal already posted.
+        assert _post(scheduled_at + timedelta(minutes=1), "poller") is False
+
+        updated = session.exec(select(Deal).where(Deal.id == deal.id)).one()
+        assert updated.state == DealState.POSTED.value
+        assert len(bot_api.calls) == 1
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_schedule_deal_post_leaves_starts_beyond_the_eta_horizon_to_the_poller(monkeypatch) -> None:
+    queued: list[dict] = []
+    monkeypatch.setattr(post_deal, "apply_async", lambda **kwargs: queued.append(kwargs))
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    schedule_deal_post(1, now + ETA_HORIZON, now=now)
+    schedule_deal_post(2, now + timedelta(days=3), now=now)
+
+    assert queued == [{"args": [1], "eta": now + ETA_HORIZON}]
+
+
+def test_queue_upcoming_posts_queues_deals_starting_before_the_next_runs() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    start = datetime(2026, 1, 3, 12, 0, tzinfo=timezone.utc)
+    scheduled: list[tuple[int, datetime]] = []
+
+    def schedule(deal_id, scheduled_at, *, now):
+        scheduled.append((deal_id, scheduled_at.replace(tzinfo=timezone.utc)))
+
+    with Session(engine) as session:
+        deal = _seed_deal(
+            session, scheduled_at=start, placement_type="post", media_type="image", retention_hours=24
+        )
+
+        # Days ahead, the poller leaves it alone; minutes ahead, it queues the ETA task.
+        assert _queue_upcoming_posts(db=session, now=start - timedelta(days=2), schedule_fn=schedule) == 0
+        assert _queue_upcoming_posts(db=session, now=start - timedelta(minutes=4), schedule_fn=schedule) == 1
+        # Once due, the deal is the poller's own to post.
+        assert _queue_upcoming_posts(db=session, now=start, schedule_fn=schedule) == 0
+
+    assert scheduled == [(deal.id, start)]
+    SQLModel.metadata.drop_all(engine)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.pool import StaticPool
 from sqlmodel import Session, select
 
@@ -13,12 +14,33 @@ from app.models.deal import Deal, DealSourceType, DealState
 from app.models.deal_escrow import DealEscrow
 from app.models.listing import Listing
 from app.models.listing_format import ListingFormat
+from app.models.ton_payout import TonPayout, TonPayoutKind, TonPayoutState
 from app.models.user import User
 from app.settings import Settings
-from app.worker.deal_verification import _verify_posted_deals
+from app.worker.deal_verification import (
+    _load_due_posted_deals,
+    _next_verification_at,
+    _settle_deals,
+    _verify_posted_deals,
+)
 from shared.db.base import SQLModel
 
 
+# Stands in for the shared Telethon client; the injected checks ignore it.
+_CLIENT = object()
+
+
+def _returning(value):
+    async def _check(client, **kwargs):
+        return value
+
+    return _check
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
 def _seed_posted_deal(
     session: Session,
     *,
@@ -26,14 +48,19 @@ def _seed_posted_deal(
     placement_type: str,
     exclusive_hours: int,
     retention_hours: int,
+    offset: int = 0,
 ) -> tuple[Deal, DealEscrow]:
-    advertiser = User(telegram_user_id=111, username="adv", ton_wallet_address="EQ_ADV")
-    owner = User(telegram_user_id=222, username="owner", ton_wallet_address="EQ_OWNER")
+    advertiser = User(
+        telegram_user_id=111 + 1000 * offset, username=f"adv{offset or ''}", ton_wallet_address="EQ_ADV"
+    )
+    owner = User(
+        telegram_user_id=222 + 1000 * offset, username=f"owner{offset or ''}", ton_wallet_address="EQ_OWNER"
+    )
     session.add(advertiser)
     session.add(owner)
     session.flush()
 
-    channel = Channel(username="channel", telegram_channel_id=123)
+    channel = Channel(username=f"channel{offset or ''}", telegram_channel_id=123 + offset)
     session.add(channel)
     session.flush()
 
@@ -76,12 +103,13 @@ def _seed_posted_deal(
     session.add(deal)
     session.flush()
 
+    deposit_address = f"0:{offset:064x}" if offset else "0:" + "22" * 32
     escrow = DealEscrow(
         deal_id=deal.id,
         state=EscrowState.FUNDED.value,
-        deposit_address="0:2222222222222222222222222222222222222222222222222222222222222222",
-        deposit_address_raw="0:2222222222222222222222222222222222222222222222222222222222222222",
-        subwallet_id=456,
+        deposit_address=deposit_address,
+        deposit_address_raw=deposit_address,
+        subwallet_id=456 + offset,
         escrow_network="testnet",
         expected_amount_ton=Decimal("10.00"),
         received_amount_ton=Decimal("10.00"),
@@ -114,9 +142,6 @@ def test_verify_posted_deals_releases_after_windows(monkeypatch) -> None:
         lambda **kwargs: notifications.append(1),
     )
 
-    def fake_transfer(**kwargs):
-        return "tx_release"
-
     with Session(engine) as session:
         deal, escrow = _seed_posted_deal(
             session,
@@ -129,8 +154,8 @@ def test_verify_posted_deals_releases_after_windows(monkeypatch) -> None:
             db=session,
             settings=settings,
             now=now,
-            fetch_hash_fn=lambda **kwargs: "hash",
-            transfer_fn=fake_transfer,
+            client=_CLIENT,
+            fetch_hash_fn=_returning("hash"),
         )
         assert processed == 1
 
@@ -139,10 +164,15 @@ def test_verify_posted_deals_releases_after_windows(monkeypatch) -> None:
             select(DealEscrow).where(DealEscrow.id == escrow.id)
         ).one()
 
+        payout = session.exec(select(TonPayout)).one()
         assert updated.state == DealState.RELEASED.value
-        assert updated_escrow.release_tx_hash == "tx_release"
+        assert payout.kind == TonPayoutKind.RELEASE.value
+        assert payout.amount_ton == Decimal("9.480000000")
+        assert payout.state == TonPayoutState.PENDING.value
+        assert updated_escrow.release_tx_hash is None
         assert updated_escrow.released_amount_ton == Decimal("9.480000000")
-        assert notifications == [1]
+        # Announced by the payout worker once the transfer is confirmed.
+        assert notifications == []
 
     SQLModel.metadata.drop_all(engine)
 
@@ -167,9 +197,6 @@ def test_verify_posted_deals_refunds_when_missing_before_retention(monkeypatch)
         lambda **kwargs: notifications.append(1),
     )
 
-    def fake_transfer(**kwargs):
-        return "tx_refund"
-
     with Session(engine) as session:
         deal, escrow = _seed_posted_deal(
             session,
@@ -182,8 +209,8 @@ def test_verify_posted_deals_refunds_when_missing_before_retention(monkeypatch)
             db=session,
             settings=settings,
             now=now,
-            fetch_hash_fn=lambda **kwargs: None,
-            transfer_fn=fake_transfer,
+            client=_CLIENT,
+            fetch_hash_fn=_returning(None),
         )
         assert processed == 1
 
@@ -192,10 +219,13 @@ def test_verify_posted_deals_refunds_when_missing_before_retention(monkeypatch)
             select(DealEscrow).where(DealEscrow.id == escrow.id)
         ).one()
 
+        payout = session.exec(select(TonPayout)).one()
         assert updated.state == DealState.REFUNDED.value
-        assert updated_escrow.refund_tx_hash == "tx_refund"
+        assert payout.kind == TonPayoutKind.REFUND.value
+        assert payout.reason == "missing_content"
+        assert updated_escrow.refund_tx_hash is None
         assert updated_escrow.refunded_amount_ton == Decimal("9.980000000")
-        assert notifications == [1]
+        assert notifications == []
 
     SQLModel.metadata.drop_all(engine)
 
@@ -215,9 +245,6 @@ def test_verify_posted_deals_refunds_on_post_exclusivity_breach() -> None:
     )
     now = datetime.now(timezone.utc)
 
-    def fake_transfer(**kwargs):
-        return "tx_refund"
-
     with Session(engine) as session:
         deal, _ = _seed_posted_deal(
             session,
@@ -230,9 +257,9 @@ def test_verify_posted_deals_refunds_on_post_exclusivity_breach() -> None:
             db=session,
             settings=settings,
             now=now,
-            fetch_hash_fn=lambda **kwargs: "hash",
-            has_post_breach_fn=lambda **kwargs: True,
-            transfer_fn=fake_transfer,
+            client=_CLIENT,
+            fetch_hash_fn=_returning("hash"),
+            has_post_breach_fn=_returning(True),
         )
         assert processed == 1
 
@@ -242,7 +269,7 @@ def test_verify_posted_deals_refunds_on_post_exclusivity_breach() -> None:
     SQLModel.metadata.drop_all(engine)
 
 
-def test_verify_posted_deals_refunds_on_story_exclusivity_breach() -> None:
+def test_verify_posted_deals_finds_a_breach_once_the_exclusivity_window_has_closed() -> None:
     engine = create_engine(
         "sqlite://",
         connect_args={"check_same_thread": False},
@@ -256,9 +283,77 @@ def test_verify_posted_deals_refunds_on_story_exclusivity_breach() -> None:
         TON_REFUND_NETWORK_FEE=Decimal("0.02"),
     )
     now = datetime.now(timezone.utc)
+    windows: list[tuple[datetime, datetime]] = []
+
+    async def _breach(client, *, start_at, end_at, **kwargs) -> bool:
+        windows.append((start_at, end_at))
+        return True
+
+    with Session(engine) as session:
+        deal, _ = _seed_posted_deal(
+            session,
+            posted_at=now - timedelta(hours=2),
+            placement_type="post",
+            exclusive_hours=1,
+            retention_hours=24,
+        )
+        processed = _verify_posted_deals(
+            db=session,
+            settings=settings,
+            now=now,
+            client=_CLIENT,
+            fetch_hash_fn=_returning("hash"),
+            has_post_breach_fn=_breach,
+        )
+        assert processed == 1
+
+        updated = session.exec(select(Deal).where(Deal.id == deal.id)).one()
+        assert updated.state == DealState.REFUNDED.value
+        posted_at = now - timedelta(hours=2)
+        assert [(_as_utc(start), _as_utc(end)) for start, end in windows] == [
+            (posted_at, posted_at + timedelta(hours=1))
+        ]
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_next_verification_follows_the_deadlines_with_sparse_spot_checks() -> None:
+    settings = Settings(
+        _env_file=None,
+        VERIFICATION_SPOT_CHECK_INTERVAL_SECONDS=6 * 3600,
+        VERIFICATION_RETRY_INTERVAL_SECONDS=300,
+    )
+    posted_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    deal = Deal(posted_at=posted_at, exclusive_hours=1, retention_hours=24)
+
+    def next_after(hours: float) -> datetime:
+        return _next_verification_at(deal, now=posted_at + timedelta(hours=hours), settings=settings)
+
+    # Exclusivity end, then spot checks, then just before and at the end of retention.
+    assert next_after(0) == posted_at + timedelta(hours=1)
+    assert next_after(1) == posted_at + timedelta(hours=7)
+    assert next_after(19) == posted_at + timedelta(hours=24) - timedelta(minutes=2)
+    assert _next_verification_at(
+        deal, now=posted_at + timedelta(hours=24, minutes=-2), settings=settings
+    ) == posted_at + timedelta(hours=24)
+    # A deal past its deadline that did not settle is retried soon.
+    assert next_after(24) == posted_at + timedelta(hours=24, minutes=5)
+
+
+def test_verify_posted_deals_refunds_on_story_exclusivity_breach() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
 
-    def fake_transfer(**kwargs):
-        return "tx_refund"
+    settings = Settings(
+        _env_file=None,
+        TON_FEE_PERCENT=Decimal("5.0"),
+        TON_REFUND_NETWORK_FEE=Decimal("0.02"),
+    )
+    now = datetime.now(timezone.utc)
 
     with Session(engine) as session:
         deal, _ = _seed_posted_deal(
@@ -272,9 +367,9 @@ def test_verify_posted_deals_refunds_on_story_exclusivity_breach() -> None:
             db=session,
             settings=settings,
             now=now,
-            fetch_story_hash_fn=lambda **kwargs: "hash",
-            has_story_breach_fn=lambda **kwargs: True,
-            transfer_fn=fake_transfer,
+            client=_CLIENT,
+            fetch_story_hash_fn=_returning("hash"),
+            has_story_breach_fn=_returning(True),
         )
         assert processed == 1
 
@@ -282,3 +377,264 @@ def test_verify_posted_deals_refunds_on_story_exclusivity_breach() -> None:
         assert updated.state == DealState.REFUNDED.value
 
     SQLModel.metadata.drop_all(engine)
+
+
+def test_verify_posted_deals_reads_a_constant_number_of_queries() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    settings = Settings(_env_file=None, TON_FEE_PERCENT=Decimal("5.0"))
+    now = datetime.now(timezone.utc)
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    def _run_with(session: Session, deals: int) -> int:
+        for offset in range(len(session.exec(select(Deal)).all()), deals):
+            _seed_posted_deal(
+                session,
+                posted_at=now - timedelta(hours=1),
+                placement_type="post",
+                exclusive_hours=2,
+                retention_hours=24,
+                offset=offset,
+            )
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            processed = _verify_posted_deals(
+                db=session,
+                settings=settings,
+                now=now,
+                client=_CLIENT,
+                fetch_hash_fn=_returning("hash"),
+                has_post_breach_fn=_returning(False),
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+        assert processed == 0
+        return len(statements)
+
+    with Session(engine) as session:
+        assert _run_with(session, 1) == _run_with(session, 5)
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_verify_posted_deals_checks_only_due_deals_in_deadline_order() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    settings = Settings(
+        _env_file=None,
+        TON_FEE_PERCENT=Decimal("5.0"),
+        VERIFICATION_SPOT_CHECK_INTERVAL_SECONDS=3600,
+        VERIFICATION_BATCH_SIZE=2,
+    )
+    now = datetime.now(timezone.utc)
+    checked: list[str] = []
+
+    async def _fetch_hash(client, *, channel, **kwargs) -> str:
+        checked.append(channel)
+        return "hash"
+
+    with Session(engine) as session:
+        deals = []
+        for offset, (next_at, retention_hours) in enumerate(
+            [
+                (now - timedelta(minutes=1), 24),
+                (now + timedelta(minutes=1), 24),
+                (now - timedelta(minutes=5), 24),
+                # Retention ends before the next spot check is due.
+                (now - timedelta(minutes=3), 2),
+            ]
+        ):
+            deal, _ = _seed_posted_deal(
+                session,
+                posted_at=now - timedelta(hours=2) + timedelta(minutes=2),
+                placement_type="post",
+                exclusive_hours=0,
+                retention_hours=retention_hours,
+                offset=offset,
+            )
+            deal.next_verification_at = next_at
+            session.add(deal)
+            deals.append(deal)
+        session.commit()
+
+        processed = _verify_posted_deals(
+            db=session,
+            settings=settings,
+            now=now,
+            client=_CLIENT,
+            fetch_hash_fn=_fetch_hash,
+        )
+        assert processed == 0
+        # Oldest due first, capped by the batch size; the deal not yet due is skipped.
+        assert checked == [123 + 2, 123 + 3]
+
+        session.expire_all()
+        rescheduled = {deal.id: _as_utc(deal.next_verification_at) for deal in session.exec(select(Deal))}
+        assert rescheduled[deals[2].id] == now + timedelta(hours=1)
+        assert rescheduled[deals[3].id] == now + timedelta(minutes=2)
+        assert rescheduled[deals[0].id] == _as_utc(now - timedelta(minutes=1))
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_verify_posted_deals_checks_channels_concurrently_and_deals_of_a_channel_in_turn() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    settings = Settings(
+        _env_file=None,
+        TON_FEE_PERCENT=Decimal("5.0"),
+        VERIFICATION_CHANNEL_CONCURRENCY=2,
+    )
+    now = datetime.now(timezone.utc)
+    in_flight: dict[object, int] = {}
+    peaks = {"total": 0, "per_channel": 0}
+
+    async def _fetch_hash(client, *, channel, **kwargs) -> str:
+        in_flight[channel] = in_flight.get(channel, 0) + 1
+        peaks["total"] = max(peaks["total"], sum(in_flight.values()))
+        peaks["per_channel"] = max(peaks["per_channel"], in_flight[channel])
+        await asyncio.sleep(0.01)
+        in_flight[channel] -= 1
+        return "hash"
+
+    with Session(engine) as session:
+        for offset in range(3):
+            deal, _ = _seed_posted_deal(
+                session,
+                posted_at=now - timedelta(hours=1),
+                placement_type="post",
+                exclusive_hours=0,
+                retention_hours=24,
+                offset=offset,
+            )
+            # A second deal in the same channel.
+            second = Deal.model_validate(
+                deal.model_dump(exclude={"id", "created_at", "updated_at", "next_verification_at"})
+            )
+            session.add(second)
+        session.commit()
+
+        processed = _verify_posted_deals(
+            db=session,
+            settings=settings,
+            now=now,
+            client=_CLIENT,
+            fetch_hash_fn=_fetch_hash,
+        )
+        assert processed == 0
+        assert len(session.exec(select(Deal)).all()) == 6
+
+    assert peaks == {"total": 2, "per_channel": 1}
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_verify_posted_deals_keeps_other_channels_when_one_deal_fails() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    settings = Settings(
+        _env_file=None,
+        TON_FEE_PERCENT=Decimal("5.0"),
+        TON_REFUND_NETWORK_FEE=Decimal("0.02"),
+        VERIFICATION_RETRY_INTERVAL_SECONDS=300,
+    )
+    now = datetime.now(timezone.utc)
+
+    with Session(engine) as session:
+        broken, _ = _seed_posted_deal(
+            session,
+            posted_at=now - timedelta(hours=3),
+            placement_type="post",
+            exclusive_hours=1,
+            retention_hours=2,
+        )
+        broken.posted_message_id = "not-a-number"
+        session.add(broken)
+        healthy, _ = _seed_posted_deal(
+            session,
+            posted_at=now - timedelta(hours=3),
+            placement_type="post",
+            exclusive_hours=1,
+            retention_hours=2,
+            offset=1,
+        )
+        session.commit()
+
+        processed = _verify_posted_deals(
+            db=session,
+            settings=settings,
+            now=now,
+            client=_CLIENT,
+            fetch_hash_fn=_returning("hash"),
+        )
+
+        assert processed == 1
+        session.expire_all()
+        assert session.get(Deal, healthy.id).state == DealState.RELEASED.value
+        failed = session.get(Deal, broken.id)
+        assert failed.state == DealState.POSTED.value
+        # Past its deadline, so it is retried soon rather than at the next spot check.
+        assert _as_utc(failed.next_verification_at) == now + timedelta(seconds=300)
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_overlapping_runs_settle_a_deal_once() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    settings = Settings(
+        _env_file=None,
+        TON_FEE_PERCENT=Decimal("5.0"),
+        TON_REFUND_NETWORK_FEE=Decimal("0.02"),
+    )
+    now = datetime.now(timezone.utc)
+
+    with Session(engine) as session:
+        deal, _ = _seed_posted_deal(
+            session,
+            posted_at=now - timedelta(hours=3),
+            placement_type="post",
+            exclusive_hours=1,
+            retention_hours=2,
+        )
+        # Both runs found the deal due and checked it before either settled it.
+        targets = _load_due_posted_deals(session, now=now, limit=10)
+        session.rollback()
+
+        with Session(engine) as other:
+            assert _settle_deals(other, [(targets[0], None)], settings=settings, now=now) == 1
+        assert _settle_deals(session, [(targets[0], None)], settings=settings, now=now) == 0
+
+        session.expire_all()
+        assert session.get(Deal, deal.id).state == DealState.RELEASED.value
+        assert len(session.exec(select(TonPayout)).all()) == 1
+
+    SQLModel.metadata.drop_all(engine)
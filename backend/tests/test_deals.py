@@ -68,6 +68,34 @@ def stub_telegram_http(monkeypatch) -> None:
 
     monkeypatch.setattr(bot_api.httpx, "post", fake_post)
     monkeypatch.setattr(bot_api.httpx, "get", fake_get)
+    monkeypatch.setattr(bot_api.httpx, "stream", _fake_stream_factory(b"stub-bytes"))
+
+
+def _fake_stream_factory(content: bytes, content_type: str = "application/octet-stream", calls: list | None = None):
+    class DummyStreamResponse:
+        status_code = 200
+        headers = {"content-type": content_type}
+        text = "ok"
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info) -> None:
+            return None
+
+        def read(self) -> bytes:
+            return content
+
+        def iter_bytes(self, chunk_size: int):
+            for start in range(0, len(content), chunk_size):
+                yield content[start : start + chunk_size]
+
+    def fake_stream(method: str, url: str, **kwargs):
+        if calls is not None:
+            calls.append(url)
+        return DummyStreamResponse()
+
+    return fake_stream
 
 
 def build_init_data(payload: dict[str, str], bot_token: str = BOT_TOKEN) -> str:
@@ -93,7 +121,7 @@ def db_engine():
 
 
 @pytest.fixture
-def client(db_engine):
+def client(db_engine, tmp_path):
     def override_get_db():
         with Session(db_engine) as session:
             yield session
@@ -103,6 +131,7 @@ def client(db_engine):
             _env_file=None,
             TELEGRAM_BOT_TOKEN=BOT_TOKEN,
             TELEGRAM_MEDIA_CHANNEL_ID=123,
+            MEDIA_CACHE_DIR=str(tmp_path / "media-cache"),
         )
 
     app.dependency_overrides[get_db] = override_get_db
@@ -1005,17 +1034,10 @@ def test_proposal_media_preview_endpoint(client: TestClient, monkeypatch) -> Non
 
         return DummyResponse()
 
-    def fake_get(url: str):
-        class DummyResponse:
-            status_code = 200
-            content = b"image-bytes"
-            headers = {"content-type": "image/jpeg"}
-            text = "ok"
-
-        return DummyResponse()
-
     monkeypatch.setattr(bot_api.httpx, "post", fake_post)
-    monkeypatch.setattr(bot_api.httpx, "get", fake_get)
+    monkeypatch.setattr(
+        bot_api.httpx, "stream", _fake_stream_factory(b"image-bytes", "image/jpeg")
+    )
 
     deal_id = _create_listing_deal(client, advertiser_id=101, owner_id=202)
 
@@ -1027,3 +1049,46 @@ def test_proposal_media_preview_endpoint(client: TestClient, monkeypatch) -> Non
     assert response.status_code == 200
     assert response.content == b"image-bytes"
     assert response.headers["content-type"].startswith("image/jpeg")
+
+
+def test_proposal_media_preview_is_cached_and_supports_range(
+    client: TestClient, db_engine, monkeypatch
+) -> None:
+    downloads: list[str] = []
+    monkeypatch.setattr(
+        bot_api.httpx,
+        "stream",
+        _fake_stream_factory(b"0123456789", "video/mp4", calls=downloads),
+    )
+
+    deal_id = _create_listing_deal(client, advertiser_id=101, owner_id=202)
+    with Session(db_engine) as session:
+        deal = session.get(Deal, deal_id)
+        deal.creative_media_ref = "video-ref"
+        session.add(deal)
+        session.commit()
+
+    first = client.get(
+        f"/deals/{deal_id}/proposal/media",
+        params={"media_ref": "video-ref"},
+        headers=_auth_headers(101),
+    )
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    partial = client.get(
+        f"/deals/{deal_id}/proposal/media",
+        params={"media_ref": "video-ref"},
+        headers={**_auth_headers(202), "Range": "bytes=2-5"},
+    )
+    assert partial.status_code == 206
+    assert partial.content == b"2345"
+    assert partial.headers["content-range"] == "bytes 2-5/10"
+
+    not_modified = client.get(
+        f"/deals/{deal_id}/proposal/media",
+        params={"media_ref": "video-ref"},
+        headers={**_auth_headers(101), "If-None-Match": etag},
+    )
+    assert not_modified.status_code == 304
+    assert len(downloads) == 1
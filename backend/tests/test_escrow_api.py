@@ -139,7 +139,13 @@ def _seed_deal(db_engine) -> int:
 
 def test_escrow_init_idempotent(client, db_engine, monkeypatch) -> None:
     deal_id = _seed_deal(db_engine)
-    monkeypatch.setattr("app.api.routes.deals.resolve_deal_deposit_address", lambda **kwargs: _fake_deposit_details())
+    resolve_calls: list[int] = []
+
+    def _resolve(**kwargs):
+        resolve_calls.append(kwargs["deal_id"])
+        return _fake_deposit_details()
+
+    monkeypatch.setattr("app.api.routes.deals.resolve_deal_deposit_address", _resolve)
 
     response = client.post(f"/deals/{deal_id}/escrow/init", headers=_auth_headers(111))
     assert response.status_code == 200
@@ -151,6 +157,8 @@ def test_escrow_init_idempotent(client, db_engine, monkeypatch) -> None:
     payload_repeat = response_repeat.json()
     assert payload_repeat["deposit_address"] == TEST_DEPOSIT_ADDRESS
     assert payload_repeat["escrow_id"] == payload["escrow_id"]
+    # The stored address is reused without deriving it again.
+    assert resolve_calls == [deal_id]
 
     with Session(db_engine) as session:
         escrows = session.exec(select(DealEscrow).where(DealEscrow.deal_id == deal_id)).all()
@@ -235,6 +243,12 @@ def test_tonconnect_payload(client, db_engine, monkeypatch) -> None:
     assert payload["messages"][0]["address"] == TEST_DEPOSIT_ADDRESS
     assert payload["messages"][0]["amount"] == str(10 * 1_000_000_000)
 
+    with Session(db_engine) as session:
+        escrow = session.exec(select(DealEscrow).where(DealEscrow.deal_id == deal_id)).one()
+        # The watcher picks the escrow up on its next tick.
+        assert escrow.next_scan_at is not None
+        assert escrow.scan_activity_at == escrow.next_scan_at
+
 
 def test_escrow_status_endpoint(client, db_engine, monkeypatch) -> None:
     deal_id = _seed_deal(db_engine)
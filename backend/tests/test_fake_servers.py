@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from tonutils.exceptions import HTTPClientResponseError
+from tonutils.wallet import WalletV5R1
+from tonutils.wallet.messages import TransferMessage
+
+from app.services.rate_limit import InMemoryTokenBucket
+from app.services.ton.toncenter_client import PooledToncenterV3Client, TonCenterClient
+from app.services.ton.transfers import _delivered_message_indexes
+from benchmarks.fakes import bot_api, toncenter
+from benchmarks.fakes.faults import FaultProfile
+from shared.telegram.bot_api import BotApiService
+from shared.telegram.errors import TelegramRateLimitError
+
+_MNEMONIC = " ".join(["abandon"] * 23 + ["art"])
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_fake_toncenter_executes_wallet_transfer_and_reports_partial_delivery() -> None:
+    clock = FakeClock()
+    ledger = toncenter.FakeLedger(default_balance_nano=1_000_000_000, clock=clock)
+    http = TestClient(toncenter.create_app(ledger))
+    client = PooledToncenterV3Client(
+        TonCenterClient(
+            base_url="http://testserver/api/v3",
+            rps=100,
+            limiter=InMemoryTokenBucket(clock=clock),
+            transport=http._transport,
+        ),
+        is_testnet=True,
+        base_url="http://testserver",
+    )
+    wallet, _, _, _ = WalletV5R1.from_mnemonic(client, _MNEMONIC, 0)
+    wallet_raw = wallet.address.to_str(is_user_friendly=False)
+    messages = [("0:" + "11" * 32, Decimal("0.4")), ("0:" + "22" * 32, Decimal("5"))]
+
+    transfers = [TransferMessage(dest, float(amount)) for dest, amount in messages]
+
+    external_hash = asyncio.run(wallet.batch_transfer_messages(transfers, seqno=0))
+
+    # Nothing is visible before the next masterchain block.
+    assert http.get("/api/v3/transactions", params={"account": wallet_raw}).json()["transactions"] == []
+    clock.now += 2
+    [tx] = http.get("/api/v3/transactions", params={"account": wallet_raw}).json()["transactions"]
+    assert base64.b64decode(tx["in_msg"]["hash_norm"]).hex() == external_hash
+    # The confirm step finds it by message hash, however many transactions followed.
+    for _ in range(30):
+        ledger.credit(wallet_raw, 1)
+    clock.now += 2
+    found = http.get("/api/v3/transactionsByMessage", params={"msg_hash": external_hash}).json()
+    assert found["transactions"] == [tx]
+    # The second message exceeds the balance and is skipped under the ignore-errors send mode.
+    assert _delivered_message_indexes(tx, messages) == frozenset({0})
+    assert asyncio.run(WalletV5R1.get_seqno(client, wallet.address)) == 1
+
+    # A consumed seqno is refused, as the real wallet contract would.
+    with pytest.raises(HTTPClientResponseError):
+        asyncio.run(wallet.batch_transfer_messages([TransferMessage(messages[0][0], 0.1)], seqno=0))
+
+
+def test_fake_bot_api_throttles_sends_per_chat_in_telegram_envelope(monkeypatch) -> None:
+    http = TestClient(bot_api.create_app(bot_api.FakeBotState(chat_rps=1.0), FaultProfile()))
+    monkeypatch.setattr("shared.telegram.bot_api.httpx.post", http.post)
+
+    class _Settings:
+        TELEGRAM_BOT_TOKEN = "token"
+        TELEGRAM_BOT_API_URL = "http://testserver"
+
+    service = BotApiService(_Settings())
+
+    first = service.send_message(chat_id=42, text="hello")
+    assert first["result"]["message_id"] == 1
+    with pytest.raises(TelegramRateLimitError) as excinfo:
+        service.send_message(chat_id=42, text="again")
+    assert excinfo.value.retry_after >= 1
+    # Other chats have their own budget.
+    assert service.send_message(chat_id=43, text="hello")["ok"] is True
@@ -466,6 +466,35 @@ def test_upload_listing_creative_rejects_invalid_media_type(client: TestClient)
     assert response.json()["detail"] == "Invalid creative_media_type"
 
 
+def test_upload_listing_creative_rejects_oversized_upload(client: TestClient) -> None:
+    def override_small_limit() -> Settings:
+        return Settings(
+            _env_file=None,
+            TELEGRAM_BOT_TOKEN=BOT_TOKEN,
+            TELEGRAM_MEDIA_CHANNEL_ID=123,
+            MEDIA_UPLOAD_MAX_IMAGE_BYTES=8,
+        )
+
+    original = app.dependency_overrides.get(get_settings_dep)
+    app.dependency_overrides[get_settings_dep] = override_small_limit
+    try:
+        channel_id = _create_channel(client, owner_id=123, username="@ownerchannel")
+        listing_id = _create_listing(client, channel_id, owner_id=123)
+        _create_listing_format(client, listing_id, owner_id=123)
+        _activate_listing(client, listing_id, owner_id=123)
+
+        response = client.post(
+            f"/listings/{listing_id}/creative/upload",
+            files={"file": ("photo.jpg", b"\xff\xd8\xff" + b"x" * 32, "image/jpeg")},
+            headers=_auth_headers(456),
+        )
+    finally:
+        if original is not None:
+            app.dependency_overrides[get_settings_dep] = original
+
+    assert response.status_code == 413
+
+
 def test_upload_listing_creative_maps_telegram_failure_to_502(client: TestClient, monkeypatch) -> None:
     def fake_post(url: str, data: dict, files: dict):
         class DummyResponse:
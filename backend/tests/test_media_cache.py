@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import media_cache
+from app.services.media_cache import TelegramMediaCache
+from shared.telegram.errors import TelegramApiError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeBotApi:
+    def __init__(self, files: dict[str, bytes]) -> None:
+        self.files = files
+        self.get_file_calls: list[str] = []
+        self.downloads: list[str] = []
+        self.fail_downloads = False
+
+    def get_file_path(self, *, file_id: str) -> str:
+        self.get_file_calls.append(file_id)
+        return f"documents/{file_id}"
+
+    def stream_file_to(self, *, file_path: str, destination, chunk_size: int = 4) -> str | None:
+        self.downloads.append(file_path)
+        if self.fail_downloads:
+            raise TelegramApiError("Bot API file error 400: expired")
+        content = self.files[file_path.split("/", 1)[1]]
+        for start in range(0, len(content), chunk_size):
+            destination.write(content[start : start + chunk_size])
+        return "image/jpeg"
+
+
+def test_media_cache_serves_hits_from_disk(tmp_path) -> None:
+    bot_api = FakeBotApi({"a": b"aaaa-bytes"})
+    cache = TelegramMediaCache(tmp_path, max_bytes=1024, ttl_seconds=60)
+
+    first = cache.get_or_fetch(file_id="a", bot_api=bot_api)
+    second = cache.get_or_fetch(file_id="a", bot_api=bot_api)
+
+    assert first.path.read_bytes() == b"aaaa-bytes"
+    assert second.etag == first.etag
+    assert second.size == 10
+    assert bot_api.downloads == ["documents/a"]
+
+
+def test_media_cache_expires_entries_after_ttl(tmp_path) -> None:
+    clock = FakeClock()
+    bot_api = FakeBotApi({"a": b"aaaa"})
+    cache = TelegramMediaCache(tmp_path, max_bytes=1024, ttl_seconds=60, clock=clock)
+
+    cache.get_or_fetch(file_id="a", bot_api=bot_api)
+    clock.now += 61
+    cache.get_or_fetch(file_id="a", bot_api=bot_api)
+
+    assert len(bot_api.downloads) == 2
+    # The getFile path is still fresh and is reused for the re-download.
+    assert bot_api.get_file_calls == ["a"]
+
+
+def test_media_cache_evicts_least_recently_used(tmp_path) -> None:
+    clock = FakeClock()
+    bot_api = FakeBotApi({"a": b"a" * 6, "b": b"b" * 6, "c": b"c" * 6})
+    cache = TelegramMediaCache(tmp_path, max_bytes=12, ttl_seconds=3600, clock=clock)
+
+    cache.get_or_fetch(file_id="a", bot_api=bot_api)
+    clock.now += 1
+    cache.get_or_fetch(file_id="b", bot_api=bot_api)
+    clock.now += 1
+    cache.get_or_fetch(file_id="a", bot_api=bot_api)
+    clock.now += 1
+    cache.get_or_fetch(file_id="c", bot_api=bot_api)
+
+    cache.get_or_fetch(file_id="a", bot_api=bot_api)
+    cache.get_or_fetch(file_id="b", bot_api=bot_api)
+
+    assert bot_api.downloads == [
+        "documents/a",
+        "documents/b",
+        "documents/c",
+        "documents/b",
+    ]
+
+
+def test_media_cache_discards_partial_download_on_failure(tmp_path) -> None:
+    bot_api = FakeBotApi({"a": b"aaaa"})
+    bot_api.fail_downloads = True
+    cache = TelegramMediaCache(tmp_path, max_bytes=1024, ttl_seconds=60)
+
+    with pytest.raises(TelegramApiError):
+        cache.get_or_fetch(file_id="a", bot_api=bot_api)
+
+    assert list(tmp_path.iterdir()) == []
+    bot_api.fail_downloads = False
+    cache.get_or_fetch(file_id="a", bot_api=bot_api)
+    assert bot_api.get_file_calls == ["a", "a"]
+
+
+def test_media_cache_keeps_bounded_in_memory_state(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(media_cache, "MAX_FILE_PATHS", 2)
+    bot_api = FakeBotApi({"a": b"a", "b": b"b", "c": b"c"})
+    cache = TelegramMediaCache(tmp_path, max_bytes=1024, ttl_seconds=60)
+
+    for file_id in ("a", "b", "c"):
+        cache.get_or_fetch(file_id=file_id, bot_api=bot_api)
+
+    assert cache._key_locks == {}
+    assert list(cache._file_paths) == ["b", "c"]
+
+
+def test_media_cache_ignores_a_payload_its_sidecar_does_not_describe(tmp_path) -> None:
+    bot_api = FakeBotApi({"a": b"aaaa"})
+    cache = TelegramMediaCache(tmp_path, max_bytes=1024, ttl_seconds=60)
+    first = cache.get_or_fetch(file_id="a", bot_api=bot_api)
+
+    # A concurrent rewrite swapped the payload but has not written its sidecar yet.
+    replacement = tmp_path / "other.part"
+    replacement.write_bytes(b"bbbb")
+    replacement.replace(first.path)
+
+    second = cache.get_or_fetch(file_id="a", bot_api=bot_api)
+
+    assert len(bot_api.downloads) == 2
+    assert second.path.read_bytes() == b"aaaa"
+    assert second.etag == first.etag
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, select
+from starlette.datastructures import Headers
+
+from app.services.media_upload import (
+    InvalidMediaUpload,
+    MediaUploadTooLarge,
+    resolve_upload_media_type,
+    sniff_media_type,
+    send_creative_upload,
+)
+from app.models.media_asset import MediaAsset
+from app.settings import Settings
+from shared.db.base import SQLModel
+import shared.telegram.bot_api as bot_api
+
+JPEG_HEAD = b"\xff\xd8\xff\xe0\x00\x10JFIF"
+MP4_HEAD = b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00"
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    SQLModel.metadata.drop_all(engine)
+
+
+def _settings(**overrides) -> Settings:
+    return Settings(
+        _env_file=None,
+        TELEGRAM_BOT_TOKEN="token",
+        TELEGRAM_MEDIA_CHANNEL_ID=123,
+        **overrides,
+    )
+
+
+def _upload(content: bytes, content_type: str | None, filename: str = "creative.bin") -> UploadFile:
+    headers = Headers({"content-type": content_type}) if content_type else None
+    return UploadFile(file=io.BytesIO(content), filename=filename, headers=headers)
+
+
+@pytest.mark.parametrize(
+    ("head", "expected"),
+    [
+        (JPEG_HEAD, "image"),
+        (b"\x89PNG\r\n\x1a\n", "image"),
+        (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image"),
+        (b"\x00\x00\x00\x18ftypheic", "image"),
+        (MP4_HEAD, "video"),
+        (b"\x1a\x45\xdf\xa3\x01", "video"),
+        (b"plain text", None),
+    ],
+)
+def test_sniff_media_type(head: bytes, expected: str | None) -> None:
+    assert sniff_media_type(head) == expected
+
+
+def test_resolve_upload_prefers_sniffed_type_over_generic_content_type() -> None:
+    media_type, stream = resolve_upload_media_type(
+        _upload(MP4_HEAD + b"rest", "application/octet-stream"), _settings()
+    )
+
+    assert media_type == "video"
+    assert stream.tell() == 0
+
+
+def test_resolve_upload_rejects_mismatched_content_type() -> None:
+    with pytest.raises(InvalidMediaUpload, match="Invalid creative_media_type"):
+        resolve_upload_media_type(_upload(MP4_HEAD, "image/jpeg"), _settings())
+
+
+def test_resolve_upload_enforces_size_limit_before_reading_body() -> None:
+    upload = _upload(JPEG_HEAD + b"x" * 100, "image/jpeg")
+
+    with pytest.raises(MediaUploadTooLarge) as excinfo:
+        resolve_upload_media_type(upload, _settings(MEDIA_UPLOAD_MAX_IMAGE_BYTES=64))
+
+    assert excinfo.value.limit == 64
+
+
+def _fake_upload_post(calls: list[dict], file_id: str = "video-1"):
+    def fake_post(url: str, data: dict, files: dict):
+        calls.append(files)
+
+        class DummyResponse:
+            status_code = 200
+
+            def json(self) -> dict:
+                return {"ok": True, "result": {"video": {"file_id": file_id}}}
+
+        return DummyResponse()
+
+    return fake_post
+
+
+def test_send_creative_upload_streams_file_object(monkeypatch, db_session) -> None:
+    calls: list[dict] = []
+    monkeypatch.setattr(bot_api.httpx, "post", _fake_upload_post(calls))
+    upload = _upload(MP4_HEAD + b"frames", "video/mp4", filename="clip.mp4")
+
+    result = send_creative_upload(upload=upload, settings=_settings(), db=db_session)
+
+    assert result == {"file_id": "video-1", "media_type": "video"}
+    filename, content = calls[0]["video"]
+    assert filename == "clip.mp4"
+    assert content is upload.file
+    assert content.tell() == 0
+
+
+def test_send_creative_upload_reuses_known_asset(monkeypatch, db_session) -> None:
+    calls: list[dict] = []
+    monkeypatch.setattr(bot_api.httpx, "post", _fake_upload_post(calls))
+    body = MP4_HEAD + b"same-frames"
+
+    first = send_creative_upload(upload=_upload(body, "video/mp4"), settings=_settings(), db=db_session)
+    second = send_creative_upload(upload=_upload(body, "video/mp4"), settings=_settings(), db=db_session)
+    third = send_creative_upload(
+        upload=_upload(MP4_HEAD + b"other-frames", "video/mp4"), settings=_settings(), db=db_session
+    )
+
+    assert first == second == third == {"file_id": "video-1", "media_type": "video"}
+    assert len(calls) == 2
+    assets = db_session.exec(select(MediaAsset)).all()
+    assert [asset.size_bytes for asset in assets] == [len(body), len(MP4_HEAD) + 12]
+
+
+def _limited_app(max_body_bytes: int):
+    from fastapi import FastAPI, File
+    from fastapi.testclient import TestClient
+
+    from app.api.upload_limit import UploadSizeLimitMiddleware
+
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_body_bytes=max_body_bytes)
+    parsed: list[int] = []
+
+    @app.post("/deals/{deal_id}/creative/upload")
+    def upload(deal_id: int, file: UploadFile = File(...)) -> dict:
+        parsed.append(deal_id)
+        return {"size": file.size}
+
+    return TestClient(app), parsed
+
+
+def test_upload_limit_rejects_declared_oversized_body_before_parsing() -> None:
+    client, parsed = _limited_app(1024)
+
+    response = client.post(
+        "/deals/1/creative/upload", files={"file": ("a.jpg", JPEG_HEAD + b"x" * 2048, "image/jpeg")}
+    )
+
+    assert response.status_code == 413
+    assert parsed == []
+    assert client.post(
+        "/deals/1/creative/upload", files={"file": ("a.jpg", JPEG_HEAD, "image/jpeg")}
+    ).json() == {"size": len(JPEG_HEAD)}
+
+
+def test_upload_limit_cuts_off_streamed_body_without_length() -> None:
+    client, parsed = _limited_app(1024)
+
+    def chunks():
+        for _ in range(8):
+            yield b"x" * 512
+
+    response = client.post(
+        "/deals/1/creative/upload",
+        content=chunks(),
+        headers={"content-type": "multipart/form-data; boundary=b"},
+    )
+
+    assert response.status_code == 413
+    assert parsed == []
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from tonutils.wallet import WalletV5R1
+
+from app.services.ton import wallets
 from app.services.ton.addressing import to_raw_address, try_to_raw_address
 from app.services.ton.wallets import resolve_deal_deposit_address, subwallet_id_from_deal_id
 from app.settings import Settings
@@ -27,52 +30,60 @@ def test_try_to_raw_address_handles_blank_values() -> None:
     assert try_to_raw_address("invalid") is None
 
 
-def test_resolve_deal_deposit_address_applies_network_friendly_flags(monkeypatch) -> None:
-    class _FakeAddress:
-        def to_str(
-            self,
-            is_user_friendly: bool = True,
-            is_url_safe: bool = True,
-            is_bounceable: bool = True,
-            is_test_only: bool = False,
-        ) -> str:
-            if not is_user_friendly:
-                return RAW_ADDRESS
-            if is_test_only and not is_bounceable:
-                return TEST_NON_BOUNCE
-            if (not is_test_only) and (not is_bounceable):
-                return MAIN_NON_BOUNCE
-            return MAIN_BOUNCE
-
-    class _FakeWallet:
-        address = _FakeAddress()
+# A throwaway 24-word mnemonic; it never holds funds.
+TEST_MNEMONIC = (
+    "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon "
+    "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon "
+    "abandon abandon abandon art"
+)
 
-    monkeypatch.setattr(
-        "app.services.ton.wallets.WalletV5R1.from_mnemonic",
-        lambda *args, **kwargs: (_FakeWallet(), None, None, None),
-    )
 
-    settings_test = Settings(
+def _wallet_settings(network: str) -> Settings:
+    return Settings(
         _env_file=None,
         TON_ENABLED=True,
-        TON_NETWORK="testnet",
-        TON_HOT_WALLET_MNEMONIC="seed words",
+        TON_NETWORK=network,
+        TON_HOT_WALLET_MNEMONIC=TEST_MNEMONIC,
         TONCENTER_API="https://testnet.toncenter.com/api/v3/jsonRPC",
     )
-    details_test = resolve_deal_deposit_address(deal_id=5, settings=settings_test)
-    assert details_test.friendly == TEST_NON_BOUNCE
-    assert details_test.raw == RAW_ADDRESS
+
+
+def test_resolve_deal_deposit_address_applies_network_friendly_flags(monkeypatch) -> None:
+    monkeypatch.setattr(wallets, "_KEYPAIR_CACHE", {})
+
+    details_test = resolve_deal_deposit_address(deal_id=5, settings=_wallet_settings("testnet"))
+    assert details_test.friendly.startswith("0Q")
+    assert details_test.raw == to_raw_address(details_test.friendly)
     assert details_test.network == "testnet"
     assert details_test.subwallet_id == subwallet_id_from_deal_id(5)
 
-    settings_main = Settings(
-        _env_file=None,
-        TON_ENABLED=True,
-        TON_NETWORK="mainnet",
-        TON_HOT_WALLET_MNEMONIC="seed words",
-        TONCENTER_API="https://toncenter.com/api/v3/jsonRPC",
-    )
-    details_main = resolve_deal_deposit_address(deal_id=5, settings=settings_main)
-    assert details_main.friendly == MAIN_NON_BOUNCE
-    assert details_main.raw == RAW_ADDRESS
+    details_main = resolve_deal_deposit_address(deal_id=5, settings=_wallet_settings("mainnet"))
+    assert details_main.friendly.startswith("UQ")
+    assert details_main.raw == details_test.raw
     assert details_main.network == "mainnet"
+
+
+def test_resolve_deal_deposit_address_derives_keypair_once(monkeypatch) -> None:
+    monkeypatch.setattr(wallets, "_KEYPAIR_CACHE", {})
+    derivations: list[int] = []
+    original = WalletV5R1.from_mnemonic
+
+    def _counting_from_mnemonic(*args, **kwargs):
+        derivations.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(
+        "app.services.ton.wallets.WalletV5R1.from_mnemonic", _counting_from_mnemonic
+    )
+    settings = _wallet_settings("testnet")
+
+    first = resolve_deal_deposit_address(deal_id=5, settings=settings)
+    second = resolve_deal_deposit_address(deal_id=6, settings=settings)
+
+    assert derivations == [1]
+    assert first.raw != second.raw
+    # The cached public key yields the same address as a full per-call derivation.
+    expected_wallet, _, _, _ = original(
+        wallets._toncenter_client(settings), TEST_MNEMONIC, subwallet_id_from_deal_id(6)
+    )
+    assert second.raw == expected_wallet.address.to_str(is_user_friendly=False)
@@ -72,3 +72,116 @@ def test_find_incoming_tx_ignores_other_destinations(monkeypatch) -> None:
         None,
     )
     assert tx is None
+
+
+def test_find_incoming_txs_batch_groups_by_address(monkeypatch) -> None:
+    settings = Settings(
+        _env_file=None,
+        TON_ENABLED=True,
+        TONCENTER_API="https://testnet.toncenter.com/api/v3/jsonRPC",
+        TON_SCAN_BATCH_SIZE=2,
+        TON_SCAN_CONCURRENCY=1,
+    )
+    adapter = TonCenterAdapter(settings)
+
+    first = "0:" + "1" * 64
+    second = "0:" + "2" * 64
+    third = "0:" + "3" * 64
+    calls: list[dict] = []
+
+    def _fake_get(path, params=None):
+        calls.append(dict(params))
+        rows = [
+            {"hash": "a1", "lt": "5", "in_msg": {"destination": first, "value": "1000000000"}},
+            {"hash": "a2", "lt": "12", "in_msg": {"destination": first, "value": "2000000000"}},
+            {"hash": "b1", "lt": "7", "in_msg": {"destination": second, "value": "1000000000"}},
+            {"hash": "c1", "lt": "9", "in_msg": {"destination": third, "value": "1000000000"}},
+        ]
+        return {
+            "transactions": [
+                row for row in rows if row["in_msg"]["destination"] in params["account"]
+            ]
+        }
+
+    monkeypatch.setattr(adapter, "_get", _fake_get)
+
+    grouped = adapter.find_incoming_txs_batch({first: "10", second: None, third: "9"})
+
+    assert len(calls) == 2
+    assert calls[0]["account"] == [first, second]
+    assert "start_lt" not in calls[0]
+    assert calls[1]["account"] == [third]
+    assert calls[1]["start_lt"] == 10
+    assert [tx["hash"] for tx in grouped[first]] == ["a2"]
+    assert [tx["hash"] for tx in grouped[second]] == ["b1"]
+    assert grouped[third] == []
+
+
+def test_find_incoming_txs_batch_pages_and_skips_failed_batches(monkeypatch) -> None:
+    from app.services.ton import chain_scan
+    from app.services.ton.errors import TonConfigError
+
+    settings = Settings(
+        _env_file=None,
+        TON_ENABLED=True,
+        TONCENTER_API="https://testnet.toncenter.com/api/v3/jsonRPC",
+        TON_SCAN_BATCH_SIZE=1,
+        TON_SCAN_CONCURRENCY=2,
+    )
+    adapter = TonCenterAdapter(settings)
+    monkeypatch.setattr(chain_scan, "BATCH_PAGE_LIMIT", 2)
+
+    good = "0:" + "1" * 64
+    bad = "0:" + "2" * 64
+    rows = [
+        {"hash": f"t{lt}", "lt": str(lt), "in_msg": {"destination": good, "value": "1"}}
+        for lt in range(1, 6)
+    ]
+
+    def _fake_get(path, params=None):
+        if params["account"] == [bad]:
+            raise TonConfigError("TonCenter error 500: boom")
+        offset = params["offset"]
+        return {"transactions": rows[offset : offset + 2]}
+
+    monkeypatch.setattr(adapter, "_get", _fake_get)
+
+    grouped = adapter.find_incoming_txs_batch({good: None, bad: None})
+
+    assert [tx["hash"] for tx in grouped[good]] == ["t1", "t2", "t3", "t4", "t5"]
+    assert bad not in grouped
+
+
+def test_iter_incoming_txs_pages_forward_by_lt(monkeypatch) -> None:
+    from app.services.ton import chain_scan
+
+    settings = Settings(
+        _env_file=None,
+        TON_ENABLED=True,
+        TONCENTER_API="https://testnet.toncenter.com/api/v3/jsonRPC",
+    )
+    adapter = TonCenterAdapter(settings)
+    monkeypatch.setattr(chain_scan, "BATCH_PAGE_LIMIT", 2)
+
+    address = "0:" + "1" * 64
+    other = "0:" + "2" * 64
+    rows = [
+        {"hash": "t4", "lt": "4", "in_msg": {"destination": address, "value": "1"}},
+        {"hash": "t5", "lt": "5", "in_msg": {"destination": other, "value": "1"}},
+        {"hash": "t6", "lt": "6", "in_msg": {"destination": address, "value": "1"}},
+        {"hash": "t7", "lt": "7", "in_msg": {"destination": address, "value": "1"}},
+        {"hash": "t8", "lt": "8", "in_msg": {"destination": address, "value": "1"}},
+    ]
+    start_lts: list[int] = []
+
+    def _fake_get(path, params=None):
+        start_lts.append(params["start_lt"])
+        page = [row for row in rows if int(row["lt"]) >= params["start_lt"]]
+        return {"transactions": page[: params["limit"]]}
+
+    monkeypatch.setattr(adapter, "_get", _fake_get)
+
+    txs = list(adapter.iter_incoming_txs(address, Decimal("0"), "3"))
+
+    assert [tx["hash"] for tx in txs] == ["t4", "t6", "t7", "t8"]
+    assert start_lts == [4, 6, 8]
@@ -1,22 +1,39 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
+import httpx
 from sqlalchemy import create_engine
 from sqlalchemy.pool import StaticPool
-from sqlmodel import Session
+from sqlmodel import Session, select
 
 from app.domain.escrow_fsm import EscrowState
 from app.models.channel import Channel
 from app.models.deal import Deal, DealSourceType, DealState
+from app.models.bot_notification import BotNotification
 from app.models.deal_escrow import DealEscrow
 from app.models.listing import Listing
 from app.models.listing_format import ListingFormat
+from app.models.ton_payout import TonPayout, TonPayoutKind, TonPayoutState
 from app.models.user import User
 from app.services.ton.payouts import ensure_refund, refund_funds, release_funds
+from app.services.ton.transfers import BatchTransferResult, SubmittedTransfer, TonTransferError
 from app.settings import Settings
+from app.worker.ton_payouts import (
+    _confirm_submitted_payouts,
+    _submit_pending_payouts,
+    _sweep_funded_escrows,
+)
 from shared.db.base import SQLModel
 
+# A throwaway 24-word mnemonic; it never holds funds.
+TEST_MNEMONIC = (
+    "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon "
+    "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon "
+    "abandon abandon abandon art"
+)
+
 
 def _seed_deal_and_escrow(
     session: Session,
@@ -25,14 +42,19 @@ def _seed_deal_and_escrow(
     expected_amount: Decimal,
     received_amount: Decimal,
     subwallet_id: int,
+    user_id_offset: int = 0,
 ) -> tuple[Deal, DealEscrow, User, User]:
-    advertiser = User(telegram_user_id=111, username="adv", ton_wallet_address="EQ_ADV")
-    owner = User(telegram_user_id=222, username="owner", ton_wallet_address="EQ_OWNER")
+    advertiser = User(
+        telegram_user_id=111 + user_id_offset, username=f"adv{user_id_offset}", ton_wallet_address="EQ_ADV"
+    )
+    owner = User(
+        telegram_user_id=222 + user_id_offset, username=f"owner{user_id_offset}", ton_wallet_address="EQ_OWNER"
+    )
     session.add(advertiser)
     session.add(owner)
     session.flush()
 
-    channel = Channel(username="channel")
+    channel = Channel(username=f"channel{user_id_offset}")
     session.add(channel)
     session.flush()
 
@@ -71,11 +93,12 @@ def _seed_deal_and_escrow(
     session.add(deal)
     session.flush()
 
+    deposit_address = "0:" + format(int("1" * 64, 16) + user_id_offset, "064x")
     escrow = DealEscrow(
         deal_id=deal.id,
         state=EscrowState.FUNDED.value,
-        deposit_address="0:1111111111111111111111111111111111111111111111111111111111111111",
-        deposit_address_raw="0:1111111111111111111111111111111111111111111111111111111111111111",
+        deposit_address=deposit_address,
+        deposit_address_raw=deposit_address,
         subwallet_id=subwallet_id,
         escrow_network="testnet",
         expected_amount_ton=expected_amount,
@@ -89,7 +112,7 @@ def _seed_deal_and_escrow(
     return deal, escrow, advertiser, owner
 
 
-def test_release_uses_escrow_principal_and_subwallet() -> None:
+def test_release_queues_payout_and_worker_confirms_it_from_escrow_subwallet() -> None:
     engine = create_engine(
         "sqlite://",
         connect_args={"check_same_thread": False},
@@ -102,11 +125,20 @@ def test_release_uses_escrow_principal_and_subwallet() -> None:
         TON_FEE_PERCENT=Decimal("10.0"),
         TON_REFUND_NETWORK_FEE=Decimal("0.02"),
     )
-    calls: list[dict] = []
+    submissions: list[dict] = []
+
+    def fake_submit(**kwargs):
+        submissions.append(kwargs)
+        return SubmittedTransfer(
+            external_hash="ext_release",
+            source_address_raw="0:" + "7" * 64,
+            seqno=kwargs["seqno"],
+            valid_until=None,
+        )
 
-    def fake_transfer(**kwargs):
-        calls.append(kwargs)
-        return "tx_release"
+    def fake_confirm(**kwargs):
+        assert kwargs["external_hash"] == "ext_release"
+        return BatchTransferResult(tx_hash="tx_release", delivered=frozenset({0}))
 
     with Session(engine) as session:
         deal, escrow, _, owner = _seed_deal_and_escrow(
@@ -123,18 +155,104 @@ def test_release_uses_escrow_principal_and_subwallet() -> None:
             escrow=escrow,
             owner=owner,
             settings=settings,
-            transfer_fn=fake_transfer,
         )
         session.commit()
         session.refresh(deal)
         session.refresh(escrow)
 
-        assert result.tx_hash == "tx_release"
+        assert result.queued
         assert result.amount_ton == Decimal("5.380000000")
         assert deal.state == DealState.RELEASED.value
+        assert escrow.release_tx_hash is None
+        assert escrow.released_at is None
+
+        submitted = _submit_pending_payouts(
+            db=session,
+            settings=settings,
+            submit_fn=fake_submit,
+            seqno_fn=lambda **kwargs: 0,
+        )
+        assert submitted == 1
+        assert submissions[0]["source_subwallet_id"] == 777
+        assert submissions[0]["messages"] == [("EQ_OWNER", Decimal("5.380000000"))]
+        payout = session.exec(select(TonPayout)).one()
+        assert payout.state == TonPayoutState.SUBMITTED.value
+        assert payout.seqno == 0
+
+        confirmed = _confirm_submitted_payouts(
+            db=session,
+            settings=settings,
+            confirm_fn=fake_confirm,
+            seqno_fn=lambda **kwargs: 1,
+        )
+        session.refresh(escrow)
+
+        assert confirmed == 1
+        assert payout.state == TonPayoutState.SENT.value
+        assert escrow.release_tx_hash == "tx_release"
         assert escrow.released_amount_ton == Decimal("5.380000000")
-        assert calls[0]["source_subwallet_id"] == 777
-        assert calls[0]["amount_ton"] == Decimal("5.380000000")
+        assert escrow.released_at is not None
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_confirm_announces_each_transfer_with_its_outcome_and_keeps_failed_lookups_submitted() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    settings = Settings(
+        _env_file=None,
+        TON_FEE_PERCENT=Decimal("10.0"),
+        TON_REFUND_NETWORK_FEE=Decimal("0.02"),
+    )
+
+    def fake_submit(**kwargs):
+        return SubmittedTransfer(
+            external_hash=f"ext_{kwargs['source_subwallet_id']}",
+            source_address_raw="0:" + "7" * 64,
+            seqno=kwargs["seqno"],
+            valid_until=None,
+        )
+
+    def fake_confirm(**kwargs):
+        if kwargs["external_hash"] == "ext_778":
+            raise httpx.ConnectError("connection reset")
+        return BatchTransferResult(tx_hash="tx_777", delivered=frozenset({0}))
+
+    with Session(engine) as session:
+        for offset, subwallet_id in enumerate((777, 778)):
+            deal, escrow, _, owner = _seed_deal_and_escrow(
+                session,
+                deal_state=DealState.VERIFIED.value,
+                expected_amount=Decimal("10.00"),
+                received_amount=Decimal("10.00"),
+                subwallet_id=subwallet_id,
+                user_id_offset=offset,
+            )
+            release_funds(db=session, deal=deal, escrow=escrow, owner=owner, settings=settings)
+            session.commit()
+        assert _submit_pending_payouts(
+            db=session, settings=settings, submit_fn=fake_submit, seqno_fn=lambda **_: 0
+        ) == 2
+
+        confirmed = _confirm_submitted_payouts(
+            db=session, settings=settings, confirm_fn=fake_confirm, seqno_fn=lambda **_: 1
+        )
+        session.rollback()
+
+        assert confirmed == 1
+        sent, pending = session.exec(select(TonPayout).order_by(TonPayout.id)).all()
+        assert sent.state == TonPayoutState.SENT.value
+        # The failed lookup neither retries the transfer nor gives up its seqno.
+        assert pending.state == TonPayoutState.SUBMITTED.value
+        assert (pending.attempts, pending.seqno, pending.lease_until) == (0, 0, None)
+        notified = session.exec(select(BotNotification)).all()
+        assert {notification.event for notification in notified} == {"deal_released"}
+        assert len(notified) == 2
 
     SQLModel.metadata.drop_all(engine)
 
@@ -149,9 +267,6 @@ def test_refund_always_deducts_fee_and_records_zero_without_transfer() -> None:
 
     settings = Settings(_env_file=None, TON_REFUND_NETWORK_FEE=Decimal("0.02"))
 
-    def fail_transfer(**kwargs):
-        raise AssertionError("transfer should not be called")
-
     with Session(engine) as session:
         deal, escrow, advertiser, _ = _seed_deal_and_escrow(
             session,
@@ -167,7 +282,6 @@ def test_refund_always_deducts_fee_and_records_zero_without_transfer() -> None:
             escrow=escrow,
             advertiser=advertiser,
             settings=settings,
-            transfer_fn=fail_transfer,
         )
         session.commit()
         session.refresh(escrow)
@@ -185,8 +299,7 @@ def test_refund_always_deducts_fee_and_records_zero_without_transfer() -> None:
                 escrow=escrow,
                 advertiser=advertiser,
                 settings=settings,
-                transfer_fn=fail_transfer,
-            )
+                )
             is None
         )
 
@@ -207,9 +320,6 @@ def test_release_records_zero_without_transfer_when_fees_exceed_principal() -> N
         TON_REFUND_NETWORK_FEE=Decimal("0.02"),
     )
 
-    def fail_transfer(**kwargs):
-        raise AssertionError("transfer should not be called")
-
     with Session(engine) as session:
         deal, escrow, _, owner = _seed_deal_and_escrow(
             session,
@@ -225,7 +335,6 @@ def test_release_records_zero_without_transfer_when_fees_exceed_principal() -> N
             escrow=escrow,
             owner=owner,
             settings=settings,
-            transfer_fn=fail_transfer,
         )
         session.commit()
         session.refresh(deal)
@@ -239,3 +348,343 @@ def test_release_records_zero_without_transfer_when_fees_exceed_principal() -> N
         assert escrow.released_amount_ton == Decimal("0E-9")
 
     SQLModel.metadata.drop_all(engine)
+
+
+def test_batched_payouts_share_tx_hash_and_retry_skipped_messages() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    settings = Settings(
+        _env_file=None,
+        TON_FEE_PERCENT=Decimal("10.0"),
+        TON_REFUND_NETWORK_FEE=Decimal("0.02"),
+        TON_PAYOUT_MODE="batched",
+        TON_SETTLEMENT_SUBWALLET_ID=0,
+    )
+    submissions: list[dict] = []
+
+    def fake_submit(**kwargs):
+        submissions.append(kwargs)
+        return SubmittedTransfer(
+            external_hash="ext_batch",
+            source_address_raw="0:" + "5" * 64,
+            seqno=kwargs["seqno"],
+            valid_until=None,
+        )
+
+    def fake_confirm(**kwargs):
+        # The second message is skipped on chain, e.g. for lack of balance.
+        return BatchTransferResult(tx_hash="tx_batch", delivered=frozenset({0}))
+
+    with Session(engine) as session:
+        escrow_ids = []
+        for offset, subwallet_id in ((0, 701), (1000, 702)):
+            deal, escrow, _, owner = _seed_deal_and_escrow(
+                session,
+                deal_state=DealState.VERIFIED.value,
+                expected_amount=Decimal("10.00"),
+                received_amount=Decimal("10.00"),
+                subwallet_id=subwallet_id,
+                user_id_offset=offset,
+            )
+            release_funds(db=session, deal=deal, escrow=escrow, owner=owner, settings=settings)
+            escrow.swept_at = datetime.now(timezone.utc)
+            session.add(escrow)
+            session.commit()
+            escrow_ids.append(escrow.id)
+
+        submitted = _submit_pending_payouts(
+            db=session,
+            settings=settings,
+            submit_fn=fake_submit,
+            seqno_fn=lambda **kwargs: 4,
+        )
+
+        assert submitted == 2
+        assert len(submissions) == 1
+        assert submissions[0]["source_subwallet_id"] == 0
+        assert submissions[0]["seqno"] == 4
+        assert submissions[0]["messages"] == [
+            ("EQ_OWNER", Decimal("8.980000000")),
+            ("EQ_OWNER", Decimal("8.980000000")),
+        ]
+
+        confirmed = _confirm_submitted_payouts(
+            db=session,
+            settings=settings,
+            confirm_fn=fake_confirm,
+            seqno_fn=lambda **kwargs: 5,
+        )
+
+        assert confirmed == 1
+        first, second = (session.get(DealEscrow, escrow_id) for escrow_id in escrow_ids)
+        assert first.release_tx_hash == "tx_batch"
+        assert first.released_at is not None
+        assert second.release_tx_hash is None
+        assert second.released_at is None
+
+        payouts = session.exec(select(TonPayout).order_by(TonPayout.id)).all()
+        assert [payout.state for payout in payouts] == [
+            TonPayoutState.SENT.value,
+            TonPayoutState.PENDING.value,
+        ]
+        assert payouts[0].tx_hash == "tx_batch"
+        assert payouts[1].attempts == 1
+        assert payouts[1].seqno is None
+        assert "tx_batch" in payouts[1].last_error
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_payout_retries_reuse_seqno_until_the_wallet_moves_on() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    settings = Settings(
+        _env_file=None,
+        TON_FEE_PERCENT=Decimal("10.0"),
+        TON_REFUND_NETWORK_FEE=Decimal("0.02"),
+        TON_PAYOUT_CONFIRM_TIMEOUT_SECONDS=900,
+    )
+    wallet_seqno = [3]
+    submissions: list[int] = []
+
+    def flaky_submit(**kwargs):
+        submissions.append(kwargs["seqno"])
+        if len(submissions) == 1:
+            raise TonTransferError("connection reset")
+        return SubmittedTransfer(
+            external_hash=f"ext_{len(submissions)}",
+            source_address_raw="0:" + "7" * 64,
+            seqno=kwargs["seqno"],
+            valid_until=int(now.timestamp()) + 120,
+        )
+
+    # Queued rows take next_attempt_at from the database clock, which may tick past a bare now().
+    now = datetime.now(timezone.utc) + timedelta(minutes=1)
+    with Session(engine) as session:
+        deal, escrow, _, owner = _seed_deal_and_escrow(
+            session,
+            deal_state=DealState.VERIFIED.value,
+            expected_amount=Decimal("10.00"),
+            received_amount=Decimal("10.00"),
+            subwallet_id=777,
+        )
+        release_funds(db=session, deal=deal, escrow=escrow, owner=owner, settings=settings)
+        session.commit()
+
+        def submit(at: datetime) -> int:
+            return _submit_pending_payouts(
+                db=session,
+                settings=settings,
+                submit_fn=flaky_submit,
+                seqno_fn=lambda **kwargs: wallet_seqno[0],
+                now=at,
+            )
+
+        def confirm(at: datetime) -> int:
+            return _confirm_submitted_payouts(
+                db=session,
+                settings=settings,
+                confirm_fn=lambda **kwargs: None,
+                seqno_fn=lambda **kwargs: wallet_seqno[0],
+                now=at,
+            )
+
+        payout = session.exec(select(TonPayout)).one()
+        assert submit(now) == 0
+        assert payout.state == TonPayoutState.PENDING.value
+        assert payout.seqno == 3
+
+        later = now + timedelta(minutes=1)
+        assert submit(later) == 1
+        assert payout.state == TonPayoutState.SUBMITTED.value
+
+        # Not indexed yet and still valid: keep waiting.
+        assert confirm(later) == 0
+        assert payout.state == TonPayoutState.SUBMITTED.value
+
+        # Expired with the wallet still at our seqno: resubmit the same action.
+        expired = later + timedelta(minutes=2)
+        assert confirm(expired) == 0
+        assert payout.state == TonPayoutState.PENDING.value
+        assert submit(expired + timedelta(minutes=5)) == 1
+        assert submissions == [3, 3, 3]
+
+        # The wallet moved on without a matching transaction: stop and ask for reconciliation.
+        wallet_seqno[0] = 4
+        assert confirm(expired + timedelta(hours=1)) == 0
+        assert payout.state == TonPayoutState.FAILED.value
+        assert "reconcile" in payout.last_error
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_overlapping_submit_runs_leave_a_leased_wallet_alone() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    settings = Settings(
+        _env_file=None,
+        TON_FEE_PERCENT=Decimal("10.0"),
+        TON_REFUND_NETWORK_FEE=Decimal("0.02"),
+        TON_PAYOUT_MODE="batched",
+        TON_SETTLEMENT_SUBWALLET_ID=0,
+        TON_PAYOUT_BATCH_SIZE=2,
+    )
+    submissions: list[dict] = []
+    overlapping: list[int] = []
+
+    def submit(**kwargs):
+        submissions.append(kwargs)
+        return SubmittedTransfer(
+            external_hash=f"ext_{len(submissions)}",
+            source_address_raw="0:" + "5" * 64,
+            seqno=kwargs["seqno"],
+            valid_until=None,
+        )
+
+    def submit_with_overlapping_run(**kwargs):
+        # Another beat run starts while this one is broadcasting.
+        with Session(engine) as other:
+            overlapping.append(
+                _submit_pending_payouts(
+                    db=other, settings=settings, submit_fn=submit, seqno_fn=lambda **_: 4
+                )
+            )
+        return submit(**kwargs)
+
+    with Session(engine) as session:
+        for offset, subwallet_id in ((0, 701), (1000, 702), (2000, 703)):
+            deal, escrow, _, owner = _seed_deal_and_escrow(
+                session,
+                deal_state=DealState.VERIFIED.value,
+                expected_amount=Decimal("10.00"),
+                received_amount=Decimal("10.00"),
+                subwallet_id=subwallet_id,
+                user_id_offset=offset,
+            )
+            release_funds(db=session, deal=deal, escrow=escrow, owner=owner, settings=settings)
+            escrow.swept_at = datetime.now(timezone.utc)
+            session.add(escrow)
+            session.commit()
+
+        submitted = _submit_pending_payouts(
+            db=session,
+            settings=settings,
+            submit_fn=submit_with_overlapping_run,
+            seqno_fn=lambda **kwargs: 4,
+        )
+
+        # The third payout was free, but its wallet was leased by the first run.
+        assert submitted == 2
+        assert overlapping == [0]
+        assert len(submissions) == 1
+        payouts = session.exec(select(TonPayout).order_by(TonPayout.id)).all()
+        assert [payout.state for payout in payouts] == [
+            TonPayoutState.SUBMITTED.value,
+            TonPayoutState.SUBMITTED.value,
+            TonPayoutState.PENDING.value,
+        ]
+        assert all(payout.external_hash == "ext_1" for payout in payouts[:2])
+        assert all(payout.lease_until is None for payout in payouts)
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_batched_payouts_wait_for_the_sweep_to_be_confirmed() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    settings = Settings(
+        _env_file=None,
+        TON_FEE_PERCENT=Decimal("10.0"),
+        TON_REFUND_NETWORK_FEE=Decimal("0.02"),
+        TON_PAYOUT_MODE="batched",
+        TON_SETTLEMENT_SUBWALLET_ID=0,
+        TON_NETWORK="testnet",
+        TON_HOT_WALLET_MNEMONIC=TEST_MNEMONIC,
+        TONCENTER_API="https://testnet.toncenter.com/api/v3/jsonRPC",
+    )
+    submissions: list[dict] = []
+    confirmations: list[BatchTransferResult | None] = [None]
+
+    def fake_submit(**kwargs):
+        submissions.append(kwargs)
+        return SubmittedTransfer(
+            external_hash=f"ext_{len(submissions)}",
+            source_address_raw="0:" + "7" * 64,
+            seqno=kwargs["seqno"],
+            valid_until=None,
+        )
+
+    # Queued rows take next_attempt_at from the database clock, which may tick past a bare now().
+    now = datetime.now(timezone.utc) + timedelta(minutes=1)
+    with Session(engine) as session:
+        deal, escrow, _, owner = _seed_deal_and_escrow(
+            session,
+            deal_state=DealState.VERIFIED.value,
+            expected_amount=Decimal("10.00"),
+            received_amount=Decimal("10.00"),
+            subwallet_id=777,
+        )
+
+        assert _sweep_funded_escrows(db=session, settings=settings) == 1
+        release_funds(db=session, deal=deal, escrow=escrow, owner=owner, settings=settings)
+        session.commit()
+
+        def submit() -> int:
+            return _submit_pending_payouts(
+                db=session, settings=settings, submit_fn=fake_submit, seqno_fn=lambda **_: 0, now=now
+            )
+
+        def confirm() -> int:
+            return _confirm_submitted_payouts(
+                db=session,
+                settings=settings,
+                confirm_fn=lambda **_: confirmations[-1],
+                seqno_fn=lambda **_: 0,
+                now=now,
+            )
+
+        # Only the sweep leaves, from the escrow subwallet; the release waits for it.
+        assert submit() == 1
+        assert submissions[0]["source_subwallet_id"] == 777
+        assert submissions[0]["messages"][0][1] == Decimal("9.98")
+
+        # Submitted but not found on chain: the escrow is not swept yet.
+        assert confirm() == 0
+        assert submit() == 0
+        session.refresh(escrow)
+        assert escrow.swept_at is None
+
+        confirmations.append(BatchTransferResult(tx_hash="tx_sweep", delivered=frozenset({0})))
+        assert confirm() == 1
+        session.refresh(escrow)
+        assert escrow.sweep_tx_hash == "tx_sweep"
+        assert escrow.swept_at is not None
+
+        assert submit() == 1
+        assert submissions[1]["source_subwallet_id"] == 0
+        release = session.exec(
+            select(TonPayout).where(TonPayout.kind == TonPayoutKind.RELEASE.value)
+        ).one()
+        assert release.state == TonPayoutState.SUBMITTED.value
+
+    SQLModel.metadata.drop_all(engine)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Iterator
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session
+
+from app.domain.escrow_fsm import EscrowState
+from app.models.channel import Channel
+from app.models.deal import Deal, DealSourceType, DealState
+from app.models.deal_escrow import DealEscrow
+from app.models.listing import Listing
+from app.models.listing_format import ListingFormat
+from app.models.user import User
+from app.settings import Settings
+from app.worker.ton_stream import (
+    InMemoryTransactionStream,
+    MasterchainBlockStream,
+    WatchedAddresses,
+    consume_deposit_stream,
+)
+from app.worker.ton_watch import scan_escrow
+from shared.db.base import SQLModel
+
+WATCHED = "0:" + "1" * 64
+OTHER = "0:" + "2" * 64
+
+
+class FakeAdapter:
+    def __init__(self, txs: list[dict]) -> None:
+        self._txs = txs
+
+    def iter_incoming_txs(
+        self, address: str, min_amount: Decimal, since_lt: str | None
+    ) -> Iterator[dict]:
+        since_value = int(since_lt) if since_lt is not None else None
+        for tx in self._txs:
+            if tx["destination_raw"] == address and (since_value is None or int(tx["lt"]) > since_value):
+                yield tx
+
+    def get_confirmations(self, tx_hash: str) -> int:
+        return 0
+
+    def get_masterchain_seqno(self) -> int | None:
+        return None
+
+
+def _engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def _seed_escrow(session: Session, *, telegram_id: int, address: str) -> DealEscrow:
+    advertiser = User(telegram_user_id=telegram_id, username=f"adv{telegram_id}")
+    owner = User(telegram_user_id=telegram_id + 1, username=f"owner{telegram_id}")
+    channel = Channel(username=f"channel{telegram_id}")
+    session.add_all([advertiser, owner, channel])
+    session.flush()
+
+    listing = Listing(channel_id=channel.id, owner_id=owner.id, is_active=True)
+    session.add(listing)
+    session.flush()
+    listing_format = ListingFormat(
+        listing_id=listing.id,
+        placement_type="post",
+        exclusive_hours=1,
+        retention_hours=24,
+        price=Decimal("10.00"),
+    )
+    session.add(listing_format)
+    session.flush()
+
+    deal = Deal(
+        source_type=DealSourceType.LISTING.value,
+        advertiser_id=advertiser.id,
+        channel_id=channel.id,
+        channel_owner_id=owner.id,
+        listing_id=listing.id,
+        listing_format_id=listing_format.id,
+        price_ton=Decimal("10.00"),
+        ad_type="post",
+        placement_type="post",
+        exclusive_hours=1,
+        retention_hours=24,
+        creative_text="Hello",
+        creative_media_type="image",
+        creative_media_ref="ref",
+        state=DealState.CREATIVE_APPROVED.value,
+    )
+    session.add(deal)
+    session.flush()
+
+    escrow = DealEscrow(
+        deal_id=deal.id,
+        state=EscrowState.AWAITING_DEPOSIT.value,
+        deposit_address=address,
+        deposit_address_raw=address,
+        subwallet_id=telegram_id,
+        expected_amount_ton=Decimal("10.00"),
+        received_amount_ton=Decimal("0"),
+        fee_percent=Decimal("5.00"),
+    )
+    session.add(escrow)
+    session.commit()
+    session.refresh(escrow)
+    return escrow
+
+
+def test_stream_triggers_processing_for_watched_addresses() -> None:
+    engine = _engine()
+    with Session(engine) as session:
+        escrow_id = _seed_escrow(session, telegram_id=10, address=WATCHED).id
+
+    deposit = {"hash": "tx1", "lt": "7", "amount_ton": Decimal("10"), "destination_raw": WATCHED}
+    adapter = FakeAdapter([deposit])
+    settings = Settings(_env_file=None, TON_CONFIRMATIONS_REQUIRED=3)
+    stream = InMemoryTransactionStream(
+        [{"hash": "other", "destination_raw": OTHER}, deposit]
+    )
+    stream.stop()
+
+    triggered = consume_deposit_stream(
+        stream,
+        watched=WatchedAddresses(lambda: Session(engine), refresh_seconds=5),
+        process=lambda escrow_id: scan_escrow(
+            escrow_id,
+            adapter=adapter,
+            settings=settings,
+            session_factory=lambda: Session(engine),
+        ),
+    )
+
+    assert triggered == 1
+    with Session(engine) as session:
+        escrow = session.get(DealEscrow, escrow_id)
+        assert escrow.state == EscrowState.DEPOSIT_DETECTED.value
+        assert escrow.received_amount_ton == Decimal("10")
+
+
+def test_watched_addresses_reload_when_escrows_change() -> None:
+    engine = _engine()
+    now = [0.0]
+    watched = WatchedAddresses(lambda: Session(engine), refresh_seconds=5, clock=lambda: now[0])
+
+    with Session(engine) as session:
+        first_id = _seed_escrow(session, telegram_id=10, address=WATCHED).id
+    assert watched.lookup(WATCHED) == first_id
+    assert watched.lookup(OTHER) is None
+
+    with Session(engine) as session:
+        second_id = _seed_escrow(session, telegram_id=20, address=OTHER).id
+        escrow = session.get(DealEscrow, first_id)
+        escrow.state = EscrowState.FUNDED.value
+        session.add(escrow)
+        session.commit()
+
+    # Within the refresh window the cached map is served without touching the database.
+    assert watched.lookup(OTHER) is None
+    now[0] = 6.0
+    assert watched.lookup(OTHER) == second_id
+    assert watched.lookup(WATCHED) is None
+
+
+def test_masterchain_block_stream_follows_new_blocks() -> None:
+    class BlockAdapter:
+        def __init__(self) -> None:
+            self.heads = [5, 6]
+            self.blocks: list[int] = []
+
+        def get_masterchain_seqno(self) -> int | None:
+            return self.heads.pop(0) if len(self.heads) > 1 else self.heads[0]
+
+        def iter_block_incoming_txs(self, mc_seqno: int) -> Iterator[dict]:
+            self.blocks.append(mc_seqno)
+            yield {"hash": f"b{mc_seqno}", "destination_raw": WATCHED}
+
+    adapter = BlockAdapter()
+    stream = MasterchainBlockStream(adapter, poll_seconds=0, start_seqno=4)
+
+    seen: list[str] = []
+    for tx in stream:
+        seen.append(tx["hash"])
+        if len(seen) == 3:
+            stream.stop()
+
+    assert seen == ["b4", "b5", "b6"]
+    assert adapter.blocks == [4, 5, 6]
+
+
+def test_stream_keeps_consuming_after_transport_and_database_errors() -> None:
+    class FlakyAdapter:
+        def __init__(self) -> None:
+            self.head_failures = 1
+            self.block_failures = 1
+
+        def get_masterchain_seqno(self) -> int | None:
+            if self.head_failures:
+                self.head_failures -= 1
+                raise httpx.ConnectError("connection refused")
+            return 5
+
+        def iter_block_incoming_txs(self, mc_seqno: int) -> Iterator[dict]:
+            if mc_seqno == 5 and self.block_failures:
+                self.block_failures -= 1
+                raise httpx.ReadTimeout("timed out")
+            yield {"hash": f"b{mc_seqno}", "destination_raw": WATCHED}
+
+    class FixedAddresses:
+        def lookup(self, destination_raw: str | None) -> int | None:
+            return 1
+
+    stream = MasterchainBlockStream(FlakyAdapter(), poll_seconds=0, start_seqno=4)
+    processed: list[int] = []
+
+    def process(escrow_id: int) -> None:
+        processed.append(escrow_id)
+        if len(processed) == 1:
+            raise OperationalError("SELECT 1", {}, Exception("server closed the connection"))
+        stream.stop()
+
+    triggered = consume_deposit_stream(stream, watched=FixedAddresses(), process=process)
+
+    # Block 4 failed to process, block 5 failed to load once and was retried.
+    assert processed == [1, 1]
+    assert triggered == 1
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import base64
 from decimal import Decimal
 
+import httpx
 import pytest
 
-from app.services.ton.transfers import TonTransferError, _invoke_transfer, _seqno_override_for_wallet, send_ton_transfer
+from app.services.ton.transfers import (
+    TonTransferError,
+    _delivered_message_indexes,
+    _invoke_transfer,
+    _seqno_override_for_wallet,
+    send_ton_transfer,
+)
 from app.settings import Settings
 
 
@@ -209,3 +217,75 @@ def test_validate_onchain_transfer_execution_returns_chain_tx_hash_hex(monkeypat
     )
 
     assert result == tx_hash_hex
+
+
+def test_delivered_message_indexes_matches_out_msgs_by_destination_and_value() -> None:
+    first = "0:" + "a" * 64
+    second = "0:" + "b" * 64
+    tx = {
+        "out_msgs": [
+            {"destination": first.upper(), "value": "1500000000"},
+            {"destination": second, "value": "2000000000"},
+        ]
+    }
+
+    delivered = _delivered_message_indexes(
+        tx,
+        [
+            (first, Decimal("1.5")),
+            (first, Decimal("1.5")),
+            (second, Decimal("2")),
+            (second, Decimal("3")),
+        ],
+    )
+
+    assert delivered == frozenset({0, 2})
+
+
+def test_confirm_ton_transfer_finds_the_wallet_transaction_by_message_hash(monkeypatch) -> None:
+    from app.services.rate_limit import InMemoryTokenBucket
+    from app.services.ton.toncenter_client import TonCenterClient
+    from app.services.ton.transfers import confirm_ton_transfer
+
+    external_hash = "a" * 64
+    external_hash_b64 = base64.b64encode(bytes.fromhex(external_hash)).decode()
+    wallet_raw = "0:" + "7" * 64
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        executed = {
+            "account": wallet_raw.upper(),
+            "hash": "u7u7u7u7u7u7u7u7u7u7u7u7u7u7u7u7u7u7u7u7u7s=",
+            "in_msg": {"hash_norm": external_hash_b64},
+            "description": {"aborted": False, "action": {"msgs_created": 1, "skipped_actions": 0}},
+        }
+        # A lookalike on another account must not be taken for ours.
+        elsewhere = {**executed, "account": "0:" + "8" * 64, "hash": "other"}
+        return httpx.Response(200, json={"transactions": [elsewhere, executed]})
+
+    http = TonCenterClient(
+        base_url="https://toncenter.test/api/v3",
+        rps=100,
+        limiter=InMemoryTokenBucket(),
+        transport=httpx.MockTransport(handler),
+    )
+    monkeypatch.setattr("app.services.ton.transfers.get_toncenter_client", lambda settings: http)
+    settings = Settings(
+        _env_file=None,
+        TONCENTER_API="https://testnet.toncenter.com/api/v3/jsonRPC",
+    )
+
+    result = confirm_ton_transfer(
+        settings=settings,
+        source_address_raw=wallet_raw,
+        external_hash=external_hash,
+        messages=[("0:" + "1" * 64, Decimal("1"))],
+    )
+
+    assert result is not None
+    assert result.tx_hash == "b" * 64
+    [request] = requests
+    assert request.url.path == "/api/v3/transactionsByMessage"
+    assert request.url.params["msg_hash"] == external_hash_b64
+    assert request.url.params["direction"] == "in"
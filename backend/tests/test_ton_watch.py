@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from typing import Iterator
 
+import httpx
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.pool import StaticPool
@@ -13,12 +15,20 @@ from app.models.channel import Channel
 from app.models.deal import Deal, DealSourceType, DealState
 from app.models.deal_escrow import DealEscrow
 from app.models.deal_event import DealEvent
+from app.models.escrow_event import EscrowEvent
 from app.models.listing import Listing
 from app.models.listing_format import ListingFormat
 from app.models.user import User
 from app.services.deal_fsm import DealTransitionError
 from app.settings import Settings
-from app.worker.ton_watch import _process_escrow
+from app.worker.ton_watch import (
+    _claim_due_escrows,
+    _masterchain_height_once,
+    _next_scan_at,
+    _process_escrow,
+    _scan_due_escrows,
+    scan_escrow,
+)
 from shared.db.base import SQLModel
 
 
@@ -26,20 +36,27 @@ class FakeAdapter:
     def __init__(self, txs: list[dict]) -> None:
         self._txs = txs
         self.confirmations = 0
+        self.masterchain_seqno: int | None = None
+        self.masterchain_calls = 0
+        self.confirmation_calls = 0
 
-    def find_incoming_tx(
+    def iter_incoming_txs(
         self, address: str, min_amount: Decimal, since_lt: str | None
-    ) -> dict | None:
+    ) -> Iterator[dict]:
         since_value = int(since_lt) if since_lt is not None else None
         for tx in self._txs:
             lt_value = int(tx["lt"])
             if since_value is None or lt_value > since_value:
-                return tx
-        return None
+                yield tx
 
     def get_confirmations(self, tx_hash: str) -> int:
+        self.confirmation_calls += 1
         return self.confirmations
 
+    def get_masterchain_seqno(self) -> int | None:
+        self.masterchain_calls += 1
+        return self.masterchain_seqno
+
 
 def _seed_escrow(
     session: Session,
@@ -47,14 +64,15 @@ def _seed_escrow(
     scheduled_at: datetime | None = None,
     received_amount: Decimal = Decimal("0"),
     escrow_state: str = EscrowState.AWAITING_DEPOSIT.value,
+    offset: int = 0,
 ) -> DealEscrow:
-    advertiser = User(telegram_user_id=111, username="adv", ton_wallet_address="EQ_ADV")
-    owner = User(telegram_user_id=222, username="owner")
+    advertiser = User(telegram_user_id=111 + offset, username=f"adv{offset}", ton_wallet_address="EQ_ADV")
+    owner = User(telegram_user_id=222 + offset, username=f"owner{offset}")
     session.add(advertiser)
     session.add(owner)
     session.flush()
 
-    channel = Channel(username="channel")
+    channel = Channel(username=f"channel{offset}")
     session.add(channel)
     session.flush()
 
@@ -94,11 +112,12 @@ def _seed_escrow(
     session.add(deal)
     session.flush()
 
+    deposit_address = "0:" + format(int("1" * 64, 16) + offset, "064x")
     escrow = DealEscrow(
         deal_id=deal.id,
         state=escrow_state,
-        deposit_address="0:1111111111111111111111111111111111111111111111111111111111111111",
-        deposit_address_raw="0:1111111111111111111111111111111111111111111111111111111111111111",
+        deposit_address=deposit_address,
+        deposit_address_raw=deposit_address,
         subwallet_id=123,
         escrow_network="testnet",
         expected_amount_ton=Decimal("10.00"),
@@ -154,7 +173,7 @@ def test_watch_idempotent(monkeypatch) -> None:
         assert escrow.state == EscrowState.DEPOSIT_DETECTED.value
         assert escrow.received_amount_ton == Decimal("10")
 
-        adapter.confirmations = 3
+        adapter.masterchain_seqno = 13
         _process_escrow(db=session, escrow=escrow, adapter=adapter, settings=settings)
         session.commit()
         session.refresh(escrow)
@@ -169,6 +188,127 @@ def test_watch_idempotent(monkeypatch) -> None:
         session.commit()
         session.refresh(escrow)
         assert escrow.received_amount_ton == previous_amount
+        assert escrow.last_scanned_lt == 2
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_watch_uses_prefetched_transactions_without_adapter_lookup() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    class PrefetchOnlyAdapter(FakeAdapter):
+        def iter_incoming_txs(self, address, min_amount, since_lt):
+            raise AssertionError("prefetched escrows must not be scanned again")
+
+    adapter = PrefetchOnlyAdapter([])
+    settings = Settings(_env_file=None, TON_CONFIRMATIONS_REQUIRED=3)
+    prefetched = [
+        {"hash": "tx1", "lt": "1", "amount_ton": Decimal("4"), "utime": 1, "mc_block_seqno": 10},
+        {"hash": "tx2", "lt": "2", "amount_ton": Decimal("6"), "utime": 2, "mc_block_seqno": 11},
+    ]
+
+    with Session(engine) as session:
+        escrow = _seed_escrow(session)
+        _process_escrow(
+            db=session,
+            escrow=escrow,
+            adapter=adapter,
+            settings=settings,
+            incoming_txs=prefetched,
+        )
+        session.commit()
+        _process_escrow(
+            db=session,
+            escrow=escrow,
+            adapter=adapter,
+            settings=settings,
+            incoming_txs=prefetched,
+        )
+        session.commit()
+        session.refresh(escrow)
+
+        assert escrow.state == EscrowState.DEPOSIT_DETECTED.value
+        assert escrow.received_amount_ton == Decimal("10")
+        assert escrow.deposit_tx_hash == "tx2"
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_watch_counts_confirmations_from_stored_mc_seqno() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    txs = [
+        {"hash": "tx1", "lt": "1", "amount_ton": Decimal("4"), "utime": 1, "mc_block_seqno": 10},
+    ]
+    adapter = FakeAdapter(txs)
+    adapter.masterchain_seqno = 11
+    settings = Settings(_env_file=None, TON_CONFIRMATIONS_REQUIRED=3)
+    masterchain_height = _masterchain_height_once(adapter)
+
+    with Session(engine) as session:
+        escrow = _seed_escrow(session)
+        for _ in range(2):
+            _process_escrow(
+                db=session,
+                escrow=escrow,
+                adapter=adapter,
+                settings=settings,
+                masterchain_height=masterchain_height,
+            )
+            session.commit()
+        session.refresh(escrow)
+
+        assert escrow.deposit_mc_block_seqno == 10
+        assert escrow.deposit_confirmations == 2
+        assert adapter.masterchain_calls == 1
+        assert adapter.confirmation_calls == 0
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_watch_dedups_replayed_transactions_in_database() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+
+    txs = [
+        {"hash": "tx1", "lt": "1", "amount_ton": Decimal("4"), "utime": 1, "mc_block_seqno": 10},
+    ]
+    adapter = FakeAdapter(txs)
+    settings = Settings(_env_file=None, TON_CONFIRMATIONS_REQUIRED=3)
+
+    with Session(engine) as session:
+        escrow = _seed_escrow(session)
+        _process_escrow(db=session, escrow=escrow, adapter=adapter, settings=settings)
+        session.commit()
+
+        # A lost cursor replays history; the unique (escrow_id, tx_hash) index absorbs it.
+        escrow.last_scanned_lt = None
+        _process_escrow(db=session, escrow=escrow, adapter=adapter, settings=settings)
+        session.commit()
+        session.refresh(escrow)
+
+        events = session.exec(
+            select(EscrowEvent)
+            .where(EscrowEvent.escrow_id == escrow.id)
+            .where(EscrowEvent.event_type == "tx_seen")
+        ).all()
+        assert [event.tx_hash for event in events] == ["tx1"]
+        assert escrow.received_amount_ton == Decimal("4")
+        assert escrow.last_scanned_lt == 1
 
     SQLModel.metadata.drop_all(engine)
 
@@ -316,7 +456,7 @@ def test_watch_uses_fsm_transition_helpers(monkeypatch) -> None:
         },
     ]
     adapter = FakeAdapter(txs)
-    adapter.confirmations = 3
+    adapter.masterchain_seqno = 12
 
     def _boom(*args, **kwargs):
         raise DealTransitionError("blocked")
@@ -335,3 +475,261 @@ def test_watch_uses_fsm_transition_helpers(monkeypatch) -> None:
         assert refreshed.state == DealState.CREATIVE_APPROVED.value
 
     SQLModel.metadata.drop_all(engine)
+
+
+class BatchAdapter(FakeAdapter):
+    """Serves the same transactions to every address through the batched lookup."""
+
+    def find_incoming_txs_batch(self, since_lts, min_amount=Decimal("0")):
+        return {
+            address: list(self.iter_incoming_txs(address, min_amount, since_lt))
+            for address, since_lt in since_lts.items()
+        }
+
+
+def test_scan_claims_batches_and_skips_escrows_leased_by_another_run() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    settings = Settings(
+        _env_file=None,
+        TON_CONFIRMATIONS_REQUIRED=3,
+        TON_SCAN_CLAIM_BATCH_SIZE=1,
+        TON_SCAN_PROCESS_CONCURRENCY=1,
+    )
+
+    with Session(engine) as session:
+        escrow_ids = [_seed_escrow(session, offset=offset).id for offset in range(3)]
+        held = session.get(DealEscrow, escrow_ids[2])
+        held.scan_lease_until = now + timedelta(minutes=5)
+        session.add(held)
+        session.commit()
+
+    spawned: list[int] = []
+    processed = _scan_due_escrows(
+        adapter=BatchAdapter([]),
+        settings=settings,
+        session_factory=lambda: Session(engine),
+        clock=lambda: now,
+        spawn_helper=lambda: spawned.append(1),
+    )
+
+    assert processed == 2
+    # A full batch asks for one helper run, however many batches follow.
+    assert spawned == [1]
+    with Session(engine) as session:
+        leases = {
+            escrow.id: escrow.scan_lease_until.replace(tzinfo=timezone.utc)
+            for escrow in session.exec(select(DealEscrow)).all()
+        }
+    assert leases[escrow_ids[0]] == now
+    assert leases[escrow_ids[1]] == now
+    assert leases[escrow_ids[2]] == now + timedelta(minutes=5)
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_overlapping_scan_runs_record_each_deposit_once() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    settings = Settings(_env_file=None, TON_CONFIRMATIONS_REQUIRED=3, TON_SCAN_PROCESS_CONCURRENCY=1)
+    adapter = BatchAdapter(
+        [{"hash": "tx1", "lt": "1", "amount_ton": Decimal("10"), "utime": 1, "mc_block_seqno": 10}]
+    )
+    adapter.masterchain_seqno = 10
+
+    with Session(engine) as session:
+        escrow_id = _seed_escrow(session).id
+        # Another run holds the escrow, so a run starting now finds nothing to claim.
+        _claim_due_escrows(session, run_started_at=now, lease_until=now + timedelta(minutes=5), limit=10)
+        session.commit()
+
+    overlapping = _scan_due_escrows(
+        adapter=adapter,
+        settings=settings,
+        session_factory=lambda: Session(engine),
+        clock=lambda: now + timedelta(seconds=30),
+    )
+    later = _scan_due_escrows(
+        adapter=adapter,
+        settings=settings,
+        session_factory=lambda: Session(engine),
+        clock=lambda: now + timedelta(minutes=6),
+    )
+
+    assert overlapping == 0
+    assert later == 1
+    with Session(engine) as session:
+        escrow = session.get(DealEscrow, escrow_id)
+        seen = session.exec(
+            select(EscrowEvent).where(EscrowEvent.escrow_id == escrow_id, EscrowEvent.event_type == "tx_seen")
+        ).all()
+        assert len(seen) == 1
+        assert escrow.received_amount_ton == Decimal("10")
+        assert escrow.state == EscrowState.DEPOSIT_DETECTED.value
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_scan_releases_an_escrow_whose_lookup_hits_a_network_error() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    settings = Settings(_env_file=None, TON_SCAN_CLAIM_BATCH_SIZE=1, TON_SCAN_PROCESS_CONCURRENCY=1)
+
+    with Session(engine) as session:
+        failing = _seed_escrow(session, offset=0)
+        healthy_id = _seed_escrow(session, offset=1).id
+        failing_id, failing_address = failing.id, failing.deposit_address_raw
+
+    class FlakyAdapter(FakeAdapter):
+        def find_incoming_txs_batch(self, since_lts, min_amount=Decimal("0")):
+            raise httpx.ConnectError("connection refused")
+
+        def iter_incoming_txs(self, address, min_amount, since_lt):
+            if address == failing_address:
+                raise httpx.ConnectError("connection refused")
+            return super().iter_incoming_txs(address, min_amount, since_lt)
+
+    processed = _scan_due_escrows(
+        adapter=FlakyAdapter([]),
+        settings=settings,
+        session_factory=lambda: Session(engine),
+        clock=lambda: now,
+    )
+
+    # The later batch is still claimed, and the failed escrow does not sit out its lease.
+    assert processed == 1
+    with Session(engine) as session:
+        failing = session.get(DealEscrow, failing_id)
+        healthy = session.get(DealEscrow, healthy_id)
+        assert failing.scan_lease_until.replace(tzinfo=timezone.utc) == now
+        assert failing.next_scan_at is not None
+        assert healthy.scan_lease_until.replace(tzinfo=timezone.utc) == now
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_next_scan_backs_off_while_idle_and_stays_fast_after_a_deposit() -> None:
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    settings = Settings(
+        _env_file=None,
+        TON_SCAN_MIN_INTERVAL_SECONDS=5,
+        TON_SCAN_MAX_INTERVAL_SECONDS=900,
+    )
+
+    def escrow(state: str, *, active_for: timedelta) -> DealEscrow:
+        return DealEscrow(
+            deal_id=1,
+            state=state,
+            subwallet_id=1,
+            fee_percent=Decimal("5"),
+            scan_activity_at=now - active_for,
+        )
+
+    awaiting = EscrowState.AWAITING_DEPOSIT.value
+    assert _next_scan_at(escrow(awaiting, active_for=timedelta(seconds=3)), now=now, settings=settings) == (
+        now + timedelta(seconds=5)
+    )
+    assert _next_scan_at(escrow(awaiting, active_for=timedelta(minutes=4)), now=now, settings=settings) == (
+        now + timedelta(minutes=2)
+    )
+    assert _next_scan_at(escrow(awaiting, active_for=timedelta(days=3)), now=now, settings=settings) == (
+        now + timedelta(seconds=900)
+    )
+    detected = escrow(EscrowState.DEPOSIT_DETECTED.value, active_for=timedelta(days=3))
+    assert _next_scan_at(detected, now=now, settings=settings) == now + timedelta(seconds=5)
+    funded = escrow(EscrowState.FUNDED.value, active_for=timedelta(0))
+    assert _next_scan_at(funded, now=now, settings=settings) is None
+
+
+def test_scan_only_claims_escrows_that_are_due() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    settings = Settings(_env_file=None, TON_SCAN_PROCESS_CONCURRENCY=1)
+
+    with Session(engine) as session:
+        due_id = _seed_escrow(session, offset=0).id
+        idle = _seed_escrow(session, offset=1)
+        idle.next_scan_at = now + timedelta(minutes=10)
+        session.add(idle)
+        session.commit()
+        idle_id = idle.id
+        due = session.get(DealEscrow, due_id)
+        due.scan_activity_at = now - timedelta(hours=1)
+        session.add(due)
+        session.commit()
+
+    processed = _scan_due_escrows(
+        adapter=BatchAdapter([]),
+        settings=settings,
+        session_factory=lambda: Session(engine),
+        clock=lambda: now,
+    )
+
+    assert processed == 1
+    with Session(engine) as session:
+        due = session.get(DealEscrow, due_id)
+        idle = session.get(DealEscrow, idle_id)
+        assert due.next_scan_at.replace(tzinfo=timezone.utc) == now + timedelta(minutes=15)
+        assert idle.scan_lease_until is None
+        assert idle.next_scan_at.replace(tzinfo=timezone.utc) == now + timedelta(minutes=10)
+
+    SQLModel.metadata.drop_all(engine)
+
+
+def test_scan_escrow_hands_funded_deal_to_on_funded_after_commit(monkeypatch) -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr("app.worker.ton_watch.notify_deal_funded", lambda **kwargs: None)
+    scheduled_at = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+    adapter = FakeAdapter(
+        [{"hash": "tx1", "lt": "1", "amount_ton": Decimal("10"), "utime": 1, "mc_block_seqno": 10}]
+    )
+    adapter.masterchain_seqno = 20
+    settings = Settings(_env_file=None, TON_CONFIRMATIONS_REQUIRED=3)
+
+    with Session(engine) as session:
+        escrow = _seed_escrow(session, scheduled_at=scheduled_at)
+
+    funded: list[tuple[int, str]] = []
+
+    def _on_funded(deal_id: int, start_at: datetime | None) -> None:
+        # The ETA task may run at once, so the funding has to be visible already.
+        with Session(engine) as check:
+            funded.append((deal_id, check.get(Deal, deal_id).state))
+        assert start_at.replace(tzinfo=timezone.utc) == scheduled_at
+
+    for _ in range(2):
+        assert scan_escrow(
+            escrow.id,
+            adapter=adapter,
+            settings=settings,
+            session_factory=lambda: Session(engine),
+            on_funded=_on_funded,
+        )
+
+    assert funded == [(escrow.deal_id, DealState.FUNDED.value)]
+    SQLModel.metadata.drop_all(engine)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import httpx
+
+from app.services.rate_limit import InMemoryTokenBucket
+from app.services.ton.toncenter_client import PooledToncenterV3Client, TonCenterClient
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _client(handler, *, api_keys, rps: float, clock: FakeClock) -> TonCenterClient:
+    return TonCenterClient(
+        base_url="https://toncenter.test/api/v3",
+        api_keys=api_keys,
+        rps=rps,
+        limiter=InMemoryTokenBucket(clock=clock),
+        transport=httpx.MockTransport(handler),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+
+def test_rate_limited_key_cools_down_and_request_moves_to_next_key() -> None:
+    seen_keys: list[str | None] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_keys.append(request.headers.get("X-API-Key"))
+        if request.headers.get("X-API-Key") == "key-a":
+            return httpx.Response(429, headers={"Retry-After": "5"})
+        return httpx.Response(200, json={"last": {"seqno": 7}})
+
+    clock = FakeClock()
+    client = _client(handler, api_keys=["key-a", "key-b"], rps=10, clock=clock)
+
+    first = client.get("/masterchainInfo")
+    second = client.get("/masterchainInfo")
+
+    assert first.json() == {"last": {"seqno": 7}}
+    assert second.status_code == 200
+    # key-a sits out its Retry-After window instead of being hit again.
+    assert seen_keys == ["key-a", "key-b", "key-b"]
+    assert clock.sleeps == []
+
+
+def test_requests_wait_for_the_shared_rps_budget() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={})
+
+    clock = FakeClock()
+    client = _client(handler, api_keys=["key-a"], rps=2, clock=clock)
+
+    for _ in range(4):
+        client.get("/masterchainInfo")
+
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_pooled_tonutils_client_unwraps_toncenter_envelope() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/v3/runGetMethod"
+        return httpx.Response(200, json={"ok": True, "result": {"stack": []}})
+
+    clock = FakeClock()
+    http = _client(handler, api_keys=[], rps=10, clock=clock)
+    client = PooledToncenterV3Client(http, is_testnet=True, base_url="https://toncenter.test")
+
+    result = asyncio.run(client._request("POST", "/runGetMethod", body={"address": "x"}))
+
+    assert result == {"stack": []}
+
+
+def test_pooled_tonutils_client_does_not_block_the_event_loop() -> None:
+    # Both requests must be in flight at once to pass the barrier; a blocking call would time out.
+    barrier = threading.Barrier(2, timeout=5)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        barrier.wait()
+        return httpx.Response(200, json={"ok": True, "result": {"stack": []}})
+
+    clock = FakeClock()
+    http = _client(handler, api_keys=[], rps=10, clock=clock)
+    client = PooledToncenterV3Client(http, is_testnet=True, base_url="https://toncenter.test")
+
+    async def run_both():
+        return await asyncio.gather(
+            client._request("POST", "/runGetMethod", body={"address": "x"}),
+            client._request("POST", "/runGetMethod", body={"address": "y"}),
+        )
+
+    assert asyncio.run(run_both()) == [{"stack": []}, {"stack": []}]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+from prometheus_client import REGISTRY
+
+from app.services.rate_limit import InMemoryTokenBucket
+from app.services.ton.toncenter_client import TonCenterClient
+from app.worker.metrics import _on_task_postrun, _on_task_prerun, _stamp_published_at
+
+
+def _sample(name: str, labels: dict[str, str]) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_task_hooks_record_duration_and_lag_from_the_later_of_publish_and_eta() -> None:
+    headers: dict = {}
+    _stamp_published_at(headers=headers)
+    eta = datetime.now(timezone.utc) - timedelta(seconds=30)
+    task = SimpleNamespace(
+        name="tests.metrics_task",
+        request=SimpleNamespace(published_at=headers["published_at"] - 60, eta=eta.isoformat()),
+    )
+    lag_labels = {"task": "tests.metrics_task"}
+    duration_labels = {"task": "tests.metrics_task", "state": "SUCCESS"}
+    lag_sum = _sample("celery_task_queue_lag_seconds_sum", lag_labels)
+    runs = _sample("celery_task_duration_seconds_count", duration_labels)
+
+    _on_task_prerun(task_id="task-1", task=task)
+    _on_task_postrun(task_id="task-1", task=task, state="SUCCESS")
+
+    lag = _sample("celery_task_queue_lag_seconds_sum", lag_labels) - lag_sum
+    # Waiting for the ETA is not queue lag.
+    assert 30 <= lag < 30 + (time.time() - headers["published_at"]) + 5
+    assert _sample("celery_task_duration_seconds_count", duration_labels) == runs + 1
+
+
+def test_toncenter_requests_are_timed_by_method_and_outcome() -> None:
+    responses = iter([httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200, json={})])
+    client = TonCenterClient(
+        base_url="https://toncenter.test/api/v3",
+        api_keys=["key-a"],
+        rps=100,
+        limiter=InMemoryTokenBucket(clock=time.monotonic),
+        transport=httpx.MockTransport(lambda request: next(responses)),
+        sleep=lambda seconds: None,
+    )
+    labels = {"service": "toncenter", "method": "masterchainInfo"}
+    before = {
+        outcome: _sample("outbound_call_duration_seconds_count", {**labels, "outcome": outcome})
+        for outcome in ("ok", "rate_limited")
+    }
+
+    assert client.get("/masterchainInfo").status_code == 200
+
+    for outcome in ("ok", "rate_limited"):
+        count = _sample("outbound_call_duration_seconds_count", {**labels, "outcome": outcome})
+        assert count == before[outcome] + 1
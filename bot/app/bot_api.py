@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import httpx
 
+from shared.telegram.bot_api import DEFAULT_BOT_API_URL
 from shared.telegram.errors import TelegramApiError, TelegramConfigError
 
 
@@ -16,7 +17,8 @@ class BotApiService:
             raise TelegramConfigError("TELEGRAM_BOT_TOKEN is not configured")
 
     def _base_url(self) -> str:
-        return f"https://api.telegram.org/bot{self._settings.TELEGRAM_BOT_TOKEN}"
+        api_url = getattr(self._settings, "TELEGRAM_BOT_API_URL", None) or DEFAULT_BOT_API_URL
+        return f"{api_url.rstrip('/')}/bot{self._settings.TELEGRAM_BOT_TOKEN}"
 
     @staticmethod
     def _request_timeout(*, read_timeout: float) -> httpx.Timeout:
@@ -61,3 +63,25 @@ class BotApiService:
         if response.status_code != 200:
             raise TelegramApiError(f"Bot API error {response.status_code}: {response.text}")
         return response.json()
+
+    def set_webhook(self, *, url: str, secret_token: str | None = None) -> dict:
+        self._require_enabled()
+        payload: dict[str, object] = {"url": url}
+        if secret_token:
+            payload["secret_token"] = secret_token
+        return self._post("setWebhook", payload)
+
+    def delete_webhook(self) -> dict:
+        # getUpdates is rejected while a webhook is registered, so polling clears it first.
+        self._require_enabled()
+        return self._post("deleteWebhook", {})
+
+    def _post(self, method: str, payload: dict[str, object]) -> dict:
+        response = httpx.post(
+            f"{self._base_url()}/{method}",
+            json=payload,
+            timeout=self._request_timeout(read_timeout=20.0),
+        )
+        if response.status_code != 200:
+            raise TelegramApiError(f"Bot API error {response.status_code}: {response.text}")
+        return response.json()
@@ -8,11 +8,12 @@ from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 
 from app.bot_api import BotApiService
+from app.selection_store import DbDealSelectionStore, DealSelectionStore, DealSelectionUnavailable
 from app.settings import Settings
 from shared.db.models.deal import Deal, DealState
 from shared.db.models.deal_event import DealEvent
-from shared.db.models.deal_message_selection import DealMessageSelection
 from shared.db.models.users import User
+from shared.telegram.member_cache import BotMemberCache
 
 DEAL_MENU_STATES = {DealState.DRAFT.value, DealState.NEGOTIATION.value}
 
@@ -112,7 +113,15 @@ def handle_update(
     db: Session,
     bot_api: BotApiService,
     settings: Settings,
+    member_cache: BotMemberCache | None = None,
+    selection_store: DealSelectionStore | None = None,
 ) -> None:
+    chat_member_update = update.get("my_chat_member")
+    if isinstance(chat_member_update, dict):
+        if member_cache is not None:
+            _invalidate_bot_member(member_cache=member_cache, chat_member_update=chat_member_update)
+        return
+
     incoming = parse_update(update)
     if incoming is None:
         return
@@ -140,9 +149,13 @@ def handle_update(
         _handle_deals_menu(db=db, bot_api=bot_api, user_id=user.id, chat_id=incoming.chat_id)
         return
 
+    if selection_store is None:
+        selection_store = DbDealSelectionStore(db)
+
     if text.startswith("/deal"):
         _handle_deal_select(
             db=db,
+            selection_store=selection_store,
             bot_api=bot_api,
             user_id=user.id,
             chat_id=incoming.chat_id,
@@ -152,6 +165,7 @@ def handle_update(
 
     _handle_forward_message(
         db=db,
+        selection_store=selection_store,
         bot_api=bot_api,
         user_id=user.id,
         chat_id=incoming.chat_id,
@@ -159,6 +173,18 @@ def handle_update(
     )
 
 
+def _invalidate_bot_member(*, member_cache: BotMemberCache, chat_member_update: dict[str, Any]) -> None:
+    # The bot was promoted, restricted or removed; cached permission checks for the chat are stale.
+    chat = chat_member_update.get("chat") or {}
+    refs: list[int | str] = []
+    if chat.get("id") is not None:
+        refs.append(chat["id"])
+    if chat.get("username"):
+        refs.append(chat["username"])
+    if refs:
+        member_cache.invalidate(*refs)
+
+
 def _handle_deals_menu(*, db: Session, bot_api: BotApiService, user_id: int, chat_id: int) -> None:
     deals = db.exec(
         select(Deal)
@@ -180,6 +206,7 @@ def _handle_deals_menu(*, db: Session, bot_api: BotApiService, user_id: int, cha
 def _handle_deal_select(
     *,
     db: Session,
+    selection_store: DealSelectionStore,
     bot_api: BotApiService,
     user_id: int,
     chat_id: int,
@@ -209,18 +236,7 @@ def _handle_deal_select(
         bot_api.send_message(chat_id=chat_id, text="Not authorized for this deal")
         return
 
-    selection = db.exec(select(DealMessageSelection).where(DealMessageSelection.user_id == user_id)).first()
-    if selection is None:
-        selection = DealMessageSelection(user_id=user_id, deal_id=deal.id)
-    else:
-        selection.deal_id = deal.id
-        selection.selected_at = datetime.now(timezone.utc)
-
-    db.add(selection)
-    try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
+    if not selection_store.set(user_id, deal.id):
         bot_api.send_message(chat_id=chat_id, text="Failed to select deal")
         return
 
@@ -230,26 +246,31 @@ def _handle_deal_select(
 def _handle_forward_message(
     *,
     db: Session,
+    selection_store: DealSelectionStore,
     bot_api: BotApiService,
     user_id: int,
     chat_id: int,
     text: str,
 ) -> None:
-    selection = db.exec(select(DealMessageSelection).where(DealMessageSelection.user_id == user_id)).first()
-    if selection is None:
+    try:
+        selected_deal_id = selection_store.get(user_id)
+    except DealSelectionUnavailable:
+        bot_api.send_message(
+            chat_id=chat_id, text="Could not look up your selected deal. Please send your message again."
+        )
+        return
+    if selected_deal_id is None:
         bot_api.send_message(chat_id=chat_id, text="Please run /deals to select a deal first.")
         return
 
-    deal = db.exec(select(Deal).where(Deal.id == selection.deal_id)).first()
+    deal = db.exec(select(Deal).where(Deal.id == selected_deal_id)).first()
     if deal is None or deal.state not in DEAL_MENU_STATES:
-        db.delete(selection)
-        db.commit()
+        selection_store.clear(user_id)
         bot_api.send_message(chat_id=chat_id, text="Deal is no longer available. Use /deals again.")
         return
 
     if user_id not in {deal.advertiser_id, deal.channel_owner_id}:
-        db.delete(selection)
-        db.commit()
+        selection_store.clear(user_id)
         bot_api.send_message(chat_id=chat_id, text="Not authorized for this deal")
         return
 
@@ -266,9 +287,8 @@ def _handle_forward_message(
         payload={"text": text, "to_user_id": recipient.id},
     )
     db.add(event)
-
-    db.delete(selection)
     db.commit()
+    selection_store.clear(user_id)
 
     shortcut = f"/deal {deal.id}"
     outbound_text = f"Deal #{deal.id}: {text}"
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import queue
+import threading
+from typing import Any, Callable, Protocol
+
+logger = logging.getLogger(__name__)
+
+_CHAT_KEYS = (
+    "message",
+    "edited_message",
+    "channel_post",
+    "edited_channel_post",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+)
+# Telegram numbers updates from a random value after a week without any. Redelivered updates
+# sit just below the committed offset, so an id this far below it starts a new sequence.
+UPDATE_ID_RESET_GAP = 10_000
+
+
+class UpdateOffsetStore(Protocol):
+    def load(self) -> int | None: ...
+
+    def save(self, update_id: int) -> None: ...
+
+    def reset(self, update_id: int) -> None: ...
+
+
+def update_chat_id(update: dict[str, Any]) -> int | None:
+    for key in _CHAT_KEYS:
+        payload = update.get(key)
+        if isinstance(payload, dict):
+            chat_id = (payload.get("chat") or {}).get("id")
+            if chat_id is not None:
+                return int(chat_id)
+    callback_query = update.get("callback_query")
+    if isinstance(callback_query, dict):
+        chat_id = ((callback_query.get("message") or {}).get("chat") or {}).get("id")
+        if chat_id is not None:
+            return int(chat_id)
+    return None
+
+
+class UpdateDispatcher:
+    """Runs update handlers on a fixed pool of threads, one FIFO queue per thread.
+
+    Updates are sharded by chat id, so a chat's updates are handled in arrival order while
+    different chats proceed in parallel. The committed offset only advances past an update
+    once every earlier update has finished, so a restart resumes without gaps or repeats.
+    When Telegram restarts its numbering well below the committed offset, the offset is reset
+    to the new sequence and updates still running from the old one stop holding it back.
+    The offset is written outside the lock by one thread at a time, which always writes the
+    newest committed offset, so workers never wait on the store.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[dict[str, Any]], None],
+        *,
+        workers: int,
+        offset_store: UpdateOffsetStore,
+    ) -> None:
+        self._handler = handler
+        self._offset_store = offset_store
+        self._queues: list[queue.Queue] = [queue.Queue() for _ in range(max(1, workers))]
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._committed = offset_store.load()
+        self._saved = self._committed
+        self._saving = False
+        self._reset_pending = False
+        self._in_flight: list[int] = []
+        self._seen: set[int] = set()
+        self._finished: set[int] = set()
+        # Updates still running from before a numbering reset; they no longer gate the offset.
+        self._abandoned: set[int] = set()
+
+    @property
+    def committed_update_id(self) -> int | None:
+        with self._lock:
+            return self._committed
+
+    def start(self) -> None:
+        for index, work_queue in enumerate(self._queues):
+            thread = threading.Thread(
+                target=self._run,
+                args=(work_queue,),
+                name=f"bot-update-worker-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, update: dict[str, Any]) -> bool:
+        """Queue an update; returns False for duplicates and already committed updates."""
+        update_id = update.get("update_id")
+        if not isinstance(update_id, int):
+            return False
+        with self._lock:
+            if self._committed is not None and update_id <= self._committed:
+                if self._committed - update_id < UPDATE_ID_RESET_GAP:
+                    return False
+                self._reset_sequence(update_id)
+            if update_id in self._seen:
+                return False
+            self._seen.add(update_id)
+            heapq.heappush(self._in_flight, update_id)
+
+        chat_id = update_chat_id(update)
+        shard = 0 if chat_id is None else chat_id % len(self._queues)
+        self._queues[shard].put(update)
+        return True
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until every submitted update has been handled."""
+        with self._idle:
+            return self._idle.wait_for(self._is_idle, timeout=timeout)
+
+    def stop(self, timeout: float | None = None) -> None:
+        for work_queue in self._queues:
+            work_queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def _run(self, work_queue: queue.Queue) -> None:
+        while True:
+            update = work_queue.get()
+            if update is None:
+                return
+            try:
+                self._handler(update)
+            except Exception:
+                # A failing update must not stall the chat or the committed offset behind it.
+                logger.exception("Failed to handle update", extra={"update_id": update.get("update_id")})
+            self._finish(update["update_id"])
+
+    def _reset_sequence(self, update_id: int) -> None:
+        # Called under the lock when ``update_id`` starts a new numbering sequence.
+        logger.warning(
+            "Telegram update ids restarted; resetting the committed offset",
+            extra={"update_id": update_id, "committed_update_id": self._committed},
+        )
+        for stale_id in self._in_flight:
+            if stale_id in self._finished:
+                self._finished.discard(stale_id)
+                self._seen.discard(stale_id)
+            else:
+                self._abandoned.add(stale_id)
+        self._in_flight = []
+        self._committed = update_id - 1
+        self._reset_pending = True
+
+    def _finish(self, update_id: int) -> None:
+        with self._lock:
+            if update_id in self._abandoned:
+                self._abandoned.discard(update_id)
+                self._seen.discard(update_id)
+                self._notify_if_idle()
+                return
+            self._finished.add(update_id)
+            advanced_to: int | None = None
+            while self._in_flight and self._in_flight[0] in self._finished:
+                advanced_to = heapq.heappop(self._in_flight)
+                self._finished.discard(advanced_to)
+                self._seen.discard(advanced_to)
+            if advanced_to is not None:
+                self._committed = advanced_to
+            save_to = self._start_save()
+            self._notify_if_idle()
+        if save_to is not None:
+            self._persist(save_to)
+
+    def _start_save(self) -> tuple[int, bool] | None:
+        # Called under the lock; returns the offset this thread should write, if any, and
+        # whether it replaces a higher stored offset after a numbering reset.
+        if self._saving or self._committed is None:
+            return None
+        if not self._reset_pending and self._saved is not None and self._committed <= self._saved:
+            return None
+        self._saving = True
+        reset, self._reset_pending = self._reset_pending, False
+        return self._committed, reset
+
+    def _persist(self, save: tuple[int, bool]) -> None:
+        while True:
+            update_id, reset = save
+            try:
+                if reset:
+                    self._offset_store.reset(update_id)
+                else:
+                    self._offset_store.save(update_id)
+            except Exception:
+                logger.exception("Failed to persist update offset", extra={"update_id": update_id})
+                with self._lock:
+                    self._saving = False
+                    self._reset_pending = self._reset_pending or reset
+                    self._notify_if_idle()
+                return
+            with self._lock:
+                self._saved = update_id
+                self._saving = False
+                # Offsets committed during the write are picked up before leaving.
+                next_save = self._start_save()
+                if next_save is None:
+                    self._notify_if_idle()
+                    return
+            save = next_save
+
+    def _is_idle(self) -> bool:
+        return not self._in_flight and not self._abandoned and not self._saving
+
+    def _notify_if_idle(self) -> None:
+        if self._is_idle():
+            self._idle.notify_all()
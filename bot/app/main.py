@@ -2,23 +2,66 @@ from __future__ import annotations
 
 import logging
 import time
+from urllib.parse import urlparse
 
 from app.bot_api import BotApiService
 from app.deal_messaging import handle_update
-from app.settings import get_settings
+from app.dispatcher import UpdateDispatcher
+from app.selection_store import RedisDealSelectionStore
+from app.settings import Settings, get_settings
 from app.db import SessionLocal
+from app.update_offsets import DbUpdateOffsetStore, bot_key_from_token
+from shared.telegram.member_cache import RedisBotMemberCache
 
+# How long polling waits for in-flight updates when getUpdates only returned those again.
+POLL_BUSY_WAIT_SECONDS = 1.0
 
-def main() -> None:
-    logging.basicConfig(level=logging.INFO)
-    settings = get_settings()
-    bot_api = BotApiService(settings)
 
-    last_update_id: int | None = None
+def build_dispatcher(settings: Settings, bot_api: BotApiService) -> UpdateDispatcher:
+    member_cache = RedisBotMemberCache.from_url(
+        settings.REDIS_URL,
+        ttl_seconds=settings.BOT_PERMISSION_CACHE_TTL_SECONDS,
+    )
+    selection_store = RedisDealSelectionStore.from_url(
+        settings.REDIS_URL,
+        ttl_seconds=settings.BOT_DEAL_SELECTION_TTL_SECONDS,
+    )
+
+    def handle(update: dict) -> None:
+        with SessionLocal() as session:
+            handle_update(
+                update=update,
+                db=session,
+                bot_api=bot_api,
+                settings=settings,
+                member_cache=member_cache,
+                selection_store=selection_store,
+            )
+
+    return UpdateDispatcher(
+        handle,
+        workers=settings.BOT_WORKERS,
+        offset_store=DbUpdateOffsetStore(
+            SessionLocal,
+            bot_key=bot_key_from_token(settings.TELEGRAM_BOT_TOKEN),
+        ),
+    )
+
+
+def run_polling(bot_api: BotApiService, dispatcher: UpdateDispatcher) -> None:
+    try:
+        bot_api.delete_webhook()
+    except Exception:
+        logging.exception("Failed to delete webhook before polling")
+    dispatcher.start()
 
     while True:
+        # Offsets confirm updates to Telegram, so only confirm what has been fully handled;
+        # anything still in flight is redelivered after a crash and deduplicated meanwhile.
+        committed = dispatcher.committed_update_id
+        offset = None if committed is None else committed + 1
         try:
-            response = bot_api.get_updates(offset=last_update_id, timeout=30)
+            response = bot_api.get_updates(offset=offset, timeout=30)
         except Exception:
             logging.exception("Failed to fetch updates")
             time.sleep(3)
@@ -29,16 +72,37 @@ def main() -> None:
             continue
 
         updates = response.get("result") or []
-        for update in updates:
-            update_id = update.get("update_id")
-            if update_id is None:
-                continue
-            if last_update_id is None or update_id >= last_update_id:
-                last_update_id = update_id + 1
-            with SessionLocal() as session:
-                handle_update(update=update, db=session, bot_api=bot_api, settings=settings)
-
-        time.sleep(0.2)
+        submitted = sum(1 for update in updates if dispatcher.submit(update))
+        if updates and not submitted:
+            dispatcher.join(timeout=POLL_BUSY_WAIT_SECONDS)
+
+
+def run_webhook(settings: Settings, bot_api: BotApiService, dispatcher: UpdateDispatcher) -> None:
+    import uvicorn
+
+    from app.webhook import create_webhook_app
+
+    if not settings.BOT_WEBHOOK_URL:
+        raise RuntimeError("BOT_WEBHOOK_URL is required in webhook mode")
+    bot_api.set_webhook(url=settings.BOT_WEBHOOK_URL, secret_token=settings.BOT_WEBHOOK_SECRET)
+    app = create_webhook_app(
+        dispatcher=dispatcher,
+        path=urlparse(settings.BOT_WEBHOOK_URL).path or "/",
+        secret_token=settings.BOT_WEBHOOK_SECRET,
+    )
+    uvicorn.run(app, host=settings.BOT_WEBHOOK_HOST, port=settings.BOT_WEBHOOK_PORT)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    bot_api = BotApiService(settings)
+    dispatcher = build_dispatcher(settings, bot_api)
+
+    if settings.BOT_MODE == "webhook":
+        run_webhook(settings, bot_api, dispatcher)
+    else:
+        run_polling(bot_api, dispatcher)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Protocol
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from shared.db.models.deal_message_selection import DealMessageSelection
+
+logger = logging.getLogger(__name__)
+
+
+class DealSelectionUnavailable(RuntimeError):
+    """The store could not be read, so whether the user has a selection is unknown."""
+
+
+class DealSelectionStore(Protocol):
+    """Remembers which deal a user picked with /deal until their next message is forwarded."""
+
+    def get(self, user_id: int) -> int | None:
+        """Return the selected deal id, or None; raises ``DealSelectionUnavailable`` if unknown."""
+        ...
+
+    def set(self, user_id: int, deal_id: int) -> bool: ...
+
+    def clear(self, user_id: int) -> None: ...
+
+
+class DbDealSelectionStore:
+    def __init__(self, db: Session) -> None:
+        self._db = db
+
+    def _row(self, user_id: int) -> DealMessageSelection | None:
+        return self._db.exec(
+            select(DealMessageSelection).where(DealMessageSelection.user_id == user_id)
+        ).first()
+
+    def get(self, user_id: int) -> int | None:
+        selection = self._row(user_id)
+        return None if selection is None else selection.deal_id
+
+    def set(self, user_id: int, deal_id: int) -> bool:
+        selection = self._row(user_id)
+        if selection is None:
+            selection = DealMessageSelection(user_id=user_id, deal_id=deal_id)
+        else:
+            selection.deal_id = deal_id
+            selection.selected_at = datetime.now(timezone.utc)
+
+        self._db.add(selection)
+        try:
+            self._db.commit()
+        except IntegrityError:
+            self._db.rollback()
+            return False
+        return True
+
+    def clear(self, user_id: int) -> None:
+        selection = self._row(user_id)
+        if selection is None:
+            return
+        self._db.delete(selection)
+        self._db.commit()
+
+
+class RedisDealSelectionStore:
+    def __init__(self, client, *, ttl_seconds: int, prefix: str = "bot:deal_selection:") -> None:
+        self._client = client
+        self._ttl_seconds = ttl_seconds
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, *, ttl_seconds: int) -> "RedisDealSelectionStore":
+        import redis
+
+        return cls(redis.Redis.from_url(url), ttl_seconds=ttl_seconds)
+
+    def _key(self, user_id: int) -> str:
+        return f"{self._prefix}{user_id}"
+
+    def get(self, user_id: int) -> int | None:
+        try:
+            raw = self._client.get(self._key(user_id))
+        except Exception as exc:
+            logger.exception("Failed to load deal selection", extra={"user_id": user_id})
+            raise DealSelectionUnavailable(str(exc)) from exc
+        if raw is None:
+            return None
+        try:
+            return int(raw)
+        except (TypeError, ValueError):
+            return None
+
+    def set(self, user_id: int, deal_id: int) -> bool:
+        try:
+            self._client.set(self._key(user_id), str(deal_id), ex=self._ttl_seconds)
+        except Exception:
+            logger.exception("Failed to store deal selection", extra={"user_id": user_id})
+            return False
+        return True
+
+    def clear(self, user_id: int) -> None:
+        # A selection left behind still expires with its TTL.
+        try:
+            self._client.delete(self._key(user_id))
+        except Exception:
+            logger.exception("Failed to clear deal selection", extra={"user_id": user_id})
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     TELEGRAM_BOT_TOKEN: str | None = None
+    TELEGRAM_BOT_API_URL: str = "https://api.telegram.org"
     TELEGRAM_API_ID: int | None = None
     TELEGRAM_API_HASH: str | None = None
     TELEGRAM_ENABLED: bool = True
@@ -17,6 +19,15 @@ class Settings(BaseSettings):
     TELEGRAM_MTPROXY_PORT: int | None = None
     TELEGRAM_MTPROXY_SECRET: str | None = None
     TELEGRAM_MEDIA_CHANNEL_ID: int | None = None
+    REDIS_URL: str = "redis://redis:6379/0"
+    BOT_PERMISSION_CACHE_TTL_SECONDS: int = 120
+    BOT_DEAL_SELECTION_TTL_SECONDS: int = 3600
+    BOT_MODE: Literal["polling", "webhook"] = "polling"
+    BOT_WORKERS: int = 8
+    BOT_WEBHOOK_URL: str | None = None
+    BOT_WEBHOOK_SECRET: str | None = None
+    BOT_WEBHOOK_HOST: str = "0.0.0.0"
+    BOT_WEBHOOK_PORT: int = 8080
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy import update
+from sqlmodel import Session
+
+from shared.db.models.bot_update_offset import BotUpdateOffset
+
+
+def bot_key_from_token(token: str | None) -> str:
+    # The numeric prefix of a bot token is the bot id; the secret part is never stored.
+    if not token:
+        return "default"
+    return token.split(":", 1)[0]
+
+
+class DbUpdateOffsetStore:
+    def __init__(self, session_factory: Callable[[], Session], *, bot_key: str) -> None:
+        self._session_factory = session_factory
+        self._bot_key = bot_key
+
+    def load(self) -> int | None:
+        with self._session_factory() as session:
+            row = session.get(BotUpdateOffset, self._bot_key)
+            return None if row is None else int(row.last_update_id)
+
+    def save(self, update_id: int) -> None:
+        """Store ``update_id`` unless a newer offset is already stored."""
+        now = datetime.now(timezone.utc)
+        with self._session_factory() as session:
+            # Conditional, so an older write landing late never overwrites a newer one.
+            updated = session.execute(
+                update(BotUpdateOffset)
+                .where(BotUpdateOffset.bot_key == self._bot_key)
+                .where(BotUpdateOffset.last_update_id < update_id)
+                .values(last_update_id=update_id, updated_at=now)
+            ).rowcount
+            if not updated and session.get(BotUpdateOffset, self._bot_key) is None:
+                session.add(
+                    BotUpdateOffset(bot_key=self._bot_key, last_update_id=update_id, updated_at=now)
+                )
+            session.commit()
+
+    def reset(self, update_id: int) -> None:
+        """Store ``update_id`` even below the stored offset, after Telegram restarts numbering."""
+        now = datetime.now(timezone.utc)
+        with self._session_factory() as session:
+            row = session.get(BotUpdateOffset, self._bot_key)
+            if row is None:
+                row = BotUpdateOffset(bot_key=self._bot_key, last_update_id=update_id, updated_at=now)
+            else:
+                row.last_update_id = update_id
+                row.updated_at = now
+            session.add(row)
+            session.commit()
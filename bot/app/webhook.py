@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hmac
+import json
+from typing import Any, Awaitable, Callable
+
+from app.dispatcher import UpdateDispatcher
+
+SECRET_HEADER = b"x-telegram-bot-api-secret-token"
+DRAIN_TIMEOUT_SECONDS = 30.0
+
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+async def _respond(send: Send, status: int, body: bytes = b"") -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain"), (b"content-length", str(len(body)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks: list[bytes] = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def create_webhook_app(
+    *,
+    dispatcher: UpdateDispatcher,
+    path: str,
+    secret_token: str | None,
+):
+    """Minimal ASGI app for Telegram webhooks.
+
+    Updates are handed to the dispatcher and acknowledged right away, so Telegram never waits
+    on handler work; lifespan startup/shutdown starts the workers and drains them.
+    """
+
+    async def lifespan(receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                dispatcher.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                dispatcher.join(timeout=DRAIN_TIMEOUT_SECONDS)
+                dispatcher.stop(timeout=DRAIN_TIMEOUT_SECONDS)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def app(scope: dict[str, Any], receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if scope["path"] != path:
+            await _respond(send, 404)
+            return
+        if scope["method"] != "POST":
+            await _respond(send, 405)
+            return
+        if secret_token:
+            headers = dict(scope.get("headers") or [])
+            provided = headers.get(SECRET_HEADER, b"").decode("latin-1")
+            if not hmac.compare_digest(provided, secret_token):
+                await _respond(send, 401)
+                return
+
+        try:
+            update = json.loads(await _read_body(receive))
+        except ValueError:
+            await _respond(send, 400)
+            return
+        if not isinstance(update, dict):
+            await _respond(send, 400)
+            return
+
+        dispatcher.submit(update)
+        await _respond(send, 200, b"ok")
+
+    return app
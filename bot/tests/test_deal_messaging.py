@@ -8,12 +8,14 @@ from sqlalchemy.pool import StaticPool
 from sqlmodel import Session, select
 
 from app.deal_messaging import handle_update
+from app.selection_store import RedisDealSelectionStore
 from app.settings import Settings
 from shared.db.base import SQLModel
 from shared.db.models.deal import Deal, DealSourceType, DealState
 from shared.db.models.deal_event import DealEvent
 from shared.db.models.deal_message_selection import DealMessageSelection
 from shared.db.models.users import User
+from shared.telegram.member_cache import InMemoryBotMemberCache
 
 
 class FakeBotApi:
@@ -49,7 +51,7 @@ def _make_update(user_id: int, text: str | None) -> dict:
     }
 
 
-def _seed_deal(session: Session, *, deal_id: int = 1) -> tuple[User, User, Deal]:
+def _seed_deal(session: Session, *, deal_id: int = 1, **deal_overrides) -> tuple[User, User, Deal]:
     advertiser = User(telegram_user_id=111, username="adv")
     owner = User(telegram_user_id=222, username="owner")
     session.add(advertiser)
@@ -71,6 +73,7 @@ def _seed_deal(session: Session, *, deal_id: int = 1) -> tuple[User, User, Deal]
         creative_media_ref="ref",
         posting_params=None,
         state=DealState.DRAFT.value,
+        **deal_overrides,
     )
     session.add(deal)
     session.commit()
@@ -88,6 +91,28 @@ def test_unregistered_user_prompt(db_engine) -> None:
     assert bot.sent[-1]["text"] == "Please run /start to register first."
 
 
+def test_my_chat_member_update_invalidates_cached_bot_member(db_engine) -> None:
+    bot = FakeBotApi()
+    settings = Settings(_env_file=None, TELEGRAM_BOT_TOKEN="token")
+    cache = InMemoryBotMemberCache(ttl_seconds=60)
+    cache.set(-100123, {"status": "administrator"})
+    cache.set("@MyChannel", {"status": "administrator"})
+    update = {
+        "update_id": 2,
+        "my_chat_member": {
+            "chat": {"id": -100123, "type": "channel", "username": "mychannel"},
+            "new_chat_member": {"status": "left"},
+        },
+    }
+
+    with Session(db_engine) as session:
+        handle_update(update=update, db=session, bot_api=bot, settings=settings, member_cache=cache)
+
+    assert cache.get(-100123) is None
+    assert cache.get("mychannel") is None
+    assert bot.sent == []
+
+
 def test_start_registers_user(db_engine) -> None:
     bot = FakeBotApi()
     settings = Settings(_env_file=None, TELEGRAM_BOT_TOKEN="token")
@@ -155,3 +180,102 @@ def test_deal_selection_and_message_forward(db_engine) -> None:
     assert outbound["chat_id"] == owner.telegram_user_id
     assert outbound["text"].startswith("Deal #42:")
     assert "/deal 42" in outbound["reply_markup"]["keyboard"][0][0]["text"]
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.expiries: dict[str, int] = {}
+
+    def get(self, key: str):
+        value = self.values.get(key)
+        return None if value is None else value.encode()
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.values[key] = value
+        self.expiries[key] = ex
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.values.pop(key, None)
+
+
+def test_redis_selection_store_keeps_selection_out_of_database(db_engine) -> None:
+    bot = FakeBotApi()
+    settings = Settings(_env_file=None, TELEGRAM_BOT_TOKEN="token")
+    redis_client = FakeRedis()
+    store = RedisDealSelectionStore(redis_client, ttl_seconds=600)
+
+    with Session(db_engine) as session:
+        advertiser, owner, deal = _seed_deal(
+            session,
+            deal_id=7,
+            placement_type="post",
+            exclusive_hours=0,
+            retention_hours=24,
+        )
+
+        handle_update(
+            update=_make_update(advertiser.telegram_user_id, "/deal 7"),
+            db=session,
+            bot_api=bot,
+            settings=settings,
+            selection_store=store,
+        )
+        assert store.get(advertiser.id) == 7
+        assert redis_client.expiries == {f"bot:deal_selection:{advertiser.id}": 600}
+        assert session.exec(select(DealMessageSelection)).all() == []
+
+        handle_update(
+            update=_make_update(advertiser.telegram_user_id, "Hi there"),
+            db=session,
+            bot_api=bot,
+            settings=settings,
+            selection_store=store,
+        )
+        assert store.get(advertiser.id) is None
+
+    assert bot.sent[-1]["chat_id"] == owner.telegram_user_id
+    assert bot.sent[-1]["text"] == "Deal #7: Hi there"
+
+
+class DownRedis(FakeRedis):
+    def get(self, key: str):
+        raise ConnectionError("redis down")
+
+    def delete(self, *keys: str) -> None:
+        raise ConnectionError("redis down")
+
+
+def test_redis_selection_store_outage_answers_the_forwarded_message(db_engine) -> None:
+    bot = FakeBotApi()
+    settings = Settings(_env_file=None, TELEGRAM_BOT_TOKEN="token")
+    store = RedisDealSelectionStore(DownRedis(), ttl_seconds=600)
+
+    with Session(db_engine) as session:
+        advertiser, _, _ = _seed_deal(
+            session,
+            deal_id=7,
+            placement_type="post",
+            exclusive_hours=0,
+            retention_hours=24,
+        )
+
+        handle_update(
+            update=_make_update(advertiser.telegram_user_id, "Hi there"),
+            db=session,
+            bot_api=bot,
+            settings=settings,
+            selection_store=store,
+        )
+        # Clearing is best effort: the selection expires with its TTL anyway.
+        store.clear(advertiser.id)
+
+        assert session.exec(select(DealEvent)).all() == []
+
+    assert bot.sent == [
+        {
+            "chat_id": advertiser.telegram_user_id,
+            "text": "Could not look up your selected deal. Please send your message again.",
+        }
+    ]
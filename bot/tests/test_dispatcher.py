@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session
+
+from app.dispatcher import UPDATE_ID_RESET_GAP, UpdateDispatcher, update_chat_id
+from app.update_offsets import DbUpdateOffsetStore, bot_key_from_token
+from app.webhook import create_webhook_app
+from shared.db.base import SQLModel
+
+
+class MemoryOffsetStore:
+    def __init__(self, initial: int | None = None) -> None:
+        self.value = initial
+        self.saved: list[int] = []
+
+    def load(self) -> int | None:
+        return self.value
+
+    def save(self, update_id: int) -> None:
+        self.value = update_id
+        self.saved.append(update_id)
+
+    def reset(self, update_id: int) -> None:
+        self.value = update_id
+        self.saved.append(update_id)
+
+
+def _update(update_id: int, chat_id: int) -> dict:
+    return {"update_id": update_id, "message": {"chat": {"id": chat_id}, "from": {"id": chat_id}}}
+
+
+def test_update_chat_id_reads_common_update_kinds() -> None:
+    assert update_chat_id(_update(1, 42)) == 42
+    assert update_chat_id({"update_id": 2, "my_chat_member": {"chat": {"id": -100}}}) == -100
+    assert update_chat_id({"update_id": 3, "callback_query": {"message": {"chat": {"id": 7}}}}) == 7
+    assert update_chat_id({"update_id": 4}) is None
+
+
+def test_dispatcher_keeps_chat_order_and_runs_chats_in_parallel() -> None:
+    release_slow_chat = threading.Event()
+    handled: list[tuple[int, int]] = []
+    lock = threading.Lock()
+
+    def handler(update: dict) -> None:
+        chat_id = update["message"]["chat"]["id"]
+        if update["update_id"] == 1:
+            assert release_slow_chat.wait(timeout=5)
+        with lock:
+            handled.append((chat_id, update["update_id"]))
+        if update["update_id"] == 3:
+            # Chat 2 finished while chat 1 was still blocked on its first update.
+            release_slow_chat.set()
+
+    store = MemoryOffsetStore()
+    dispatcher = UpdateDispatcher(handler, workers=2, offset_store=store)
+    dispatcher.start()
+    try:
+        for update in (_update(1, 1), _update(2, 1), _update(3, 2)):
+            assert dispatcher.submit(update) is True
+        assert dispatcher.join(timeout=5)
+    finally:
+        dispatcher.stop(timeout=5)
+
+    assert handled.index((2, 3)) < handled.index((1, 1))
+    assert [update_id for chat_id, update_id in handled if chat_id == 1] == [1, 2]
+    assert dispatcher.committed_update_id == 3
+    # Update 3 finished first, but the offset could not move past the unfinished updates 1 and 2.
+    assert store.saved == [1, 3]
+
+
+def test_dispatcher_skips_committed_and_duplicate_updates() -> None:
+    seen: list[int] = []
+    dispatcher = UpdateDispatcher(
+        lambda update: seen.append(update["update_id"]),
+        workers=1,
+        offset_store=MemoryOffsetStore(initial=10),
+    )
+    dispatcher.start()
+    try:
+        assert dispatcher.submit(_update(9, 1)) is False
+        assert dispatcher.submit(_update(10, 1)) is False
+        assert dispatcher.submit(_update(11, 1)) is True
+        dispatcher.join(timeout=5)
+        assert dispatcher.submit(_update(11, 1)) is False
+    finally:
+        dispatcher.stop(timeout=5)
+
+    assert seen == [11]
+
+
+def test_dispatcher_follows_telegram_when_update_ids_restart_lower() -> None:
+    release_old = threading.Event()
+    seen: list[int] = []
+
+    def handler(update: dict) -> None:
+        if update["update_id"] == 5_000_001:
+            assert release_old.wait(timeout=5)
+        seen.append(update["update_id"])
+
+    store = MemoryOffsetStore(initial=5_000_000)
+    dispatcher = UpdateDispatcher(handler, workers=2, offset_store=store)
+    dispatcher.start()
+    try:
+        assert dispatcher.submit(_update(5_000_001, 1)) is True
+        assert dispatcher.submit(_update(5_000_000 - UPDATE_ID_RESET_GAP + 1, 2)) is False
+        assert dispatcher.submit(_update(42, 2)) is True
+        assert dispatcher.submit(_update(43, 2)) is True
+        # The update still running from the old sequence does not hold the new offset back.
+        assert not dispatcher.join(timeout=0.2)
+        assert dispatcher.committed_update_id == 43
+        release_old.set()
+        assert dispatcher.join(timeout=5)
+    finally:
+        release_old.set()
+        dispatcher.stop(timeout=5)
+
+    assert sorted(seen) == [42, 43, 5_000_001]
+    assert dispatcher.committed_update_id == 43
+    assert store.value == 43
+
+
+def test_dispatcher_commits_past_failing_handler() -> None:
+    def handler(update: dict) -> None:
+        raise RuntimeError("boom")
+
+    store = MemoryOffsetStore()
+    dispatcher = UpdateDispatcher(handler, workers=1, offset_store=store)
+    dispatcher.start()
+    try:
+        dispatcher.submit(_update(5, 1))
+        assert dispatcher.join(timeout=5)
+    finally:
+        dispatcher.stop(timeout=5)
+
+    assert store.value == 5
+
+
+def test_dispatcher_keeps_handling_while_the_offset_is_written() -> None:
+    class SlowOffsetStore(MemoryOffsetStore):
+        def __init__(self) -> None:
+            super().__init__()
+            self.writing = threading.Event()
+            self.release = threading.Event()
+
+        def save(self, update_id: int) -> None:
+            if not self.saved:
+                self.writing.set()
+                assert self.release.wait(timeout=5)
+            super().save(update_id)
+
+    handled_three = threading.Event()
+
+    def handler(update: dict) -> None:
+        if update["update_id"] == 3:
+            handled_three.set()
+
+    store = SlowOffsetStore()
+    dispatcher = UpdateDispatcher(handler, workers=2, offset_store=store)
+    dispatcher.start()
+    try:
+        dispatcher.submit(_update(1, 1))
+        assert store.writing.wait(timeout=5)
+        dispatcher.submit(_update(2, 2))
+        dispatcher.submit(_update(3, 2))
+        # Finishing update 2 did not wait for the write of offset 1.
+        assert handled_three.wait(timeout=5)
+        store.release.set()
+        assert dispatcher.join(timeout=5)
+    finally:
+        store.release.set()
+        dispatcher.stop(timeout=5)
+
+    # The writer picked up the offset committed meanwhile.
+    assert store.saved == [1, 3]
+
+
+def test_db_offset_store_round_trip() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    store = DbUpdateOffsetStore(lambda: Session(engine), bot_key=bot_key_from_token("12345:secret"))
+
+    assert store.load() is None
+    store.save(7)
+    store.save(5)
+    assert store.load() == 7
+    store.reset(3)
+    assert store.load() == 3
+    assert bot_key_from_token("12345:secret") == "12345"
+
+
+async def _call_app(app, *, method: str, path: str, body: bytes, headers: list | None = None) -> tuple[int, bytes]:
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent: list[dict] = []
+
+    async def receive() -> dict:
+        return messages.pop(0)
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": headers or []}
+    await app(scope, receive, send)
+    return sent[0]["status"], sent[1]["body"]
+
+
+def test_webhook_acknowledges_and_dispatches_update() -> None:
+    submitted: list[dict] = []
+
+    class RecordingDispatcher:
+        def submit(self, update: dict) -> bool:
+            submitted.append(update)
+            return True
+
+    app = create_webhook_app(dispatcher=RecordingDispatcher(), path="/hook", secret_token="s3cret")
+    body = json.dumps(_update(1, 1)).encode()
+
+    status, payload = asyncio.run(
+        _call_app(
+            app,
+            method="POST",
+            path="/hook",
+            body=body,
+            headers=[(b"x-telegram-bot-api-secret-token", b"s3cret")],
+        )
+    )
+    assert (status, payload) == (200, b"ok")
+    assert submitted == [_update(1, 1)]
+
+
+@pytest.mark.parametrize(
+    ("method", "path", "headers", "body", "expected"),
+    [
+        ("POST", "/hook", [], b"{}", 401),
+        ("POST", "/other", [(b"x-telegram-bot-api-secret-token", b"s3cret")], b"{}", 404),
+        ("GET", "/hook", [(b"x-telegram-bot-api-secret-token", b"s3cret")], b"", 405),
+        ("POST", "/hook", [(b"x-telegram-bot-api-secret-token", b"s3cret")], b"not-json", 400),
+    ],
+)
+def test_webhook_rejects_invalid_requests(method, path, headers, body, expected) -> None:
+    class RejectingDispatcher:
+        def submit(self, update: dict) -> bool:
+            raise AssertionError("update must not be dispatched")
+
+    app = create_webhook_app(dispatcher=RejectingDispatcher(), path="/hook", secret_token="s3cret")
+
+    status, _ = asyncio.run(_call_app(app, method=method, path=path, body=body, headers=headers))
+
+    assert status == expected
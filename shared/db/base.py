@@ -1,5 +1,7 @@
 from sqlmodel import SQLModel
 
+from shared.db.models.bot_notification import BotNotification
+from shared.db.models.bot_update_offset import BotUpdateOffset
 from shared.db.models.campaign_application import CampaignApplication
 from shared.db.models.campaign_request import CampaignRequest
 from shared.db.models.channel import Channel
@@ -12,10 +14,14 @@ from shared.db.models.deal_message_selection import DealMessageSelection
 from shared.db.models.escrow_event import EscrowEvent
 from shared.db.models.listing import Listing
 from shared.db.models.listing_format import ListingFormat
+from shared.db.models.media_asset import MediaAsset
+from shared.db.models.ton_payout import TonPayout
 from shared.db.models.users import User
 from shared.db.models.wallet_proof_challenge import WalletProofChallenge
 
 __all__ = [
+    "BotNotification",
+    "BotUpdateOffset",
     "CampaignApplication",
     "CampaignRequest",
     "Channel",
@@ -28,7 +34,9 @@ __all__ = [
     "EscrowEvent",
     "Listing",
     "ListingFormat",
+    "MediaAsset",
     "SQLModel",
+    "TonPayout",
     "User",
     "WalletProofChallenge",
 ]
@@ -1,3 +1,5 @@
+from shared.db.models.bot_notification import BotNotification, BotNotificationState
+from shared.db.models.bot_update_offset import BotUpdateOffset
 from shared.db.models.channel import Channel
 from shared.db.models.channel_member import ChannelMember
 from shared.db.models.campaign_application import CampaignApplication
@@ -9,10 +11,15 @@ from shared.db.models.deal_escrow import DealEscrow
 from shared.db.models.escrow_event import EscrowEvent
 from shared.db.models.listing import Listing
 from shared.db.models.listing_format import ListingFormat
+from shared.db.models.media_asset import MediaAsset
+from shared.db.models.ton_payout import TonPayout, TonPayoutKind, TonPayoutState
 from shared.db.models.users import User
 from shared.db.models.wallet_proof_challenge import WalletProofChallenge
 
 __all__ = [
+    "BotNotification",
+    "BotNotificationState",
+    "BotUpdateOffset",
     "CampaignApplication",
     "CampaignLifecycleState",
     "CampaignRequest",
@@ -27,6 +34,10 @@ __all__ = [
     "EscrowEvent",
     "Listing",
     "ListingFormat",
+    "MediaAsset",
+    "TonPayout",
+    "TonPayoutKind",
+    "TonPayoutState",
     "User",
     "WalletProofChallenge",
 ]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String, Text, text
+from sqlmodel import Field, SQLModel
+
+
+class BotNotificationState(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class BotNotification(SQLModel, table=True):
+    __tablename__ = "bot_notifications"
+    __table_args__ = (
+        Index("ix_bot_notifications_state_next_attempt_at", "state", "next_attempt_at"),
+        # Delivery checks each chat for earlier queued messages before sending.
+        Index("ix_bot_notifications_chat_id_state_id", "chat_id", "state", "id"),
+    )
+
+    id: int | None = Field(default=None, sa_column=Column(Integer, primary_key=True))
+    user_id: int | None = Field(
+        default=None,
+        sa_column=Column(Integer, ForeignKey("users.id"), nullable=True),
+    )
+    chat_id: int = Field(sa_column=Column(BigInteger, nullable=False))
+    message: str = Field(sa_column=Column(Text, nullable=False))
+    event: str = Field(sa_column=Column(String, nullable=False))
+    state: str = Field(
+        default=BotNotificationState.PENDING.value,
+        sa_column=Column(String, nullable=False, server_default=text("'pending'")),
+    )
+    attempts: int = Field(
+        default=0,
+        sa_column=Column(Integer, nullable=False, server_default=text("0")),
+    )
+    next_attempt_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    )
+    last_error: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    sent_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+    created_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    )
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, String, text
+from sqlmodel import Field, SQLModel
+
+
+class BotUpdateOffset(SQLModel, table=True):
+    __tablename__ = "bot_update_offsets"
+
+    bot_key: str = Field(sa_column=Column(String, primary_key=True))
+    last_update_id: int = Field(sa_column=Column(BigInteger, nullable=False))
+    updated_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    )
@@ -145,6 +145,12 @@ class Deal(SQLModel, table=True):
         default=None,
         sa_column=Column(String, nullable=True),
     )
+    # The verification worker only picks up POSTED deals whose next check is due; NULL means
+    # check right away.
+    next_verification_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True, index=True),
+    )
     verified_at: datetime | None = Field(
         default=None,
         sa_column=Column(DateTime(timezone=True), nullable=True),
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Numeric, String, UniqueConstraint, text
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, Numeric, String, UniqueConstraint, text
 from sqlmodel import Field, SQLModel
 
 
@@ -41,6 +41,30 @@ class DealEscrow(SQLModel, table=True):
         default=None,
         sa_column=Column(String, nullable=True, index=True),
     )
+    last_scanned_lt: int | None = Field(
+        default=None,
+        sa_column=Column(BigInteger, nullable=True),
+    )
+    deposit_mc_block_seqno: int | None = Field(
+        default=None,
+        sa_column=Column(Integer, nullable=True),
+    )
+    # While in the future, a watcher run owns this escrow; afterwards it marks the last claim.
+    scan_lease_until: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+    # The watcher only claims escrows whose next scan is due; NULL means scan right away.
+    next_scan_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True, index=True),
+    )
+    # Last sign that a deposit may be close (payment requested, transfer seen); idle
+    # escrows back off from here.
+    scan_activity_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
     deposit_confirmations: int = Field(
         default=0,
         sa_column=Column(Integer, nullable=False, server_default=text("0")),
@@ -54,6 +78,14 @@ class DealEscrow(SQLModel, table=True):
         default=None,
         sa_column=Column(String, nullable=True),
     )
+    sweep_tx_hash: str | None = Field(
+        default=None,
+        sa_column=Column(String, nullable=True),
+    )
+    swept_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
     released_amount_ton: Decimal | None = Field(
         default=None,
         sa_column=Column(Numeric(18, 9), nullable=True),
@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, JSON, String, text
 from sqlmodel import Field, SQLModel
 
 
 class EscrowEvent(SQLModel, table=True):
     __tablename__ = "escrow_events"
+    __table_args__ = (
+        Index("ux_escrow_events_escrow_id_tx_hash", "escrow_id", "tx_hash", unique=True),
+    )
 
     id: int | None = Field(default=None, sa_column=Column(Integer, primary_key=True))
     escrow_id: int = Field(
@@ -21,6 +24,7 @@ class EscrowEvent(SQLModel, table=True):
     to_state: str = Field(sa_column=Column(String, nullable=False))
     event_type: str = Field(sa_column=Column(String, nullable=False))
     payload: dict | list | None = Field(default=None, sa_column=Column(JSON, nullable=True))
+    tx_hash: str | None = Field(default=None, sa_column=Column(String, nullable=True))
     created_at: datetime | None = Field(
         default=None,
         sa_column=Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP")),
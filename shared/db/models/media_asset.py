@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, UniqueConstraint, text
+from sqlmodel import Field, SQLModel
+
+
+class MediaAsset(SQLModel, table=True):
+    __tablename__ = "media_assets"
+    __table_args__ = (
+        UniqueConstraint("sha256", "media_type", name="ux_media_assets_sha256_media_type"),
+    )
+
+    id: int | None = Field(default=None, sa_column=Column(Integer, primary_key=True))
+    sha256: str = Field(sa_column=Column(String(64), nullable=False))
+    media_type: str = Field(sa_column=Column(String, nullable=False))
+    file_id: str = Field(sa_column=Column(String, nullable=False))
+    size_bytes: int = Field(sa_column=Column(BigInteger, nullable=False))
+    created_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    )
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Numeric, String, Text, UniqueConstraint, text
+from sqlmodel import Field, SQLModel
+
+
+class TonPayoutKind(str, Enum):
+    RELEASE = "release"
+    REFUND = "refund"
+    # Moves a funded escrow's balance into the settlement wallet in batched payout mode.
+    SWEEP = "sweep"
+
+
+class TonPayoutState(str, Enum):
+    PENDING = "pending"
+    SUBMITTED = "submitted"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class TonPayout(SQLModel, table=True):
+    __tablename__ = "ton_payouts"
+    __table_args__ = (
+        UniqueConstraint("escrow_id", "kind", name="ux_ton_payouts_escrow_id_kind"),
+        Index("ix_ton_payouts_state_next_attempt_at", "state", "next_attempt_at"),
+    )
+
+    id: int | None = Field(default=None, sa_column=Column(Integer, primary_key=True))
+    deal_id: int = Field(sa_column=Column(Integer, ForeignKey("deals.id"), nullable=False))
+    escrow_id: int = Field(
+        sa_column=Column(Integer, ForeignKey("deal_escrows.id"), nullable=False),
+    )
+    kind: str = Field(sa_column=Column(String, nullable=False))
+    to_address: str = Field(sa_column=Column(String, nullable=False))
+    amount_ton: Decimal = Field(sa_column=Column(Numeric(18, 9), nullable=False))
+    reason: str | None = Field(default=None, sa_column=Column(String, nullable=True))
+    state: str = Field(
+        default=TonPayoutState.PENDING.value,
+        sa_column=Column(String, nullable=False, server_default=text("'pending'")),
+    )
+    tx_hash: str | None = Field(default=None, sa_column=Column(String, nullable=True))
+    source_subwallet_id: int | None = Field(default=None, sa_column=Column(Integer, nullable=True))
+    source_address_raw: str | None = Field(default=None, sa_column=Column(String, nullable=True))
+    external_hash: str | None = Field(default=None, sa_column=Column(String, nullable=True))
+    # Wallet seqno of the first submission; retries reuse it so at most one attempt can execute.
+    seqno: int | None = Field(default=None, sa_column=Column(Integer, nullable=True))
+    expires_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+    submitted_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+    attempts: int = Field(
+        default=0,
+        sa_column=Column(Integer, nullable=False, server_default=text("0")),
+    )
+    next_attempt_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    )
+    last_error: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    # While in the future, a payout worker run owns this row (and, when pending, its source wallet).
+    lease_until: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+    sent_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True),
+    )
+    created_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+    )
@@ -0,0 +1,60 @@
+"""Prometheus metrics shared by the backend and the bot.
+
+With ``PROMETHEUS_MULTIPROC_DIR`` set (required for Celery prefork or several uvicorn
+workers), every process writes its samples there and ``metrics_registry`` aggregates them.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from prometheus_client import REGISTRY, CollectorRegistry, Histogram, multiprocess
+
+OUTBOUND_CALL_SECONDS = Histogram(
+    "outbound_call_duration_seconds",
+    "Duration of calls to external services.",
+    ["service", "method", "outcome"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+class OutboundCall:
+    """Outcome of one timed call; callers downgrade it from the response they got."""
+
+    def __init__(self) -> None:
+        self.outcome = "ok"
+
+    def record_status(self, status_code: int) -> None:
+        if status_code == 429:
+            self.outcome = "rate_limited"
+        elif status_code >= 400:
+            self.outcome = "error"
+
+
+@contextmanager
+def observe_outbound(service: str, method: str) -> Iterator[OutboundCall]:
+    call = OutboundCall()
+    started = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        call.outcome = "error"
+        raise
+    finally:
+        OUTBOUND_CALL_SECONDS.labels(service=service, method=method, outcome=call.outcome).observe(
+            time.perf_counter() - started
+        )
+
+
+def metrics_registry() -> CollectorRegistry:
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+__all__ = ["OUTBOUND_CALL_SECONDS", "OutboundCall", "metrics_registry", "observe_outbound"]
@@ -1,4 +1,4 @@
-from shared.telegram.bot_api import BotApiService
+from shared.telegram.bot_api import AsyncBotApiService, BotApiService
 from shared.telegram.telethon_client import TelegramClientService
 
-__all__ = ["BotApiService", "TelegramClientService"]
+__all__ = ["AsyncBotApiService", "BotApiService", "TelegramClientService"]
@@ -1,11 +1,101 @@
 from __future__ import annotations
 
+from typing import BinaryIO
+
 import httpx
 
-from shared.telegram.errors import TelegramApiError, TelegramConfigError
+from shared.metrics import observe_outbound
+from shared.telegram.errors import TelegramApiError, TelegramConfigError, TelegramRateLimitError
+
+DEFAULT_BOT_API_URL = "https://api.telegram.org"
+
+
+def _raise_for_status(response) -> None:
+    if response.status_code == 200:
+        return
+    message = f"Bot API error {response.status_code}: {response.text}"
+    if response.status_code == 429:
+        retry_after = 1.0
+        try:
+            parameters = response.json().get("parameters") or {}
+            retry_after = float(parameters.get("retry_after", retry_after))
+        except (AttributeError, TypeError, ValueError):
+            pass
+        raise TelegramRateLimitError(message, retry_after=retry_after)
+    raise TelegramApiError(message)
+
+
+def _unwrap_result(payload: dict, method: str) -> dict:
+    if not payload.get("ok"):
+        raise TelegramApiError(f"Bot API error: {payload}")
+    result = payload.get("result")
+    if not isinstance(result, dict):
+        raise TelegramApiError(f"Bot API response missing {method} result")
+    return result
+
+
+def _extract_uploaded_file_id(payload: dict, media_type: str) -> str:
+    if not payload.get("ok"):
+        raise TelegramApiError(f"Bot API error: {payload}")
+
+    result = payload.get("result") or {}
+    file_id: str | None = None
+    if media_type == "image":
+        photos = result.get("photo") or []
+        if isinstance(photos, list) and photos:
+            file_id = photos[-1].get("file_id")
+    else:
+        video = result.get("video") or {}
+        if isinstance(video, dict):
+            file_id = video.get("file_id")
+
+    if not file_id:
+        raise TelegramApiError("Bot API response missing file_id")
+    return file_id
+
 
+def _extract_file_path(payload: dict) -> str:
+    result = _unwrap_result(payload, "getFile")
+    file_path = result.get("file_path")
+    if not isinstance(file_path, str) or not file_path.strip():
+        raise TelegramApiError("Bot API response missing file_path")
+    return file_path
 
-class BotApiService:
+
+def _message_payload(
+    chat_id: int | str,
+    text: str,
+    reply_markup: dict | None,
+    disable_web_page_preview: bool,
+) -> dict[str, object]:
+    payload: dict[str, object] = {
+        "chat_id": chat_id,
+        "text": text,
+        "disable_web_page_preview": disable_web_page_preview,
+    }
+    if reply_markup is not None:
+        payload["reply_markup"] = reply_markup
+    return payload
+
+
+def _media_payload(
+    field_name: str,
+    chat_id: int | str,
+    media: str,
+    caption: str | None,
+    disable_notification: bool,
+) -> dict[str, object]:
+    payload: dict[str, object] = {
+        "chat_id": chat_id,
+        field_name: media,
+        "disable_notification": disable_notification,
+    }
+    if caption is not None:
+        payload["caption"] = caption
+    return payload
+
+
+class _BotApiBase:
     def __init__(self, settings) -> None:
         self._settings = settings
 
@@ -15,11 +105,14 @@ class BotApiService:
         if not self._settings.TELEGRAM_BOT_TOKEN:
             raise TelegramConfigError("TELEGRAM_BOT_TOKEN is not configured")
 
+    def _api_url(self) -> str:
+        return getattr(self._settings, "TELEGRAM_BOT_API_URL", None) or DEFAULT_BOT_API_URL
+
     def _base_url(self) -> str:
-        return f"https://api.telegram.org/bot{self._settings.TELEGRAM_BOT_TOKEN}"
+        return f"{self._api_url().rstrip('/')}/bot{self._settings.TELEGRAM_BOT_TOKEN}"
 
     def _file_base_url(self) -> str:
-        return f"https://api.telegram.org/file/bot{self._settings.TELEGRAM_BOT_TOKEN}"
+        return f"{self._api_url().rstrip('/')}/file/bot{self._settings.TELEGRAM_BOT_TOKEN}"
 
     def _require_story_capability(self) -> str:
         business_connection_id = getattr(self._settings, "TELEGRAM_BUSINESS_CONNECTION_ID", None)
@@ -27,32 +120,51 @@ class BotApiService:
             raise TelegramConfigError("TELEGRAM_BUSINESS_CONNECTION_ID is not configured")
         return str(business_connection_id)
 
+    def _story_payload(self, *, media_type: str, media: str, caption: str | None) -> dict[str, object]:
+        business_connection_id = self._require_story_capability()
+        if media_type == "image":
+            content: dict[str, object] = {"type": "photo", "photo": media}
+        elif media_type == "video":
+            content = {"type": "video", "video": media}
+        else:
+            raise TelegramApiError("Unsupported story media type")
+
+        payload: dict[str, object] = {
+            "business_connection_id": business_connection_id,
+            "content": content,
+        }
+        if caption is not None:
+            payload["caption"] = caption
+        return payload
+
+    def _upload_target(self, media_type: str) -> tuple[int, str, str]:
+        self._require_enabled()
+        channel_id = getattr(self._settings, "TELEGRAM_MEDIA_CHANNEL_ID", None)
+        if not channel_id:
+            raise TelegramConfigError("TELEGRAM_MEDIA_CHANNEL_ID is not configured")
+        if media_type not in {"image", "video"}:
+            raise TelegramApiError("Unsupported media type")
+
+        method = "sendPhoto" if media_type == "image" else "sendVideo"
+        field_name = "photo" if media_type == "image" else "video"
+        return channel_id, method, field_name
+
+
+class BotApiService(_BotApiBase):
     def _post(self, method: str, payload: dict[str, object]) -> dict:
         self._require_enabled()
-        response = httpx.post(f"{self._base_url()}/{method}", json=payload)
-        if response.status_code != 200:
-            raise TelegramApiError(
-                f"Bot API error {response.status_code}: {response.text}"
-            )
+        with observe_outbound("telegram_bot_api", method) as call:
+            response = httpx.post(f"{self._base_url()}/{method}", json=payload)
+            call.record_status(response.status_code)
+        _raise_for_status(response)
         return response.json()
 
     def get_me(self) -> dict:
-        payload = self._post("getMe", {})
-        if not payload.get("ok"):
-            raise TelegramApiError(f"Bot API error: {payload}")
-        result = payload.get("result")
-        if not isinstance(result, dict):
-            raise TelegramApiError("Bot API response missing getMe result")
-        return result
+        return _unwrap_result(self._post("getMe", {}), "getMe")
 
     def get_chat_member(self, *, chat_id: int | str, user_id: int) -> dict:
         payload = self._post("getChatMember", {"chat_id": chat_id, "user_id": user_id})
-        if not payload.get("ok"):
-            raise TelegramApiError(f"Bot API error: {payload}")
-        result = payload.get("result")
-        if not isinstance(result, dict):
-            raise TelegramApiError("Bot API response missing getChatMember result")
-        return result
+        return _unwrap_result(payload, "getChatMember")
 
     def send_message(
         self,
@@ -61,15 +173,10 @@ class BotApiService:
         reply_markup: dict | None = None,
         disable_web_page_preview: bool = True,
     ) -> dict:
-        payload: dict[str, object] = {
-            "chat_id": chat_id,
-            "text": text,
-            "disable_web_page_preview": disable_web_page_preview,
-        }
-        if reply_markup is not None:
-            payload["reply_markup"] = reply_markup
-
-        return self._post("sendMessage", payload)
+        return self._post(
+            "sendMessage",
+            _message_payload(chat_id, text, reply_markup, disable_web_page_preview),
+        )
 
     def send_photo(
         self,
@@ -78,14 +185,10 @@ class BotApiService:
         caption: str | None = None,
         disable_notification: bool = False,
     ) -> dict:
-        payload: dict[str, object] = {
-            "chat_id": chat_id,
-            "photo": photo,
-            "disable_notification": disable_notification,
-        }
-        if caption is not None:
-            payload["caption"] = caption
-        return self._post("sendPhoto", payload)
+        return self._post(
+            "sendPhoto",
+            _media_payload("photo", chat_id, photo, caption, disable_notification),
+        )
 
     def send_video(
         self,
@@ -94,14 +197,10 @@ class BotApiService:
         caption: str | None = None,
         disable_notification: bool = False,
     ) -> dict:
-        payload: dict[str, object] = {
-            "chat_id": chat_id,
-            "video": video,
-            "disable_notification": disable_notification,
-        }
-        if caption is not None:
-            payload["caption"] = caption
-        return self._post("sendVideo", payload)
+        return self._post(
+            "sendVideo",
+            _media_payload("video", chat_id, video, caption, disable_notification),
+        )
 
     def post_story(
         self,
@@ -110,20 +209,7 @@ class BotApiService:
         media: str,
         caption: str | None = None,
     ) -> dict:
-        business_connection_id = self._require_story_capability()
-        if media_type == "image":
-            content: dict[str, object] = {"type": "photo", "photo": media}
-        elif media_type == "video":
-            content = {"type": "video", "video": media}
-        else:
-            raise TelegramApiError("Unsupported story media type")
-
-        payload: dict[str, object] = {
-            "business_connection_id": business_connection_id,
-            "content": content,
-        }
-        if caption is not None:
-            payload["caption"] = caption
+        payload = self._story_payload(media_type=media_type, media=media, caption=caption)
         return self._post("postStory", payload)
 
     def upload_media(
@@ -131,70 +217,189 @@ class BotApiService:
         *,
         media_type: str,
         filename: str,
-        content: bytes,
+        content: bytes | BinaryIO,
     ) -> dict:
-        self._require_enabled()
-        channel_id = getattr(self._settings, "TELEGRAM_MEDIA_CHANNEL_ID", None)
-        if not channel_id:
-            raise TelegramConfigError("TELEGRAM_MEDIA_CHANNEL_ID is not configured")
-        if media_type not in {"image", "video"}:
-            raise TelegramApiError("Unsupported media type")
+        """Upload to the media channel; file objects are streamed by httpx, not read up front."""
+        channel_id, method, field_name = self._upload_target(media_type)
 
-        method = "sendPhoto" if media_type == "image" else "sendVideo"
-        field_name = "photo" if media_type == "image" else "video"
+        with observe_outbound("telegram_bot_api", method) as call:
+            response = httpx.post(
+                f"{self._base_url()}/{method}",
+                data={"chat_id": channel_id, "disable_notification": True},
+                files={field_name: (filename, content)},
+            )
+            call.record_status(response.status_code)
+        _raise_for_status(response)
 
-        response = httpx.post(
-            f"{self._base_url()}/{method}",
-            data={"chat_id": channel_id, "disable_notification": True},
-            files={field_name: (filename, content)},
-        )
+        file_id = _extract_uploaded_file_id(response.json(), media_type)
+        return {"file_id": file_id, "media_type": media_type}
+
+    def get_file_path(self, *, file_id: str) -> str:
+        normalized_file_id = file_id.strip()
+        if not normalized_file_id:
+            raise TelegramApiError("Missing file_id")
+
+        return _extract_file_path(self._post("getFile", {"file_id": normalized_file_id}))
+
+    def download_file(self, *, file_id: str) -> tuple[bytes, str | None]:
+        self._require_enabled()
+        file_path = self.get_file_path(file_id=file_id)
+
+        with observe_outbound("telegram_bot_api", "downloadFile") as call:
+            response = httpx.get(f"{self._file_base_url()}/{file_path}")
+            call.record_status(response.status_code)
         if response.status_code != 200:
             raise TelegramApiError(
-                f"Bot API error {response.status_code}: {response.text}"
+                f"Bot API file error {response.status_code}: {response.text}"
             )
 
-        payload = response.json()
-        if not payload.get("ok"):
-            raise TelegramApiError(f"Bot API error: {payload}")
+        content_type = response.headers.get("content-type")
+        return response.content, content_type
 
-        result = payload.get("result") or {}
-        file_id: str | None = None
-        if media_type == "image":
-            photos = result.get("photo") or []
-            if isinstance(photos, list) and photos:
-                file_id = photos[-1].get("file_id")
-        else:
-            video = result.get("video") or {}
-            if isinstance(video, dict):
-                file_id = video.get("file_id")
+    def stream_file_to(
+        self,
+        *,
+        file_path: str,
+        destination: BinaryIO,
+        chunk_size: int = 64 * 1024,
+    ) -> str | None:
+        """Copy a getFile path into destination chunk by chunk; returns the content type."""
+        self._require_enabled()
+        with (
+            observe_outbound("telegram_bot_api", "downloadFile") as call,
+            httpx.stream("GET", f"{self._file_base_url()}/{file_path}") as response,
+        ):
+            call.record_status(response.status_code)
+            if response.status_code != 200:
+                response.read()
+                raise TelegramApiError(
+                    f"Bot API file error {response.status_code}: {response.text}"
+                )
+            for chunk in response.iter_bytes(chunk_size):
+                destination.write(chunk)
+            return response.headers.get("content-type")
+
+
+class AsyncBotApiService(_BotApiBase):
+    """Bot API client for coroutines; mirrors BotApiService on a pooled httpx.AsyncClient."""
+
+    def __init__(self, settings, client: httpx.AsyncClient | None = None) -> None:
+        super().__init__(settings)
+        self._client = client
+        self._owns_client = client is None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient()
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AsyncBotApiService":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _post(self, method: str, payload: dict[str, object]) -> dict:
+        self._require_enabled()
+        with observe_outbound("telegram_bot_api", method) as call:
+            response = await self._get_client().post(f"{self._base_url()}/{method}", json=payload)
+            call.record_status(response.status_code)
+        _raise_for_status(response)
+        return response.json()
+
+    async def get_me(self) -> dict:
+        return _unwrap_result(await self._post("getMe", {}), "getMe")
 
-        if not file_id:
-            raise TelegramApiError("Bot API response missing file_id")
+    async def get_chat_member(self, *, chat_id: int | str, user_id: int) -> dict:
+        payload = await self._post("getChatMember", {"chat_id": chat_id, "user_id": user_id})
+        return _unwrap_result(payload, "getChatMember")
 
+    async def send_message(
+        self,
+        chat_id: int | str,
+        text: str,
+        reply_markup: dict | None = None,
+        disable_web_page_preview: bool = True,
+    ) -> dict:
+        return await self._post(
+            "sendMessage",
+            _message_payload(chat_id, text, reply_markup, disable_web_page_preview),
+        )
+
+    async def send_photo(
+        self,
+        chat_id: int | str,
+        photo: str,
+        caption: str | None = None,
+        disable_notification: bool = False,
+    ) -> dict:
+        return await self._post(
+            "sendPhoto",
+            _media_payload("photo", chat_id, photo, caption, disable_notification),
+        )
+
+    async def send_video(
+        self,
+        chat_id: int | str,
+        video: str,
+        caption: str | None = None,
+        disable_notification: bool = False,
+    ) -> dict:
+        return await self._post(
+            "sendVideo",
+            _media_payload("video", chat_id, video, caption, disable_notification),
+        )
+
+    async def post_story(
+        self,
+        *,
+        media_type: str,
+        media: str,
+        caption: str | None = None,
+    ) -> dict:
+        payload = self._story_payload(media_type=media_type, media=media, caption=caption)
+        return await self._post("postStory", payload)
+
+    async def upload_media(
+        self,
+        *,
+        media_type: str,
+        filename: str,
+        content: bytes | BinaryIO,
+    ) -> dict:
+        channel_id, method, field_name = self._upload_target(media_type)
+
+        with observe_outbound("telegram_bot_api", method) as call:
+            response = await self._get_client().post(
+                f"{self._base_url()}/{method}",
+                data={"chat_id": channel_id, "disable_notification": True},
+                files={field_name: (filename, content)},
+            )
+            call.record_status(response.status_code)
+        _raise_for_status(response)
+
+        file_id = _extract_uploaded_file_id(response.json(), media_type)
         return {"file_id": file_id, "media_type": media_type}
 
-    def get_file_path(self, *, file_id: str) -> str:
+    async def get_file_path(self, *, file_id: str) -> str:
         normalized_file_id = file_id.strip()
         if not normalized_file_id:
             raise TelegramApiError("Missing file_id")
 
-        payload = self._post("getFile", {"file_id": normalized_file_id})
-        if not payload.get("ok"):
-            raise TelegramApiError(f"Bot API error: {payload}")
-        result = payload.get("result")
-        if not isinstance(result, dict):
-            raise TelegramApiError("Bot API response missing getFile result")
+        return _extract_file_path(await self._post("getFile", {"file_id": normalized_file_id}))
 
-        file_path = result.get("file_path")
-        if not isinstance(file_path, str) or not file_path.strip():
-            raise TelegramApiError("Bot API response missing file_path")
-        return file_path
-
-    def download_file(self, *, file_id: str) -> tuple[bytes, str | None]:
+    async def download_file(self, *, file_id: str) -> tuple[bytes, str | None]:
         self._require_enabled()
-        file_path = self.get_file_path(file_id=file_id)
+        file_path = await self.get_file_path(file_id=file_id)
 
-        response = httpx.get(f"{self._file_base_url()}/{file_path}")
+        with observe_outbound("telegram_bot_api", "downloadFile") as call:
+            response = await self._get_client().get(f"{self._file_base_url()}/{file_path}")
+            call.record_status(response.status_code)
         if response.status_code != 200:
             raise TelegramApiError(
                 f"Bot API file error {response.status_code}: {response.text}"
@@ -202,3 +407,24 @@ class BotApiService:
 
         content_type = response.headers.get("content-type")
         return response.content, content_type
+
+    async def stream_file_to(
+        self,
+        *,
+        file_path: str,
+        destination: BinaryIO,
+        chunk_size: int = 64 * 1024,
+    ) -> str | None:
+        self._require_enabled()
+        url = f"{self._file_base_url()}/{file_path}"
+        with observe_outbound("telegram_bot_api", "downloadFile") as call:
+            async with self._get_client().stream("GET", url) as response:
+                call.record_status(response.status_code)
+                if response.status_code != 200:
+                    await response.aread()
+                    raise TelegramApiError(
+                        f"Bot API file error {response.status_code}: {response.text}"
+                    )
+                async for chunk in response.aiter_bytes(chunk_size):
+                    destination.write(chunk)
+                return response.headers.get("content-type")
@@ -8,3 +8,11 @@ class TelegramApiError(RuntimeError):
 
 class TelegramAuthorizationError(RuntimeError):
     """Raised when a Telegram client is connected but not authorized."""
+
+
+class TelegramRateLimitError(TelegramApiError):
+    """Raised when the Bot API answers 429 Too Many Requests."""
+
+    def __init__(self, message: str, *, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
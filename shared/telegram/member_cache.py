@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Callable, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+def bot_member_cache_key(chat_ref: int | str) -> str:
+    """Normalize a Bot API chat ref so ids and @usernames map to stable cache keys."""
+    if isinstance(chat_ref, int):
+        return str(chat_ref)
+    value = str(chat_ref).strip()
+    if value.lstrip("-").isdigit():
+        return str(int(value))
+    return f"@{value.lstrip('@').lower()}"
+
+
+class BotMemberCache(Protocol):
+    def get(self, chat_ref: int | str) -> dict | None: ...
+
+    def set(self, chat_ref: int | str, member: dict) -> None: ...
+
+    def invalidate(self, *chat_refs: int | str) -> None: ...
+
+
+class InMemoryBotMemberCache:
+    def __init__(self, *, ttl_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: dict[str, tuple[float, dict]] = {}
+
+    def get(self, chat_ref: int | str) -> dict | None:
+        key = bot_member_cache_key(chat_ref)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, member = entry
+        if self._clock() >= expires_at:
+            self._entries.pop(key, None)
+            return None
+        return member
+
+    def set(self, chat_ref: int | str, member: dict) -> None:
+        self._entries[bot_member_cache_key(chat_ref)] = (self._clock() + self._ttl_seconds, member)
+
+    def invalidate(self, *chat_refs: int | str) -> None:
+        for chat_ref in chat_refs:
+            self._entries.pop(bot_member_cache_key(chat_ref), None)
+
+
+class RedisBotMemberCache:
+    """Shared across the API and bot processes so my_chat_member updates can invalidate entries.
+
+    Redis failures degrade to cache misses; permission checks then fall back to the Bot API.
+    """
+
+    def __init__(self, client, *, ttl_seconds: int, prefix: str = "tg:bot_member:") -> None:
+        self._client = client
+        self._ttl_seconds = ttl_seconds
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, *, ttl_seconds: int) -> "RedisBotMemberCache":
+        import redis
+
+        return cls(redis.Redis.from_url(url), ttl_seconds=ttl_seconds)
+
+    def _key(self, chat_ref: int | str) -> str:
+        return f"{self._prefix}{bot_member_cache_key(chat_ref)}"
+
+    def get(self, chat_ref: int | str) -> dict | None:
+        try:
+            raw = self._client.get(self._key(chat_ref))
+        except Exception:
+            logger.warning("Bot member cache read failed", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        try:
+            member = json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+        return member if isinstance(member, dict) else None
+
+    def set(self, chat_ref: int | str, member: dict) -> None:
+        try:
+            self._client.set(self._key(chat_ref), json.dumps(member), ex=self._ttl_seconds)
+        except Exception:
+            logger.warning("Bot member cache write failed", exc_info=True)
+
+    def invalidate(self, *chat_refs: int | str) -> None:
+        if not chat_refs:
+            return
+        try:
+            self._client.delete(*(self._key(chat_ref) for chat_ref in chat_refs))
+        except Exception:
+            logger.warning("Bot member cache invalidation failed", exc_info=True)
@@ -6,6 +6,7 @@ from telethon import TelegramClient
 from telethon.network.connection.tcpmtproxy import ConnectionTcpMTProxyRandomizedIntermediate
 from telethon.sessions import StringSession
 
+from shared.metrics import observe_outbound
 from shared.telegram.errors import TelegramAuthorizationError, TelegramConfigError
 
 
@@ -125,7 +126,8 @@ class TelegramClientService:
     async def connect(self) -> None:
         self._require_enabled()
         client = self._get_client()
-        await client.connect()
+        with observe_outbound("telegram_mtproto", "connect"):
+            await client.connect()
 
     async def is_authorized(self) -> bool:
         self._require_enabled()